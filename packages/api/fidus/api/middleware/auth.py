@@ -22,6 +22,10 @@ logger = logging.getLogger(__name__)
 SKIP_AUTH_PATHS = [
     "/health",
     "/health/db",
+    "/health/warmup",
+    "/health/prompt-cache",
+    "/health/agents",
+    "/health/resources",
     "/docs",
     "/redoc",
     "/openapi.json",
@@ -5,13 +5,21 @@ Provides basic health checks and database connectivity checks for:
 - PostgreSQL (relational database for structured data)
 - Qdrant (vector database for embeddings)
 - Redis (cache layer)
+
+/health reports "warming_up" with status 503 until startup warmup is done
+(see fidus/api/warmup.py).
 """
 
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import Dict, Any
 
+from fidus.api.warmup import warmup_state
+from fidus.infrastructure.resources import get_resources
+from fidus.memory.prompt_cache import prompt_cache_metrics
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["health"])
@@ -36,16 +44,71 @@ class DatabaseHealthResponse(BaseModel):
     databases: Dict[str, DatabaseHealthDetail]
 
 
+class WarmupResponse(BaseModel):
+    """Startup warmup progress and per-component timings."""
+    state: str  # "not_started", "warming_up" or "ready"
+    duration_seconds: float | None = None
+    components: Dict[str, Dict[str, Any]]
+
+
 @router.get("/health", response_model=HealthResponse)
-async def health_check() -> HealthResponse:
+async def health_check(response: Response) -> HealthResponse:
     """Basic health check endpoint.
 
-    Returns 200 OK if the API is running.
+    Returns 200 OK if the API is running, or 503 while startup warmup is
+    still loading models and priming connections.
     Does not check database connectivity.
     """
+    if warmup_state.is_warming_up:
+        response.status_code = 503
+        return HealthResponse(status="warming_up", message="Fidus Memory API is warming up")
     return HealthResponse(status="ok", message="Fidus Memory API is running")
 
 
+@router.get("/health/warmup", response_model=WarmupResponse)
+async def warmup_status() -> WarmupResponse:
+    """Startup warmup status with per-component timings.
+
+    Returns:
+        WarmupResponse with overall state and result for each component
+    """
+    return WarmupResponse(**warmup_state.to_dict())
+
+
+@router.get("/health/prompt-cache")
+async def prompt_cache_status() -> Dict[str, Any]:
+    """Prompt prefix cache metrics for chat completions.
+
+    Returns:
+        Prefix stability across turns and, where the LLM provider reports
+        them, cached prompt tokens (see fidus/memory/prompt_cache.py)
+    """
+    return prompt_cache_metrics.stats()
+
+
+@router.get("/health/agents")
+async def agent_registry_status() -> Dict[str, Any]:
+    """Per-user agent registry metrics.
+
+    Returns:
+        Agent count, evictions and estimated memory of the registry
+        (see fidus/memory/agent_registry.py)
+    """
+    from fidus.api.routes.memory import user_agents
+
+    return user_agents.stats()
+
+
+@router.get("/health/resources")
+async def resources_status() -> Dict[str, Any]:
+    """Shared connection pool state.
+
+    Returns:
+        Open pools and configured pool sizes (see fidus/infrastructure/resources.py)
+    """
+    return get_resources().stats()
+
+
 @router.get("/health/db", response_model=DatabaseHealthResponse)
 async def database_health_check() -> DatabaseHealthResponse:
     """Detailed health check for all database connections.
@@ -93,18 +156,12 @@ async def _check_neo4j() -> DatabaseHealthDetail:
     """Check Neo4j connectivity."""
     try:
         from fidus.config import config
-        from fidus.infrastructure.neo4j_client import Neo4jPreferenceStore
-
-        store = Neo4jPreferenceStore(config)
-        await store.connect()
 
-        # Simple query to verify connection
-        async with store.driver.session() as session:
+        # Simple query on the shared driver to verify connection
+        async with get_resources().neo4j_driver.session() as session:
             result = await session.run("RETURN 1 as test")
             await result.single()
 
-        await store.disconnect()
-
         return DatabaseHealthDetail(
             status="ok",
             message="Connected to Neo4j",
@@ -122,20 +179,10 @@ async def _check_postgresql() -> DatabaseHealthDetail:
     """Check PostgreSQL connectivity."""
     try:
         from fidus.config import config
-        from fidus.memory.context.storage import ContextStorageService
-
-        # Check if PostgreSQL is configured
-        if not config.postgres_url:
-            return DatabaseHealthDetail(
-                status="ok",
-                message="PostgreSQL not configured (optional)",
-                details={"configured": False}
-            )
-
-        storage = ContextStorageService()
 
-        # Execute simple query to verify connection
-        async with storage.postgres_pool.acquire() as conn:
+        # Execute simple query on the shared pool to verify connection
+        pool = await get_resources().postgres_pool()
+        async with pool.acquire() as conn:
             result = await conn.fetchval("SELECT 1")
             if result != 1:
                 raise ValueError("Unexpected query result")
@@ -143,7 +190,7 @@ async def _check_postgresql() -> DatabaseHealthDetail:
         return DatabaseHealthDetail(
             status="ok",
             message="Connected to PostgreSQL",
-            details={"url": config.postgres_url.split("@")[-1]}  # Hide credentials
+            details={"host": f"{config.postgres_host}:{config.postgres_port}"}
         )
     except Exception as e:
         logger.error(f"PostgreSQL health check failed: {e}")
@@ -157,17 +204,9 @@ async def _check_qdrant() -> DatabaseHealthDetail:
     """Check Qdrant connectivity."""
     try:
         from fidus.config import config
-        from qdrant_client import QdrantClient
 
-        client = QdrantClient(
-            host=config.qdrant_host,
-            port=config.qdrant_port,
-            grpc_port=config.qdrant_grpc_port,
-            prefer_grpc=True,
-        )
-
-        # Get cluster info to verify connection
-        info = client.get_collections()
+        # Get cluster info on the shared client to verify connection
+        info = await asyncio.to_thread(get_resources().qdrant_client.get_collections)
 
         return DatabaseHealthDetail(
             status="ok",
@@ -190,7 +229,6 @@ async def _check_redis() -> DatabaseHealthDetail:
     """Check Redis connectivity."""
     try:
         from fidus.config import config
-        import redis.asyncio as aioredis
 
         # Check if Redis is configured
         if not config.redis_url:
@@ -200,15 +238,8 @@ async def _check_redis() -> DatabaseHealthDetail:
                 details={"configured": False}
             )
 
-        redis_client = await aioredis.from_url(
-            config.redis_url,
-            encoding="utf-8",
-            decode_responses=True
-        )
-
-        # Ping Redis to verify connection
-        await redis_client.ping()
-        await redis_client.close()
+        # Ping Redis on the shared pool to verify connection
+        await get_resources().redis_client.ping()
 
         return DatabaseHealthDetail(
             status="ok",
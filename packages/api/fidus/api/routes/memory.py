@@ -1,12 +1,15 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from fidus.memory.simple_agent import InMemoryAgent
 from fidus.memory.persistent_agent import PersistentAgent
+from fidus.memory.agent_registry import AgentRegistry
+from fidus.infrastructure.resources import Resources, get_resources
+from fidus.memory.context.embedding_service import get_embedding_service
 from fidus.api.utils.sanitize import sanitize_text
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import Dict
 import json
 import logging
 import traceback
@@ -22,9 +25,25 @@ router = APIRouter(prefix="/memory", tags=["memory"])
 # Check if Neo4j is configured
 USE_NEO4J = bool(os.getenv("NEO4J_URI"))
 
-# Per-user agent cache (Phase 4: Multi-User Support)
-# Key: user_id, Value: agent instance
-_user_agents: Dict[str, InMemoryAgent | PersistentAgent] = {}
+def _create_user_agent(user_id: str) -> InMemoryAgent | PersistentAgent:
+    """Create the agent instance for a user (called by the registry)."""
+    if USE_NEO4J:
+        logger.info(f"Creating PersistentAgent for user: {user_id}")
+        # Use user_id as tenant_id for data isolation in Neo4j; the shared
+        # embedding service batches and caches embeddings across users
+        return PersistentAgent(
+            tenant_id=user_id,
+            resources=get_resources(),
+            embedding_service=get_embedding_service(),
+        )
+
+    logger.info(f"Creating InMemoryAgent for user: {user_id}")
+    return InMemoryAgent()
+
+
+# Per-user agent registry (Phase 4: Multi-User Support)
+# Bounded: least recently used and idle agents are evicted and disconnected
+user_agents = AgentRegistry(_create_user_agent)
 
 
 def get_user_agent(user_id: str) -> InMemoryAgent | PersistentAgent:
@@ -33,6 +52,8 @@ def get_user_agent(user_id: str) -> InMemoryAgent | PersistentAgent:
     Phase 4: Multi-User Support
     - Each user gets their own agent instance for isolation
     - Agents are cached to maintain conversation history
+      (up to config.agent_registry_max_size, evicted after
+      config.agent_idle_ttl_seconds without requests)
     - PersistentAgent uses tenant_id = user_id for data isolation
 
     Args:
@@ -41,28 +62,35 @@ def get_user_agent(user_id: str) -> InMemoryAgent | PersistentAgent:
     Returns:
         Agent instance for this user
     """
-    if user_id not in _user_agents:
-        if USE_NEO4J:
-            logger.info(f"Creating PersistentAgent for user: {user_id}")
-            # Use user_id as tenant_id for data isolation in Neo4j
-            agent = PersistentAgent(tenant_id=user_id)
-        else:
-            logger.info(f"Creating InMemoryAgent for user: {user_id}")
-            agent = InMemoryAgent()
-
-        _user_agents[user_id] = agent
-
-    return _user_agents[user_id]
+    return user_agents.get(user_id)
 
 
 # Global agent for backwards compatibility with startup/shutdown events
 # This is only used in main.py startup/shutdown, not in endpoints
-if USE_NEO4J:
-    logger.info("Using PersistentAgent with Neo4j (multi-user mode)")
-    agent = PersistentAgent(tenant_id="default-tenant")
-else:
-    logger.info("Using InMemoryAgent (Neo4j not configured)")
-    agent = InMemoryAgent()
+agent: InMemoryAgent | PersistentAgent | None = None
+
+
+def init_agent(resources: Resources) -> InMemoryAgent | PersistentAgent:
+    """Create the global agent (on startup, once the shared resources are open).
+
+    Args:
+        resources: Process-wide connection pools
+
+    Returns:
+        The global agent
+    """
+    global agent
+    if USE_NEO4J:
+        logger.info("Using PersistentAgent with Neo4j (multi-user mode)")
+        agent = PersistentAgent(
+            tenant_id="default-tenant",
+            resources=resources,
+            embedding_service=get_embedding_service(),
+        )
+    else:
+        logger.info("Using InMemoryAgent (Neo4j not configured)")
+        agent = InMemoryAgent()
+    return agent
 
 
 class ChatRequest(BaseModel):
@@ -117,6 +145,11 @@ class SituationsResponse(BaseModel):
     situations: list[SituationItem]
 
 
+class LearningEventsResponse(BaseModel):
+    events: list[dict]  # preferences_updated / preference_conflict events
+    pending: int  # Learning jobs queued in this process
+
+
 class PreferenceWithContext(BaseModel):
     preference: PreferenceItem
     situations: list[SituationItem]  # Situations where this preference was learned
@@ -138,12 +171,18 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
         # Phase 4: Sanitize message input
         sanitized_message = sanitize_text(chat_request.message, field_name="message")
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
+        # Phase 4: Get user-specific agent instance, kept (not evicted)
+        # until the stream ends
+        lease = user_agents.lease(user_id)
+        user_agent = lease.agent
 
-        # Connect agent if needed (for PersistentAgent)
-        if USE_NEO4J and not user_agent._connected:
-            await user_agent.connect()
+        try:
+            # Connect agent if needed (for PersistentAgent)
+            if USE_NEO4J and not user_agent._connected:
+                await user_agent.connect()
+        except Exception:
+            lease.release()
+            raise
 
         async def event_generator():
             try:
@@ -160,7 +199,11 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
                     "message": str(e)
                 }
                 yield f"data: {error_event}\n\n"
+            finally:
+                lease.release()
 
+        # The background task also releases the lease if the client goes
+        # away before the stream starts
         return StreamingResponse(
             event_generator(),
             media_type="text/event-stream",
@@ -168,7 +211,8 @@ async def chat_stream(chat_request: ChatRequest, request: Request):
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
                 "X-Accel-Buffering": "no"
-            }
+            },
+            background=BackgroundTask(lease.release),
         )
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
@@ -191,17 +235,16 @@ async def chat_legacy(chat_request: ChatRequest, request: Request):
         # Phase 4: Sanitize message input
         sanitized_message = sanitize_text(chat_request.message, field_name="message")
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
-
-        # Connect agent if needed (for PersistentAgent)
-        if USE_NEO4J and not user_agent._connected:
-            await user_agent.connect()
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed (for PersistentAgent)
+            if USE_NEO4J and not user_agent._connected:
+                await user_agent.connect()
 
-        # Phase 3: Pass user_id to agent for context tracking
-        # Phase 4: Use user-specific agent with sanitized input
-        response = await user_agent.chat(sanitized_message, user_id=user_id)
-        return ChatResponse(response=response)
+            # Phase 3: Pass user_id to agent for context tracking
+            # Phase 4: Use user-specific agent with sanitized input
+            response = await user_agent.chat(sanitized_message, user_id=user_id)
+            return ChatResponse(response=response)
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
         logger.error(traceback.format_exc())
@@ -218,48 +261,48 @@ async def get_preferences(request: Request):
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
-
-        # Connect agent if needed (for PersistentAgent)
-        if USE_NEO4J and not user_agent._connected:
-            await user_agent.connect()
-
-        if USE_NEO4J:
-            # Get preferences from Neo4j (includes IDs and all fields)
-            neo4j_prefs = await user_agent.get_all_preferences()
-            preferences = [
-                PreferenceItem(
-                    id=pref.get("id"),
-                    key=pref["key"],
-                    value=pref["value"],
-                    sentiment=pref.get("sentiment", "neutral"),
-                    confidence=pref["confidence"],
-                    is_exception=pref.get("is_exception", False),
-                    domain=pref.get("domain", pref["key"].split(".")[0]),
-                    created_at=str(pref["created_at"]) if pref.get("created_at") else None,
-                    updated_at=str(pref["updated_at"]) if pref.get("updated_at") else None,
-                    reinforcement_count=pref.get("reinforcement_count", 0),
-                    rejection_count=pref.get("rejection_count", 0)
-                )
-                for pref in neo4j_prefs
-                if pref["confidence"] >= 0.5  # Filter out low-confidence (deleted) preferences
-            ]
-        else:
-            # Fallback to in-memory (no IDs available)
-            preferences = [
-                PreferenceItem(
-                    key=key,
-                    value=pref["value"],
-                    sentiment=pref.get("sentiment", "neutral"),
-                    confidence=pref["confidence"],
-                    is_exception=pref.get("is_exception", False),
-                    domain=key.split(".")[0]
-                )
-                for key, pref in user_agent.preferences.items()
-                if pref["confidence"] >= 0.5
-            ]
-        return PreferencesResponse(preferences=preferences)
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed (for PersistentAgent)
+            if USE_NEO4J and not user_agent._connected:
+                await user_agent.connect()
+
+            if USE_NEO4J:
+                # Get preferences from Neo4j (includes IDs and all fields)
+                neo4j_prefs = await user_agent.get_all_preferences()
+                preferences = [
+                    PreferenceItem(
+                        id=pref.get("id"),
+                        key=pref["key"],
+                        value=pref["value"],
+                        sentiment=pref.get("sentiment", "neutral"),
+                        confidence=pref["confidence"],
+                        is_exception=pref.get("is_exception", False),
+                        domain=pref.get("domain", pref["key"].split(".")[0]),
+                        created_at=str(pref["created_at"]) if pref.get("created_at") else None,
+                        updated_at=str(pref["updated_at"]) if pref.get("updated_at") else None,
+                        reinforcement_count=pref.get("reinforcement_count", 0),
+                        rejection_count=pref.get("rejection_count", 0)
+                    )
+                    for pref in neo4j_prefs
+                    if pref["confidence"] >= 0.5  # Filter out low-confidence (deleted) preferences
+                ]
+            else:
+                # Fallback to in-memory (no IDs available); reads a snapshot, so
+                # it doesn't wait for running chat turns
+                preferences = [
+                    PreferenceItem(
+                        key=key,
+                        value=pref["value"],
+                        sentiment=pref.get("sentiment", "neutral"),
+                        confidence=pref["confidence"],
+                        is_exception=pref.get("is_exception", False),
+                        domain=key.split(".")[0]
+                    )
+                    for key, pref in user_agent.preferences_snapshot().items()
+                    if pref["confidence"] >= 0.5
+                ]
+            return PreferencesResponse(preferences=preferences)
     except Exception as e:
         logger.error(f"Error in preferences endpoint: {str(e)}")
         logger.error(traceback.format_exc())
@@ -284,18 +327,18 @@ async def update_preference(key: str, update_request: UpdatePreferenceRequest, r
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
-
-        # Update preference in agent
-        user_agent.preferences[key] = {
-            "value": update_request.value,
-            "sentiment": update_request.sentiment,
-            "confidence": update_request.confidence,
-            "is_exception": update_request.is_exception
-        }
-        logger.info(f"User {user_id} manually updated preference: {key} = {update_request.value} ({update_request.sentiment}, {update_request.confidence:.0%})")
-        return {"status": "updated", "key": key}
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Update preference in agent, in order with running chat turns
+            # (marks it for the next conflict scan)
+            await user_agent.set_preference(key, {
+                "value": update_request.value,
+                "sentiment": update_request.sentiment,
+                "confidence": update_request.confidence,
+                "is_exception": update_request.is_exception
+            })
+            logger.info(f"User {user_id} manually updated preference: {key} = {update_request.value} ({update_request.sentiment}, {update_request.confidence:.0%})")
+            return {"status": "updated", "key": key}
     except Exception as e:
         logger.error(f"Error updating preference: {str(e)}")
         logger.error(traceback.format_exc())
@@ -346,6 +389,27 @@ async def get_ai_config(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/learning/events", response_model=LearningEventsResponse)
+async def get_learning_events(request: Request):
+    """Get results of background preference learning.
+
+    With FIDUS_BACKGROUND_LEARNING, preference extraction runs after the
+    chat response; events not delivered on a chat stream are returned
+    (once) here. Without background learning the list is always empty.
+    """
+    # Phase 4: Get user_id from auth middleware
+    user_id = request.state.user_id
+
+    # Phase 4: Get user-specific agent instance
+    user_agent = get_user_agent(user_id)
+
+    queue = user_agent.learning_queue
+    if queue is None:
+        return LearningEventsResponse(events=[], pending=0)
+
+    return LearningEventsResponse(events=queue.pop_events(user_id), pending=queue.pending())
+
+
 # Phase 2: Persistent agent endpoints (only available with Neo4j)
 
 
@@ -366,19 +430,18 @@ async def accept_preference(accept_request: AcceptRejectRequest, request: Reques
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
-
-        # Connect agent if needed
-        if not user_agent._connected:
-            await user_agent.connect()
-
-        updated = await user_agent.accept_preference(accept_request.preference_id)
-        return {
-            "status": "accepted",
-            "preference_id": accept_request.preference_id,
-            "new_confidence": updated["confidence"]
-        }
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed
+            if not user_agent._connected:
+                await user_agent.connect()
+
+            updated = await user_agent.accept_preference(accept_request.preference_id)
+            return {
+                "status": "accepted",
+                "preference_id": accept_request.preference_id,
+                "new_confidence": updated["confidence"]
+            }
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -400,19 +463,18 @@ async def reject_preference(reject_request: AcceptRejectRequest, request: Reques
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
-
-        # Connect agent if needed
-        if not user_agent._connected:
-            await user_agent.connect()
-
-        updated = await user_agent.reject_preference(reject_request.preference_id)
-        return {
-            "status": "rejected",
-            "preference_id": reject_request.preference_id,
-            "new_confidence": updated["confidence"]
-        }
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed
+            if not user_agent._connected:
+                await user_agent.connect()
+
+            updated = await user_agent.reject_preference(reject_request.preference_id)
+            return {
+                "status": "rejected",
+                "preference_id": reject_request.preference_id,
+                "new_confidence": updated["confidence"]
+            }
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -434,18 +496,17 @@ async def delete_preference(preference_id: str, request: Request):
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
-
-        # Connect agent if needed
-        if not user_agent._connected:
-            await user_agent.connect()
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed
+            if not user_agent._connected:
+                await user_agent.connect()
 
-        deleted = await user_agent.delete_preference(preference_id)
-        if not deleted:
-            raise HTTPException(status_code=404, detail="Preference not found")
+            deleted = await user_agent.delete_preference(preference_id)
+            if not deleted:
+                raise HTTPException(status_code=404, detail="Preference not found")
 
-        return {"status": "deleted", "preference_id": preference_id}
+            return {"status": "deleted", "preference_id": preference_id}
     except HTTPException:
         raise
     except Exception as e:
@@ -467,15 +528,14 @@ async def delete_all_preferences(request: Request):
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed
+            if not user_agent._connected:
+                await user_agent.connect()
 
-        # Connect agent if needed
-        if not user_agent._connected:
-            await user_agent.connect()
-
-        count = await user_agent.delete_all_preferences()
-        return {"status": "deleted_all", "count": count}
+            count = await user_agent.delete_all_preferences()
+            return {"status": "deleted_all", "count": count}
     except Exception as e:
         logger.error(f"Error deleting all preferences: {str(e)}")
         logger.error(traceback.format_exc())
@@ -483,7 +543,9 @@ async def delete_all_preferences(request: Request):
 
 
 @router.delete("/purge-all")
-async def purge_all_memories(request: Request):
+async def purge_all_memories(
+    request: Request, resources: Resources = Depends(get_resources)
+):
     """Purge ALL memories: preferences, situations, and embeddings from all databases.
 
     Phase 4: Purges only the authenticated user's data.
@@ -503,73 +565,61 @@ async def purge_all_memories(request: Request):
         # Phase 4: Get user_id from auth middleware
         user_id = request.state.user_id
 
-        # Phase 4: Get user-specific agent instance
-        user_agent = get_user_agent(user_id)
+        # Phase 4: Get user-specific agent instance (not evicted during the request)
+        with user_agents.lease(user_id) as user_agent:
+            # Connect agent if needed
+            if not user_agent._connected:
+                await user_agent.connect()
 
-        # Connect agent if needed
-        if not user_agent._connected:
-            await user_agent.connect()
+            deleted_counts = {
+                "preferences": 0,
+                "situations": 0,
+                "qdrant_collections": 0
+            }
 
-        deleted_counts = {
-            "preferences": 0,
-            "situations": 0,
-            "qdrant_collections": 0
-        }
+            # 1. Delete all situations from Neo4j (do this FIRST to remove relationships)
+            async with resources.neo4j_driver.session() as session:
+                # Delete all Situation nodes for this user (using tenant_id = user_id)
+                result = await session.run("""
+                    MATCH (s:Situation {tenant_id: $tenant_id})
+                    DETACH DELETE s
+                    RETURN count(s) as count
+                """, tenant_id=user_id)
 
-        # 1. Delete all situations from Neo4j (do this FIRST to remove relationships)
-        from fidus.memory.context.storage import ContextStorageService
-        storage = ContextStorageService()
+                record = await result.single()
+                deleted_counts["situations"] = record["count"] if record else 0
 
-        async with storage.neo4j_driver.session() as session:
-            # Delete all Situation nodes for this user (using tenant_id = user_id)
-            result = await session.run("""
-                MATCH (s:Situation {tenant_id: $tenant_id})
-                DETACH DELETE s
-                RETURN count(s) as count
-            """, tenant_id=user_id)
+            # 2. Delete all preferences from Neo4j + in-memory
+            deleted_counts["preferences"] = await user_agent.delete_all_preferences()
 
-            record = await result.single()
-            deleted_counts["situations"] = record["count"] if record else 0
-
-        # 2. Delete all preferences from Neo4j + in-memory
-        deleted_counts["preferences"] = await user_agent.delete_all_preferences()
+            # 3. Delete all embeddings from Qdrant
+            try:
+                qdrant_client = resources.qdrant_client
 
-        # 3. Delete all embeddings from Qdrant
-        try:
-            from qdrant_client import QdrantClient
-            from fidus.config import config as app_config
-
-            qdrant_client = QdrantClient(
-                host=app_config.qdrant_host,
-                port=app_config.qdrant_port,
-                grpc_port=app_config.qdrant_grpc_port,
-                prefer_grpc=True,
-            )
+                # Delete the entire collection (will be recreated on next use)
+                collection_name = f"situations_{user_id}"
+                try:
+                    qdrant_client.delete_collection(collection_name)
+                    deleted_counts["qdrant_collections"] = 1
+                    logger.info(f"Deleted Qdrant collection: {collection_name}")
+                except Exception as e:
+                    logger.warning(f"Qdrant collection might not exist: {e}")
 
-            # Delete the entire collection (will be recreated on next use)
-            collection_name = f"situations_{user_id}"
-            try:
-                qdrant_client.delete_collection(collection_name)
-                deleted_counts["qdrant_collections"] = 1
-                logger.info(f"Deleted Qdrant collection: {collection_name}")
             except Exception as e:
-                logger.warning(f"Qdrant collection might not exist: {e}")
+                logger.warning(f"Could not delete Qdrant data: {e}")
 
-        except Exception as e:
-            logger.warning(f"Could not delete Qdrant data: {e}")
-
-        logger.info(
-            f"Purged all memories for user {user_id}: "
-            f"{deleted_counts['preferences']} preferences, "
-            f"{deleted_counts['situations']} situations, "
-            f"{deleted_counts['qdrant_collections']} Qdrant collections"
-        )
+            logger.info(
+                f"Purged all memories for user {user_id}: "
+                f"{deleted_counts['preferences']} preferences, "
+                f"{deleted_counts['situations']} situations, "
+                f"{deleted_counts['qdrant_collections']} Qdrant collections"
+            )
 
-        return {
-            "status": "purged_all",
-            "deleted": deleted_counts,
-            "message": "All memories have been permanently deleted from all databases"
-        }
+            return {
+                "status": "purged_all",
+                "deleted": deleted_counts,
+                "message": "All memories have been permanently deleted from all databases"
+            }
 
     except Exception as e:
         logger.error(f"Error purging all memories: {str(e)}")
@@ -581,7 +631,7 @@ async def purge_all_memories(request: Request):
 
 
 @router.get("/situations", response_model=SituationsResponse)
-async def get_situations(request: Request):
+async def get_situations(request: Request, resources: Resources = Depends(get_resources)):
     """Get all situations with their context factors (Phase 3).
 
     Phase 4: Returns only the authenticated user's situations.
@@ -600,11 +650,8 @@ async def get_situations(request: Request):
 
     try:
         # Query Neo4j for all situations
-        from fidus.memory.context.storage import ContextStorageService
-        storage = ContextStorageService()
-
         # Get all situations from Neo4j for this user (using tenant_id = user_id)
-        async with storage.neo4j_driver.session() as session:
+        async with resources.neo4j_driver.session() as session:
             result = await session.run("""
                 MATCH (s:Situation {tenant_id: $tenant_id})
                 OPTIONAL MATCH (s)<-[:IN_SITUATION]-(p:Preference)
@@ -638,7 +685,9 @@ async def get_situations(request: Request):
 
 
 @router.get("/preferences/{preference_id}/context")
-async def get_preference_context(preference_id: str, request: Request):
+async def get_preference_context(
+    preference_id: str, request: Request, resources: Resources = Depends(get_resources)
+):
     """Get situational context for a specific preference (Phase 3).
 
     Phase 4: Returns only context for the authenticated user's preferences.
@@ -656,11 +705,8 @@ async def get_preference_context(preference_id: str, request: Request):
         raise HTTPException(status_code=501, detail="Context-awareness is disabled")
 
     try:
-        from fidus.memory.context.storage import ContextStorageService
-        storage = ContextStorageService()
-
         # Query Neo4j for situations linked to this preference (for this user)
-        async with storage.neo4j_driver.session() as session:
+        async with resources.neo4j_driver.session() as session:
             result = await session.run("""
                 MATCH (p:Preference {id: $preference_id, tenant_id: $tenant_id})-[:IN_SITUATION]->(s:Situation)
                 RETURN s
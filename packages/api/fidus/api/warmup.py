@@ -0,0 +1,214 @@
+"""Startup warmup for Fidus Memory API.
+
+Without warmup the first real request pays for Ollama model load, the first
+HTTP connection to the LLM base, Qdrant connection setup and Neo4j
+constraint creation. Warmup issues a tiny embedding and completion call and
+primes the database connections in the background at startup, recording
+per-component timings. /health reports "warming_up" (503) until it is done,
+so load balancers never send a cold instance real traffic.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from litellm import acompletion
+
+from fidus.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState:
+    """Process-wide warmup progress and per-component results."""
+
+    NOT_STARTED = "not_started"
+    WARMING_UP = "warming_up"
+    READY = "ready"
+
+    def __init__(self):
+        """Initialize in the not-started state."""
+        self.state = self.NOT_STARTED
+        self.started_at: Optional[float] = None
+        self.duration_seconds: Optional[float] = None
+        self.components: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def is_warming_up(self) -> bool:
+        """True while warmup is running."""
+        return self.state == self.WARMING_UP
+
+    def start(self) -> None:
+        """Mark warmup as started (call before scheduling run_warmup)."""
+        self.state = self.WARMING_UP
+        self.started_at = time.monotonic()
+        self.duration_seconds = None
+        self.components = {}
+
+    def finish(self) -> None:
+        """Mark warmup as finished."""
+        self.state = self.READY
+        if self.started_at is not None:
+            self.duration_seconds = round(time.monotonic() - self.started_at, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the /health/warmup endpoint.
+
+        Returns:
+            Dictionary with state, total duration and per-component results
+        """
+        return {
+            "state": self.state,
+            "duration_seconds": self.duration_seconds,
+            "components": self.components,
+        }
+
+
+# Global warmup state (read by health routes)
+warmup_state = WarmupState()
+
+
+async def _warm_embedding() -> None:
+    """Load the embedding model with a tiny embedding call."""
+    from fidus.memory.context.embedding_service import get_embedding_service
+    from fidus.memory.context.models import ContextFactors
+
+    await get_embedding_service().generate_embedding(
+        ContextFactors(factors={"warmup": "startup"}), tenant_id="system", user_id="warmup"
+    )
+
+
+async def _warm_llm() -> None:
+    """Load the chat model with a one-token completion."""
+    completion_kwargs: Dict[str, Any] = {
+        "model": config.llm_model,
+        "messages": [{"role": "user", "content": "ping"}],
+        "max_tokens": 1,
+    }
+
+    # Add api_base for models using custom endpoints
+    if config.llm_model.startswith("ollama/"):
+        completion_kwargs["api_base"] = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
+    else:
+        openai_base = os.getenv("OPENAI_API_BASE")
+        if openai_base:
+            completion_kwargs["api_base"] = openai_base
+
+    await acompletion(**completion_kwargs)
+
+
+async def _warm_neo4j() -> None:
+    """Connect the shared Neo4j driver (creating constraints once) and run a trivial query."""
+    from fidus.infrastructure.neo4j_client import Neo4jPreferenceStore
+    from fidus.infrastructure.resources import get_resources
+
+    resources = get_resources()
+    store = Neo4jPreferenceStore(config, resources=resources)
+    await store.connect()
+    async with resources.neo4j_driver.session() as session:
+        result = await session.run("RETURN 1 as test")
+        await result.single()
+
+
+async def _warm_qdrant() -> None:
+    """Connect the shared Qdrant client and load collection metadata."""
+    from fidus.infrastructure.resources import get_resources
+
+    await asyncio.to_thread(get_resources().qdrant_client.get_collections)
+
+
+async def _warm_redis() -> None:
+    """Open the shared Redis pool and ping it."""
+    from fidus.infrastructure.resources import get_resources
+
+    if not config.redis_url:
+        return
+
+    await get_resources().redis_client.ping()
+
+
+async def _warm_postgres() -> None:
+    """Open the shared PostgreSQL pool and run a trivial query."""
+    from fidus.infrastructure.resources import get_resources
+
+    pool = await get_resources().postgres_pool()
+    async with pool.acquire() as conn:
+        await conn.fetchval("SELECT 1")
+
+
+# Warmup steps by component name (FIDUS_WARMUP_COMPONENTS selects a subset)
+WARMUP_COMPONENTS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "embedding": _warm_embedding,
+    "llm": _warm_llm,
+    "neo4j": _warm_neo4j,
+    "qdrant": _warm_qdrant,
+    "redis": _warm_redis,
+    "postgres": _warm_postgres,
+}
+
+
+async def _run_component(name: str, warm: Callable[[], Awaitable[None]]) -> None:
+    """Run one warmup step with a timeout and record its outcome.
+
+    Args:
+        name: Component name
+        warm: Warmup coroutine factory
+    """
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(warm(), timeout=config.warmup_timeout_seconds)
+        status, error = "ok", None
+    except asyncio.TimeoutError:
+        status, error = "timeout", f"No response within {config.warmup_timeout_seconds}s"
+    except Exception as e:
+        status, error = "error", str(e)
+
+    seconds = round(time.monotonic() - started, 3)
+    warmup_state.components[name] = {"status": status, "seconds": seconds, "error": error}
+
+    if status == "ok":
+        logger.info(f"Warmed up {name} in {seconds}s", extra={"component": name})
+    else:
+        logger.warning(
+            f"Warmup of {name} failed after {seconds}s: {error}", extra={"component": name}
+        )
+
+
+async def run_warmup(
+    components: Optional[Dict[str, Callable[[], Awaitable[None]]]] = None,
+) -> WarmupState:
+    """Warm up all components concurrently and mark the instance ready.
+
+    Component failures are recorded but do not block readiness: a missing
+    optional backend should not keep the instance out of rotation forever.
+
+    Args:
+        components: Warmup steps by name (defaults to the configured subset of
+            WARMUP_COMPONENTS)
+
+    Returns:
+        WarmupState: Final warmup state
+    """
+    if components is None:
+        components = {
+            name: warm
+            for name, warm in WARMUP_COMPONENTS.items()
+            if name in config.warmup_components
+        }
+
+    if not warmup_state.is_warming_up:
+        warmup_state.start()
+
+    logger.info(f"Starting warmup: {', '.join(components)}")
+    try:
+        await asyncio.gather(*(_run_component(name, warm) for name, warm in components.items()))
+    finally:
+        warmup_state.finish()
+
+    logger.info(
+        f"Warmup finished in {warmup_state.duration_seconds}s",
+        extra={"components": warmup_state.components},
+    )
+    return warmup_state
@@ -35,6 +35,13 @@ class PrototypeConfig:
         # Redis Configuration
         self.redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+        # Shared connection pool sizes (see fidus/infrastructure/resources.py)
+        self.neo4j_max_pool_size: int = int(os.getenv("FIDUS_NEO4J_MAX_POOL_SIZE", "50"))
+        self.qdrant_pool_size: int = int(os.getenv("FIDUS_QDRANT_POOL_SIZE", "20"))
+        self.redis_max_connections: int = int(os.getenv("FIDUS_REDIS_MAX_CONNECTIONS", "50"))
+        self.postgres_pool_min_size: int = int(os.getenv("FIDUS_POSTGRES_POOL_MIN_SIZE", "2"))
+        self.postgres_pool_max_size: int = int(os.getenv("FIDUS_POSTGRES_POOL_MAX_SIZE", "10"))
+
         # Qdrant Configuration
         self.qdrant_host: str = os.getenv("QDRANT_HOST", "localhost")
         self.qdrant_port: int = int(os.getenv("QDRANT_PORT", "6333"))
@@ -58,6 +65,140 @@ class PrototypeConfig:
             "openai/text-embedding-3-large": 3072,
             "openai/text-embedding-ada-002": 1536,
         }
+        # Local in-process embedding backend ("local/hashing", "local/projection")
+        self.local_embedding_dimension: int = int(
+            os.getenv("FIDUS_LOCAL_EMBEDDING_DIM", "384")
+        )
+        self.local_embedding_path: Optional[str] = os.getenv("FIDUS_LOCAL_EMBEDDING_PATH")
+        self.embedding_dimensions["local/hashing"] = self.local_embedding_dimension
+        # "text" embeds the whole context string; "compositional" sums per-factor vectors
+        self.embedding_mode: str = os.getenv("FIDUS_EMBEDDING_MODE", "text")
+        # Per-key weights for compositional mode, e.g. "season=0.5,is_weekend=0.5"
+        self.embedding_factor_weights: dict[str, float] = {
+            key.strip(): float(weight)
+            for key, _, weight in (
+                item.partition("=")
+                for item in os.getenv("FIDUS_EMBEDDING_FACTOR_WEIGHTS", "").split(",")
+                if item.strip()
+            )
+        }
+        # Reduced vector size for storage/search (unset keeps full model dimension).
+        # Truncates (Matryoshka) unless a fitted PCA projection file is given.
+        reduced_dimension = os.getenv("FIDUS_EMBEDDING_REDUCED_DIM")
+        self.embedding_reduced_dimension: Optional[int] = (
+            int(reduced_dimension) if reduced_dimension else None
+        )
+        self.embedding_projection_path: Optional[str] = os.getenv(
+            "FIDUS_EMBEDDING_PROJECTION_PATH"
+        )
+        # Coalescing window for concurrent embedding requests (0 disables batching)
+        self.embedding_batch_window_ms: float = float(
+            os.getenv("FIDUS_EMBEDDING_BATCH_WINDOW_MS", "5")
+        )
+        self.embedding_batch_max_size: int = int(os.getenv("FIDUS_EMBEDDING_BATCH_MAX_SIZE", "32"))
+        # In-process LRU capacity for content-addressed embeddings (0 disables)
+        self.embedding_cache_size: int = int(os.getenv("FIDUS_EMBEDDING_CACHE_SIZE", "4096"))
+        # Per-process cap on in-flight embedding provider calls and per-call timeout
+        self.embedding_max_concurrency: int = int(
+            os.getenv("FIDUS_EMBEDDING_MAX_CONCURRENCY", "8")
+        )
+        self.embedding_timeout_seconds: float = float(
+            os.getenv("FIDUS_EMBEDDING_TIMEOUT_SECONDS", "10")
+        )
+
+        # Request hedging and circuit breaking for embedding/extraction calls
+        self.hedging_enabled: bool = os.getenv("FIDUS_HEDGING_ENABLED", "false").lower() == "true"
+        self.hedging_percentile: float = float(os.getenv("FIDUS_HEDGING_PERCENTILE", "95"))
+        self.hedging_min_samples: int = int(os.getenv("FIDUS_HEDGING_MIN_SAMPLES", "20"))
+        self.circuit_breaker_failure_threshold: int = int(
+            os.getenv("FIDUS_CIRCUIT_BREAKER_FAILURES", "5")
+        )
+        self.circuit_breaker_recovery_seconds: float = float(
+            os.getenv("FIDUS_CIRCUIT_BREAKER_RECOVERY_SECONDS", "30")
+        )
+        self.circuit_breaker_slow_call_seconds: float = float(
+            os.getenv("FIDUS_CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "15")
+        )
+
+        # Cache for LLM preference/context extraction results
+        self.extraction_cache_size: int = int(os.getenv("FIDUS_EXTRACTION_CACHE_SIZE", "1024"))
+        self.extraction_cache_ttl_seconds: int = int(
+            os.getenv("FIDUS_EXTRACTION_CACHE_TTL_SECONDS", "3600")
+        )
+
+        # Skip LLM context extraction for messages without situational signal
+        self.context_fast_path_enabled: bool = (
+            os.getenv("FIDUS_CONTEXT_FAST_PATH", "true").lower() == "true"
+        )
+
+        # Startup warmup (preload models, prime connections before reporting ready)
+        self.warmup_enabled: bool = os.getenv("FIDUS_WARMUP_ENABLED", "true").lower() == "true"
+        self.warmup_timeout_seconds: float = float(
+            os.getenv("FIDUS_WARMUP_TIMEOUT_SECONDS", "60")
+        )
+        self.warmup_components: list[str] = [
+            name.strip()
+            for name in os.getenv("FIDUS_WARMUP_COMPONENTS", "embedding,llm,qdrant,redis").split(",")
+            if name.strip()
+        ]
+
+        # Token budget for the preference section of the chat system prompt
+        self.prompt_preference_token_budget: int = int(
+            os.getenv("FIDUS_PROMPT_PREFERENCE_TOKEN_BUDGET", "800")
+        )
+        self.prompt_token_counter: str = os.getenv("FIDUS_PROMPT_TOKEN_COUNTER", "approx")
+        # Stable system prompt prefix (static first, time last) for KV/prompt caching.
+        # Opt-in: the time is sent as a second system message after the user turn,
+        # which not every provider accepts.
+        self.prompt_cache_friendly: bool = (
+            os.getenv("FIDUS_PROMPT_CACHE_FRIENDLY", "false").lower() == "true"
+        )
+
+        # Background learning (preference extraction/persistence off the response path)
+        self.background_learning_enabled: bool = (
+            os.getenv("FIDUS_BACKGROUND_LEARNING", "false").lower() == "true"
+        )
+        self.learning_queue_size: int = int(os.getenv("FIDUS_LEARNING_QUEUE_SIZE", "1000"))
+        self.learning_workers: int = int(os.getenv("FIDUS_LEARNING_WORKERS", "4"))
+        self.learning_drain_timeout_seconds: float = float(
+            os.getenv("FIDUS_LEARNING_DRAIN_TIMEOUT_SECONDS", "10")
+        )
+        # Users with buffered learning events, and how long unpolled events are kept
+        self.learning_events_max_users: int = int(
+            os.getenv("FIDUS_LEARNING_EVENTS_MAX_USERS", "10000")
+        )
+        self.learning_events_ttl_seconds: float = float(
+            os.getenv("FIDUS_LEARNING_EVENTS_TTL_SECONDS", "3600")
+        )
+
+        # Semantic conflict detection: embedding prefilter, then one batched LLM check
+        self.conflict_similarity_threshold: float = float(
+            os.getenv("FIDUS_CONFLICT_SIMILARITY_THRESHOLD", "0.5")
+        )
+        self.conflict_max_candidate_pairs: int = int(
+            os.getenv("FIDUS_CONFLICT_MAX_CANDIDATE_PAIRS", "50")
+        )
+        # Memo for LLM relatedness verdicts used by conflict checks
+        self.relatedness_memo_size: int = int(os.getenv("FIDUS_RELATEDNESS_MEMO_SIZE", "4096"))
+        # Share key/key relation verdicts across tenants (off: verdicts are scoped
+        # per tenant, like the IS_A edges the taxonomy learns from them)
+        self.relatedness_share_pairs: bool = (
+            os.getenv("FIDUS_RELATEDNESS_SHARE_PAIRS", "false").lower() == "true"
+        )
+        # Shared Neo4j concept taxonomy (IS_A graph) answering relatedness without the LLM
+        self.taxonomy_enabled: bool = os.getenv("FIDUS_TAXONOMY_ENABLED", "true").lower() == "true"
+        self.taxonomy_max_depth: int = int(os.getenv("FIDUS_TAXONOMY_MAX_DEPTH", "3"))
+        # JSON seed vocabulary {"parent key": ["child key", ...]} (unset: built-in vocabulary)
+        self.taxonomy_seed_path: Optional[str] = os.getenv("FIDUS_TAXONOMY_SEED_PATH")
+
+        # Per-user agent registry (least recently used / idle agents are disconnected)
+        self.agent_registry_max_size: int = int(os.getenv("FIDUS_AGENT_REGISTRY_MAX_SIZE", "1000"))
+        self.agent_idle_ttl_seconds: float = float(
+            os.getenv("FIDUS_AGENT_IDLE_TTL_SECONDS", "1800")
+        )
+        self.agent_sweep_interval_seconds: float = float(
+            os.getenv("FIDUS_AGENT_SWEEP_INTERVAL_SECONDS", "60")
+        )
 
         # Application Configuration
         self.environment: str = os.getenv("ENVIRONMENT", "development")
@@ -82,6 +223,14 @@ class PrototypeConfig:
         Raises:
             ValueError: If the configured embedding model is not in the known dimensions map.
         """
+        if self.embedding_model not in self.embedding_dimensions and self.embedding_model.startswith(
+            "local/"
+        ):
+            # Local backends register their dimension when loaded (e.g. projection size)
+            from fidus.memory.context.embedding_backends import get_embedding_backend
+
+            get_embedding_backend(self.embedding_model)
+
         if self.embedding_model not in self.embedding_dimensions:
             raise ValueError(
                 f"Unknown embedding model: {self.embedding_model}. "
@@ -89,6 +238,30 @@ class PrototypeConfig:
             )
         return self.embedding_dimensions[self.embedding_model]
 
+    def get_vector_size(self) -> int:
+        """Get the vector size stored and searched in Qdrant.
+
+        This is the reduced dimension when a projection is configured,
+        otherwise the embedding model dimension.
+
+        Returns:
+            int: Qdrant vector size
+
+        Raises:
+            ValueError: If the configured embedding model is not in the known dimensions map.
+        """
+        model_dimension = self.get_embedding_dimension()
+
+        if self.embedding_projection_path:
+            from fidus.memory.context.projection import get_embedding_projection
+
+            return get_embedding_projection(model_dimension).output_dimension
+
+        if self.embedding_reduced_dimension:
+            return min(self.embedding_reduced_dimension, model_dimension)
+
+        return model_dimension
+
     @property
     def postgres_dsn(self) -> str:
         """Get PostgreSQL connection DSN for asyncpg.
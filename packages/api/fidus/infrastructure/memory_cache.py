@@ -0,0 +1,118 @@
+"""Bounded in-process cache for Fidus Memory hot paths.
+
+This module provides a small LRU cache with optional per-entry TTL that is
+used as the first (in-process) tier in front of Redis-backed caches.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Least-recently-used cache with optional TTL and hit/miss counters.
+
+    Not thread-safe; intended for use from a single asyncio event loop.
+
+    Example:
+        cache = LRUCache[list[float]](max_size=1024)
+        cache.set("key", [0.1, 0.2])
+        cache.get("key")  # [0.1, 0.2]
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries (0 disables caching)
+            ttl_seconds: Optional time-to-live for entries in seconds
+        """
+        if max_size < 0:
+            raise ValueError(f"max_size must be >= 0, got {max_size}")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not None
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Get a value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on miss or expiry
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Insert or replace a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        if self.max_size == 0:
+            return
+
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with size, max_size, hits, misses, evictions and hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, key: Hashable) -> Optional[tuple[float, V]]:
+        """Return the raw entry for a key, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if self.ttl_seconds is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        return entry
@@ -8,6 +8,7 @@ import uuid
 from typing import Dict, List, Optional, Any
 from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
 from fidus.config import PrototypeConfig
+from fidus.infrastructure.resources import Resources
 
 
 class Neo4jPreferenceStore:
@@ -32,23 +33,41 @@ class Neo4jPreferenceStore:
         })
     """
 
-    def __init__(self, config: PrototypeConfig, cache: Optional[Any] = None):
+    def __init__(
+        self,
+        config: PrototypeConfig,
+        cache: Optional[Any] = None,
+        resources: Optional[Resources] = None,
+    ):
         """Initialize Neo4j connection.
 
         Args:
             config: PrototypeConfig instance with Neo4j credentials
             cache: Optional SessionCache instance for performance optimization
+            resources: Shared connection pools (the store opens its own
+                driver if omitted)
         """
         self.config = config
         self.cache = cache
+        self.resources = resources
         self._driver: Optional[AsyncDriver] = None
 
     async def connect(self) -> None:
         """Establish connection to Neo4j database."""
+        if self.resources is not None:
+            # Shared driver: verify and create constraints once per process
+            self._driver = self.resources.neo4j_driver
+            await self.resources.once("neo4j:preferences", self._setup)
+            return
+
         self._driver = AsyncGraphDatabase.driver(
             self.config.neo4j_uri,
             auth=(self.config.neo4j_user, self.config.neo4j_password),
         )
+        await self._setup()
+
+    async def _setup(self) -> None:
+        """Verify the connection and create constraints."""
         # Verify connection
         await self._driver.verify_connectivity()
 
@@ -56,9 +75,10 @@ class Neo4jPreferenceStore:
         await self._create_constraints()
 
     async def disconnect(self) -> None:
-        """Close connection to Neo4j database."""
+        """Close connection to Neo4j database (a shared driver stays open)."""
         if self._driver:
-            await self._driver.close()
+            if self.resources is None:
+                await self._driver.close()
             self._driver = None
 
     async def _create_constraints(self) -> None:
@@ -0,0 +1,315 @@
+"""Neo4j concept taxonomy for preference keys.
+
+Whether two preference keys are related ("food.coffee" / "food.espresso")
+describes the world, not the user, so the answers are materialized once in
+a taxonomy graph instead of being rediscovered by LLM prompts. The graph is
+seeded from a vocabulary shared by all tenants and grows lazily from LLM
+verdicts; conflict detection looks relations up with one traversal.
+
+LLM verdicts come from one tenant's preferences (and whatever text the user
+wrote), so learned IS_A edges are scoped to that tenant: a tenant sees the
+seeded edges plus its own, never another tenant's.
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from neo4j import AsyncDriver, AsyncGraphDatabase
+
+from fidus.config import PrototypeConfig
+from fidus.infrastructure.resources import Resources
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r"[\s\-]+")
+
+# (child key, parent key): child IS_A parent
+IsA = Tuple[str, str]
+
+# Scope of seeded IS_A edges, visible to all tenants
+SHARED_SCOPE = "*"
+
+
+def normalize_concept_key(key: str) -> str:
+    """Normalize a preference key to its concept key.
+
+    Args:
+        key: Preference key, e.g. "Food.Instant Coffee"
+
+    Returns:
+        str: Concept key, e.g. "food.instant_coffee"
+    """
+    return _SEPARATORS.sub("_", key.strip().lower())
+
+
+class Neo4jTaxonomyStore:
+    """Taxonomy of preference concepts with tenant-scoped learned edges.
+
+    Schema:
+        (Concept {
+            key: string (normalized preference key, unique),
+            domain: string,
+            source: string ("seed" or "llm"),
+            created_at: datetime
+        })-[:IS_A {
+            source: string ("seed" or "llm"),
+            scope: string (SHARED_SCOPE for seeded edges, else the tenant ID)
+        }]->(Concept)
+
+    Concepts are shared; the same relation learned by two tenants is two
+    edges. Synonyms are stored as IS_A in both directions.
+    """
+
+    def __init__(self, config: PrototypeConfig, resources: Optional[Resources] = None):
+        """Initialize Neo4j connection settings.
+
+        Args:
+            config: PrototypeConfig instance with Neo4j credentials
+            resources: Shared connection pools (the store opens its own
+                driver if omitted)
+        """
+        self.config = config
+        self.resources = resources
+        self._driver: Optional[AsyncDriver] = None
+
+    async def connect(self) -> None:
+        """Establish connection to Neo4j database."""
+        if self.resources is not None:
+            # Shared driver: verify and create the constraint once per process
+            self._driver = self.resources.neo4j_driver
+            await self.resources.once("neo4j:taxonomy", self._setup)
+            return
+
+        self._driver = AsyncGraphDatabase.driver(
+            self.config.neo4j_uri,
+            auth=(self.config.neo4j_user, self.config.neo4j_password),
+        )
+        await self._setup()
+
+    async def _setup(self) -> None:
+        """Verify the connection and create the constraint."""
+        # Verify connection
+        await self._driver.verify_connectivity()
+
+        await self._create_constraints()
+
+    async def disconnect(self) -> None:
+        """Close connection to Neo4j database (a shared driver stays open)."""
+        if self._driver:
+            if self.resources is None:
+                await self._driver.close()
+            self._driver = None
+
+    async def _create_constraints(self) -> None:
+        """Create the unique constraint (and index) on the concept key."""
+        if not self._driver:
+            raise RuntimeError("Driver not initialized. Call connect() first.")
+
+        async with self._driver.session() as session:
+            await session.run(
+                """
+                CREATE CONSTRAINT concept_key_unique IF NOT EXISTS
+                FOR (c:Concept)
+                REQUIRE c.key IS UNIQUE
+                """
+            )
+
+    async def add_relations(
+        self,
+        relations: Iterable[IsA],
+        source: str = "llm",
+        tenant_id: Optional[str] = None,
+    ) -> int:
+        """Add IS_A relations, creating missing concepts (idempotent).
+
+        Args:
+            relations: (child key, parent key) pairs
+            source: Origin of the relations ("seed" or "llm")
+            tenant_id: Tenant the relations were learned for (required
+                unless source is "seed"; seeded relations are shared)
+
+        Returns:
+            int: Number of relations submitted
+
+        Raises:
+            RuntimeError: If driver not initialized
+            ValueError: If learned relations have no tenant
+        """
+        if not self._driver:
+            raise RuntimeError("Driver not initialized. Call connect() first.")
+
+        if source == "seed":
+            scope = SHARED_SCOPE
+        elif tenant_id:
+            scope = tenant_id
+        else:
+            raise ValueError(f"Taxonomy relations from {source!r} must be scoped to a tenant")
+
+        rows = [
+            {"child": normalize_concept_key(child), "parent": normalize_concept_key(parent)}
+            for child, parent in relations
+            if normalize_concept_key(child) != normalize_concept_key(parent)
+        ]
+        if not rows:
+            return 0
+
+        async with self._driver.session() as session:
+            await session.run(
+                """
+                UNWIND $rows AS row
+                MERGE (child:Concept {key: row.child})
+                  ON CREATE SET child.domain = split(row.child, '.')[0],
+                                child.source = $source,
+                                child.created_at = datetime()
+                MERGE (parent:Concept {key: row.parent})
+                  ON CREATE SET parent.domain = split(row.parent, '.')[0],
+                                parent.source = $source,
+                                parent.created_at = datetime()
+                MERGE (child)-[rel:IS_A {scope: $scope}]->(parent)
+                  ON CREATE SET rel.source = $source
+                """,
+                rows=rows,
+                source=source,
+                scope=scope,
+            )
+
+        logger.info(f"Added {len(rows)} taxonomy relations ({source}, scope {scope})")
+        return len(rows)
+
+    async def seed(self, vocabulary: Dict[str, List[str]]) -> int:
+        """Seed the taxonomy from a vocabulary (idempotent).
+
+        Args:
+            vocabulary: Mapping of parent keys to child keys,
+                e.g. {"food.coffee": ["food.espresso", "food.cappuccino"]}
+
+        Returns:
+            int: Number of relations submitted
+        """
+        return await self.add_relations(
+            ((child, parent) for parent, children in vocabulary.items() for child in children),
+            source="seed",
+        )
+
+    async def related_keys(
+        self,
+        keys: Sequence[str],
+        candidates: Sequence[str],
+        max_depth: int = 3,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, List[str]]:
+        """Find candidates that are ancestors or descendants of each key.
+
+        Siblings (two kinds of coffee) are not related; only IS_A paths of
+        up to max_depth hops in one direction count, over seeded edges and
+        edges learned for tenant_id. Runs one query for all keys.
+
+        Args:
+            keys: Preference keys to look up
+            candidates: Preference keys to look for
+            max_depth: Maximum IS_A hops
+            tenant_id: Tenant whose learned relations count (seeded
+                relations only if omitted)
+
+        Returns:
+            Mapping of normalized keys to related normalized candidate keys
+            (keys without related candidates are omitted)
+
+        Raises:
+            RuntimeError: If driver not initialized
+        """
+        if not self._driver:
+            raise RuntimeError("Driver not initialized. Call connect() first.")
+
+        if not keys or not candidates:
+            return {}
+
+        # Variable-length bounds can't be query parameters
+        depth = max(1, int(max_depth))
+        async with self._driver.session() as session:
+            result = await session.run(
+                f"""
+                UNWIND $keys AS key
+                MATCH (concept:Concept {{key: key}})
+                CALL {{
+                    WITH concept
+                    MATCH path = (concept)-[:IS_A*1..{depth}]->(other:Concept)
+                    WHERE all(rel IN relationships(path) WHERE
+                              rel.scope IN $scopes
+                              OR (rel.scope IS NULL AND rel.source = 'seed'))
+                    RETURN other
+                    UNION
+                    WITH concept
+                    MATCH path = (other:Concept)-[:IS_A*1..{depth}]->(concept)
+                    WHERE all(rel IN relationships(path) WHERE
+                              rel.scope IN $scopes
+                              OR (rel.scope IS NULL AND rel.source = 'seed'))
+                    RETURN other
+                }}
+                WITH key, other
+                WHERE other.key IN $candidates AND other.key <> key
+                RETURN key, collect(DISTINCT other.key) AS related
+                """,
+                keys=[normalize_concept_key(key) for key in keys],
+                candidates=[normalize_concept_key(key) for key in candidates],
+                scopes=[SHARED_SCOPE] + ([tenant_id] if tenant_id else []),
+            )
+
+            related: Dict[str, List[str]] = {}
+            async for record in result:
+                related[record["key"]] = list(record["related"])
+
+            return related
+
+
+# Built-in seed vocabulary (parent key -> child keys), extended per tenant by LLM verdicts
+DEFAULT_VOCABULARY: Dict[str, List[str]] = {
+    "food.coffee": [
+        "food.espresso", "food.cappuccino", "food.latte", "food.latte_macchiato",
+        "food.flat_white", "food.americano", "food.mocha", "food.instant_coffee",
+        "food.cold_brew", "food.filter_coffee",
+    ],
+    "food.tea": ["food.green_tea", "food.black_tea", "food.herbal_tea", "food.chai", "food.matcha"],
+    "food.meat": ["food.beef", "food.pork", "food.chicken", "food.lamb", "food.poultry"],
+    "food.poultry": ["food.chicken", "food.turkey", "food.duck"],
+    "food.seafood": ["food.fish", "food.shrimp", "food.shellfish"],
+    "food.fish": ["food.salmon", "food.tuna", "food.cod"],
+    "food.dairy": ["food.milk", "food.cheese", "food.yogurt", "food.butter"],
+    "food.sweets": ["food.chocolate", "food.cake", "food.ice_cream", "food.candy"],
+    "food.alcohol": ["food.beer", "food.wine", "food.spirits", "food.cocktails"],
+    "food.wine": ["food.red_wine", "food.white_wine", "food.rose_wine"],
+    "food.spicy_food": ["food.chili", "food.curry"],
+    "music.rock": ["music.hard_rock", "music.punk", "music.metal", "music.indie_rock"],
+    "music.electronic": ["music.techno", "music.house", "music.trance", "music.ambient"],
+    "music.classical": ["music.opera", "music.baroque", "music.symphony"],
+    "sports.ball_sports": ["sports.football", "sports.basketball", "sports.tennis", "sports.volleyball"],
+    "sports.endurance_sports": ["sports.running", "sports.cycling", "sports.swimming"],
+}
+
+
+def load_vocabulary(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Load a seed vocabulary.
+
+    Args:
+        path: JSON file mapping parent keys to lists of child keys
+            (defaults to the built-in vocabulary)
+
+    Returns:
+        Mapping of parent keys to child keys
+
+    Raises:
+        ValueError: If the file does not contain such a mapping
+    """
+    if not path:
+        return DEFAULT_VOCABULARY
+
+    with open(path, encoding="utf-8") as f:
+        vocabulary = json.load(f)
+
+    if not isinstance(vocabulary, dict) or not all(
+        isinstance(children, list) for children in vocabulary.values()
+    ):
+        raise ValueError(f"Taxonomy vocabulary must map parent keys to lists of keys: {path}")
+    return vocabulary
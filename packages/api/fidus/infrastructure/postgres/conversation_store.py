@@ -15,6 +15,7 @@ from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
 from fidus.config import config
+from fidus.infrastructure.resources import Resources
 
 logger = logging.getLogger(__name__)
 
@@ -113,21 +114,30 @@ class ConversationStore:
     Privacy: Messages are automatically deleted after 7 days.
     """
 
-    def __init__(self, pool: Optional[asyncpg.Pool] = None):
+    def __init__(
+        self,
+        pool: Optional[asyncpg.Pool] = None,
+        resources: Optional[Resources] = None,
+    ):
         """Initialize conversation store.
 
         Args:
             pool: Optional asyncpg connection pool (created if not provided)
+            resources: Shared connection pools (the shared PostgreSQL pool is
+                used instead of creating one)
         """
         self.pool = pool
-        self._pool_created_internally = pool is None
+        self.resources = resources
+        self._pool_created_internally = pool is None and resources is None
 
     async def initialize(self) -> None:
         """Initialize database connection pool.
 
         Must be called before using the store if pool was not provided.
         """
-        if self.pool is None:
+        if self.pool is None and self.resources is not None:
+            self.pool = await self.resources.postgres_pool()
+        elif self.pool is None:
             logger.info(f"Connecting to PostgreSQL: {config.postgres_host}:{config.postgres_port}")
             self.pool = await asyncpg.create_pool(
                 host=config.postgres_host,
@@ -135,8 +145,8 @@ class ConversationStore:
                 user=config.postgres_user,
                 password=config.postgres_password,
                 database=config.postgres_db,
-                min_size=2,
-                max_size=10,
+                min_size=config.postgres_pool_min_size,
+                max_size=config.postgres_pool_max_size,
             )
             logger.info("PostgreSQL connection pool created")
 
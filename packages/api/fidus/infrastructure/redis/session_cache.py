@@ -4,12 +4,15 @@ This module provides a Redis-based caching layer for user preferences
 and context retrieval results to improve performance and reduce database load.
 """
 
+import base64
 import hashlib
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 from datetime import datetime
+import numpy as np
 import redis.asyncio as redis
 from fidus.config import PrototypeConfig
+from fidus.infrastructure.resources import Resources
 
 
 class Neo4jJSONEncoder(json.JSONEncoder):
@@ -36,6 +39,10 @@ class Neo4jJSONEncoder(json.JSONEncoder):
         if isinstance(obj, datetime):
             return obj.isoformat()
 
+        # Handle NumPy arrays and compact EmbeddingVector objects
+        if hasattr(obj, 'tolist'):
+            return obj.tolist()
+
         # Fall back to default serialization
         return super().default(obj)
 
@@ -46,6 +53,10 @@ class SessionCache:
     Provides caching with TTL (Time To Live) for:
     - User preferences (5-minute TTL)
     - Context retrieval results (10-minute TTL)
+    - Embedding vectors (7-day TTL, content-addressed)
+    - Factor vector tables (persistent, one hash per embedding model)
+    - LLM extraction results (short TTL, content-addressed)
+    - LLM relatedness verdicts between preference keys (persistent)
 
     All cache keys are multi-tenant aware and include tenant_id + user_id
     to ensure proper isolation between tenants.
@@ -53,23 +64,36 @@ class SessionCache:
     Cache key formats:
         - Preferences: prefs:{tenant_id}:{user_id}
         - Context: context:{tenant_id}:{user_id}:{context_hash}
+        - Embedding: embedding:{content_hash}
+        - Factor vectors: factor_vectors:{model} (hash field: "key: value")
+        - Extraction: extraction:{content_hash}
+        - Related pairs: related_pairs:{scope}:{model} (hash field: "key_a|key_b")
     """
 
     # TTL constants (in seconds)
     PREFERENCES_TTL = 300  # 5 minutes
     CONTEXT_TTL = 600  # 10 minutes
+    EMBEDDING_TTL = 604800  # 7 days
 
-    def __init__(self, config: PrototypeConfig):
+    def __init__(self, config: PrototypeConfig, resources: Optional[Resources] = None):
         """Initialize Redis connection.
 
         Args:
             config: PrototypeConfig instance with Redis URL
+            resources: Shared connection pools (the cache opens its own
+                connection if omitted)
         """
         self.config = config
+        self.resources = resources
         self._client: Optional[redis.Redis] = None
 
     async def connect(self) -> None:
         """Establish connection to Redis."""
+        if self.resources is not None:
+            self._client = self.resources.redis_client
+            await self.resources.once("redis", self._client.ping)
+            return
+
         self._client = redis.from_url(
             self.config.redis_url,
             encoding="utf-8",
@@ -79,9 +103,10 @@ class SessionCache:
         await self._client.ping()
 
     async def disconnect(self) -> None:
-        """Close connection to Redis."""
+        """Close connection to Redis (a shared pool stays open)."""
         if self._client:
-            await self._client.aclose()
+            if self.resources is None:
+                await self._client.aclose()
             self._client = None
 
     def _get_preferences_key(self, tenant_id: str, user_id: str) -> str:
@@ -112,6 +137,51 @@ class SessionCache:
         context_hash = hashlib.sha256(context_str.encode()).hexdigest()[:16]
         return f"context:{tenant_id}:{user_id}:{context_hash}"
 
+    def _get_embedding_key(self, content_hash: str) -> str:
+        """Generate cache key for an embedding vector.
+
+        Args:
+            content_hash: Hash of embedding model and input text
+
+        Returns:
+            Cache key in format: embedding:{content_hash}
+        """
+        return f"embedding:{content_hash}"
+
+    def _get_extraction_key(self, content_hash: str) -> str:
+        """Generate cache key for an LLM extraction result.
+
+        Args:
+            content_hash: Hash of extraction kind, model, time bucket and message
+
+        Returns:
+            Cache key in format: extraction:{content_hash}
+        """
+        return f"extraction:{content_hash}"
+
+    def _get_factor_vectors_key(self, model: str) -> str:
+        """Generate key for the factor vector table of an embedding model.
+
+        Args:
+            model: Embedding model namespace
+
+        Returns:
+            Key in format: factor_vectors:{model}
+        """
+        return f"factor_vectors:{model}"
+
+    def _get_related_pairs_key(self, scope: str, model: str) -> str:
+        """Generate key for the relatedness verdict table of an LLM model.
+
+        Args:
+            scope: Tenant identifier, or "shared" for verdicts shared by all tenants
+            model: LLM model name
+
+        Returns:
+            Key in format: related_pairs:{scope}:{model}
+        """
+        return f"related_pairs:{scope}:{model}"
+
     async def cache_preferences(
         self,
         tenant_id: str,
@@ -250,6 +320,202 @@ class SessionCache:
 
         return json.loads(value)
 
+    async def cache_embedding(
+        self, content_hash: str, embedding: Sequence[float]
+    ) -> None:
+        """Cache an embedding vector under its content hash with 7-day TTL.
+
+        Embeddings are content-addressed (hash of model name + text), so
+        entries are shared across tenants and never need invalidation.
+
+        Args:
+            content_hash: Hash of embedding model and input text
+            embedding: Embedding vector to cache
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        # Stored as base64 float32 (~4x smaller than a JSON float list)
+        await self._client.setex(
+            self._get_embedding_key(content_hash),
+            self.EMBEDDING_TTL,
+            base64.b64encode(np.asarray(embedding, dtype="<f4").tobytes()).decode("ascii"),
+        )
+
+    async def get_cached_embedding(self, content_hash: str) -> Optional[List[float]]:
+        """Retrieve a cached embedding vector.
+
+        Args:
+            content_hash: Hash of embedding model and input text
+
+        Returns:
+            Cached embedding vector, or None if cache miss
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        value = await self._client.get(self._get_embedding_key(content_hash))
+
+        if value is None:
+            return None
+
+        # Entries written before the compact format are JSON lists
+        if value.startswith("["):
+            return json.loads(value)
+        return np.frombuffer(base64.b64decode(value), dtype="<f4").tolist()
+
+    async def cache_extraction(
+        self, content_hash: str, result: Dict[str, Any], ttl_seconds: int
+    ) -> None:
+        """Cache an LLM extraction result under its content hash.
+
+        Args:
+            content_hash: Hash of extraction kind, model, time bucket and message
+            result: JSON-serializable extraction result
+            ttl_seconds: Time-to-live in seconds
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        await self._client.setex(
+            self._get_extraction_key(content_hash),
+            ttl_seconds,
+            json.dumps(result),
+        )
+
+    async def get_cached_extraction(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a cached LLM extraction result.
+
+        Args:
+            content_hash: Hash of extraction kind, model, time bucket and message
+
+        Returns:
+            Cached extraction result, or None if cache miss
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        value = await self._client.get(self._get_extraction_key(content_hash))
+
+        if value is None:
+            return None
+
+        return json.loads(value)
+
+    async def store_factor_vectors(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """Persist per-factor vectors (no TTL; the vocabulary is small).
+
+        Args:
+            model: Embedding model namespace
+            vectors: Mapping of "key: value" factor strings to vectors
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        if not vectors:
+            return
+
+        await self._client.hset(
+            self._get_factor_vectors_key(model),
+            mapping={factor: json.dumps(vector) for factor, vector in vectors.items()},
+        )
+
+    async def get_factor_vectors(
+        self, model: str, factors: List[str]
+    ) -> Dict[str, List[float]]:
+        """Retrieve stored vectors for the given factor strings.
+
+        Args:
+            model: Embedding model namespace
+            factors: "key: value" factor strings to look up
+
+        Returns:
+            Mapping of found factor strings to vectors (missing ones omitted)
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        if not factors:
+            return {}
+
+        values = await self._client.hmget(self._get_factor_vectors_key(model), factors)
+        return {
+            factor: json.loads(value)
+            for factor, value in zip(factors, values)
+            if value is not None
+        }
+
+    async def store_related_pairs(
+        self, scope: str, model: str, verdicts: Dict[str, bool]
+    ) -> None:
+        """Persist relatedness verdicts between preference keys (no TTL).
+
+        Args:
+            scope: Tenant identifier, or "shared" for verdicts shared by all tenants
+            model: LLM model name
+            verdicts: Mapping of "key_a|key_b" (sorted) to related
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        if not verdicts:
+            return
+
+        await self._client.hset(
+            self._get_related_pairs_key(scope, model),
+            mapping={pair: "1" if related else "0" for pair, related in verdicts.items()},
+        )
+
+    async def get_related_pairs(
+        self, scope: str, model: str, pairs: List[str]
+    ) -> Dict[str, bool]:
+        """Retrieve stored relatedness verdicts between preference keys.
+
+        Args:
+            scope: Tenant identifier, or "shared" for verdicts shared by all tenants
+            model: LLM model name
+            pairs: "key_a|key_b" (sorted) pairs to look up
+
+        Returns:
+            Mapping of found pairs to related (missing ones omitted)
+
+        Raises:
+            RuntimeError: If Redis client not initialized
+        """
+        if not self._client:
+            raise RuntimeError("Redis client not initialized. Call connect() first.")
+
+        if not pairs:
+            return {}
+
+        values = await self._client.hmget(self._get_related_pairs_key(scope, model), pairs)
+        return {
+            pair: value == "1"
+            for pair, value in zip(pairs, values)
+            if value is not None
+        }
+
     async def clear_all_cache(self, tenant_id: str, user_id: str) -> None:
         """Clear all cache entries for a specific user.
 
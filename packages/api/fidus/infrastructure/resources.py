@@ -0,0 +1,209 @@
+"""Process-wide connection pools shared by all stores and services.
+
+Stores and services used to open their own connections: every
+PersistentAgent had a Neo4j driver for its preference store, one for its
+taxonomy and one for its ContextStorageService, plus Qdrant clients, and
+several routes and health checks opened fresh clients on every request.
+Resources owns one pool per backend for the whole process. Components
+receive the container (dependency injection) and borrow its clients;
+only the container closes them.
+
+Clients are created on first use, so a backend that is never used is
+never connected. The app's container is created by open_resources() in
+the startup handler and closed by close_resources() on shutdown, so it
+belongs to the running event loop (not to whoever imports this module).
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncpg
+import redis.asyncio as redis
+from neo4j import AsyncDriver, AsyncGraphDatabase
+from qdrant_client import QdrantClient
+
+from fidus.config import PrototypeConfig, config as default_config
+
+logger = logging.getLogger(__name__)
+
+
+class Resources:
+    """Shared Neo4j driver, Qdrant client, Redis pool and PostgreSQL pool.
+
+    Example:
+        resources = Resources(config)
+        store = Neo4jPreferenceStore(config, resources=resources)
+        await store.connect()  # borrows resources.neo4j_driver
+        ...
+        await resources.close()  # on shutdown
+    """
+
+    def __init__(self, config: Optional[PrototypeConfig] = None):
+        """Initialize the container (no connections are opened yet).
+
+        Args:
+            config: PrototypeConfig instance with connection settings and
+                pool sizes (defaults to the global config)
+        """
+        self.config = config or default_config
+        self._neo4j_driver: Optional[AsyncDriver] = None
+        self._qdrant_client: Optional[QdrantClient] = None
+        self._redis_client: Optional[redis.Redis] = None
+        self._postgres_pool: Optional[asyncpg.Pool] = None
+        self._postgres_lock = asyncio.Lock()
+        # One-time setup steps (schema constraints, connectivity checks) done so far
+        self._initialized: set[str] = set()
+        self._setup_locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def neo4j_driver(self) -> AsyncDriver:
+        """Shared Neo4j driver (its connection pool is sized by config.neo4j_max_pool_size)."""
+        if self._neo4j_driver is None:
+            self._neo4j_driver = AsyncGraphDatabase.driver(
+                self.config.neo4j_uri,
+                auth=(self.config.neo4j_user, self.config.neo4j_password),
+                max_connection_pool_size=self.config.neo4j_max_pool_size,
+            )
+            logger.info("Created shared Neo4j driver")
+        return self._neo4j_driver
+
+    @property
+    def qdrant_client(self) -> QdrantClient:
+        """Shared Qdrant client (connection pool sized by config.qdrant_pool_size)."""
+        if self._qdrant_client is None:
+            self._qdrant_client = QdrantClient(
+                host=self.config.qdrant_host,
+                port=self.config.qdrant_port,
+                grpc_port=self.config.qdrant_grpc_port,
+                pool_size=self.config.qdrant_pool_size,
+            )
+            logger.info("Created shared Qdrant client")
+        return self._qdrant_client
+
+    @property
+    def redis_client(self) -> redis.Redis:
+        """Shared Redis client (connection pool sized by config.redis_max_connections)."""
+        if self._redis_client is None:
+            pool = redis.ConnectionPool.from_url(
+                self.config.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+                max_connections=self.config.redis_max_connections,
+            )
+            self._redis_client = redis.Redis(connection_pool=pool)
+            logger.info("Created shared Redis connection pool")
+        return self._redis_client
+
+    async def postgres_pool(self) -> asyncpg.Pool:
+        """Get the shared PostgreSQL pool, creating it on first use.
+
+        Returns:
+            asyncpg.Pool: Pool sized by config.postgres_pool_min_size/max_size
+        """
+        if self._postgres_pool is None:
+            async with self._postgres_lock:
+                if self._postgres_pool is None:
+                    self._postgres_pool = await asyncpg.create_pool(
+                        host=self.config.postgres_host,
+                        port=self.config.postgres_port,
+                        user=self.config.postgres_user,
+                        password=self.config.postgres_password,
+                        database=self.config.postgres_db,
+                        min_size=self.config.postgres_pool_min_size,
+                        max_size=self.config.postgres_pool_max_size,
+                    )
+                    logger.info("Created shared PostgreSQL pool")
+        return self._postgres_pool
+
+    async def once(self, name: str, setup: Callable[[], Awaitable[None]]) -> None:
+        """Run a setup step once per process (retried if it failed).
+
+        Used for work that belongs to the shared connection rather than to
+        each component, such as connectivity checks and schema constraints.
+
+        Args:
+            name: Unique name of the step
+            setup: Coroutine function performing the step
+        """
+        if name in self._initialized:
+            return
+
+        lock = self._setup_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name not in self._initialized:
+                await setup()
+                self._initialized.add(name)
+
+    async def close(self) -> None:
+        """Close all pools (on shutdown)."""
+        if self._neo4j_driver is not None:
+            await self._neo4j_driver.close()
+            self._neo4j_driver = None
+        if self._qdrant_client is not None:
+            self._qdrant_client.close()
+            self._qdrant_client = None
+        if self._redis_client is not None:
+            await self._redis_client.aclose()
+            self._redis_client = None
+        if self._postgres_pool is not None:
+            await self._postgres_pool.close()
+            self._postgres_pool = None
+        self._initialized.clear()
+        logger.info("Closed shared connection pools")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the state of the pools.
+
+        Returns:
+            Dictionary with the open pools and configured sizes
+        """
+        return {
+            "neo4j": self._neo4j_driver is not None,
+            "qdrant": self._qdrant_client is not None,
+            "redis": self._redis_client is not None,
+            "postgres": self._postgres_pool is not None,
+            "neo4j_max_pool_size": self.config.neo4j_max_pool_size,
+            "qdrant_pool_size": self.config.qdrant_pool_size,
+            "redis_max_connections": self.config.redis_max_connections,
+            "postgres_pool_max_size": self.config.postgres_pool_max_size,
+            "initialized": sorted(self._initialized),
+        }
+
+
+# Shared by the app (created on startup, connected lazily, closed on shutdown)
+_resources: Optional[Resources] = None
+
+
+def open_resources(config: Optional[PrototypeConfig] = None) -> Resources:
+    """Create the process-wide resources (in the startup handler).
+
+    Args:
+        config: PrototypeConfig instance (defaults to the global config)
+
+    Returns:
+        Resources: The process-wide container (the existing one if open)
+    """
+    global _resources
+    if _resources is None:
+        _resources = Resources(config)
+    return _resources
+
+
+async def close_resources() -> None:
+    """Close the process-wide resources (on shutdown)."""
+    global _resources
+    resources, _resources = _resources, None
+    if resources is not None:
+        await resources.close()
+
+
+def get_resources() -> Resources:
+    """FastAPI dependency returning the process-wide resources.
+
+    Raises:
+        RuntimeError: If called before open_resources()
+    """
+    if _resources is None:
+        raise RuntimeError("Resources not open. Call open_resources() on startup.")
+    return _resources
@@ -8,10 +8,21 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fidus.api.routes import memory, mcp, health
 from fidus.api.middleware.auth import SimpleAuthMiddleware
+from fidus.api.warmup import run_warmup, warmup_state
+from fidus.config import config
+from fidus.infrastructure.neo4j_taxonomy import load_vocabulary
+from fidus.infrastructure.redis.session_cache import SessionCache
+from fidus.infrastructure.resources import close_resources, open_resources
+from fidus.memory.context.embedding_cache import default_embedding_cache
+from fidus.memory.context.factor_vectors import connect_factor_tables
+from fidus.memory.extraction_cache import default_extraction_cache
+from fidus.memory.learning_queue import default_learning_queue
 from fidus.memory.mcp_server import PreferenceMCPServer
+from fidus.memory.relatedness_memo import default_relatedness_memo
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,6 +57,11 @@ app.include_router(mcp.router)     # MCP endpoints (auth required)
 @app.on_event("startup")
 async def startup_event():
     """Initialize connections on startup."""
+    # Process-wide connection pools, injected into all stores and services
+    resources = open_resources(config)
+    app.state.resources = resources
+    memory.init_agent(resources)
+
     # Connect PersistentAgent to Neo4j if configured
     if hasattr(memory.agent, 'connect'):
         try:
@@ -55,6 +71,15 @@ async def startup_event():
             logger.error(f"Failed to connect to Neo4j: {e}")
             logger.warning("Falling back to in-memory mode")
 
+    # Seed the shared preference taxonomy (idempotent; LLM verdicts extend it per tenant)
+    taxonomy = getattr(memory.agent, "taxonomy", None)
+    if taxonomy is not None:
+        try:
+            count = await taxonomy.seed(load_vocabulary(config.taxonomy_seed_path))
+            logger.info(f"Seeded preference taxonomy with {count} relations")
+        except Exception as e:
+            logger.error(f"Failed to seed preference taxonomy: {e}")
+
     # Initialize MCP server with the memory agent
     try:
         mcp_server = PreferenceMCPServer(memory.agent)
@@ -64,10 +89,50 @@ async def startup_event():
         logger.error(f"Failed to initialize MCP server: {e}")
         logger.warning("MCP endpoints will not be available")
 
+    # Preference learning workers (off the response path)
+    if config.background_learning_enabled:
+        default_learning_queue.start()
+
+    # Redis tier for the extraction, embedding and relatedness caches and the
+    # factor vector tables (shared pool)
+    session_cache = SessionCache(config, resources=resources)
+    try:
+        await session_cache.connect()
+        default_extraction_cache.session_cache = session_cache
+        default_embedding_cache.session_cache = session_cache
+        connect_factor_tables(session_cache)
+        default_relatedness_memo.session_cache = session_cache
+        logger.info("Connected extraction, embedding and relatedness caches to Redis")
+    except Exception as e:
+        logger.warning(f"Redis unavailable, caches stay in process: {e}")
+
+    # Evict idle per-user agents periodically
+    memory.user_agents.start()
+
+    # Warm up models and connections in the background; /health reports
+    # "warming_up" until this is done
+    if config.warmup_enabled:
+        warmup_state.start()
+        app.state.warmup_task = asyncio.create_task(run_warmup())
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up connections on shutdown."""
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+
+    # Finish queued learning jobs while Neo4j is still connected
+    await default_learning_queue.stop()
+
+    # Disconnect per-user agents
+    try:
+        await memory.user_agents.close()
+        logger.info("Closed per-user agents")
+    except Exception as e:
+        logger.error(f"Error closing per-user agents: {e}")
+
     # Disconnect PersistentAgent from Neo4j
     if hasattr(memory.agent, 'disconnect'):
         try:
@@ -76,5 +141,11 @@ async def shutdown_event():
         except Exception as e:
             logger.error(f"Error disconnecting from Neo4j: {e}")
 
+    # Close the shared connection pools last
+    try:
+        await close_resources()
+    except Exception as e:
+        logger.error(f"Error closing connection pools: {e}")
+
 
 # Health check moved to health.router (see fidus/api/routes/health.py)
@@ -0,0 +1,223 @@
+"""Per-agent mailbox and per-turn state (actor model).
+
+Each user has one agent, but a user can send requests concurrently (two
+browser tabs, the MCP server and the UI). Chat turns used to keep their
+state on the agent (current message, user, combined analysis, pending
+saves) and interleave their history and preference updates, so
+concurrent turns of the same user corrupted each other.
+
+Every agent now owns a Mailbox: operations that change its state (chat
+turns, applying learned preferences, accept/reject/delete) are queued
+and run one at a time, in order, by a worker task. Per-request state
+travels in a TurnContext instead of agent attributes. Reads don't go
+through the mailbox and use snapshots (see
+InMemoryAgent.preferences_snapshot), and agents of different users have
+separate mailboxes, so there is no global lock.
+"""
+
+import asyncio
+import functools
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Sentinel put on a stream's item queue when its generator finishes
+_STREAM_END = object()
+
+
+class TurnContext:
+    """State of one chat turn, from the request until its learning is done.
+
+    Passed through the turn and into its background learning job, so
+    concurrent turns and queued jobs never read each other's state.
+    """
+
+    def __init__(self, user_message: str, user_id: str = "unknown"):
+        """Initialize the turn.
+
+        Args:
+            user_message: The user's message
+            user_id: User identifier for context tracking
+        """
+        self.user_message = user_message
+        self.user_id = user_id
+        # Preferences from the combined analysis (None: extract separately)
+        self.preferences: Optional[List[Dict[str, Any]]] = None
+        # Merged situational context of the message (ContextFactors, Phase 3)
+        self.context: Any = None
+        # Preferences learned in this turn that still need to be persisted
+        self.pending_saves: List[Dict[str, Any]] = []
+
+    def take_preferences(self) -> Optional[List[Dict[str, Any]]]:
+        """Take the preferences of the combined analysis (at most once).
+
+        Returns:
+            Extracted preferences, or None if no analysis is available
+        """
+        preferences, self.preferences = self.preferences, None
+        return preferences
+
+    def take_pending_saves(self) -> List[Dict[str, Any]]:
+        """Take the preferences waiting to be persisted.
+
+        Returns:
+            Pending saves (the turn keeps none, so each is persisted once)
+        """
+        pending_saves, self.pending_saves = self.pending_saves, []
+        return pending_saves
+
+
+class Mailbox:
+    """FIFO of operations on one agent, run one at a time by a worker task.
+
+    Operations run to completion even if the caller is cancelled (e.g. the
+    client disconnects), so a turn never leaves the agent half-updated.
+    The worker exits when the mailbox is empty; idle agents hold no task.
+
+    Operations must not post to their own mailbox and wait for the result
+    (that would wait forever); call the unserialized implementation instead.
+
+    Example:
+        mailbox = Mailbox("user-1")
+        response = await mailbox.call(lambda: agent._chat_turn(turn))
+    """
+
+    def __init__(self, name: str = "agent"):
+        """Initialize an empty mailbox.
+
+        Args:
+            name: Name of the worker task (for debugging)
+        """
+        self.name = name
+        self._messages: Deque[Tuple[Callable[[], Awaitable[Any]], asyncio.Future]] = deque()
+        self._worker: Optional[asyncio.Task] = None
+
+        self.processed = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @property
+    def busy(self) -> bool:
+        """True while an operation is running or queued."""
+        return self._worker is not None
+
+    def post(self, operation: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """Queue an operation without waiting for it.
+
+        Args:
+            operation: Coroutine function to run in the mailbox
+
+        Returns:
+            Future resolved with the operation's result or exception
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._messages.append((operation, future))
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(), name=f"mailbox-{self.name}")
+        return future
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Run an operation after all queued ones and return its result.
+
+        Args:
+            operation: Coroutine function to run in the mailbox
+
+        Returns:
+            The operation's result (its exception is re-raised)
+        """
+        return await asyncio.shield(self.post(operation))
+
+    async def stream(self, operation: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Run an async generator in the mailbox and yield its items.
+
+        If the consumer stops early, the generator is closed at its next
+        item (as it would be without the mailbox).
+
+        Args:
+            operation: Function returning the async generator
+
+        Yields:
+            The generator's items, as they are produced
+        """
+        items: asyncio.Queue = asyncio.Queue()
+        closed = asyncio.Event()
+
+        async def run() -> None:
+            generator = operation()
+            try:
+                async for item in generator:
+                    if closed.is_set():
+                        break
+                    items.put_nowait(item)
+            except Exception as e:
+                items.put_nowait(e)
+            finally:
+                await generator.aclose()
+                items.put_nowait(_STREAM_END)
+
+        self.post(run)
+        try:
+            while True:
+                item = await items.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            closed.set()
+
+    async def join(self) -> None:
+        """Wait until all queued operations have run."""
+        while self._worker is not None:
+            await asyncio.wait([self._worker])
+
+    async def _run(self) -> None:
+        try:
+            while self._messages:
+                operation, future = self._messages.popleft()
+                try:
+                    result = await operation()
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                self.processed += 1
+        finally:
+            self._worker = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get mailbox metrics.
+
+        Returns:
+            Dictionary with queued, processed and failed operations
+        """
+        return {
+            "queued": len(self._messages),
+            "busy": self.busy,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+def serialized(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Run an agent coroutine method through the agent's mailbox.
+
+    The agent must have a `mailbox` attribute. Serialized methods must not
+    call each other; share an unserialized helper instead.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        return await self.mailbox.call(lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,348 @@
+"""Bounded registry of per-user chat agents.
+
+Every user (including each anonymous guest-<uuid> the auth middleware
+creates) gets an agent holding their conversation history and, for a
+PersistentAgent, Neo4j drivers and Qdrant clients. A plain dict kept all
+of them forever, so memory and open sockets grew with every new user.
+AgentRegistry keeps at most max_size agents, evicts the least recently
+used one when full and agents idle longer than the TTL on a periodic
+sweep, and disconnects evicted agents.
+
+Busy agents are never evicted: a new agent for the same user would run
+alongside the old one, and the old one's writes would be lost after its
+disconnect. An agent is busy while a request holds a lease on it (see
+lease()), a turn is running or queued in its mailbox, learning is in
+flight, or learning jobs of its user are waiting in the learning queue.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fidus.config import config
+from fidus.memory.simple_agent import InMemoryAgent
+
+logger = logging.getLogger(__name__)
+
+# Creates the agent for a user ID
+AgentFactory = Callable[[str], InMemoryAgent]
+
+# Fixed per-agent overhead in the memory estimate (objects, prompt builder, clients)
+AGENT_BASE_BYTES = 64 * 1024
+
+
+def estimate_agent_bytes(agent: InMemoryAgent) -> int:
+    """Estimate the memory an agent holds.
+
+    Counts the fixed overhead plus conversation history and preference text
+    (roughly 2 bytes per character including object overhead).
+
+    Args:
+        agent: Agent to measure
+
+    Returns:
+        int: Estimated bytes
+    """
+    history_chars = sum(len(message.get("content", "")) for message in agent.conversation_history)
+    preference_chars = sum(
+        len(key) + len(str(pref.get("value", ""))) for key, pref in agent.preferences.items()
+    )
+    return AGENT_BASE_BYTES + 2 * (history_chars + preference_chars)
+
+
+class AgentLease:
+    """Keeps a user's agent from being evicted until released.
+
+    Release is idempotent, so it can be called from several cleanup paths
+    (e.g. a stream's finally block and the response's background task).
+
+    Example:
+        with registry.lease(user_id) as agent:
+            await agent.chat(message, user_id=user_id)
+    """
+
+    def __init__(self, registry: "AgentRegistry", user_id: str, agent: InMemoryAgent):
+        """Initialize the lease (taken by AgentRegistry.lease).
+
+        Args:
+            registry: Registry holding the agent
+            user_id: User the agent belongs to
+            agent: The leased agent
+        """
+        self.registry = registry
+        self.user_id = user_id
+        self.agent = agent
+        self._released = False
+
+    def release(self) -> None:
+        """Allow the agent to be evicted again (once all leases are released)."""
+        if not self._released:
+            self._released = True
+            self.registry._release(self.user_id)
+
+    def __enter__(self) -> InMemoryAgent:
+        return self.agent
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class AgentRegistry:
+    """LRU/TTL-bounded map of user IDs to agents.
+
+    Not thread-safe; intended for use from a single asyncio event loop.
+
+    Example:
+        registry = AgentRegistry(lambda user_id: PersistentAgent(tenant_id=user_id))
+        registry.start()
+        with registry.lease(user_id) as agent:
+            ...
+        await registry.close()
+    """
+
+    def __init__(
+        self,
+        factory: AgentFactory,
+        max_size: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        sweep_interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the registry (call start() from a running event loop).
+
+        Args:
+            factory: Creates the agent for a user ID
+            max_size: Maximum number of agents (defaults to config.agent_registry_max_size)
+            idle_ttl_seconds: Evict agents unused for this long, 0 to keep them
+                (defaults to config.agent_idle_ttl_seconds)
+            sweep_interval_seconds: Interval of the idle sweep
+                (defaults to config.agent_sweep_interval_seconds)
+            clock: Monotonic time source (for tests)
+        """
+        self.factory = factory
+        self.max_size = max(1, config.agent_registry_max_size if max_size is None else max_size)
+        self.idle_ttl_seconds = (
+            config.agent_idle_ttl_seconds if idle_ttl_seconds is None else idle_ttl_seconds
+        )
+        self.sweep_interval_seconds = (
+            config.agent_sweep_interval_seconds
+            if sweep_interval_seconds is None
+            else sweep_interval_seconds
+        )
+        self._clock = clock
+
+        # user_id -> (agent, last access time), least recently used first
+        self._agents: "OrderedDict[str, Tuple[InMemoryAgent, float]]" = OrderedDict()
+        # user_id -> number of requests holding the agent
+        self._leases: Dict[str, int] = {}
+        self._closing: set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.created = 0
+        self.hits = 0
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        self.close_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._agents
+
+    def get(self, user_id: str) -> InMemoryAgent:
+        """Get or create the agent of a user and mark it as recently used.
+
+        Creating an agent beyond max_size evicts the least recently used
+        idle one; it is disconnected in the background. If every agent is
+        busy, the registry exceeds max_size until they finish.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            The user's agent
+        """
+        now = self._clock()
+        entry = self._agents.get(user_id)
+        if (
+            entry is not None
+            and self._is_idle(entry[1], now)
+            and not self._is_busy(user_id, entry[0])
+        ):
+            self._evict(user_id)
+            self.evicted_idle += 1
+            entry = None
+
+        if entry is not None:
+            self._agents[user_id] = (entry[0], now)
+            self._agents.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+        agent = self.factory(user_id)
+        self._agents[user_id] = (agent, now)
+        self.created += 1
+
+        excess = len(self._agents) - self.max_size
+        if excess > 0:
+            evictable = [
+                other for other, (other_agent, _) in self._agents.items()
+                if other != user_id and not self._is_busy(other, other_agent)
+            ][:excess]
+            for oldest in evictable:
+                self._evict(oldest)
+                self.evicted_lru += 1
+                logger.info(f"Evicted least recently used agent of user {oldest}")
+            if len(evictable) < excess:
+                logger.warning(
+                    f"Agent registry over capacity ({len(self._agents)}/{self.max_size}): "
+                    "remaining agents are busy"
+                )
+
+        return agent
+
+    def lease(self, user_id: str) -> AgentLease:
+        """Get the agent of a user and keep it until the lease is released.
+
+        Requests hold a lease from the lookup (including connect()) until
+        they (or their response stream) end, so the agent isn't evicted
+        and disconnected before their turn reaches its mailbox.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            AgentLease: Lease on the user's agent (a context manager)
+        """
+        agent = self.get(user_id)
+        self._leases[user_id] = self._leases.get(user_id, 0) + 1
+        return AgentLease(self, user_id, agent)
+
+    def _release(self, user_id: str) -> None:
+        remaining = self._leases.get(user_id, 0) - 1
+        if remaining > 0:
+            self._leases[user_id] = remaining
+        else:
+            self._leases.pop(user_id, None)
+
+    def _is_idle(self, last_access: float, now: float) -> bool:
+        return bool(self.idle_ttl_seconds) and now - last_access > self.idle_ttl_seconds
+
+    def _is_busy(self, user_id: str, agent: InMemoryAgent) -> bool:
+        """True while the agent is leased or has turns or learning pending."""
+        queue = agent.learning_queue
+        return (
+            user_id in self._leases
+            or agent.mailbox.busy
+            or bool(agent._learning_tasks)
+            or (queue is not None and queue.pending_for(user_id) > 0)
+        )
+
+    def _evict(self, user_id: str) -> None:
+        """Remove an agent and disconnect it in the background."""
+        agent, _ = self._agents.pop(user_id)
+        try:
+            task = asyncio.get_running_loop().create_task(self._disconnect(user_id, agent))
+        except RuntimeError:
+            # No event loop (sync callers): nothing could have connected the agent
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _disconnect(self, user_id: str, agent: InMemoryAgent) -> None:
+        """Release an evicted agent's connections once its work is done."""
+        if not hasattr(agent, "disconnect"):
+            return
+        try:
+            # Only close() evicts busy agents; let their turns finish first
+            await agent.mailbox.join()
+            if agent._learning_tasks:
+                await asyncio.gather(*list(agent._learning_tasks), return_exceptions=True)
+            await agent.disconnect()
+        except Exception as e:
+            self.close_failures += 1
+            logger.error(f"Error disconnecting agent of user {user_id}: {e}")
+
+    async def sweep(self) -> int:
+        """Evict and disconnect all idle agents.
+
+        Returns:
+            int: Number of evicted agents
+        """
+        now = self._clock()
+        idle = [
+            user_id for user_id, (agent, last_access) in self._agents.items()
+            if self._is_idle(last_access, now) and not self._is_busy(user_id, agent)
+        ]
+        for user_id in idle:
+            self._evict(user_id)
+        self.evicted_idle += len(idle)
+
+        if idle:
+            logger.info(f"Evicted {len(idle)} idle agents", extra={"evicted": len(idle)})
+            await self.wait_closed()
+        return len(idle)
+
+    async def wait_closed(self) -> None:
+        """Wait until evicted agents are disconnected."""
+        if self._closing:
+            await asyncio.gather(*list(self._closing), return_exceptions=True)
+
+    def start(self) -> None:
+        """Start the periodic idle sweep on the running event loop."""
+        if self._sweeper is not None or not self.idle_ttl_seconds:
+            return
+        self._sweeper = asyncio.create_task(self._sweep_loop(), name="agent-registry-sweeper")
+        logger.info(
+            f"Started agent registry (max {self.max_size} agents, "
+            f"idle TTL {self.idle_ttl_seconds:.0f}s)"
+        )
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Agent registry sweep failed: {e}")
+
+    async def close(self) -> None:
+        """Stop the sweep and disconnect all agents (on shutdown)."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+        for user_id in list(self._agents):
+            self._evict(user_id)
+        await self.wait_closed()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get registry metrics.
+
+        Returns:
+            Dictionary with agent counts, evictions and estimated memory
+        """
+        lookups = self.created + self.hits
+        sizes: List[int] = [estimate_agent_bytes(agent) for agent, _ in self._agents.values()]
+        return {
+            "agents": len(self._agents),
+            "leased": len(self._leases),
+            "max_size": self.max_size,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "created": self.created,
+            "hits": self.hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evicted_lru": self.evicted_lru,
+            "evicted_idle": self.evicted_idle,
+            "closing": len(self._closing),
+            "close_failures": self.close_failures,
+            "estimated_bytes": sum(sizes),
+            "largest_agent_bytes": max(sizes, default=0),
+        }
@@ -0,0 +1,178 @@
+"""Embedding prefilter for semantic preference conflicts.
+
+Semantic conflict detection used to ask the LLM about every pair of
+same-domain preferences with opposite sentiment, one call per pair and
+turn. ConflictDetector is the first of two stages: it embeds preference
+keys once (vectors are cached per key) and keeps only pairs whose cosine
+similarity reaches a threshold. The agent sends the remaining candidates to
+the LLM in a single batched call (see InMemoryAgent._find_related_pairs).
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from fidus.config import config
+from fidus.infrastructure.memory_cache import LRUCache
+from fidus.memory.relatedness_memo import KeyPair
+
+if TYPE_CHECKING:
+    # fidus.memory.context imports the agents, which import this module
+    from fidus.memory.context.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class ConflictDetector:
+    """Select candidate pairs of related preference keys by embedding similarity.
+
+    Example:
+        detector = ConflictDetector()
+        candidates = await detector.candidates([("food.coffee", "food.espresso")])
+    """
+
+    def __init__(
+        self,
+        embedding_service: Optional["EmbeddingService"] = None,
+        similarity_threshold: Optional[float] = None,
+        max_candidates: Optional[int] = None,
+        max_cached_keys: int = 4096,
+    ):
+        """Initialize the detector.
+
+        Args:
+            embedding_service: Service used to embed keys (defaults to the
+                process-wide service, see get_embedding_service)
+            similarity_threshold: Minimum cosine similarity of a candidate pair
+                (defaults to config.conflict_similarity_threshold)
+            max_candidates: Maximum candidate pairs per check, most similar first
+                (defaults to config.conflict_max_candidate_pairs)
+            max_cached_keys: Capacity of the per-key vector cache
+        """
+        self._embedding_service = embedding_service
+        self.similarity_threshold = (
+            config.conflict_similarity_threshold
+            if similarity_threshold is None
+            else similarity_threshold
+        )
+        self.max_candidates = (
+            config.conflict_max_candidate_pairs if max_candidates is None else max_candidates
+        )
+        # (embedding model, key) -> L2-normalized vector
+        self._vectors: LRUCache[np.ndarray] = LRUCache(max_size=max_cached_keys)
+
+        self.pairs_checked = 0
+        self.pairs_selected = 0
+
+    @property
+    def embedding_service(self) -> "EmbeddingService":
+        """Embedding service (the process-wide service unless one was given)."""
+        if self._embedding_service is None:
+            from fidus.memory.context.embedding_service import get_embedding_service
+
+            self._embedding_service = get_embedding_service()
+        return self._embedding_service
+
+    @staticmethod
+    def key_text(key: str) -> str:
+        """Text to embed for a preference key ("food.instant_coffee" -> "food: instant coffee").
+
+        Args:
+            key: Preference key (domain.key)
+
+        Returns:
+            str: Readable form of the key
+        """
+        domain, _, item = key.rpartition(".")
+        item = item.replace("_", " ")
+        return f"{domain}: {item}" if domain else item
+
+    async def key_vectors(self, keys: Sequence[str]) -> np.ndarray:
+        """Get normalized vectors for preference keys, embedding unseen keys in one call.
+
+        Args:
+            keys: Preference keys
+
+        Returns:
+            np.ndarray: float32 matrix with one L2-normalized row per key
+
+        Raises:
+            Exception: If the embedding provider fails
+        """
+        service = self.embedding_service
+        found: Dict[str, np.ndarray] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self._vectors.get((service.model, key))
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+
+        if missing:
+            from fidus.memory.context.embedding_service import EmbeddingService
+
+            vectors = await service.generate_text_embeddings(
+                [self.key_text(key) for key in missing]
+            )
+            for key, vector in zip(missing, EmbeddingService.normalize_embeddings(vectors)):
+                self._vectors.set((service.model, key), vector)
+                found[key] = vector
+
+        return np.stack([found[key] for key in keys])
+
+    async def candidates(self, pairs: Sequence[KeyPair]) -> List[KeyPair]:
+        """Keep the pairs similar enough to be related, most similar first.
+
+        If embedding fails, all pairs are kept (up to max_candidates), so
+        the LLM still judges them, just without the prefilter.
+
+        Args:
+            pairs: Sorted key pairs to check
+
+        Returns:
+            list[KeyPair]: Candidate pairs for LLM adjudication
+        """
+        if not pairs:
+            return []
+
+        keys = list(dict.fromkeys(key for pair in pairs for key in pair))
+        index = {key: position for position, key in enumerate(keys)}
+        try:
+            vectors = await self.key_vectors(keys)
+        except Exception as e:
+            logger.warning(f"Conflict prefilter unavailable, checking all pairs: {e}")
+            return list(pairs[: self.max_candidates])
+
+        # Rows are normalized, so row-wise dot products are the cosine similarities
+        first = np.fromiter((index[a] for a, _ in pairs), dtype=np.intp, count=len(pairs))
+        second = np.fromiter((index[b] for _, b in pairs), dtype=np.intp, count=len(pairs))
+        scores = np.einsum("ij,ij->i", vectors[first], vectors[second])
+
+        selected = np.flatnonzero(scores >= self.similarity_threshold)
+        selected = selected[np.argsort(-scores[selected], kind="stable")][: self.max_candidates]
+
+        self.pairs_checked += len(pairs)
+        self.pairs_selected += len(selected)
+        logger.debug(
+            f"Conflict prefilter kept {len(selected)}/{len(pairs)} pairs",
+            extra={"pairs": len(pairs), "candidates": len(selected)},
+        )
+        return [pairs[position] for position in selected]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get prefilter metrics.
+
+        Returns:
+            Dictionary with checked/selected pair counts and cached key vectors
+        """
+        return {
+            "pairs_checked": self.pairs_checked,
+            "pairs_selected": self.pairs_selected,
+            "cached_keys": len(self._vectors),
+        }
+
+
+# Shared by all agents in this process (key vectors are user independent)
+default_conflict_detector = ConflictDetector()
@@ -6,6 +6,7 @@ enabling the system to differentiate preferences based on context
 
 Main Components:
 - DynamicContextExtractor: LLM-based context extraction
+- CombinedExtractor: Preferences + context in a single LLM call
 - SystemContextProvider: Automatic context from time/date/etc.
 - ContextMerger: Merge LLM and system context
 - EmbeddingService: Generate vector embeddings
@@ -17,7 +18,7 @@ Main Components:
 """
 
 from fidus.memory.context.agent import ContextAwareAgent
-from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.memory.context.embedding_service import EmbeddingService, get_embedding_service
 from fidus.memory.context.events import (
     ContextExtracted,
     ContextExtractionFailed,
@@ -29,11 +30,12 @@ from fidus.memory.context.events import (
     SituationStorageFailed,
     event_publisher,
 )
-from fidus.memory.context.extractor import DynamicContextExtractor
+from fidus.memory.context.extractor import CombinedExtractor, DynamicContextExtractor
 from fidus.memory.context.merger import ContextMerger
 from fidus.memory.context.models import (
     ContextExtractionResult,
     ContextFactors,
+    MessageAnalysis,
     Situation,
 )
 from fidus.memory.context.retrieval import ContextRetrievalService
@@ -46,15 +48,18 @@ __all__ = [
     "ContextAwareAgent",
     # Core Services
     "DynamicContextExtractor",
+    "CombinedExtractor",
     "SystemContextProvider",
     "ContextMerger",
     "EmbeddingService",
+    "get_embedding_service",
     "ContextStorageService",
     "ContextRetrievalService",
     # Models
     "ContextFactors",
     "Situation",
     "ContextExtractionResult",
+    "MessageAnalysis",
     # Events
     "ContextExtracted",
     "SituationStored",
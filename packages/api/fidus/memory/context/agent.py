@@ -7,10 +7,16 @@ embedding generation, storage, and retrieval for context-aware preferences.
 import logging
 from typing import Optional
 
-from fidus.memory.context.embedding_service import EmbeddingService
-from fidus.memory.context.extractor import DynamicContextExtractor
+from fidus.infrastructure.resources import Resources
+from fidus.memory.context.embedding_service import EmbeddingService, get_embedding_service
+from fidus.memory.context.extractor import CombinedExtractor, DynamicContextExtractor
 from fidus.memory.context.merger import ContextMerger
-from fidus.memory.context.models import ContextFactors, Situation
+from fidus.memory.context.models import (
+    ContextExtractionResult,
+    ContextFactors,
+    MessageAnalysis,
+    Situation,
+)
 from fidus.memory.context.retrieval import ContextRetrievalService
 from fidus.memory.context.storage import ContextStorageService
 from fidus.memory.context.system_provider import SystemContextProvider
@@ -22,7 +28,8 @@ class ContextAwareAgent:
     """Orchestrate all context services for context-aware preference learning.
 
     This agent coordinates:
-    1. Dynamic context extraction from user messages (LLM)
+    1. Dynamic context extraction from user messages (LLM), optionally
+       together with preference extraction in a single call
     2. System context extraction (time, date, etc.)
     3. Context merging (LLM takes precedence)
     4. Embedding generation for similarity search
@@ -56,36 +63,77 @@ class ContextAwareAgent:
         embedding_service: Optional[EmbeddingService] = None,
         storage: Optional[ContextStorageService] = None,
         retrieval: Optional[ContextRetrievalService] = None,
+        resources: Optional[Resources] = None,
     ):
         """Initialize the context-aware agent.
 
         Args:
-            extractor: Dynamic context extractor (defaults to new instance)
+            extractor: Dynamic context extractor (defaults to a new CombinedExtractor)
             system_provider: System context provider (defaults to new instance)
             merger: Context merger (defaults to new instance)
-            embedding_service: Embedding service (defaults to new instance)
+            embedding_service: Embedding service (defaults to the process-wide service)
             storage: Context storage service (defaults to new instance)
             retrieval: Context retrieval service (defaults to new instance)
+            resources: Shared connection pools for the default storage and
+                retrieval services (they open their own connections if omitted)
         """
-        self.extractor = extractor or DynamicContextExtractor()
+        self.extractor = extractor or CombinedExtractor()
         self.system_provider = system_provider or SystemContextProvider()
         self.merger = merger or ContextMerger()
-        self.embedding_service = embedding_service or EmbeddingService()
-        self.storage = storage or ContextStorageService()
-        self.retrieval = retrieval or ContextRetrievalService()
+        self.embedding_service = embedding_service or get_embedding_service()
+        self.storage = storage or ContextStorageService(
+            embedding_service=self.embedding_service, resources=resources
+        )
+        self.retrieval = retrieval or ContextRetrievalService(resources=resources)
 
         logger.info("Initialized ContextAwareAgent")
 
     async def close(self) -> None:
         """Close database connections."""
         await self.storage.close()
+        self.retrieval.close()
         logger.info("ContextAwareAgent connections closed")
 
+    async def analyze_message(
+        self,
+        message: str,
+        tenant_id: str,
+        user_id: str,
+    ) -> MessageAnalysis:
+        """Extract preferences and context from a message in one LLM call.
+
+        Falls back to context-only extraction (preferences is None) if the
+        extractor doesn't support combined analysis.
+
+        Args:
+            message: User message to analyze
+            tenant_id: Tenant ID
+            user_id: User ID
+
+        Returns:
+            MessageAnalysis: Extracted preferences and LLM context (not yet
+                merged with system context)
+        """
+        if isinstance(self.extractor, CombinedExtractor):
+            return await self.extractor.analyze(
+                message=message,
+                tenant_id=tenant_id,
+                user_id=user_id,
+            )
+
+        context = await self.extractor.extract(
+            message=message,
+            tenant_id=tenant_id,
+            user_id=user_id,
+        )
+        return MessageAnalysis(context=context)
+
     async def extract_and_merge_context(
         self,
         message: str,
         tenant_id: str,
         user_id: str,
+        llm_result: Optional[ContextExtractionResult] = None,
     ) -> ContextFactors:
         """Extract context from message and merge with system context.
 
@@ -93,6 +141,8 @@ class ContextAwareAgent:
             message: User message to extract context from
             tenant_id: Tenant ID for logging
             user_id: User ID for logging
+            llm_result: Context already extracted from this message (e.g. by
+                analyze_message); skips the LLM call
 
         Returns:
             ContextFactors: Merged context (LLM + system)
@@ -106,12 +156,13 @@ class ContextAwareAgent:
             },
         )
 
-        # Extract dynamic context via LLM
-        llm_result = await self.extractor.extract(
-            message=message,
-            tenant_id=tenant_id,
-            user_id=user_id,
-        )
+        # Extract dynamic context via LLM (unless already extracted)
+        if llm_result is None:
+            llm_result = await self.extractor.extract(
+                message=message,
+                tenant_id=tenant_id,
+                user_id=user_id,
+            )
 
         # Extract system context
         system_context = self.system_provider.get_context(
@@ -147,11 +198,12 @@ class ContextAwareAgent:
         preference_id: str,
         tenant_id: str,
         user_id: str,
+        context: Optional[ContextFactors] = None,
     ) -> Situation:
         """Record a preference with its situational context.
 
         This method:
-        1. Extracts context from the user's message
+        1. Extracts context from the user's message (unless given)
         2. Generates an embedding for the context
         3. Stores the situation in Neo4j + Qdrant
         4. Links the preference to the situation
@@ -161,6 +213,7 @@ class ContextAwareAgent:
             preference_id: ID of the preference being recorded
             tenant_id: Tenant ID
             user_id: User ID
+            context: Merged context already extracted from this message
 
         Returns:
             Situation: The stored situation with context
@@ -179,11 +232,12 @@ class ContextAwareAgent:
 
         try:
             # Extract and merge context
-            context = await self.extract_and_merge_context(
-                message=message,
-                tenant_id=tenant_id,
-                user_id=user_id,
-            )
+            if context is None:
+                context = await self.extract_and_merge_context(
+                    message=message,
+                    tenant_id=tenant_id,
+                    user_id=user_id,
+                )
 
             # Generate embedding
             embedding = await self.embedding_service.generate_embedding(
@@ -238,11 +292,12 @@ class ContextAwareAgent:
         user_id: str,
         top_k: int = 5,
         min_score: float = 0.7,
+        context: Optional[ContextFactors] = None,
     ) -> list[Situation]:
         """Get preferences relevant to the current context.
 
         This method:
-        1. Extracts context from the user's message
+        1. Extracts context from the user's message (unless given)
         2. Generates an embedding for the context
         3. Searches for similar situations in Qdrant
         4. Returns situations with their linked preferences
@@ -253,6 +308,7 @@ class ContextAwareAgent:
             user_id: User ID
             top_k: Maximum number of similar situations to return
             min_score: Minimum similarity score (0.0 to 1.0)
+            context: Merged context already extracted from this message
 
         Returns:
             list[Situation]: Similar situations ordered by relevance
@@ -272,11 +328,12 @@ class ContextAwareAgent:
 
         try:
             # Extract and merge context
-            context = await self.extract_and_merge_context(
-                message=message,
-                tenant_id=tenant_id,
-                user_id=user_id,
-            )
+            if context is None:
+                context = await self.extract_and_merge_context(
+                    message=message,
+                    tenant_id=tenant_id,
+                    user_id=user_id,
+                )
 
             # Generate embedding for query
             query_embedding = await self.embedding_service.generate_embedding(
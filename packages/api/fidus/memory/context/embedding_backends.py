@@ -0,0 +1,288 @@
+"""Pluggable embedding backends.
+
+EmbeddingService talks to LiteLLM (Ollama/OpenAI) by default. This module
+defines the backend interface for in-process alternatives and provides a
+CPU-only local backend, so privacy-first deployments can embed one-line
+context strings without an HTTP hop and tests can run fully offline.
+
+Local models are selected through the model name:
+
+- ``local/hashing``: deterministic feature hashing of the factor string
+  (dimension: FIDUS_LOCAL_EMBEDDING_DIM)
+- ``local/projection``: feature hashing followed by a dense NumPy projection
+  matrix loaded from FIDUS_LOCAL_EMBEDDING_PATH (``.npy``, shape
+  ``[hash_dim, output_dim]``)
+"""
+
+import hashlib
+import logging
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from fidus.config import config
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MODEL_PREFIX = "local/"
+HASHING_MODEL = "local/hashing"
+PROJECTION_MODEL = "local/projection"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingBackend(ABC):
+    """Interface for in-process embedding backends."""
+
+    #: Model name the backend serves (e.g. "local/hashing")
+    model: str
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Vector dimension produced by this backend."""
+
+    @property
+    def cache_namespace(self) -> str:
+        """Model identifier used for content-addressed caching.
+
+        Backends whose output depends on more than the model name (e.g. a
+        weights file) must include that in the namespace.
+        """
+        return self.model
+
+    @abstractmethod
+    def embed_sync(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts synchronously.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            list[list[float]]: One vector per text, in input order
+        """
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts from async code.
+
+        Local backends are CPU-bound and fast for short context strings, so
+        the default implementation runs inline.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            list[list[float]]: One vector per text, in input order
+        """
+        return self.embed_sync(texts)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """CPU-only embedder based on signed feature hashing.
+
+    Each "key: value" pair of the context text contributes the full pair,
+    the key, and the individual value tokens as features. Features are
+    hashed into a fixed number of buckets with a deterministic hash (not
+    Python's salted hash()), so vectors are stable across processes.
+
+    An optional projection matrix maps the hashed vector to a dense space,
+    which lets a trained model be shipped as a plain ``.npy`` file.
+
+    Example:
+        backend = LocalEmbeddingBackend(dimension=384)
+        vectors = backend.embed_sync(["mood: happy, time_of_day: morning"])
+    """
+
+    def __init__(
+        self,
+        model: str = HASHING_MODEL,
+        dimension: Optional[int] = None,
+        projection_path: Optional[str] = None,
+    ):
+        """Initialize the local backend and register its dimension.
+
+        Args:
+            model: Model name to register (defaults to "local/hashing")
+            dimension: Number of hash buckets (defaults to config.local_embedding_dimension)
+            projection_path: Optional path to a 2-D ``.npy`` projection matrix
+
+        Raises:
+            ValueError: If the dimension is invalid or the projection matrix
+                doesn't match the hash dimension
+        """
+        self.model = model
+        self.hash_dimension = dimension or config.local_embedding_dimension
+        if self.hash_dimension < 1:
+            raise ValueError(f"Invalid local embedding dimension: {self.hash_dimension}")
+
+        self.projection: Optional[np.ndarray] = None
+        self._projection_digest: Optional[str] = None
+        if projection_path:
+            self._load_projection(projection_path)
+
+        # Make the dimension visible to config.get_embedding_dimension() and Qdrant setup
+        config.embedding_dimensions[self.model] = self.dimension
+
+        logger.info(
+            f"Initialized LocalEmbeddingBackend",
+            extra={
+                "model": self.model,
+                "dimension": self.dimension,
+                "projection_path": projection_path,
+            },
+        )
+
+    @property
+    def dimension(self) -> int:
+        """Vector dimension produced by this backend."""
+        if self.projection is not None:
+            return int(self.projection.shape[1])
+        return self.hash_dimension
+
+    @property
+    def cache_namespace(self) -> str:
+        """Model name plus projection file digest, if any."""
+        if self._projection_digest:
+            return f"{self.model}:{self._projection_digest}"
+        return self.model
+
+    def embed_sync(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts with feature hashing (and projection, if loaded).
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            list[list[float]]: L2-normalized vectors, one per text
+        """
+        hashed = np.zeros((len(texts), self.hash_dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                index, sign = self._hash(feature)
+                hashed[row, index] += sign * weight
+
+        vectors = hashed @ self.projection if self.projection is not None else hashed
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return (vectors / norms).tolist()
+
+    def _load_projection(self, path: str) -> None:
+        """Load and validate the projection matrix.
+
+        Args:
+            path: Path to a ``.npy`` file
+
+        Raises:
+            ValueError: If the matrix is not 2-D or its input size doesn't
+                match the hash dimension
+        """
+        file_path = Path(path)
+        matrix = np.load(file_path, allow_pickle=False)
+        if matrix.ndim != 2:
+            raise ValueError(f"Projection matrix must be 2-D, got shape {matrix.shape}")
+        if matrix.shape[0] != self.hash_dimension:
+            raise ValueError(
+                f"Projection input dimension mismatch: expected {self.hash_dimension}, "
+                f"got {matrix.shape[0]} in {path}"
+            )
+
+        self.projection = matrix.astype(np.float32, copy=False)
+        self._projection_digest = hashlib.sha256(file_path.read_bytes()).hexdigest()[:16]
+
+    def _features(self, text: str) -> list[tuple[str, float]]:
+        """Split a context text into weighted hashing features.
+
+        Args:
+            text: Context text such as "mood: happy, time_of_day: morning"
+
+        Returns:
+            list[tuple[str, float]]: (feature, weight) pairs
+        """
+        features: list[tuple[str, float]] = []
+        for pair in text.lower().split(","):
+            pair = pair.strip()
+            if not pair:
+                continue
+
+            key, sep, value = pair.partition(":")
+            key, value = key.strip(), value.strip()
+            if not sep:
+                # Free text: token features only
+                features.extend((f"tok={token}", 1.0) for token in _TOKEN_PATTERN.findall(key))
+                continue
+
+            features.append((f"kv={key}={value}", 1.0))
+            features.append((f"k={key}", 0.5))
+            features.extend(
+                (f"v={token}", 0.5) for token in _TOKEN_PATTERN.findall(value)
+            )
+        return features
+
+    def _hash(self, feature: str) -> tuple[int, float]:
+        """Map a feature to a bucket index and sign.
+
+        Args:
+            feature: Feature string
+
+        Returns:
+            tuple[int, float]: Bucket index and +1.0/-1.0 sign
+        """
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        sign = 1.0 if value & 1 else -1.0
+        return (value >> 1) % self.hash_dimension, sign
+
+
+# Backends are loaded once per process (projection files can be large)
+_backends: dict[str, EmbeddingBackend] = {}
+
+
+def is_local_model(model: str) -> bool:
+    """Check whether a model name refers to an in-process backend.
+
+    Args:
+        model: Embedding model name
+
+    Returns:
+        bool: True for "local/..." models
+    """
+    return model.startswith(LOCAL_MODEL_PREFIX)
+
+
+def get_embedding_backend(model: str) -> Optional[EmbeddingBackend]:
+    """Get the in-process backend for a model name.
+
+    Args:
+        model: Embedding model name
+
+    Returns:
+        EmbeddingBackend for "local/..." models, None for LiteLLM models
+
+    Raises:
+        ValueError: If the local model is unknown or misconfigured
+    """
+    if not is_local_model(model):
+        return None
+
+    if model not in _backends:
+        if model == HASHING_MODEL:
+            _backends[model] = LocalEmbeddingBackend(model=model)
+        elif model == PROJECTION_MODEL:
+            if not config.local_embedding_path:
+                raise ValueError(
+                    f"{PROJECTION_MODEL} requires FIDUS_LOCAL_EMBEDDING_PATH to be set"
+                )
+            _backends[model] = LocalEmbeddingBackend(
+                model=model, projection_path=config.local_embedding_path
+            )
+        else:
+            raise ValueError(
+                f"Unknown local embedding model: {model}. "
+                f"Supported models: {HASHING_MODEL}, {PROJECTION_MODEL}"
+            )
+
+    return _backends[model]
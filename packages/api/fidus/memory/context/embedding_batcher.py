@@ -0,0 +1,156 @@
+"""Cross-request coalescing of embedding calls.
+
+This module provides a micro-batcher that collects concurrent single-text
+embedding requests (typically from different users chatting at the same time)
+for a short window and sends them to the embedding provider as one batched
+request, fanning the resulting vectors back out to the individual callers.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into batched provider calls.
+
+    The first request that arrives opens a collection window. Every request
+    submitted before the window closes (or before the batch is full) is sent
+    in the same provider call. Identical texts within a batch are embedded
+    only once.
+
+    Example:
+        batcher = EmbeddingBatcher(embed_batch=service._embed_texts, window_ms=5)
+        vector = await batcher.submit("time_of_day: morning")
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[list[str]], Awaitable[list[list[float]]]],
+        window_ms: float = 5.0,
+        max_batch_size: int = 32,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            embed_batch: Coroutine embedding a list of texts, returning vectors in order
+            window_ms: How long to wait for more requests before flushing (milliseconds)
+            max_batch_size: Flush immediately once this many requests are pending
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+
+        self.embed_batch = embed_batch
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # The loop only keeps weak references to tasks; hold on to running batches
+        self._batch_tasks: set[asyncio.Task] = set()
+
+        # Counters for observability
+        self.requests_total = 0
+        self.batches_total = 0
+
+    async def submit(self, text: str) -> list[float]:
+        """Submit a single text and wait for its embedding.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            list[float]: Embedding vector for the text
+
+        Raises:
+            Exception: Whatever the batched provider call raised
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests_total += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_now()
+        elif self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_window())
+
+        return await future
+
+    @property
+    def average_batch_size(self) -> float:
+        """Average number of requests served per provider call."""
+        if self.batches_total == 0:
+            return 0.0
+        return self.requests_total / self.batches_total
+
+    def _flush_now(self) -> None:
+        """Flush the pending batch immediately (batch is full)."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        batch = self._take_pending()
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _flush_after_window(self) -> None:
+        """Wait for the collection window to close, then flush."""
+        try:
+            await asyncio.sleep(self.window_ms / 1000.0)
+        except asyncio.CancelledError:
+            return
+
+        self._flush_task = None
+        batch = self._take_pending()
+        if batch:
+            await self._run_batch(batch)
+
+    def _take_pending(self) -> list[tuple[str, asyncio.Future]]:
+        """Detach and return the currently pending requests."""
+        batch = self._pending
+        self._pending = []
+        return batch
+
+    async def _run_batch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        """Embed one batch and resolve every waiting future.
+
+        Args:
+            batch: Pending (text, future) pairs
+        """
+        # Deduplicate texts while preserving order
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches_total += 1
+
+        logger.debug(
+            "Flushing embedding batch",
+            extra={"requests": len(batch), "unique_texts": len(unique_texts)},
+        )
+
+        try:
+            vectors = await self.embed_batch(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise ValueError(
+                    f"Embedding batch size mismatch: sent {len(unique_texts)} texts, "
+                    f"got {len(vectors)} vectors"
+                )
+        except asyncio.CancelledError:
+            # Don't leave the callers waiting on a batch that will never finish
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        vectors_by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                # Hand out a copy so callers cannot mutate each other's vectors
+                future.set_result(list(vectors_by_text[text]))
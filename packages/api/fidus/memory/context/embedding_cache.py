@@ -0,0 +1,137 @@
+"""Content-addressed cache for context embeddings.
+
+Context texts such as "day_of_week: monday, is_weekend: false, season: fall"
+repeat on almost every turn. This module caches their embeddings in two tiers:
+a bounded in-process LRU and an optional Redis tier shared by all API
+processes via the existing SessionCache connection.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from fidus.config import config
+from fidus.infrastructure.memory_cache import LRUCache
+from fidus.infrastructure.redis.session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-tier (in-process LRU + Redis) embedding cache.
+
+    Keys are a SHA-256 hash of the embedding model name and the input text,
+    so the same text embedded by a different model never collides.
+
+    Example:
+        cache = EmbeddingCache(session_cache=session_cache)
+        vector = await cache.get("ollama/bge-m3", "time_of_day: morning")
+        if vector is None:
+            vector = ...  # call the embedding model
+            await cache.set("ollama/bge-m3", "time_of_day: morning", vector)
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        session_cache: Optional[SessionCache] = None,
+    ):
+        """Initialize the embedding cache.
+
+        Args:
+            max_size: In-process LRU capacity (defaults to config.embedding_cache_size)
+            session_cache: Connected SessionCache for the Redis tier (optional)
+        """
+        self._memory: LRUCache[list[float]] = LRUCache(
+            max_size=config.embedding_cache_size if max_size is None else max_size
+        )
+        self.session_cache = session_cache
+
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Build the content address for a model/text pair.
+
+        Args:
+            model: Embedding model name
+            text: Text that was embedded
+
+        Returns:
+            str: Hex SHA-256 digest of model and text
+        """
+        return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+    async def get(self, model: str, text: str) -> Optional[list[float]]:
+        """Look up a cached embedding, promoting Redis hits into the LRU.
+
+        Args:
+            model: Embedding model name
+            text: Embedded text
+
+        Returns:
+            Cached vector, or None on miss
+        """
+        key = self.make_key(model, text)
+
+        vector = self._memory.get(key)
+        if vector is not None:
+            self.memory_hits += 1
+            return list(vector)
+
+        if self.session_cache is not None:
+            try:
+                vector = await self.session_cache.get_cached_embedding(key)
+            except Exception as e:
+                # Redis is an optimization; never fail embedding because of it
+                logger.warning(f"Embedding cache Redis lookup failed: {e}")
+                vector = None
+
+            if vector is not None:
+                self.redis_hits += 1
+                self._memory.set(key, vector)
+                return list(vector)
+
+        self.misses += 1
+        return None
+
+    async def set(self, model: str, text: str, vector: list[float]) -> None:
+        """Store an embedding in both tiers.
+
+        Args:
+            model: Embedding model name
+            text: Embedded text
+            vector: Embedding vector
+        """
+        key = self.make_key(model, text)
+        self._memory.set(key, list(vector))
+
+        if self.session_cache is not None:
+            try:
+                await self.session_cache.cache_embedding(key, vector)
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for both tiers.
+
+        Returns:
+            Dictionary with memory_hits, redis_hits, misses, hit_rate and LRU size
+        """
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        hits = self.memory_hits + self.redis_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "memory_max_size": self._memory.max_size,
+        }
+
+
+# Shared by all EmbeddingService instances in this process (results are
+# content-addressed); main.py connects its Redis tier at startup
+default_embedding_cache = EmbeddingCache()
@@ -4,18 +4,61 @@ This module provides embedding generation for situational context, allowing
 similarity-based matching of situations in the vector database.
 """
 
+import asyncio
 import logging
 import os
-from typing import Optional
+from typing import Optional, Sequence, Union
 
-from litellm import embedding
-from tenacity import retry, stop_after_attempt, wait_exponential
+import numpy as np
+from litellm import aembedding, embedding
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
 from fidus.config import config
+from fidus.memory.context.embedding_backends import EmbeddingBackend, get_embedding_backend
+from fidus.memory.context.embedding_batcher import EmbeddingBatcher
+from fidus.memory.context.embedding_cache import EmbeddingCache, default_embedding_cache
+from fidus.memory.context.factor_vectors import (
+    FactorVectorTable,
+    compose_vector,
+    factor_pairs,
+    get_factor_table,
+)
 from fidus.memory.context.models import ContextFactors
+from fidus.memory.context.projection import EmbeddingProjection, get_embedding_projection
+from fidus.memory.context.resilience import CircuitOpenError, ResiliencePolicy, get_policy
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODE_TEXT = "text"
+EMBEDDING_MODE_COMPOSITIONAL = "compositional"
+EMBEDDING_MODES = (EMBEDDING_MODE_TEXT, EMBEDDING_MODE_COMPOSITIONAL)
+
+# A single vector or a batch of vectors, as lists or arrays
+VectorLike = Union[Sequence[float], np.ndarray]
+VectorsLike = Union[Sequence[Sequence[float]], np.ndarray]
+
+# Shared by all EmbeddingService instances in this process (see _get_semaphore)
+_semaphore: Optional[asyncio.Semaphore] = None
+_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the per-process semaphore bounding in-flight embedding calls.
+
+    The semaphore is recreated when the running event loop changes (e.g.
+    between test cases), since asyncio primitives are bound to one loop.
+
+    Returns:
+        asyncio.Semaphore: Semaphore sized by config.embedding_max_concurrency
+    """
+    global _semaphore, _semaphore_loop
+
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore_loop is not loop:
+        _semaphore = asyncio.Semaphore(max(1, config.embedding_max_concurrency))
+        _semaphore_loop = loop
+    return _semaphore
+
 
 class EmbeddingService:
     """Generate embeddings for context factors using configured embedding model.
@@ -24,6 +67,30 @@ class EmbeddingService:
     similarity search in Qdrant. It uses the embedding model specified in
     configuration and validates that vector dimensions match expectations.
 
+    Concurrent single-context requests are coalesced into batched provider
+    calls, and generate_embeddings_batch() embeds many contexts at once.
+    Results are cached by content (model + text), so repeated contexts skip
+    the embedding model entirely.
+
+    Provider calls use the async LiteLLM API so they never block the event
+    loop. They are bounded by a per-process semaphore, time out after
+    config.embedding_timeout_seconds and are retried with async backoff.
+
+    "local/..." models (or an explicit backend) are embedded in-process by an
+    EmbeddingBackend instead, with no network call.
+
+    In compositional mode a situation vector is the normalized weighted sum
+    of per-factor vectors from a FactorVectorTable; the model is only called
+    for "key: value" pairs that have never been seen.
+
+    An optional EmbeddingProjection (truncation or PCA) reduces returned
+    vectors to config.get_vector_size(); caches keep full model vectors.
+
+    Provider calls go through a ResiliencePolicy: slow calls can be hedged,
+    and a circuit breaker rejects calls to a persistently failing or slow
+    backend (CircuitOpenError). Compositional mode then degrades to the
+    already-known factor vectors.
+
     Example:
         service = EmbeddingService()
         context = ContextFactors(factors={"time_of_day": "morning", "mood": "energetic"})
@@ -31,28 +98,82 @@ class EmbeddingService:
         # embedding = [0.123, -0.456, 0.789, ...] (length: 1536 for text-embedding-3-small)
     """
 
-    def __init__(self, model: Optional[str] = None):
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        batch_window_ms: Optional[float] = None,
+        cache: Optional[EmbeddingCache] = None,
+        backend: Optional[EmbeddingBackend] = None,
+        mode: Optional[str] = None,
+        factor_table: Optional[FactorVectorTable] = None,
+        projection: Optional[EmbeddingProjection] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+    ):
         """Initialize the embedding service.
 
         Args:
             model: Embedding model to use (defaults to config.embedding_model)
+            batch_window_ms: Coalescing window for concurrent requests in milliseconds
+                (defaults to config.embedding_batch_window_ms, 0 disables batching)
+            cache: Embedding cache (defaults to the process-wide default_embedding_cache)
+            backend: In-process embedding backend (defaults to the local backend for
+                "local/..." models, LiteLLM otherwise)
+            mode: "text" or "compositional" (defaults to config.embedding_mode)
+            factor_table: Factor vector table for compositional mode (defaults to the
+                process-wide table for the model, see get_factor_table)
+            projection: Dimension reduction applied to returned vectors (defaults to
+                the configured truncation/PCA projection, if any)
+            resilience: Hedging/circuit breaker policy for provider calls (defaults to
+                the process-wide policy for this model)
+
+        Raises:
+            ValueError: If the embedding mode is unknown
         """
-        self.model = model or config.embedding_model
-        self.expected_dimension = config.get_embedding_dimension()
+        self.backend = backend or get_embedding_backend(model or config.embedding_model)
+        self.model = self.backend.model if self.backend else (model or config.embedding_model)
+        self.expected_dimension = (
+            self.backend.dimension if self.backend else config.get_embedding_dimension()
+        )
+        self.projection = projection or get_embedding_projection(self.expected_dimension)
+        # Dimension of returned vectors (what Qdrant stores and searches)
+        self.vector_size = (
+            self.projection.output_dimension if self.projection else self.expected_dimension
+        )
+        self.cache = cache or default_embedding_cache
+        # Cache namespace; local backends include their weights digest
+        self._cache_model = self.backend.cache_namespace if self.backend else self.model
+
+        self.mode = mode or config.embedding_mode
+        if self.mode not in EMBEDDING_MODES:
+            raise ValueError(
+                f"Unknown embedding mode: {self.mode}. Supported modes: {', '.join(EMBEDDING_MODES)}"
+            )
+        self.factor_table = factor_table or get_factor_table(self._cache_model)
+        self.resilience = resilience or get_policy(f"embedding:{self.model}")
+        self.factor_weights = config.embedding_factor_weights
+
+        window_ms = (
+            config.embedding_batch_window_ms if batch_window_ms is None else batch_window_ms
+        )
+        self._batcher: Optional[EmbeddingBatcher] = None
+        # Batching only pays off for network round trips
+        if window_ms > 0 and self.backend is None:
+            self._batcher = EmbeddingBatcher(
+                embed_batch=self._embed_texts,
+                window_ms=window_ms,
+                max_batch_size=config.embedding_batch_max_size,
+            )
 
         logger.info(
             f"Initialized EmbeddingService",
             extra={
                 "model": self.model,
                 "expected_dimension": self.expected_dimension,
+                "vector_size": self.vector_size,
+                "mode": self.mode,
             },
         )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True,
-    )
     async def generate_embedding(
         self,
         context: ContextFactors,
@@ -65,6 +186,9 @@ class EmbeddingService:
         generates an embedding vector using the configured model. The vector
         can be used for similarity search in Qdrant.
 
+        When batching is enabled, concurrent calls (e.g. from different users)
+        are coalesced into a single provider request by the EmbeddingBatcher.
+
         Args:
             context: Context factors to embed
             tenant_id: Tenant ID for logging and tracking
@@ -75,6 +199,8 @@ class EmbeddingService:
 
         Raises:
             ValueError: If embedding dimensions don't match expected size
+            asyncio.TimeoutError: If the provider keeps timing out after retries
+            CircuitOpenError: If the provider circuit is open and no cached vector exists
             Exception: If embedding generation fails after retries
         """
         logger.info(
@@ -95,40 +221,26 @@ class EmbeddingService:
                 extra={"tenant_id": tenant_id, "user_id": user_id},
             )
             # Return zero vector for empty context
-            return [0.0] * self.expected_dimension
+            return [0.0] * self.vector_size
 
-        try:
-            # Build kwargs for embedding
-            embedding_kwargs = {
-                "model": self.model,
-                "input": [text],  # LiteLLM expects a list of texts
-            }
-
-            # Add api_base for models using custom endpoints (LiteLLM/OpenAI-compatible)
-            # Ollama models use OLLAMA_API_BASE, non-ollama models use OPENAI_API_BASE
-            if self.model.startswith("ollama/"):
-                ollama_base = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
-                embedding_kwargs["api_base"] = ollama_base
-                logger.info(f"Using Ollama API base: {ollama_base}")
-            else:
-                # For non-ollama models, use OPENAI_API_BASE if set
-                openai_base = os.getenv("OPENAI_API_BASE")
-                if openai_base:
-                    embedding_kwargs["api_base"] = openai_base
-                    logger.info(f"Using OpenAI API base: {openai_base}")
+        if self.mode == EMBEDDING_MODE_COMPOSITIONAL:
+            return self._project(await self._compose_embeddings([context]))[0]
 
-            # Generate embedding using LiteLLM
-            response = embedding(**embedding_kwargs)
+        cached_vector = await self.cache.get(self._cache_model, text)
+        if cached_vector is not None:
+            logger.debug(
+                f"Embedding cache hit",
+                extra={"tenant_id": tenant_id, "user_id": user_id},
+            )
+            return self._project([cached_vector])[0]
 
-            # Extract embedding vector
-            embedding_vector = response.data[0]["embedding"]
+        try:
+            if self._batcher is not None:
+                embedding_vector = await self._batcher.submit(text)
+            else:
+                embedding_vector = (await self._embed_texts([text]))[0]
 
-            # Validate dimensions
-            if len(embedding_vector) != self.expected_dimension:
-                raise ValueError(
-                    f"Embedding dimension mismatch: expected {self.expected_dimension}, "
-                    f"got {len(embedding_vector)} for model {self.model}"
-                )
+            await self.cache.set(self._cache_model, text, embedding_vector)
 
             logger.info(
                 f"Embedding generated successfully",
@@ -139,7 +251,7 @@ class EmbeddingService:
                 },
             )
 
-            return embedding_vector
+            return self._project([embedding_vector])[0]
 
         except Exception as e:
             logger.error(
@@ -148,6 +260,93 @@ class EmbeddingService:
             )
             raise
 
+    async def generate_embeddings_batch(
+        self,
+        contexts: list[ContextFactors],
+        tenant_id: str,
+        user_id: str,
+    ) -> list[list[float]]:
+        """Generate embedding vectors for several contexts in one provider call.
+
+        Empty contexts get a zero vector without touching the provider, cached
+        texts are served from the cache, and identical texts are embedded once.
+
+        Args:
+            contexts: Context factors to embed
+            tenant_id: Tenant ID for logging and tracking
+            user_id: User ID for logging and tracking
+
+        Returns:
+            list[list[float]]: One embedding vector per context, in input order
+
+        Raises:
+            ValueError: If embedding dimensions don't match expected size
+            Exception: If embedding generation fails after retries
+        """
+        logger.info(
+            f"Generating embeddings for {len(contexts)} contexts",
+            extra={"tenant_id": tenant_id, "user_id": user_id},
+        )
+
+        if self.mode == EMBEDDING_MODE_COMPOSITIONAL:
+            try:
+                return self._project(await self._compose_embeddings(contexts))
+            except Exception as e:
+                logger.error(
+                    f"Batch embedding generation failed: {e}",
+                    extra={"tenant_id": tenant_id, "user_id": user_id},
+                )
+                raise
+
+        texts = [self._context_to_text(context) for context in contexts]
+        try:
+            return await self.generate_text_embeddings(texts)
+        except Exception as e:
+            logger.error(
+                f"Batch embedding generation failed: {e}",
+                extra={"tenant_id": tenant_id, "user_id": user_id},
+            )
+            raise
+
+    async def generate_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Embed plain texts (e.g. preference keys) in one provider call.
+
+        Uses the text representation as is, regardless of the embedding mode.
+        Empty texts get a zero vector, cached texts are served from the cache,
+        and identical texts are embedded once.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            list[list[float]]: One embedding vector per text, in input order
+
+        Raises:
+            ValueError: If embedding dimensions don't match expected size
+            Exception: If embedding generation fails after retries
+        """
+        unique_texts = list(dict.fromkeys(text for text in texts if text))
+
+        vectors_by_text: dict[str, list[float]] = {}
+        for text in unique_texts:
+            cached_vector = await self.cache.get(self._cache_model, text)
+            if cached_vector is not None:
+                vectors_by_text[text] = cached_vector
+
+        missing_texts = [text for text in unique_texts if text not in vectors_by_text]
+        if missing_texts:
+            vectors = await self._embed_texts(missing_texts)
+            for text, vector in zip(missing_texts, vectors):
+                vectors_by_text[text] = vector
+                await self.cache.set(self._cache_model, text, vector)
+
+        return self._project(
+            [
+                list(vectors_by_text[text]) if text else [0.0] * self.expected_dimension
+                for text in texts
+            ]
+        )
+
     def generate_embedding_sync(
         self,
         context: ContextFactors,
@@ -182,25 +381,22 @@ class EmbeddingService:
                 extra={"tenant_id": tenant_id, "user_id": user_id},
             )
             # Return zero vector for empty context
-            return [0.0] * self.expected_dimension
+            return [0.0] * self.vector_size
 
         try:
-            # Generate embedding using LiteLLM
-            response = embedding(
-                model=self.model,
-                input=[text],
-            )
-
-            # Extract embedding vector
-            embedding_vector = response.data[0]["embedding"]
-
-            # Validate dimensions
-            if len(embedding_vector) != self.expected_dimension:
-                raise ValueError(
-                    f"Embedding dimension mismatch: expected {self.expected_dimension}, "
-                    f"got {len(embedding_vector)} for model {self.model}"
+            if self.mode == EMBEDDING_MODE_COMPOSITIONAL:
+                embedding_vector = self._compose_embedding_sync(context)
+            elif self.backend is not None:
+                embedding_vector = self.backend.embed_sync([text])[0]
+            else:
+                # Generate embedding using LiteLLM
+                response = embedding(
+                    model=self.model,
+                    input=[text],
                 )
 
+                embedding_vector = self._parse_embedding_response(response, expected_count=1)[0]
+
             logger.info(
                 f"Embedding generated successfully",
                 extra={
@@ -210,7 +406,7 @@ class EmbeddingService:
                 },
             )
 
-            return embedding_vector
+            return self._project([embedding_vector])[0]
 
         except Exception as e:
             logger.error(
@@ -219,6 +415,237 @@ class EmbeddingService:
             )
             raise
 
+    def _project(self, vectors: list[list[float]]) -> list[list[float]]:
+        """Apply the configured dimension reduction, if any.
+
+        Args:
+            vectors: Full model-dimension vectors
+
+        Returns:
+            list[list[float]]: Vectors of self.vector_size
+        """
+        if self.projection is None:
+            return vectors
+        return self.projection.apply(vectors)
+
+    async def _compose_embeddings(self, contexts: list[ContextFactors]) -> list[list[float]]:
+        """Build situation vectors from per-factor vectors.
+
+        Factor pairs missing from the table are embedded in one request (or
+        coalesced with concurrent requests) and stored for future turns.
+
+        Args:
+            contexts: Context factors to embed
+
+        Returns:
+            list[list[float]]: One vector per context; empty contexts get zeros
+        """
+        pairs = list(
+            dict.fromkeys(pair for context in contexts for pair in factor_pairs(context.factors))
+        )
+        vectors = await self.factor_table.get(pairs)
+
+        missing = [pair for pair in pairs if pair not in vectors]
+        if missing:
+            try:
+                if self._batcher is not None:
+                    new_vectors = await asyncio.gather(
+                        *(self._batcher.submit(pair) for pair in missing)
+                    )
+                else:
+                    new_vectors = await self._embed_texts(missing)
+            except CircuitOpenError:
+                # Degraded path: compose from known factors only
+                if not vectors:
+                    raise
+                logger.warning(
+                    f"Embedding circuit open, composing from known factors",
+                    extra={"unknown_factors": len(missing)},
+                )
+                return [self._compose_known(context, vectors) for context in contexts]
+
+            learned = dict(zip(missing, new_vectors))
+            await self.factor_table.set(learned)
+            vectors.update(learned)
+
+            logger.info(
+                f"Learned new factor vectors",
+                extra={"new_factors": len(missing), "table_size": len(self.factor_table)},
+            )
+
+        return [
+            compose_vector(context.factors, vectors, self.factor_weights)
+            if context.factors
+            else [0.0] * self.expected_dimension
+            for context in contexts
+        ]
+
+    def _compose_known(
+        self, context: ContextFactors, vectors: dict[str, list[float]]
+    ) -> list[float]:
+        """Compose a vector from the factors that already have vectors.
+
+        Args:
+            context: Context factors
+            vectors: Known factor vectors
+
+        Returns:
+            list[float]: Situation vector (zeros if no factor is known)
+        """
+        known = {
+            key: value for key, value in context.factors.items() if f"{key}: {value}" in vectors
+        }
+        if not known:
+            return [0.0] * self.expected_dimension
+        return compose_vector(known, vectors, self.factor_weights)
+
+    def _compose_embedding_sync(self, context: ContextFactors) -> list[float]:
+        """Synchronous compositional embedding using the in-process table.
+
+        Args:
+            context: Non-empty context factors
+
+        Returns:
+            list[float]: Situation vector
+        """
+        pairs = factor_pairs(context.factors)
+        vectors = self.factor_table.get_local(pairs)
+
+        missing = [pair for pair in pairs if pair not in vectors]
+        if missing:
+            if self.backend is not None:
+                new_vectors = self.backend.embed_sync(missing)
+            else:
+                response = embedding(**self._build_embedding_kwargs(missing))
+                new_vectors = self._parse_embedding_response(
+                    response, expected_count=len(missing)
+                )
+            learned = dict(zip(missing, new_vectors))
+            self.factor_table.set_local(learned)
+            vectors.update(learned)
+
+        return compose_vector(context.factors, vectors, self.factor_weights)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type((ValueError, CircuitOpenError)),
+        reraise=True,
+    )
+    async def _embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed a list of texts with the backend or a single provider request.
+
+        Transient failures and timeouts are retried (tenacity sleeps with
+        asyncio.sleep for coroutines); malformed responses and open circuits
+        are not. Each attempt may be hedged by the resilience policy.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            list[list[float]]: One vector per text, in input order
+
+        Raises:
+            ValueError: If the response is malformed or dimensions don't match
+            asyncio.TimeoutError: If the provider call exceeds the timeout
+            CircuitOpenError: If the provider circuit is open
+        """
+        if self.backend is not None:
+            return await self.backend.embed(texts)
+
+        return await self.resilience.call(lambda: self._call_provider(texts))
+
+    async def _call_provider(self, texts: list[str]) -> list[list[float]]:
+        """Make one bounded, time-limited LiteLLM embedding request.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            list[list[float]]: One vector per text, in input order
+
+        Raises:
+            ValueError: If the response is malformed or dimensions don't match
+            asyncio.TimeoutError: If the provider call exceeds the timeout
+        """
+        async with _get_semaphore():
+            try:
+                response = await asyncio.wait_for(
+                    aembedding(**self._build_embedding_kwargs(texts)),
+                    timeout=config.embedding_timeout_seconds,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Embedding call timed out",
+                    extra={
+                        "model": self.model,
+                        "texts_count": len(texts),
+                        "timeout_seconds": config.embedding_timeout_seconds,
+                    },
+                )
+                raise
+        return self._parse_embedding_response(response, expected_count=len(texts))
+
+    def _build_embedding_kwargs(self, texts: list[str]) -> dict:
+        """Build LiteLLM embedding kwargs for the configured model.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            dict: Keyword arguments for litellm.embedding() / aembedding()
+        """
+        embedding_kwargs = {
+            "model": self.model,
+            "input": texts,  # LiteLLM accepts a list of texts
+        }
+
+        # Add api_base for models using custom endpoints (LiteLLM/OpenAI-compatible)
+        # Ollama models use OLLAMA_API_BASE, non-ollama models use OPENAI_API_BASE
+        if self.model.startswith("ollama/"):
+            embedding_kwargs["api_base"] = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
+        else:
+            # For non-ollama models, use OPENAI_API_BASE if set
+            openai_base = os.getenv("OPENAI_API_BASE")
+            if openai_base:
+                embedding_kwargs["api_base"] = openai_base
+
+        return embedding_kwargs
+
+    def _parse_embedding_response(self, response, expected_count: int) -> list[list[float]]:
+        """Extract and validate embedding vectors from a LiteLLM response.
+
+        Args:
+            response: LiteLLM embedding response
+            expected_count: Number of vectors the request asked for
+
+        Returns:
+            list[list[float]]: Vectors ordered like the request inputs
+
+        Raises:
+            ValueError: If vector count or dimensions don't match expectations
+        """
+        data = list(response.data)
+        if len(data) != expected_count:
+            raise ValueError(
+                f"Embedding count mismatch: expected {expected_count}, got {len(data)}"
+            )
+
+        # Providers may return items out of order; "index" refers to the input position
+        if all("index" in item for item in data):
+            data.sort(key=lambda item: item["index"])
+
+        vectors = [item["embedding"] for item in data]
+
+        for vector in vectors:
+            if len(vector) != self.expected_dimension:
+                raise ValueError(
+                    f"Embedding dimension mismatch: expected {self.expected_dimension}, "
+                    f"got {len(vector)} for model {self.model}"
+                )
+
+        return vectors
+
     def _context_to_text(self, context: ContextFactors) -> str:
         """Convert context factors to text representation for embedding.
 
@@ -248,6 +675,94 @@ class EmbeddingService:
 
         return ", ".join(formatted_pairs)
 
+    @staticmethod
+    def normalize_embeddings(vectors: VectorsLike) -> np.ndarray:
+        """Convert vectors to an L2-normalized float32 matrix.
+
+        Store the result to make every later cosine similarity a plain dot
+        product. Zero vectors stay zero (similarity 0.0 with everything).
+
+        Args:
+            vectors: Vectors as a list of lists or a 1-D/2-D array
+
+        Returns:
+            np.ndarray: Normalized float32 matrix of shape (n, dimension)
+        """
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0.0)
+
+    @classmethod
+    def similarity_matrix(
+        cls,
+        queries: VectorsLike,
+        candidates: VectorsLike,
+        normalized: bool = False,
+    ) -> np.ndarray:
+        """Calculate cosine similarity between every query and every candidate.
+
+        Args:
+            queries: Query vectors, shape (q, dimension)
+            candidates: Candidate vectors, shape (c, dimension)
+            normalized: Set when both inputs are already L2-normalized float32
+                (skips normalization, leaving a single matrix product)
+
+        Returns:
+            np.ndarray: float32 matrix of shape (q, c), clamped to [0, 1]
+
+        Raises:
+            ValueError: If queries and candidates have different dimensions
+        """
+        if normalized:
+            query_matrix = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+            candidate_matrix = np.atleast_2d(np.asarray(candidates, dtype=np.float32))
+        else:
+            query_matrix = cls.normalize_embeddings(queries)
+            candidate_matrix = cls.normalize_embeddings(candidates)
+
+        if query_matrix.shape[1] != candidate_matrix.shape[1]:
+            raise ValueError(
+                f"Embedding dimension mismatch: {query_matrix.shape[1]} vs "
+                f"{candidate_matrix.shape[1]}"
+            )
+
+        similarities = query_matrix @ candidate_matrix.T
+        # Clamp to [0, 1] range like calculate_similarity()
+        return np.clip(similarities, 0.0, 1.0, out=similarities)
+
+    @classmethod
+    def top_k(
+        cls,
+        query: VectorLike,
+        candidates: VectorsLike,
+        k: int,
+        normalized: bool = False,
+    ) -> list[tuple[int, float]]:
+        """Find the k candidates most similar to a query.
+
+        Args:
+            query: Query vector
+            candidates: Candidate vectors, shape (c, dimension)
+            k: Number of results
+            normalized: Set when both inputs are already L2-normalized float32
+
+        Returns:
+            list[tuple[int, float]]: (candidate index, similarity), best first
+
+        Raises:
+            ValueError: If query and candidates have different dimensions
+        """
+        if k <= 0 or len(candidates) == 0:
+            return []
+
+        scores = cls.similarity_matrix(query, candidates, normalized=normalized)[0]
+        k = min(k, scores.shape[0])
+
+        # argpartition is O(c); only the k winners get sorted
+        indices = np.argpartition(-scores, k - 1)[:k]
+        indices = indices[np.argsort(-scores[indices], kind="stable")]
+        return [(int(index), float(scores[index])) for index in indices]
+
     def calculate_similarity(
         self,
         embedding1: list[float],
@@ -255,6 +770,9 @@ class EmbeddingService:
     ) -> float:
         """Calculate cosine similarity between two embeddings.
 
+        Thin wrapper around similarity_matrix(); prefer the matrix/top_k APIs
+        when comparing one vector against many.
+
         Args:
             embedding1: First embedding vector
             embedding2: Second embedding vector
@@ -270,19 +788,22 @@ class EmbeddingService:
                 f"Embedding dimension mismatch: {len(embedding1)} vs {len(embedding2)}"
             )
 
-        # Calculate dot product
-        dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
+        return float(self.similarity_matrix(embedding1, embedding2)[0, 0])
 
-        # Calculate magnitudes
-        magnitude1 = sum(a * a for a in embedding1) ** 0.5
-        magnitude2 = sum(b * b for b in embedding2) ** 0.5
 
-        # Avoid division by zero
-        if magnitude1 == 0.0 or magnitude2 == 0.0:
-            return 0.0
+# Shared by all agents and services in this process, so the batcher coalesces
+# concurrent requests of all users (see get_embedding_service)
+_default_service: Optional[EmbeddingService] = None
 
-        # Cosine similarity
-        similarity = dot_product / (magnitude1 * magnitude2)
 
-        # Clamp to [0, 1] range
-        return max(0.0, min(1.0, similarity))
+def get_embedding_service() -> EmbeddingService:
+    """Get the process-wide embedding service (created on first use).
+
+    Returns:
+        EmbeddingService: Shared service using the configured model and mode
+    """
+    global _default_service
+
+    if _default_service is None:
+        _default_service = EmbeddingService()
+    return _default_service
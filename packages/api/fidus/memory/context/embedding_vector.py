@@ -0,0 +1,155 @@
+"""Compact float32 representation for embedding vectors.
+
+A 1024-dimensional ``list[float]`` holds 1024 boxed Python floats (~32 KB)
+and pydantic validates each one. EmbeddingVector stores the same data in a
+single read-only float32 NumPy array (4 KB), converts from Qdrant results
+in one call, and still behaves like a read-only sequence of floats.
+"""
+
+import base64
+from collections.abc import Sequence
+from typing import Any, Iterator, Union
+
+import numpy as np
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+
+# Serialization context flag for the compact (base64) format, e.g.
+# situation.model_dump(mode="json", context={COMPACT_EMBEDDINGS: True})
+COMPACT_EMBEDDINGS = "compact_embeddings"
+
+
+class EmbeddingVector(Sequence):
+    """Read-only float32 embedding with a lazy list view.
+
+    Indexing and iteration yield Python floats on demand; tolist() builds a
+    full list only when a caller really needs one (e.g. the Qdrant client).
+    Equality against plain lists compares at float32 precision.
+
+    Example:
+        vector = EmbeddingVector([0.1, 0.2, 0.3])
+        vector.array        # np.ndarray(float32), no copy
+        vector.to_base64()  # compact string for JSON/Redis
+    """
+
+    __slots__ = ("_array",)
+
+    def __init__(self, values: Union["EmbeddingVector", Sequence[float], np.ndarray, bytes]):
+        """Create a vector from floats, an array, or raw float32 bytes.
+
+        Args:
+            values: Vector values
+
+        Raises:
+            ValueError: If the values are not one-dimensional
+        """
+        if isinstance(values, EmbeddingVector):
+            array = values._array
+        elif isinstance(values, (bytes, bytearray, memoryview)):
+            array = np.frombuffer(values, dtype="<f4").astype(np.float32, copy=False)
+        else:
+            array = np.array(values, dtype=np.float32)
+
+        if array.ndim != 1:
+            raise ValueError(f"Embedding must be one-dimensional, got shape {array.shape}")
+
+        array.flags.writeable = False
+        self._array = array
+
+    @property
+    def array(self) -> np.ndarray:
+        """Underlying read-only float32 array."""
+        return self._array
+
+    def tolist(self) -> list[float]:
+        """Materialize the vector as a list of Python floats."""
+        return self._array.tolist()
+
+    def to_bytes(self) -> bytes:
+        """Raw little-endian float32 bytes."""
+        return self._array.astype("<f4", copy=False).tobytes()
+
+    def to_base64(self) -> str:
+        """Compact string form for JSON payloads and Redis."""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, value: str) -> "EmbeddingVector":
+        """Decode a vector produced by to_base64().
+
+        Args:
+            value: Base64-encoded float32 bytes
+
+        Returns:
+            EmbeddingVector: Decoded vector
+        """
+        return cls(base64.b64decode(value))
+
+    def __len__(self) -> int:
+        """Vector dimension."""
+        return int(self._array.shape[0])
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get a float (or a list of floats for slices)."""
+        if isinstance(index, slice):
+            return self._array[index].tolist()
+        return float(self._array[index])
+
+    def __iter__(self) -> Iterator[float]:
+        """Iterate over Python floats without building a list."""
+        return (float(value) for value in self._array)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with another vector or a sequence of floats at float32 precision."""
+        if isinstance(other, EmbeddingVector):
+            return np.array_equal(self._array, other._array)
+        if isinstance(other, (list, tuple, np.ndarray)):
+            other_array = np.asarray(other, dtype=np.float32)
+            return other_array.shape == self._array.shape and np.array_equal(
+                self._array, other_array
+            )
+        return NotImplemented
+
+    __hash__ = None  # mutable-sequence semantics: not hashable
+
+    def __repr__(self) -> str:
+        """Short representation (vectors are long)."""
+        return f"EmbeddingVector(dim={len(self)})"
+
+    @classmethod
+    def _validate(cls, value: Any) -> "EmbeddingVector":
+        """Pydantic validator accepting vectors, sequences, arrays and base64."""
+        if isinstance(value, EmbeddingVector):
+            return value
+        if isinstance(value, str):
+            return cls.from_base64(value)
+        return cls(value)
+
+    @staticmethod
+    def _serialize(value: "EmbeddingVector", info: core_schema.SerializationInfo) -> Any:
+        """Pydantic serializer: list of floats, or base64 in compact mode."""
+        if info.context and info.context.get(COMPACT_EMBEDDINGS):
+            return value.to_base64()
+        if info.mode == "json":
+            return value.tolist()
+        return value
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        """Validate without per-element checks and serialize as floats."""
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls._serialize, info_arg=True
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        """Document the default (list of numbers) JSON form."""
+        return {"type": "array", "items": {"type": "number"}}
@@ -7,20 +7,92 @@ using a predefined schema.
 
 import json
 import logging
-import os
-from datetime import datetime
-from typing import Optional
-from zoneinfo import ZoneInfo
+import re
+from typing import Any, Optional
 
-from litellm import completion
+from litellm import acompletion, completion
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from fidus.config import config
-from fidus.memory.context.models import ContextFactors, ContextExtractionResult
+from fidus.memory.context.fast_path import ContextSignalClassifier, default_classifier
+from fidus.memory.context.models import ContextFactors, ContextExtractionResult, MessageAnalysis
+from fidus.memory.context.resilience import CircuitOpenError, ResiliencePolicy, get_policy
+from fidus.memory.extraction_cache import (
+    ExtractionCache,
+    current_datetime_bucket,
+    default_extraction_cache,
+)
+from fidus.memory.simple_agent import PREFERENCE_EXTRACTION_RULES
 
 logger = logging.getLogger(__name__)
 
 
+class _JSONObjectScanner:
+    """Detect the end of a JSON object in streamed text.
+
+    Skips any preamble (e.g. qwen3 reasoning) until the object start
+    ``{"<key>":`` appears, then tracks brace depth, ignoring braces inside
+    strings. feed() returns the complete object as soon as it is closed,
+    so the caller can stop the stream without waiting for trailing output.
+    """
+
+    # Preamble characters kept between chunks so a split start marker is found
+    _TAIL = 64
+
+    def __init__(self, key: str):
+        """Initialize the scanner.
+
+        Args:
+            key: First key of the expected object, e.g. "context_factors"
+        """
+        self._start = re.compile(r'\{\s*"' + re.escape(key) + r'"\s*:')
+        self._preamble = ""
+        self._parts: Optional[list[str]] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> Optional[str]:
+        """Consume a chunk of streamed text.
+
+        Args:
+            text: Next chunk
+
+        Returns:
+            Optional[str]: The complete JSON object once closed, else None
+        """
+        if self._parts is None:
+            self._preamble += text
+            match = self._start.search(self._preamble)
+            if not match:
+                self._preamble = self._preamble[-self._TAIL:]
+                return None
+            text = self._preamble[match.start():]
+            self._preamble = ""
+            self._parts = []
+
+        for index, char in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(text[: index + 1])
+                    return "".join(self._parts)
+
+        self._parts.append(text)
+        return None
+
+
 class DynamicContextExtractor:
     """Extract context factors dynamically from user messages using LLM.
 
@@ -34,6 +106,12 @@ class DynamicContextExtractor:
         # result.context.factors = {"time_of_day": "morning", "beverage": "coffee"}
     """
 
+    # First key of the expected response object (used to skip reasoning preambles)
+    RESPONSE_KEY = "context_factors"
+
+    # Extraction kind in cache keys
+    CACHE_KIND = "context"
+
     SYSTEM_PROMPT = """You are a context extraction assistant for Fidus Memory.
 
 Your task is to analyze user messages and extract relevant situational context factors.
@@ -82,6 +160,9 @@ IMPORTANT: You MUST respond with ONLY valid JSON in exactly this format (no othe
         model: Optional[str] = None,
         temperature: float = 0.3,
         max_tokens: int = 500,
+        resilience: Optional[ResiliencePolicy] = None,
+        classifier: Optional[ContextSignalClassifier] = None,
+        cache: Optional[ExtractionCache] = None,
     ):
         """Initialize the context extractor.
 
@@ -89,10 +170,20 @@ IMPORTANT: You MUST respond with ONLY valid JSON in exactly this format (no othe
             model: LLM model to use (defaults to config.llm_model)
             temperature: LLM temperature for response variability
             max_tokens: Maximum tokens in LLM response
+            resilience: Hedging/circuit breaker policy for LLM calls (defaults to the
+                process-wide policy for this model)
+            classifier: Fast path classifier (defaults to the shared classifier if
+                config.context_fast_path_enabled, otherwise no fast path)
+            cache: Extraction result cache (defaults to the shared in-process cache)
         """
         self.model = model or config.llm_model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.resilience = resilience or get_policy(f"extraction:{self.model}")
+        if classifier is None and config.context_fast_path_enabled:
+            classifier = default_classifier
+        self.classifier = classifier
+        self.cache = cache or default_extraction_cache
 
     @retry(
         stop=stop_after_attempt(3),
@@ -110,6 +201,14 @@ IMPORTANT: You MUST respond with ONLY valid JSON in exactly this format (no othe
         This method uses an LLM to analyze the message and identify relevant
         context factors. The extraction includes retry logic for reliability.
 
+        The LLM response is streamed with the async completion API and the
+        stream is closed as soon as the JSON object is complete, so trailing
+        output isn't waited for. The call goes through the resilience policy: slow calls can be hedged with a duplicate request,
+        and while the circuit breaker is open an empty low-confidence result
+        is returned, so callers fall back to system-only context. Messages
+        without situational signal (see fast_path.py) skip the LLM the same way.
+        Results are cached per message, model and hour (see ExtractionCache).
+
         Args:
             message: User message to analyze
             tenant_id: Tenant ID for logging and tracking
@@ -131,113 +230,40 @@ IMPORTANT: You MUST respond with ONLY valid JSON in exactly this format (no othe
             },
         )
 
-        try:
-            # Get current datetime for temporal context in Europe/Berlin timezone
-            timezone = os.getenv("TZ", "Europe/Berlin")
-            try:
-                tz = ZoneInfo(timezone)
-                current_datetime = datetime.now(tz).strftime("%A, %Y-%m-%d %H:%M:%S %Z")
-            except Exception:
-                # Fallback to UTC if timezone not found
-                current_datetime = datetime.now().strftime("%A, %Y-%m-%d %H:%M:%S UTC")
-
-            # Call LLM for context extraction
-            # Using streaming to work around Ollama/LiteLLM non-streaming empty response bug
-            response = completion(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {
-                        "role": "user",
-                        "content": self.USER_PROMPT_TEMPLATE.format(
-                            current_datetime=current_datetime,
-                            message=message
-                        ),
-                    },
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                stream=True,
-                # response_format removed for Ollama compatibility via LiteLLM
+        if self._take_fast_path(message, tenant_id, user_id):
+            return self._fast_path_result()
+
+        bucket = current_datetime_bucket()
+        cached = await self.cache.get(self.CACHE_KIND, self.model, message, bucket)
+        if cached is not None:
+            logger.info(
+                f"Context extraction cache hit",
+                extra={"tenant_id": tenant_id, "user_id": user_id},
             )
+            return ContextExtractionResult.model_validate(cached)
 
-            # Collect streaming response
-            content = ""
-            chunk_count = 0
-            for chunk in response:
-                chunk_count += 1
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    # qwen3 uses 'reasoning_content' for all output, other models use 'content'
-                    delta_content = getattr(delta, 'content', None) or getattr(delta, 'reasoning_content', None)
-                    if delta_content is not None:
-                        content += str(delta_content)
-            logger.info(f"Total chunks received: {chunk_count}, final content length: {len(content)}")
-
-            # Clean up response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            elif content.startswith("```"):
-                content = content[3:]  # Remove ```
-            if content.endswith("```"):
-                content = content[:-3]  # Remove trailing ```
-            content = content.strip()
+        try:
+            messages = self._build_messages(message, bucket)
 
-            # qwen3 may include reasoning before JSON - extract JSON object
-            # Look for the first occurrence of {"context_factors"
-            json_start = content.find('{"context_factors"')
-            if json_start > 0:
-                logger.debug(f"Found JSON at position {json_start}, removing {json_start} characters of reasoning")
-                content = content[json_start:]
-                content = content.strip()
-            elif json_start == -1:
-                # Try finding any JSON object
-                json_start = content.find('{')
-                if json_start > 0:
-                    logger.debug(f"Found JSON object at position {json_start}")
-                    content = content[json_start:]
-                    content = content.strip()
-
-            # Parse JSON response
             try:
-                parsed = json.loads(content)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {e}")
-                logger.error(f"Raw content (first 500 chars): {content[:500]}")
-                raise ValueError(f"Invalid JSON response from LLM")
-
-            # Extract context factors
-            context_factors = parsed.get("context_factors", {})
-            confidence = float(parsed.get("confidence", 0.0))
-            explanation = parsed.get("explanation")
-
-            # Validate and create ContextFactors
-            try:
-                context = ContextFactors(factors=context_factors)
-            except ValueError as e:
-                logger.warning(f"Invalid context factors from LLM: {e}")
-                # Return empty context with low confidence if validation fails
-                context = ContextFactors(factors={})
-                confidence = 0.0
-                explanation = f"Validation failed: {str(e)}"
-
-            result = ContextExtractionResult(
-                context=context,
-                confidence=confidence,
-                explanation=explanation,
+                content = await self.resilience.call(
+                    lambda: self._acomplete(messages)
+                )
+            except CircuitOpenError:
+                logger.warning(
+                    f"Context extraction circuit open, using degraded path",
+                    extra={"tenant_id": tenant_id, "user_id": user_id},
+                )
+                return ContextExtractionResult(
+                    context=ContextFactors(factors={}),
+                    confidence=0.0,
+                    explanation="Context extraction skipped: LLM backend unavailable",
+                )
+
+            result = self._parse_content(content, tenant_id, user_id)
+            await self.cache.set(
+                self.CACHE_KIND, self.model, message, result.model_dump(), bucket
             )
-
-            logger.info(
-                f"Context extracted successfully",
-                extra={
-                    "tenant_id": tenant_id,
-                    "user_id": user_id,
-                    "factors_count": len(context.factors),
-                    "confidence": confidence,
-                },
-            )
-
             return result
 
         except Exception as e:
@@ -273,117 +299,584 @@ IMPORTANT: You MUST respond with ONLY valid JSON in exactly this format (no othe
         )
 
         try:
-            # Get current datetime for temporal context in Europe/Berlin timezone
-            timezone = os.getenv("TZ", "Europe/Berlin")
-            try:
-                tz = ZoneInfo(timezone)
-                current_datetime = datetime.now(tz).strftime("%A, %Y-%m-%d %H:%M:%S %Z")
-            except Exception:
-                # Fallback to UTC if timezone not found
-                current_datetime = datetime.now().strftime("%A, %Y-%m-%d %H:%M:%S UTC")
-
-            # Call LLM for context extraction
-            # Using streaming to work around Ollama/LiteLLM non-streaming empty response bug
-            response = completion(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {
-                        "role": "user",
-                        "content": self.USER_PROMPT_TEMPLATE.format(
-                            current_datetime=current_datetime,
-                            message=message
-                        ),
-                    },
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                stream=True,
-                # response_format removed for Ollama compatibility via LiteLLM
+            content = self._complete(self._build_messages(message))
+            return self._parse_content(content, tenant_id, user_id)
+
+        except Exception as e:
+            logger.error(
+                f"Context extraction failed: {e}",
+                extra={"tenant_id": tenant_id, "user_id": user_id},
             )
+            raise
 
-            # Collect streaming response
-            content = ""
-            chunk_count = 0
-            for chunk in response:
-                chunk_count += 1
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    # qwen3 uses 'reasoning_content' for all output, other models use 'content'
-                    delta_content = getattr(delta, 'content', None) or getattr(delta, 'reasoning_content', None)
-                    if delta_content is not None:
-                        content += str(delta_content)
-            logger.info(f"Total chunks received: {chunk_count}, final content length: {len(content)}")
-
-            # Clean up response - remove markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            elif content.startswith("```"):
-                content = content[3:]  # Remove ```
-            if content.endswith("```"):
-                content = content[:-3]  # Remove trailing ```
-            content = content.strip()
+    def _has_signal(self, message: str) -> bool:
+        """Check whether the LLM could extract anything beyond system context.
 
-            # qwen3 may include reasoning before JSON - extract JSON object
-            # Look for the first occurrence of {"context_factors"
-            json_start = content.find('{"context_factors"')
-            if json_start > 0:
-                logger.debug(f"Found JSON at position {json_start}, removing {json_start} characters of reasoning")
-                content = content[json_start:]
-                content = content.strip()
-            elif json_start == -1:
-                # Try finding any JSON object
-                json_start = content.find('{')
-                if json_start > 0:
-                    logger.debug(f"Found JSON object at position {json_start}")
-                    content = content[json_start:]
-                    content = content.strip()
-
-            # Parse JSON response
-            try:
-                parsed = json.loads(content)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse LLM response as JSON: {e}")
-                logger.error(f"Raw content (first 500 chars): {content[:500]}")
-                raise ValueError(f"Invalid JSON response from LLM")
-
-            # Extract context factors
-            context_factors = parsed.get("context_factors", {})
-            confidence = float(parsed.get("confidence", 0.0))
-            explanation = parsed.get("explanation")
-
-            # Validate and create ContextFactors
-            try:
-                context = ContextFactors(factors=context_factors)
-            except ValueError as e:
-                logger.warning(f"Invalid context factors from LLM: {e}")
-                # Return empty context with low confidence if validation fails
-                context = ContextFactors(factors={})
-                confidence = 0.0
-                explanation = f"Validation failed: {str(e)}"
-
-            result = ContextExtractionResult(
-                context=context,
-                confidence=confidence,
-                explanation=explanation,
-            )
+        Args:
+            message: User message
+
+        Returns:
+            bool: True if the message carries situational signal
+        """
+        return self.classifier.has_situational_signal(message)
 
+    def _take_fast_path(self, message: str, tenant_id: str, user_id: str) -> bool:
+        """Decide (and count) whether to skip the LLM call for a message.
+
+        Args:
+            message: User message
+            tenant_id: Tenant ID for logging
+            user_id: User ID for logging
+
+        Returns:
+            bool: True if the LLM call should be skipped
+        """
+        if self.classifier is None:
+            return False
+
+        fast_path = not self._has_signal(message)
+        self.classifier.record(fast_path)
+
+        if fast_path:
             logger.info(
-                f"Context extracted successfully",
+                f"No situational signal, skipping LLM context extraction",
                 extra={
                     "tenant_id": tenant_id,
                     "user_id": user_id,
-                    "factors_count": len(context.factors),
-                    "confidence": confidence,
+                    **self.classifier.stats(),
                 },
             )
+        return fast_path
+
+    @staticmethod
+    def _fast_path_result() -> ContextExtractionResult:
+        """Empty LLM context; the merger fills in system context."""
+        return ContextExtractionResult(
+            context=ContextFactors(factors={}),
+            confidence=0.0,
+            explanation="No situational signal in message, using system context only",
+        )
 
-            return result
+    def _build_messages(self, message: str, current_datetime: Optional[str] = None) -> list[dict]:
+        """Build the chat messages for context extraction.
+
+        Args:
+            message: User message to analyze
+            current_datetime: Date and hour for temporal context
+                (defaults to current_datetime_bucket())
+
+        Returns:
+            list[dict]: System and user messages
+        """
+        if current_datetime is None:
+            current_datetime = current_datetime_bucket()
+
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": self.USER_PROMPT_TEMPLATE.format(
+                    current_datetime=current_datetime,
+                    message=message
+                ),
+            },
+        ]
+
+    def _completion_kwargs(self, messages: list[dict]) -> dict[str, Any]:
+        """Build the streaming completion arguments.
+
+        Args:
+            messages: Chat messages
+
+        Returns:
+            dict: Keyword arguments for completion/acompletion
+        """
+        # Using streaming to work around Ollama/LiteLLM non-streaming empty response bug
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": True,
+            # response_format removed for Ollama compatibility via LiteLLM
+        }
+
+    @staticmethod
+    def _delta_text(chunk: Any) -> Optional[str]:
+        """Get the text of a streamed chunk, if any."""
+        if chunk.choices and len(chunk.choices) > 0:
+            delta = chunk.choices[0].delta
+            # qwen3 uses 'reasoning_content' for all output, other models use 'content'
+            delta_content = getattr(delta, 'content', None) or getattr(delta, 'reasoning_content', None)
+            if delta_content is not None:
+                return str(delta_content)
+        return None
+
+    async def _acomplete(self, messages: list[dict]) -> str:
+        """Stream the LLM response until the JSON object is complete.
+
+        Args:
+            messages: Chat messages
+
+        Returns:
+            str: The JSON object, or the full raw content if none was found
+        """
+        response = await acompletion(**self._completion_kwargs(messages))
+
+        scanner = _JSONObjectScanner(self.RESPONSE_KEY)
+        parts: list[str] = []
+        chunk_count = 0
+        result: Optional[str] = None
+        drained = False
+        try:
+            async for chunk in response:
+                chunk_count += 1
+                text = self._delta_text(chunk)
+                if text is None:
+                    continue
+                parts.append(text)
+                result = scanner.feed(text)
+                if result is not None:
+                    break
+            else:
+                drained = True
+        finally:
+            if not drained:
+                # Stop generation (early end or cancelled hedge) instead of draining the stream
+                close = getattr(response, "aclose", None)
+                if close is not None:
+                    await close()
+
+        logger.info(
+            f"Total chunks received: {chunk_count}, "
+            f"{'stopped at end of JSON' if result is not None else 'stream finished'}"
+        )
+        return result if result is not None else "".join(parts)
+
+    def _complete(self, messages: list[dict]) -> str:
+        """Call the LLM and collect the streamed response (blocking).
+
+        Used by extract_sync(); stops reading once the JSON object is complete.
+
+        Args:
+            messages: Chat messages
+
+        Returns:
+            str: The JSON object, or the full raw content if none was found
+        """
+        response = completion(**self._completion_kwargs(messages))
+
+        scanner = _JSONObjectScanner(self.RESPONSE_KEY)
+        parts: list[str] = []
+        chunk_count = 0
+        for chunk in response:
+            chunk_count += 1
+            text = self._delta_text(chunk)
+            if text is None:
+                continue
+            parts.append(text)
+            result = scanner.feed(text)
+            if result is not None:
+                logger.info(f"Total chunks received: {chunk_count}, stopped at end of JSON")
+                return result
+
+        content = "".join(parts)
+        logger.info(f"Total chunks received: {chunk_count}, final content length: {len(content)}")
+        return content
+
+    def _parse_content(
+        self,
+        content: str,
+        tenant_id: str,
+        user_id: str,
+    ) -> ContextExtractionResult:
+        """Parse raw LLM output into a ContextExtractionResult.
+
+        Args:
+            content: Raw response content
+            tenant_id: Tenant ID for logging and tracking
+            user_id: User ID for logging and tracking
+
+        Returns:
+            ContextExtractionResult: Extracted context with confidence score
+
+        Raises:
+            ValueError: If the response is not valid JSON
+        """
+        parsed = self._parse_json(content, marker=f'{{"{self.RESPONSE_KEY}"')
+        return self._to_context_result(parsed, tenant_id, user_id)
+
+    @staticmethod
+    def _parse_json(content: str, marker: str) -> dict:
+        """Extract the JSON object from raw LLM output.
+
+        Args:
+            content: Raw response content
+            marker: Expected start of the JSON object (used to skip reasoning text)
+
+        Returns:
+            dict: Parsed JSON object
+
+        Raises:
+            ValueError: If the response is not valid JSON
+        """
+        # Clean up response - remove markdown code blocks if present
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]  # Remove ```json
+        elif content.startswith("```"):
+            content = content[3:]  # Remove ```
+        if content.endswith("```"):
+            content = content[:-3]  # Remove trailing ```
+        content = content.strip()
+
+        # qwen3 may include reasoning before JSON - extract JSON object
+        # Look for the first occurrence of the expected object start
+        json_start = content.find(marker)
+        if json_start > 0:
+            logger.debug(f"Found JSON at position {json_start}, removing {json_start} characters of reasoning")
+            content = content[json_start:]
+            content = content.strip()
+        elif json_start == -1:
+            # Try finding any JSON object
+            json_start = content.find('{')
+            if json_start > 0:
+                logger.debug(f"Found JSON object at position {json_start}")
+                content = content[json_start:]
+                content = content.strip()
+
+        # Parse JSON response
+        try:
+            parsed = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM response as JSON: {e}")
+            logger.error(f"Raw content (first 500 chars): {content[:500]}")
+            raise ValueError(f"Invalid JSON response from LLM")
+
+        if not isinstance(parsed, dict):
+            raise ValueError(f"Invalid JSON response from LLM")
+
+        return parsed
+
+    def _to_context_result(
+        self,
+        parsed: dict,
+        tenant_id: str,
+        user_id: str,
+    ) -> ContextExtractionResult:
+        """Validate the context part of a parsed LLM response.
+
+        Args:
+            parsed: Parsed JSON object
+            tenant_id: Tenant ID for logging and tracking
+            user_id: User ID for logging and tracking
+
+        Returns:
+            ContextExtractionResult: Extracted context with confidence score
+        """
+        # Extract context factors
+        context_factors = parsed.get("context_factors", {})
+        confidence = float(parsed.get("confidence", 0.0))
+        explanation = parsed.get("explanation")
+
+        # Validate and create ContextFactors
+        try:
+            context = ContextFactors(factors=context_factors)
+        except ValueError as e:
+            logger.warning(f"Invalid context factors from LLM: {e}")
+            # Return empty context with low confidence if validation fails
+            context = ContextFactors(factors={})
+            confidence = 0.0
+            explanation = f"Validation failed: {str(e)}"
+
+        result = ContextExtractionResult(
+            context=context,
+            confidence=confidence,
+            explanation=explanation,
+        )
+
+        logger.info(
+            f"Context extracted successfully",
+            extra={
+                "tenant_id": tenant_id,
+                "user_id": user_id,
+                "factors_count": len(context.factors),
+                "confidence": confidence,
+            },
+        )
+
+        return result
+
+
+class CombinedExtractor(DynamicContextExtractor):
+    """Extract preferences and context factors from a message in one LLM call.
+
+    A chat turn used to analyze the same message up to three times
+    (preference extraction, context extraction for retrieval, and context
+    extraction again when a preference is persisted). analyze() returns
+    both results from a single response, validated into the existing
+    preference dict shape and ContextExtractionResult.
+
+    extract() still works and returns only the context part.
+
+    Example:
+        extractor = CombinedExtractor()
+        analysis = await extractor.analyze("I love cappuccino in the morning", "t1", "u1")
+        # analysis.preferences = [{"domain": "food", "key": "cappuccino", ...}]
+        # analysis.context.context.factors = {"time_of_day": "morning"}
+    """
+
+    RESPONSE_KEY = "preferences"
+    CACHE_KIND = "analysis"
+
+    SYSTEM_PROMPT = f"""You are a preference and context extraction assistant for Fidus Memory.
+
+Your task is to analyze user messages and extract, in one response:
+1. The user's preferences
+2. The situational context factors of the message
+
+## Preferences
+
+{PREFERENCE_EXTRACTION_RULES}
+
+## Context factors
+
+Context factors should be:
+1. In snake_case format (lowercase with underscores)
+2. Descriptive and specific
+3. Relevant to understanding user preferences
+4. Focused on the situation, not the preference itself
+
+Examples of good context factors:
+- time_of_day: "morning", "afternoon", "evening", "night"
+- day_of_week: "monday", "tuesday", etc.
+- location: "home", "work", "cafe", "gym"
+- activity: "working", "relaxing", "exercising", "socializing"
+- mood: "energetic", "tired", "stressed", "happy"
+
+Extract factors organically - you can discover new factor types beyond these examples.
+
+Response format (JSON):
+{{
+  "preferences": [
+    {{"domain": "food", "key": "cappuccino", "sentiment": "positive", "value": "loves it", "confidence": 0.9}}
+  ],
+  "context_factors": {{
+    "factor_name": "factor_value"
+  }},
+  "confidence": 0.95,
+  "explanation": "Brief explanation of the extracted context"
+}}
+
+If NO clear preferences are found, return an empty "preferences" list.
+If no clear context is found, return empty context_factors with low confidence.
+"""
+
+    USER_PROMPT_TEMPLATE = """Analyze this user message and extract preferences and context factors:
+
+Current Date and Time: {current_datetime}
+Message: "{message}"
+
+Use the current date and time to infer temporal context like time_of_day, day_of_week, season, etc.
+
+IMPORTANT: You MUST respond with ONLY valid JSON in exactly this format (no other text, no markdown, no code blocks):
+{{"preferences": [], "context_factors": {{}}, "confidence": 0.0, "explanation": "your explanation"}}"""
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 800,
+        resilience: Optional[ResiliencePolicy] = None,
+        classifier: Optional[ContextSignalClassifier] = None,
+        cache: Optional[ExtractionCache] = None,
+    ):
+        """Initialize the combined extractor.
+
+        Args:
+            model: LLM model to use (defaults to config.llm_model)
+            temperature: LLM temperature for response variability
+            max_tokens: Maximum tokens in LLM response (preferences need more room
+                than context alone)
+            resilience: Hedging/circuit breaker policy for LLM calls (defaults to the
+                process-wide policy for this model)
+            classifier: Fast path classifier (see DynamicContextExtractor)
+            cache: Extraction result cache (see DynamicContextExtractor)
+        """
+        super().__init__(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            resilience=resilience,
+            classifier=classifier,
+            cache=cache,
+        )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        reraise=True,
+    )
+    async def analyze(
+        self,
+        message: str,
+        tenant_id: str,
+        user_id: str,
+    ) -> MessageAnalysis:
+        """Extract preferences and context factors from a user message.
+
+        The fast path and the open circuit breaker only skip the context
+        part: they return an empty low-confidence context and preferences
+        None, so the caller still runs its own preference extraction (the
+        lexicon can't recognize every preference, e.g. "I am vegetarian").
+        Results are cached per message, model and hour.
+
+        Args:
+            message: User message to analyze
+            tenant_id: Tenant ID for logging and tracking
+            user_id: User ID for logging and tracking
+
+        Returns:
+            MessageAnalysis: Extracted preferences and context
+
+        Raises:
+            ValueError: If LLM response cannot be parsed
+            Exception: If LLM call fails after retries
+        """
+        logger.info(
+            f"Analyzing message (preferences + context)",
+            extra={
+                "tenant_id": tenant_id,
+                "user_id": user_id,
+                "message_length": len(message),
+            },
+        )
+
+        if self._take_fast_path(message, tenant_id, user_id):
+            return MessageAnalysis(preferences=None, context=self._fast_path_result())
+
+        bucket = current_datetime_bucket()
+        cached = await self.cache.get(self.CACHE_KIND, self.model, message, bucket)
+        if cached is not None:
+            logger.info(
+                f"Message analysis cache hit",
+                extra={"tenant_id": tenant_id, "user_id": user_id},
+            )
+            return MessageAnalysis.model_validate(cached)
+
+        try:
+            messages = self._build_messages(message, bucket)
+
+            try:
+                content = await self.resilience.call(
+                    lambda: self._acomplete(messages)
+                )
+            except CircuitOpenError:
+                logger.warning(
+                    f"Message analysis circuit open, using degraded path",
+                    extra={"tenant_id": tenant_id, "user_id": user_id},
+                )
+                return MessageAnalysis(
+                    preferences=None,
+                    context=ContextExtractionResult(
+                        context=ContextFactors(factors={}),
+                        confidence=0.0,
+                        explanation="Context extraction skipped: LLM backend unavailable",
+                    ),
+                )
+
+            parsed = self._parse_json(content, marker=f'{{"{self.RESPONSE_KEY}"')
+            analysis = MessageAnalysis(
+                preferences=self._to_preferences(parsed),
+                context=self._to_context_result(parsed, tenant_id, user_id),
+            )
+            await self.cache.set(
+                self.CACHE_KIND, self.model, message, analysis.model_dump(), bucket
+            )
+            return analysis
 
         except Exception as e:
             logger.error(
-                f"Context extraction failed: {e}",
+                f"Message analysis failed: {e}",
                 extra={"tenant_id": tenant_id, "user_id": user_id},
             )
             raise
+
+    async def extract(
+        self,
+        message: str,
+        tenant_id: str,
+        user_id: str,
+    ) -> ContextExtractionResult:
+        """Extract only the context part (see analyze()).
+
+        Args:
+            message: User message to analyze
+            tenant_id: Tenant ID for logging and tracking
+            user_id: User ID for logging and tracking
+
+        Returns:
+            ContextExtractionResult: Extracted context with confidence score
+        """
+        analysis = await self.analyze(message, tenant_id, user_id)
+        return analysis.context
+
+    def _has_signal(self, message: str) -> bool:
+        """Also call the LLM for messages that may express a preference.
+
+        Those get both results from one call; messages on the fast path
+        leave preference extraction to the caller.
+
+        Args:
+            message: User message
+
+        Returns:
+            bool: True if the message carries situational or preference signal
+        """
+        return self.classifier.has_situational_signal(
+            message
+        ) or self.classifier.has_preference_signal(message)
+
+    def _parse_content(
+        self,
+        content: str,
+        tenant_id: str,
+        user_id: str,
+    ) -> ContextExtractionResult:
+        """Parse a combined response, keeping only the context part."""
+        parsed = self._parse_json(content, marker=f'{{"{self.RESPONSE_KEY}"')
+        return self._to_context_result(parsed, tenant_id, user_id)
+
+    @staticmethod
+    def _to_preferences(parsed: dict) -> list[dict]:
+        """Keep well-formed preference entries from a parsed response.
+
+        Field-level validation (placeholders, low confidence, sentiment) is
+        left to InMemoryAgent._is_valid_preference, as for the standalone
+        preference extraction.
+
+        Args:
+            parsed: Parsed JSON object
+
+        Returns:
+            list[dict]: Preference dicts with domain, key and value
+        """
+        preferences = parsed.get("preferences", [])
+        if not isinstance(preferences, list):
+            logger.warning(f"Invalid preferences from LLM: {type(preferences).__name__}")
+            return []
+
+        valid = []
+        for pref in preferences:
+            if not isinstance(pref, dict):
+                continue
+            if not all(isinstance(pref.get(field), str) for field in ("domain", "key", "value")):
+                logger.warning(f"Rejected malformed preference: {pref}")
+                continue
+            try:
+                pref["confidence"] = float(pref.get("confidence", 0.7))
+            except (TypeError, ValueError):
+                logger.warning(f"Rejected preference with invalid confidence: {pref}")
+                continue
+            valid.append(pref)
+        return valid
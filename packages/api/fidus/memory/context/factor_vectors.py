@@ -0,0 +1,180 @@
+"""Persistent per-factor vector table for compositional embeddings.
+
+Context factors come from a small vocabulary of "key: value" pairs (the
+system provider emits the same five keys every turn). In compositional
+mode a situation vector is the normalized weighted sum of one vector per
+factor pair, so the embedding model is only called for pairs never seen
+before and cost grows with vocabulary size instead of turn count.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from fidus.infrastructure.redis.session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+
+def factor_pairs(factors: dict[str, str]) -> list[str]:
+    """Format context factors as sorted "key: value" strings.
+
+    Uses the same formatting as EmbeddingService._context_to_text, so a
+    single-factor context embeds to the same vector in both modes.
+
+    Args:
+        factors: Context factors
+
+    Returns:
+        list[str]: Sorted factor strings
+    """
+    return [f"{key}: {value}" for key, value in sorted(factors.items())]
+
+
+def compose_vector(
+    factors: dict[str, str],
+    vectors: dict[str, list[float]],
+    weights: Optional[dict[str, float]] = None,
+) -> list[float]:
+    """Build a situation vector as the normalized weighted sum of factor vectors.
+
+    Args:
+        factors: Context factors
+        vectors: Mapping of "key: value" strings to factor vectors
+        weights: Optional per-key weights (default 1.0)
+
+    Returns:
+        list[float]: L2-normalized situation vector
+    """
+    weights = weights or {}
+    keys = sorted(factors)
+    matrix = np.asarray([vectors[f"{key}: {factors[key]}"] for key in keys], dtype=np.float32)
+    key_weights = np.asarray([weights.get(key, 1.0) for key in keys], dtype=np.float32)
+
+    combined = key_weights @ matrix
+    norm = float(np.linalg.norm(combined))
+    if norm == 0.0:
+        return combined.tolist()
+    return (combined / norm).tolist()
+
+
+class FactorVectorTable:
+    """Per-model table of factor vectors with an optional Redis backing store.
+
+    The in-process dict is unbounded on purpose: the factor vocabulary is
+    small and every entry saves a model call. Redis makes the table survive
+    restarts and shares it between API processes.
+    """
+
+    def __init__(self, model: str, session_cache: Optional[SessionCache] = None):
+        """Initialize the table.
+
+        Args:
+            model: Embedding model namespace the vectors belong to
+            session_cache: Connected SessionCache for persistence (optional)
+        """
+        self.model = model
+        self.session_cache = session_cache
+        self._vectors: dict[str, list[float]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of factor vectors held in process."""
+        return len(self._vectors)
+
+    def get_local(self, pairs: list[str]) -> dict[str, list[float]]:
+        """Look up factor vectors in the in-process table only.
+
+        Args:
+            pairs: "key: value" factor strings
+
+        Returns:
+            Mapping of found factor strings to vectors
+        """
+        found = {pair: self._vectors[pair] for pair in pairs if pair in self._vectors}
+        self.hits += len(found)
+        self.misses += len(pairs) - len(found)
+        return found
+
+    def set_local(self, vectors: dict[str, list[float]]) -> None:
+        """Add factor vectors to the in-process table.
+
+        Args:
+            vectors: Mapping of factor strings to vectors
+        """
+        self._vectors.update({pair: list(vector) for pair, vector in vectors.items()})
+
+    async def get(self, pairs: list[str]) -> dict[str, list[float]]:
+        """Look up factor vectors, falling back to Redis for unknown pairs.
+
+        Args:
+            pairs: "key: value" factor strings
+
+        Returns:
+            Mapping of found factor strings to vectors
+        """
+        found = {pair: self._vectors[pair] for pair in pairs if pair in self._vectors}
+        missing = [pair for pair in pairs if pair not in found]
+
+        if missing and self.session_cache is not None:
+            try:
+                stored = await self.session_cache.get_factor_vectors(self.model, missing)
+            except Exception as e:
+                logger.warning(f"Factor vector Redis lookup failed: {e}")
+                stored = {}
+            self._vectors.update(stored)
+            found.update(stored)
+
+        self.hits += len(found)
+        self.misses += len(pairs) - len(found)
+        return found
+
+    async def set(self, vectors: dict[str, list[float]]) -> None:
+        """Store new factor vectors in process and in Redis.
+
+        Args:
+            vectors: Mapping of factor strings to vectors
+        """
+        self.set_local(vectors)
+
+        if self.session_cache is not None:
+            try:
+                await self.session_cache.store_factor_vectors(self.model, vectors)
+            except Exception as e:
+                logger.warning(f"Factor vector Redis write failed: {e}")
+
+
+# One table per model namespace, shared by all EmbeddingService instances in
+# this process (see get_factor_table)
+_tables: Dict[str, FactorVectorTable] = {}
+_session_cache: Optional[SessionCache] = None
+
+
+def get_factor_table(model: str) -> FactorVectorTable:
+    """Get the process-wide factor vector table for a model.
+
+    Args:
+        model: Embedding model namespace
+
+    Returns:
+        FactorVectorTable: Shared table (Redis-backed once connect_factor_tables ran)
+    """
+    if model not in _tables:
+        _tables[model] = FactorVectorTable(model, session_cache=_session_cache)
+    return _tables[model]
+
+
+def connect_factor_tables(session_cache: SessionCache) -> None:
+    """Back all shared tables, including ones created later, with Redis.
+
+    Args:
+        session_cache: Connected SessionCache
+    """
+    global _session_cache
+
+    _session_cache = session_cache
+    for table in _tables.values():
+        table.session_cache = session_cache
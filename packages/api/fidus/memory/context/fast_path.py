@@ -0,0 +1,207 @@
+"""Rule-based fast path for context extraction.
+
+Most chat messages are greetings, questions or short statements without any
+situational signal. For those, SystemContextProvider already supplies the
+useful factors (time_of_day, day_of_week, season), and the LLM extraction
+call only adds latency. ContextSignalClassifier decides deterministically,
+using keyword and regex lexicons in English, German, French and Spanish,
+whether a message mentions a location, activity, weather, mood, time or
+company. Messages without such a signal skip the LLM.
+"""
+
+import logging
+import re
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def _words(*groups: str) -> frozenset[str]:
+    """Build a lexicon from whitespace-separated word groups."""
+    return frozenset(word for group in groups for word in group.split())
+
+
+class ContextSignalClassifier:
+    """Detect situational (and preference) signals in a message.
+
+    Example:
+        classifier = ContextSignalClassifier()
+        classifier.signals("Hi, how are you?")         # set()
+        classifier.signals("Tired after the gym")      # {"mood", "location"}
+    """
+
+    # Single-word lexicons per signal category (lowercase, en/de/fr/es)
+    LEXICONS: Dict[str, frozenset[str]] = {
+        "location": _words(
+            "home office work workplace cafe café coffeeshop gym restaurant bar pub outside "
+            "outdoors car train bus subway airport plane beach park school university campus "
+            "kitchen bed bedroom hotel city downtown",
+            "zuhause daheim arbeit büro fitnessstudio draußen auto zug bahn flughafen flugzeug "
+            "strand schule uni universität küche bett schlafzimmer stadt kneipe",
+            "maison bureau travail dehors voiture gare aéroport avion plage parc école "
+            "université cuisine lit chambre ville",
+            "casa oficina trabajo cafetería gimnasio fuera coche tren aeropuerto avión playa "
+            "parque escuela universidad cocina cama habitación ciudad",
+        ),
+        "activity": _words(
+            "working meeting meetings studying cooking running jogging exercising workout "
+            "training driving commuting traveling travelling trip vacation holiday reading "
+            "relaxing party dinner lunch breakfast brunch shopping coding sleeping walking "
+            "hiking cycling swimming gaming watching",
+            "arbeite arbeiten lerne lernen koche kochen laufe laufen joggen sport fahre "
+            "fahren pendle pendeln reise reisen urlaub lese lesen entspanne entspannen "
+            "abendessen mittagessen frühstück einkaufen schlafen spazieren wandern radfahren "
+            "schwimmen zocken",
+            "travaille travailler réunion étudie étudier cuisiner courir entraînement conduis "
+            "conduire voyage voyager vacances lis lire détends fête dîner déjeuner courses "
+            "dormir marcher randonnée nager",
+            "trabajando reunión estudiando cocinando corriendo entrenando conduciendo "
+            "viajando viaje vacaciones leyendo relajando fiesta cena almuerzo desayuno compras "
+            "durmiendo caminando senderismo nadando",
+        ),
+        "weather": _words(
+            "rain raining rainy sunny sunshine snow snowing cold hot warm windy storm stormy "
+            "fog foggy heat humid freezing",
+            "regen regnet regnerisch sonnig sonne schnee schneit kalt heiß warm windig sturm "
+            "gewitter nebel hitze schwül",
+            "pluie pleut soleil neige neiger froid chaud vent venteux orage brouillard chaleur",
+            "lluvia llueve lloviendo soleado sol nieve nevando frío calor viento tormenta "
+            "niebla",
+        ),
+        "mood": _words(
+            "tired exhausted sleepy stressed happy sad energetic bored hungry thirsty sick ill "
+            "relaxed anxious excited angry nervous lonely motivated",
+            "müde erschöpft gestresst glücklich traurig hungrig durstig krank entspannt "
+            "gelangweilt aufgeregt wütend nervös einsam motiviert",
+            "fatigué fatiguée épuisé stressé stressée heureux heureuse triste faim soif malade "
+            "détendu détendue ennuie énervé",
+            "cansado cansada agotado estresado estresada feliz triste hambre sed enfermo "
+            "enferma relajado relajada aburrido nervioso",
+        ),
+        "time": _words(
+            "morning afternoon evening night tonight today tomorrow yesterday weekend noon "
+            "midnight monday tuesday wednesday thursday friday saturday sunday",
+            "morgen morgens vormittag nachmittag abend abends nacht nachts heute gestern "
+            "wochenende mittag mitternacht montag dienstag mittwoch donnerstag freitag "
+            "samstag sonntag",
+            "matin après-midi soir soirée nuit aujourd'hui demain hier week-end midi minuit "
+            "lundi mardi mercredi jeudi vendredi samedi dimanche",
+            "mañana tarde noche hoy ayer mediodía medianoche lunes martes miércoles jueves "
+            "viernes sábado domingo",
+        ),
+        "company": _words(
+            "friends family kids children colleagues coworkers partner wife husband alone "
+            "girlfriend boyfriend",
+            "freunden freunde familie kinder kollegen kollegin partnerin frau mann allein "
+            "freundin freund",
+            "amis amies famille enfants collègues copine copain seul seule",
+            "amigos amigas familia niños hijos compañeros pareja esposa esposo solo sola",
+        ),
+    }
+
+    # Patterns that single words can't express (clock times, multi-word phrases)
+    PATTERNS: Dict[str, re.Pattern] = {
+        "time": re.compile(
+            r"\b\d{1,2}(:\d{2})?\s*(am|pm|uhr|h)\b|\b\d{1,2}:\d{2}\b", re.IGNORECASE
+        ),
+        "weather": re.compile(
+            r"\b(it'?s|es ist|il fait|hace)\s+(cold|hot|kalt|heiß|froid|chaud|frío|calor)\b",
+            re.IGNORECASE,
+        ),
+    }
+
+    # Words that indicate a preference statement (kept for the combined extractor)
+    PREFERENCE_WORDS: frozenset[str] = _words(
+        "like likes love loves hate hates prefer prefers enjoy enjoys dislike dislikes favorite "
+        "favourite want adore",
+        "mag mögen liebe liebt hasse hasst bevorzuge lieblings gern gerne möchte will "
+        "lieber",
+        "aime aimes adore adorer déteste préfère préfères envie veux",
+        "gusta gustan encanta encantan odio prefiero quiero favorito favorita",
+    )
+
+    _TOKEN = re.compile(r"[\w'-]+", re.UNICODE)
+    _WORD = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self):
+        """Initialize with zeroed counters."""
+        self.messages_total = 0
+        self.fast_path_total = 0
+
+    def _tokens(self, message: str) -> set[str]:
+        """Lowercase word tokens, both whole ("après-midi") and split ("l'école" -> "école")."""
+        lowered = message.lower()
+        return set(self._TOKEN.findall(lowered)) | set(self._WORD.findall(lowered))
+
+    def signals(self, message: str) -> set[str]:
+        """Get the situational signal categories present in a message.
+
+        Args:
+            message: User message
+
+        Returns:
+            set[str]: Categories such as "location", "mood" or "time"
+        """
+        tokens = self._tokens(message)
+        found = {category for category, words in self.LEXICONS.items() if tokens & words}
+        found.update(
+            category
+            for category, pattern in self.PATTERNS.items()
+            if category not in found and pattern.search(message)
+        )
+        return found
+
+    def has_situational_signal(self, message: str) -> bool:
+        """Check whether a message carries any situational signal.
+
+        Args:
+            message: User message
+
+        Returns:
+            bool: True if the LLM might find context beyond system context
+        """
+        return bool(self.signals(message))
+
+    def has_preference_signal(self, message: str) -> bool:
+        """Check whether a message might express a preference.
+
+        Args:
+            message: User message
+
+        Returns:
+            bool: True if the message contains preference vocabulary
+        """
+        return bool(self._tokens(message) & self.PREFERENCE_WORDS)
+
+    def record(self, fast_path: bool) -> None:
+        """Count a classification decision.
+
+        Args:
+            fast_path: Whether the LLM call was skipped
+        """
+        self.messages_total += 1
+        if fast_path:
+            self.fast_path_total += 1
+
+    @property
+    def fast_path_ratio(self) -> float:
+        """Share of messages that took the fast path."""
+        if not self.messages_total:
+            return 0.0
+        return self.fast_path_total / self.messages_total
+
+    def stats(self) -> Dict[str, Any]:
+        """Get fast path metrics.
+
+        Returns:
+            Dictionary with message count, fast path count and ratio
+        """
+        return {
+            "messages_total": self.messages_total,
+            "fast_path_total": self.fast_path_total,
+            "fast_path_ratio": self.fast_path_ratio,
+        }
+
+
+# Shared by all extractors in this process so the fast path ratio covers all users
+default_classifier = ContextSignalClassifier()
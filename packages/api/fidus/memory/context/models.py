@@ -5,9 +5,11 @@ that influences user preferences. Context factors are discovered dynamically
 by the LLM rather than using a fixed schema.
 """
 
-from typing import Optional
+from typing import Any, Optional
 from pydantic import BaseModel, Field, field_validator
 
+from fidus.memory.context.embedding_vector import EmbeddingVector
+
 
 class ContextFactors(BaseModel):
     """Context factors extracted from user message.
@@ -99,9 +101,9 @@ class Situation(BaseModel):
         description="Context factors for this situation"
     )
 
-    embedding: Optional[list[float]] = Field(
+    embedding: Optional[EmbeddingVector] = Field(
         default=None,
-        description="Vector embedding of the context for similarity search"
+        description="Vector embedding of the context for similarity search (compact float32)"
     )
 
     created_at: Optional[str] = Field(
@@ -140,3 +142,24 @@ class ContextExtractionResult(BaseModel):
         default=None,
         description="Optional explanation of why these factors were extracted"
     )
+
+
+class MessageAnalysis(BaseModel):
+    """Preferences and context extracted from a user message in one LLM call.
+
+    Preferences keep the shape produced by InMemoryAgent._extract_preferences
+    (domain, key, sentiment, value, confidence); context is the same
+    ContextExtractionResult that DynamicContextExtractor returns.
+    """
+
+    preferences: Optional[list[dict[str, Any]]] = Field(
+        default=None,
+        description=(
+            "Extracted preferences (domain, key, sentiment, value, confidence), "
+            "or None if the extractor only extracted context"
+        )
+    )
+
+    context: ContextExtractionResult = Field(
+        description="Extracted context factors with confidence"
+    )
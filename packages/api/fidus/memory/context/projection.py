@@ -0,0 +1,212 @@
+"""Dimension reduction for stored and searched embeddings.
+
+Context strings are short, so full model dimensionality (768-3072) is
+mostly wasted in Qdrant RAM, network payload and search time. A projection
+maps model vectors to a smaller size before storage and search:
+
+- Truncation: keep the first N dimensions (for Matryoshka-trained models
+  such as nomic-embed-text or text-embedding-3-*) and re-normalize.
+- PCA: a matrix fitted offline on existing situation vectors, loaded from
+  an ``.npz`` file with ``mean`` and ``components`` arrays.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from fidus.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingProjection(ABC):
+    """Maps model-dimension vectors to a reduced, L2-normalized space."""
+
+    #: Dimension of the model vectors this projection accepts
+    input_dimension: int
+
+    #: Dimension of the projected vectors
+    output_dimension: int
+
+    @abstractmethod
+    def _project(self, matrix: np.ndarray) -> np.ndarray:
+        """Project a float32 matrix of shape (n, input_dimension)."""
+
+    def apply(self, vectors: list[list[float]]) -> list[list[float]]:
+        """Project and re-normalize vectors.
+
+        Zero vectors (empty contexts) stay zero.
+
+        Args:
+            vectors: Model vectors of input_dimension
+
+        Returns:
+            list[list[float]]: Projected vectors of output_dimension
+
+        Raises:
+            ValueError: If a vector doesn't have input_dimension
+        """
+        if not vectors:
+            return []
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.input_dimension:
+            raise ValueError(
+                f"Projection dimension mismatch: expected {self.input_dimension}, "
+                f"got {matrix.shape[-1]}"
+            )
+
+        is_zero = ~matrix.any(axis=1, keepdims=True)
+        projected = self._project(matrix)
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        keep = (norms > 0.0) & ~is_zero
+        projected = np.divide(projected, norms, out=np.zeros_like(projected), where=keep)
+        return projected.tolist()
+
+
+class TruncationProjection(EmbeddingProjection):
+    """Matryoshka-style truncation to the leading dimensions."""
+
+    def __init__(self, input_dimension: int, output_dimension: int):
+        """Initialize truncation.
+
+        Args:
+            input_dimension: Model vector dimension
+            output_dimension: Number of leading dimensions to keep
+
+        Raises:
+            ValueError: If output_dimension is not in [1, input_dimension]
+        """
+        if not 0 < output_dimension <= input_dimension:
+            raise ValueError(
+                f"Invalid reduced dimension {output_dimension} for {input_dimension}-d embeddings"
+            )
+        self.input_dimension = input_dimension
+        self.output_dimension = output_dimension
+
+    def _project(self, matrix: np.ndarray) -> np.ndarray:
+        """Keep the leading output_dimension columns."""
+        return matrix[:, : self.output_dimension]
+
+
+class PCAProjection(EmbeddingProjection):
+    """Linear projection onto principal components fitted offline."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray):
+        """Initialize from a fitted mean and component matrix.
+
+        Args:
+            mean: Mean vector of shape (input_dimension,)
+            components: Matrix of shape (input_dimension, output_dimension)
+
+        Raises:
+            ValueError: If the shapes are inconsistent
+        """
+        if components.ndim != 2 or mean.shape != (components.shape[0],):
+            raise ValueError(
+                f"Invalid PCA shapes: mean {mean.shape}, components {components.shape}"
+            )
+        self.mean = mean.astype(np.float32, copy=False)
+        self.components = components.astype(np.float32, copy=False)
+        self.input_dimension = int(components.shape[0])
+        self.output_dimension = int(components.shape[1])
+
+    def _project(self, matrix: np.ndarray) -> np.ndarray:
+        """Center and multiply by the component matrix."""
+        return (matrix - self.mean) @ self.components
+
+    @classmethod
+    def fit(cls, vectors: list[list[float]], output_dimension: int) -> "PCAProjection":
+        """Fit a PCA projection on existing (e.g. Qdrant) vectors.
+
+        Args:
+            vectors: Sample of model vectors, at least output_dimension of them
+            output_dimension: Number of principal components to keep
+
+        Returns:
+            PCAProjection: Fitted projection
+
+        Raises:
+            ValueError: If there are fewer samples than components
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.shape[0] < output_dimension:
+            raise ValueError(
+                f"Need at least {output_dimension} vectors to fit PCA, got {matrix.shape[0]}"
+            )
+
+        mean = matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+        return cls(mean=mean, components=vt[:output_dimension].T)
+
+    @classmethod
+    def load(cls, path: str) -> "PCAProjection":
+        """Load a projection saved with save().
+
+        Args:
+            path: Path to an ``.npz`` file
+
+        Returns:
+            PCAProjection: Loaded projection
+        """
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(mean=data["mean"], components=data["components"])
+
+    def save(self, path: str) -> None:
+        """Save the projection as ``.npz``.
+
+        Args:
+            path: Target file path
+        """
+        np.savez(Path(path), mean=self.mean, components=self.components)
+
+
+def get_embedding_projection(input_dimension: int) -> Optional[EmbeddingProjection]:
+    """Build the projection configured for this process.
+
+    Uses FIDUS_EMBEDDING_PROJECTION_PATH (PCA) if set, otherwise truncation
+    to FIDUS_EMBEDDING_REDUCED_DIM. Returns None when no reduction is set.
+
+    Args:
+        input_dimension: Dimension of the embedding model vectors
+
+    Returns:
+        Optional[EmbeddingProjection]: Projection, or None for full dimensionality
+
+    Raises:
+        ValueError: If the PCA file doesn't match the model or reduced dimension
+    """
+    if config.embedding_projection_path:
+        projection: EmbeddingProjection = PCAProjection.load(config.embedding_projection_path)
+        if projection.input_dimension != input_dimension:
+            raise ValueError(
+                f"PCA projection expects {projection.input_dimension}-d embeddings, "
+                f"model produces {input_dimension}-d"
+            )
+    elif config.embedding_reduced_dimension:
+        if config.embedding_reduced_dimension >= input_dimension:
+            return None
+        projection = TruncationProjection(input_dimension, config.embedding_reduced_dimension)
+    else:
+        return None
+
+    if (
+        config.embedding_reduced_dimension
+        and projection.output_dimension != config.embedding_reduced_dimension
+    ):
+        raise ValueError(
+            f"Projection output dimension {projection.output_dimension} does not match "
+            f"FIDUS_EMBEDDING_REDUCED_DIM={config.embedding_reduced_dimension}"
+        )
+
+    logger.info(
+        f"Using {type(projection).__name__}",
+        extra={
+            "input_dimension": projection.input_dimension,
+            "output_dimension": projection.output_dimension,
+        },
+    )
+    return projection
@@ -0,0 +1,360 @@
+"""Tail-latency protection for model calls: hedging and circuit breaking.
+
+Local Ollama latency is spiky under load, and p99 chat latency is dominated
+by these outliers. This module provides:
+
+- LatencyTracker: rolling latency window with percentile lookup
+- hedged(): start a duplicate call when the first one exceeds a deadline
+  and keep whichever finishes first
+- CircuitBreaker: stop calling a backend that keeps failing or is
+  persistently slow, so callers can switch to a degraded path
+- ResiliencePolicy: combines the three, shared per backend via get_policy()
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from fidus.config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class LatencyTracker:
+    """Rolling window of call latencies."""
+
+    def __init__(self, window_size: int = 200):
+        """Initialize the tracker.
+
+        Args:
+            window_size: Number of most recent samples to keep
+        """
+        self._samples: deque[float] = deque(maxlen=window_size)
+
+    def __len__(self) -> int:
+        """Number of samples in the window."""
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Record a call latency.
+
+        Args:
+            seconds: Call duration in seconds
+        """
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Get a latency percentile (nearest-rank).
+
+        Args:
+            percentile: Percentile in (0, 100]
+
+        Returns:
+            Latency in seconds, or None without samples
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, int(round(percentile / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker.
+
+    The circuit opens after failure_threshold consecutive failures, where a
+    call slower than slow_call_seconds counts as a failure. After
+    recovery_seconds one probe call is let through (half-open); its outcome
+    closes or re-opens the circuit. A cancelled probe has no outcome and
+    lets the next call probe instead.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_seconds: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            name: Backend name for logging
+            failure_threshold: Consecutive failures before opening
+                (defaults to config.circuit_breaker_failure_threshold)
+            recovery_seconds: Time before a probe is allowed
+                (defaults to config.circuit_breaker_recovery_seconds)
+            slow_call_seconds: Latency counted as a failure
+                (defaults to config.circuit_breaker_slow_call_seconds)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or config.circuit_breaker_failure_threshold
+        self.recovery_seconds = (
+            config.circuit_breaker_recovery_seconds
+            if recovery_seconds is None
+            else recovery_seconds
+        )
+        self.slow_call_seconds = (
+            config.circuit_breaker_slow_call_seconds
+            if slow_call_seconds is None
+            else slow_call_seconds
+        )
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected_calls = 0
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected."""
+        return (
+            self.state == self.OPEN
+            and self.opened_at is not None
+            and time.monotonic() - self.opened_at < self.recovery_seconds
+        )
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed (moves open -> half-open after recovery).
+
+        Returns:
+            bool: True if the call may proceed
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and not self.is_open:
+            self.state = self.HALF_OPEN
+            logger.info(f"Circuit half-open, probing backend", extra={"backend": self.name})
+            return True
+        # Open, or half-open with a probe already in flight
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self, seconds: float) -> None:
+        """Record a completed call.
+
+        Args:
+            seconds: Call duration in seconds
+        """
+        if seconds > self.slow_call_seconds:
+            self.record_failure()
+            return
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit closed", extra={"backend": self.name})
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Record a failed or too-slow call."""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    f"Circuit opened",
+                    extra={
+                        "backend": self.name,
+                        "consecutive_failures": self.consecutive_failures,
+                    },
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        """Record a call cancelled before it finished (e.g. client disconnect).
+
+        Its outcome is unknown, so it counts as neither success nor failure.
+        A cancelled probe frees the half-open slot: the circuit goes back to
+        open with its recovery time already passed, so the next call probes.
+        """
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+
+async def hedged(call: Callable[[], Awaitable[T]], hedge_delay: Optional[float]) -> T:
+    """Run a call and start one duplicate if it hasn't finished by hedge_delay.
+
+    The first successful result wins and the other attempt is cancelled. If
+    one attempt fails, the other one is still awaited.
+
+    Args:
+        call: Zero-argument coroutine factory (called once per attempt)
+        hedge_delay: Seconds before the duplicate is sent (None disables hedging)
+
+    Returns:
+        Result of the first successful attempt
+
+    Raises:
+        Exception: The last error if all attempts fail
+    """
+    if hedge_delay is None:
+        return await call()
+
+    tasks = {asyncio.ensure_future(call())}
+    hedge_sent = False
+    last_error: Optional[BaseException] = None
+
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                tasks,
+                timeout=None if hedge_sent else hedge_delay,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if not done:
+                # Deadline passed without a result: send the duplicate
+                hedge_sent = True
+                tasks.add(asyncio.ensure_future(call()))
+                continue
+
+            for task in done:
+                tasks.discard(task)
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+
+            if not tasks:
+                # Failures are not hedged; retries are the caller's job
+                raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class ResiliencePolicy:
+    """Hedging + circuit breaking for one backend.
+
+    Example:
+        policy = get_policy("embedding:ollama/bge-m3")
+        vectors = await policy.call(lambda: provider_call(texts))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        hedging_enabled: Optional[bool] = None,
+        hedge_percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """Initialize the policy.
+
+        Args:
+            name: Backend name for logging and metrics
+            hedging_enabled: Send duplicates for slow calls (defaults to config.hedging_enabled)
+            hedge_percentile: Latency percentile used as hedge deadline
+                (defaults to config.hedging_percentile)
+            min_samples: Samples required before hedging starts
+                (defaults to config.hedging_min_samples)
+            breaker: Circuit breaker (defaults to a new CircuitBreaker)
+        """
+        self.name = name
+        self.hedging_enabled = (
+            config.hedging_enabled if hedging_enabled is None else hedging_enabled
+        )
+        self.hedge_percentile = hedge_percentile or config.hedging_percentile
+        self.min_samples = config.hedging_min_samples if min_samples is None else min_samples
+        self.breaker = breaker or CircuitBreaker(name)
+        self.latency = LatencyTracker()
+
+        self.calls_total = 0
+        self.hedges_sent = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Current hedge deadline, or None if hedging is off or still warming up.
+
+        Returns:
+            Seconds before a duplicate is sent, or None
+        """
+        if not self.hedging_enabled or len(self.latency) < self.min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    async def call(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run a call with hedging and circuit breaking.
+
+        Args:
+            call: Zero-argument coroutine factory
+
+        Returns:
+            Result of the call
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: If the call fails
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {self.name}")
+
+        self.calls_total += 1
+        delay = self.hedge_delay()
+
+        attempts = 0
+
+        async def counted_call() -> T:
+            nonlocal attempts
+            attempts += 1
+            return await call()
+
+        started = time.monotonic()
+        try:
+            result = await hedged(counted_call, delay)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.hedges_sent += max(0, attempts - 1)
+
+        elapsed = time.monotonic() - started
+        self.latency.record(elapsed)
+        self.breaker.record_success(elapsed)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Get latency and breaker metrics.
+
+        Returns:
+            Dictionary with calls, hedges, percentiles and breaker state
+        """
+        return {
+            "calls_total": self.calls_total,
+            "hedges_sent": self.hedges_sent,
+            "p50_seconds": self.latency.percentile(50),
+            "p99_seconds": self.latency.percentile(99),
+            "circuit_state": self.breaker.state,
+            "rejected_calls": self.breaker.rejected_calls,
+        }
+
+
+# One policy per backend, shared by all service instances in this process
+_policies: Dict[str, ResiliencePolicy] = {}
+
+
+def get_policy(name: str) -> ResiliencePolicy:
+    """Get the process-wide policy for a backend.
+
+    Args:
+        name: Backend name, e.g. "embedding:ollama/bge-m3"
+
+    Returns:
+        ResiliencePolicy: Shared policy
+    """
+    if name not in _policies:
+        _policies[name] = ResiliencePolicy(name)
+    return _policies[name]
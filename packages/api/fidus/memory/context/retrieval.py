@@ -11,6 +11,7 @@ from qdrant_client import QdrantClient
 from qdrant_client.models import Filter, FieldCondition, MatchValue, ScoredPoint
 
 from fidus.config import config
+from fidus.infrastructure.resources import Resources
 from fidus.memory.context.models import ContextFactors, Situation
 
 logger = logging.getLogger(__name__)
@@ -36,12 +37,21 @@ class ContextRetrievalService:
 
     COLLECTION_NAME = "situations"
 
-    def __init__(self, qdrant_client: Optional[QdrantClient] = None):
+    def __init__(
+        self,
+        qdrant_client: Optional[QdrantClient] = None,
+        resources: Optional[Resources] = None,
+    ):
         """Initialize the context retrieval service.
 
         Args:
-            qdrant_client: Qdrant client (defaults to new instance)
+            qdrant_client: Qdrant client (defaults to the shared client,
+                or a new instance without resources)
+            resources: Shared connection pools (not closed by close())
         """
+        self.resources = resources
+        if resources is not None:
+            qdrant_client = qdrant_client or resources.qdrant_client
         self.qdrant_client = qdrant_client or QdrantClient(
             host=config.qdrant_host,
             port=config.qdrant_port,
@@ -50,6 +60,13 @@ class ContextRetrievalService:
 
         logger.info("Initialized ContextRetrievalService")
 
+    def close(self) -> None:
+        """Close the Qdrant connection (a shared client stays open)."""
+        if self.resources is not None:
+            return
+        self.qdrant_client.close()
+        logger.info("ContextRetrievalService connections closed")
+
     def find_similar_situations(
         self,
         query_embedding: list[float],
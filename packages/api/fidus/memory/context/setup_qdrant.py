@@ -4,6 +4,7 @@ This module provides functionality to initialize Qdrant collections for storing
 situation embeddings with proper schema and multi-tenancy support.
 """
 
+import asyncio
 import logging
 from typing import Optional
 
@@ -12,6 +13,9 @@ from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
 from fidus.config import config
+from fidus.infrastructure.resources import Resources
+from fidus.memory.context.embedding_service import EmbeddingService, get_embedding_service
+from fidus.memory.context.models import ContextFactors
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,7 @@ class QdrantSetup:
         host: Optional[str] = None,
         port: Optional[int] = None,
         grpc_port: Optional[int] = None,
+        resources: Optional[Resources] = None,
     ):
         """Initialize Qdrant setup client.
 
@@ -33,11 +38,17 @@ class QdrantSetup:
             host: Qdrant host (defaults to config.qdrant_host)
             port: Qdrant HTTP port (defaults to config.qdrant_port)
             grpc_port: Qdrant gRPC port (defaults to config.qdrant_grpc_port)
+            resources: Shared connection pools (uses the shared client instead
+                of opening one)
         """
         self.host = host or config.qdrant_host
         self.port = port or config.qdrant_port
         self.grpc_port = grpc_port or config.qdrant_grpc_port
 
+        if resources is not None:
+            self.client = resources.qdrant_client
+            return
+
         self.client = QdrantClient(
             host=self.host,
             port=self.port,
@@ -71,8 +82,8 @@ class QdrantSetup:
                     logger.info(f"Collection already exists: {self.COLLECTION_NAME}")
                     return False
 
-            # Get embedding dimension from config
-            vector_size = config.get_embedding_dimension()
+            # Get vector size from config (reduced dimension if a projection is configured)
+            vector_size = config.get_vector_size()
             logger.info(f"Creating collection with vector size: {vector_size}")
 
             # Create collection with cosine distance metric
@@ -137,6 +148,68 @@ class QdrantSetup:
             logger.error(f"Failed to delete collection: {e}")
             raise
 
+    async def reembed_points(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        batch_size: int = 64,
+    ) -> int:
+        """Re-embed stored situations with the current embedding mode.
+
+        Migration path when switching config.embedding_mode (e.g. from "text"
+        to "compositional"). Vectors are rebuilt from the "factors" payload,
+        so no data outside Qdrant is needed. Points already tagged with the
+        target mode are skipped, which makes the migration resumable.
+
+        Args:
+            embedding_service: Service producing the new vectors (defaults to the
+                process-wide service using config.embedding_mode)
+            batch_size: Number of points to scroll and re-embed per batch
+
+        Returns:
+            int: Number of points re-embedded
+        """
+        embedding_service = embedding_service or get_embedding_service()
+        target_mode = embedding_service.mode
+        migrated = 0
+        offset = None
+
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.COLLECTION_NAME,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+
+            stale = [
+                point for point in points if point.payload.get("embedding_mode") != target_mode
+            ]
+            if stale:
+                vectors = await embedding_service.generate_embeddings_batch(
+                    contexts=[ContextFactors(factors=point.payload["factors"]) for point in stale],
+                    tenant_id="migration",
+                    user_id="migration",
+                )
+                self.client.upsert(
+                    collection_name=self.COLLECTION_NAME,
+                    points=[
+                        qdrant_models.PointStruct(
+                            id=point.id,
+                            vector=vector,
+                            payload={**point.payload, "embedding_mode": target_mode},
+                        )
+                        for point, vector in zip(stale, vectors)
+                    ],
+                )
+                migrated += len(stale)
+                logger.info(f"Re-embedded {migrated} points (mode: {target_mode})")
+
+            if offset is None:
+                break
+
+        return migrated
+
     def collection_info(self) -> dict:
         """Get information about the situations collection.
 
@@ -172,13 +245,14 @@ class QdrantSetup:
             return False
 
 
-def setup_qdrant(recreate: bool = False) -> None:
+def setup_qdrant(recreate: bool = False, reembed: bool = False) -> None:
     """Setup Qdrant collection for Fidus Memory.
 
     This is a convenience function for command-line usage.
 
     Args:
         recreate: If True, delete and recreate the collection
+        reembed: If True, re-embed existing points with config.embedding_mode
     """
     logging.basicConfig(level=logging.INFO)
 
@@ -198,6 +272,10 @@ def setup_qdrant(recreate: bool = False) -> None:
             logger.info(f"Collection info: {info}")
         else:
             logger.info("Collection already exists. Use recreate=True to recreate.")
+
+        if reembed:
+            migrated = asyncio.run(setup.reembed_points())
+            logger.info(f"Re-embedding completed: {migrated} points updated")
     except Exception as e:
         logger.error(f"Setup failed: {e}")
         raise
@@ -207,4 +285,5 @@ if __name__ == "__main__":
     import sys
 
     recreate = "--recreate" in sys.argv
-    setup_qdrant(recreate=recreate)
+    reembed = "--reembed" in sys.argv
+    setup_qdrant(recreate=recreate, reembed=reembed)
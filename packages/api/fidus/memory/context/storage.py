@@ -15,7 +15,8 @@ from qdrant_client import QdrantClient
 from qdrant_client.models import PointStruct
 
 from fidus.config import config
-from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.infrastructure.resources import Resources
+from fidus.memory.context.embedding_service import EmbeddingService, get_embedding_service
 from fidus.memory.context.models import ContextFactors, Situation
 
 logger = logging.getLogger(__name__)
@@ -47,14 +48,22 @@ class ContextStorageService:
         neo4j_driver: Optional[AsyncDriver] = None,
         qdrant_client: Optional[QdrantClient] = None,
         embedding_service: Optional[EmbeddingService] = None,
+        resources: Optional[Resources] = None,
     ):
         """Initialize the context storage service.
 
         Args:
-            neo4j_driver: Neo4j async driver (defaults to new instance)
-            qdrant_client: Qdrant client (defaults to new instance)
-            embedding_service: Embedding service (defaults to new instance)
+            neo4j_driver: Neo4j async driver (defaults to the shared driver,
+                or a new instance without resources)
+            qdrant_client: Qdrant client (defaults to the shared client,
+                or a new instance without resources)
+            embedding_service: Embedding service (defaults to the process-wide service)
+            resources: Shared connection pools (not closed by close())
         """
+        self.resources = resources
+        if resources is not None:
+            neo4j_driver = neo4j_driver or resources.neo4j_driver
+            qdrant_client = qdrant_client or resources.qdrant_client
         self.neo4j_driver = neo4j_driver or AsyncGraphDatabase.driver(
             config.neo4j_uri,
             auth=(config.neo4j_user, config.neo4j_password),
@@ -64,13 +73,16 @@ class ContextStorageService:
             port=config.qdrant_port,
             grpc_port=config.qdrant_grpc_port,
         )
-        self.embedding_service = embedding_service or EmbeddingService()
+        self.embedding_service = embedding_service or get_embedding_service()
 
         logger.info("Initialized ContextStorageService")
 
     async def close(self) -> None:
-        """Close database connections."""
+        """Close database connections (shared connections stay open)."""
+        if self.resources is not None:
+            return
         await self.neo4j_driver.close()
+        self.qdrant_client.close()
         logger.info("ContextStorageService connections closed")
 
     async def store_situation(
@@ -252,6 +264,8 @@ class ContextStorageService:
                 "tenant_id": tenant_id,
                 "user_id": user_id,
                 "factors": context.factors,
+                # Lets QdrantSetup.reembed_points() find points from another mode
+                "embedding_mode": self.embedding_service.mode,
                 "created_at": timestamp,
                 "updated_at": timestamp,
             },
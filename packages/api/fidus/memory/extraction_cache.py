@@ -0,0 +1,210 @@
+"""Cache for LLM preference and context extraction results.
+
+Greetings and recurring phrases ("good morning"), MCP get_context
+auto-learning and client retries re-run identical extractions. Results are
+cached by normalized message, model, extraction kind and the coarse time
+bucket the prompt depends on, in a TTL-bounded in-process LRU and an
+optional Redis tier shared by all API processes.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from fidus.config import config
+from fidus.infrastructure.memory_cache import LRUCache
+from fidus.infrastructure.redis.session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def current_datetime_bucket() -> str:
+    """Current date and hour as injected into extraction prompts.
+
+    Hour resolution is enough for the temporal factors the LLM infers
+    (time_of_day, day_of_week, season) and keeps prompts, and therefore
+    cache keys, stable within the hour.
+
+    Returns:
+        str: e.g. "Monday, 2025-01-13 09:00 CET"
+    """
+    # Europe/Berlin by default, as in the chat prompt
+    timezone = os.getenv("TZ", "Europe/Berlin")
+    try:
+        tz = ZoneInfo(timezone)
+        return datetime.now(tz).strftime("%A, %Y-%m-%d %H:00 %Z")
+    except Exception:
+        # Fallback to UTC if timezone not found
+        return datetime.now().strftime("%A, %Y-%m-%d %H:00 UTC")
+
+
+class ExtractionCache:
+    """Two-tier (in-process LRU + Redis) cache for extraction results.
+
+    Values are JSON-serializable dicts. get() returns a copy, so callers
+    may mutate results (e.g. preference validation) without touching the
+    cached entry.
+
+    Example:
+        cache = ExtractionCache()
+        result = await cache.get("context", "ollama/llama3.2", message, bucket)
+        if result is None:
+            result = ...  # call the LLM
+            await cache.set("context", "ollama/llama3.2", message, result, bucket)
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        session_cache: Optional[SessionCache] = None,
+    ):
+        """Initialize the extraction cache.
+
+        Args:
+            max_size: In-process LRU capacity (defaults to config.extraction_cache_size)
+            ttl_seconds: Entry lifetime in both tiers
+                (defaults to config.extraction_cache_ttl_seconds)
+            session_cache: Connected SessionCache for the Redis tier (optional)
+        """
+        self.ttl_seconds = (
+            config.extraction_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self._memory: LRUCache[Dict[str, Any]] = LRUCache(
+            max_size=config.extraction_cache_size if max_size is None else max_size,
+            ttl_seconds=self.ttl_seconds,
+        )
+        self.session_cache = session_cache
+
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Normalize a message so trivially different spellings share an entry.
+
+        Applies NFKC, case folding, whitespace collapsing and strips trailing
+        periods and exclamation marks ("Good  morning!" == "good morning").
+
+        Args:
+            message: User message
+
+        Returns:
+            str: Normalized message
+        """
+        normalized = unicodedata.normalize("NFKC", message).casefold()
+        normalized = _WHITESPACE.sub(" ", normalized).strip()
+        return normalized.rstrip(".! ")
+
+    @classmethod
+    def make_key(cls, kind: str, model: str, message: str, bucket: str = "") -> str:
+        """Build the content address for an extraction.
+
+        Args:
+            kind: Extraction kind, e.g. "context", "analysis" or "preferences"
+            model: LLM model name
+            message: User message (normalized here)
+            bucket: Time bucket the prompt depends on ("" if none)
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        material = f"{kind}\n{model}\n{bucket}\n{cls.normalize(message)}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(
+        self, kind: str, model: str, message: str, bucket: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """Look up a cached result, promoting Redis hits into the LRU.
+
+        Args:
+            kind: Extraction kind
+            model: LLM model name
+            message: User message
+            bucket: Time bucket the prompt depends on
+
+        Returns:
+            Copy of the cached result, or None on miss
+        """
+        key = self.make_key(kind, model, message, bucket)
+
+        result = self._memory.get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return copy.deepcopy(result)
+
+        if self.session_cache is not None:
+            try:
+                result = await self.session_cache.get_cached_extraction(key)
+            except Exception as e:
+                # Redis is an optimization; never fail extraction because of it
+                logger.warning(f"Extraction cache Redis lookup failed: {e}")
+                result = None
+
+            if result is not None:
+                self.redis_hits += 1
+                self._memory.set(key, result)
+                return copy.deepcopy(result)
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self,
+        kind: str,
+        model: str,
+        message: str,
+        result: Dict[str, Any],
+        bucket: str = "",
+    ) -> None:
+        """Store a result in both tiers.
+
+        Args:
+            kind: Extraction kind
+            model: LLM model name
+            message: User message
+            result: JSON-serializable extraction result
+            bucket: Time bucket the prompt depends on
+        """
+        key = self.make_key(kind, model, message, bucket)
+        self._memory.set(key, copy.deepcopy(result))
+
+        if self.session_cache is not None:
+            try:
+                await self.session_cache.cache_extraction(key, result, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Extraction cache Redis write failed: {e}")
+
+    def clear(self) -> None:
+        """Remove all entries from the in-process tier (Redis entries expire by TTL)."""
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for both tiers.
+
+        Returns:
+            Dictionary with memory_hits, redis_hits, misses, hit_rate and LRU size
+        """
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        hits = self.memory_hits + self.redis_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "memory_max_size": self._memory.max_size,
+        }
+
+
+# Shared by all agents and extractors in this process (results are content-addressed)
+default_extraction_cache = ExtractionCache()
@@ -0,0 +1,234 @@
+"""Background learning queue for preference extraction and persistence.
+
+Preference extraction, conflict checks, Neo4j writes and situation
+recording (embedding + Qdrant upsert) don't affect the current response,
+but running them inline makes every chat turn pay for them. LearningQueue
+is a bounded per-process queue drained by a pool of worker tasks. Jobs for
+the same user run one at a time and in order, because they update that
+user's agent state. Learning events (preferences_updated,
+preference_conflict) are buffered per user until the next chat stream or
+a poll of /memory/learning/events picks them up; buffers of users who never
+come back are dropped (least recently used first, or after a TTL).
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from fidus.config import config
+from fidus.infrastructure.memory_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Callback a job uses to publish learning events for its user
+EmitEvent = Callable[[Dict[str, Any]], None]
+
+# A job receives the emit callback and performs the learning for one message
+LearningJob = Callable[[EmitEvent], Awaitable[None]]
+
+
+class LearningQueue:
+    """Bounded queue of learning jobs with a worker pool.
+
+    Example:
+        queue = LearningQueue()
+        queue.start()
+        if not queue.submit(user_id, job):
+            await job(emit)  # queue full or not running: learn inline
+        ...
+        events = queue.pop_events(user_id)
+    """
+
+    # Buffered learning events per user (oldest dropped first)
+    MAX_EVENTS_PER_USER = 100
+
+    def __init__(self, max_size: Optional[int] = None, workers: Optional[int] = None):
+        """Initialize the queue (call start() from a running event loop).
+
+        Args:
+            max_size: Maximum number of queued jobs (defaults to config.learning_queue_size)
+            workers: Number of worker tasks (defaults to config.learning_workers)
+        """
+        self.max_size = config.learning_queue_size if max_size is None else max_size
+        self.workers = max(1, config.learning_workers if workers is None else workers)
+
+        self._queue: Optional[asyncio.Queue[Tuple[str, LearningJob]]] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        # Locks of users with queued or running jobs (dropped once they finish)
+        self._user_locks: Dict[str, asyncio.Lock] = {}
+        # Jobs per user that are queued or running
+        self._user_jobs: Dict[str, int] = {}
+        self._events: LRUCache[Deque[Dict[str, Any]]] = LRUCache(
+            max_size=config.learning_events_max_users,
+            ttl_seconds=config.learning_events_ttl_seconds,
+        )
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        """True while workers are accepting jobs."""
+        return self._queue is not None
+
+    def start(self) -> None:
+        """Start the worker pool on the running event loop."""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(self._queue), name=f"learning-worker-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(f"Started learning queue with {self.workers} workers")
+
+    async def stop(self, drain_timeout: Optional[float] = None) -> None:
+        """Stop accepting jobs, let queued jobs finish, then stop the workers.
+
+        Args:
+            drain_timeout: Seconds to wait for queued jobs
+                (defaults to config.learning_drain_timeout_seconds)
+        """
+        if not self.running:
+            return
+
+        queue, self._queue = self._queue, None
+        timeout = config.learning_drain_timeout_seconds if drain_timeout is None else drain_timeout
+        try:
+            await asyncio.wait_for(queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {queue.qsize()} learning jobs after {timeout}s drain timeout")
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        # Jobs dropped after the drain timeout never finish
+        self._user_jobs.clear()
+        self._user_locks.clear()
+        logger.info("Stopped learning queue")
+
+    def submit(self, user_id: str, job: LearningJob) -> bool:
+        """Queue a learning job.
+
+        Args:
+            user_id: User the job learns for (jobs per user run in order)
+            job: Coroutine factory receiving the emit callback
+
+        Returns:
+            bool: False if the queue is not running or full; the caller should
+                then learn inline instead of losing the message
+        """
+        if self._queue is None:
+            return False
+
+        try:
+            self._queue.put_nowait((user_id, job))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(
+                "Learning queue full, learning inline", extra={"user_id": user_id}
+            )
+            return False
+
+        self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+        self.submitted += 1
+        return True
+
+    def publish(self, user_id: str, event: Dict[str, Any]) -> None:
+        """Buffer a learning event for a user.
+
+        Args:
+            user_id: User the event belongs to
+            event: Event payload, e.g. {"type": "preferences_updated", "count": 1}
+        """
+        events = self._events.get(user_id)
+        if events is None:
+            events = deque(maxlen=self.MAX_EVENTS_PER_USER)
+        events.append(event)
+        # Set again so the TTL counts from the latest event
+        self._events.set(user_id, events)
+
+    def pop_events(self, user_id: str) -> List[Dict[str, Any]]:
+        """Take all buffered learning events for a user.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Events in the order they were published
+        """
+        events = self._events.get(user_id)
+        self._events.delete(user_id)
+        return list(events) if events else []
+
+    def pending(self) -> int:
+        """Number of queued jobs not yet picked up by a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def pending_for(self, user_id: str) -> int:
+        """Number of a user's jobs that are queued or running.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            int: Unfinished jobs of the user
+        """
+        return self._user_jobs.get(user_id, 0)
+
+    async def join(self) -> None:
+        """Wait until all queued jobs are processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue metrics.
+
+        Returns:
+            Dictionary with queue depth, worker count and job counters
+        """
+        return {
+            "running": self.running,
+            "pending": self.pending(),
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        """Process jobs until cancelled.
+
+        Args:
+            queue: Job queue (kept after stop() detaches it, to drain)
+        """
+        while True:
+            user_id, job = await queue.get()
+            try:
+                lock = self._user_locks.setdefault(user_id, asyncio.Lock())
+                async with lock:
+                    await job(lambda event: self.publish(user_id, event))
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Learning job failed: {e}", extra={"user_id": user_id})
+            finally:
+                remaining = self._user_jobs.get(user_id, 0) - 1
+                if remaining > 0:
+                    self._user_jobs[user_id] = remaining
+                else:
+                    # No job of the user is left to wait on the lock
+                    self._user_jobs.pop(user_id, None)
+                    self._user_locks.pop(user_id, None)
+                queue.task_done()
+
+
+# Shared by all agents in this process (started and stopped by main.py)
+default_learning_queue = LearningQueue()
@@ -358,9 +358,8 @@ class PreferenceMCPServer:
                 if not self.agent.context_agent:
                     return "Context awareness is disabled"
 
-                # Query Neo4j for situations
-                from fidus.memory.context.storage import ContextStorageService
-                storage = ContextStorageService()
+                # Query Neo4j for situations (through the agent's storage connection)
+                storage = self.agent.context_agent.storage
 
                 async with storage.neo4j_driver.session() as session:
                     result = await session.run(
@@ -543,8 +542,8 @@ class PreferenceMCPServer:
         if not self.agent.context_agent:
             return "Context awareness is disabled"
 
-        from fidus.memory.context.storage import ContextStorageService
-        storage = ContextStorageService()
+        # Query through the agent's storage connection
+        storage = self.agent.context_agent.storage
 
         async with storage.neo4j_driver.session() as session:
             result = await session.run(
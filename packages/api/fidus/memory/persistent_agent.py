@@ -5,12 +5,17 @@ confidence scoring, accept/reject functionality, and context-aware
 preference learning (Phase 3: Situational Context Awareness).
 """
 
-import json
+import asyncio
 import logging
-from typing import Dict, List, Any, AsyncGenerator
+from typing import Dict, List, Any, Optional
+from fidus.memory.agent_actor import TurnContext, serialized
 from fidus.memory.simple_agent import InMemoryAgent
 from fidus.infrastructure.neo4j_client import Neo4jPreferenceStore
+from fidus.infrastructure.neo4j_taxonomy import Neo4jTaxonomyStore
+from fidus.infrastructure.resources import Resources
 from fidus.memory.context.agent import ContextAwareAgent
+from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.memory.context.models import ContextFactors
 from fidus.config import config
 
 logger = logging.getLogger(__name__)
@@ -21,11 +26,13 @@ class PersistentAgent(InMemoryAgent):
 
     Extends InMemoryAgent to add:
     - Neo4j persistence for preferences
+    - Neo4j concept taxonomy for LLM-free relatedness lookups
     - Confidence scoring (+0.1 on accept, -0.15 on reject)
     - Accept/reject actions for user feedback
     - Multi-tenant support
     - **Phase 3: Situational context awareness**
       - Context extraction from messages (LLM + system)
+      - One combined LLM call per message for preferences and context
       - Context-based preference storage (Neo4j + Qdrant)
       - Context-based preference retrieval (similarity search)
     """
@@ -36,6 +43,8 @@ class PersistentAgent(InMemoryAgent):
         llm_model: str | None = None,
         max_history_messages: int = 20,
         enable_context_awareness: bool = True,
+        resources: Optional[Resources] = None,
+        embedding_service: Optional[EmbeddingService] = None,
     ):
         """Initialize persistent agent.
 
@@ -44,35 +53,71 @@ class PersistentAgent(InMemoryAgent):
             llm_model: LLM model to use (defaults to config)
             max_history_messages: Conversation history window size
             enable_context_awareness: Enable Phase 3 context-aware features (default: True)
+            resources: Shared connection pools (the agent's stores and services
+                open their own connections if omitted)
+            embedding_service: Embedding service for context storage and retrieval
+                (defaults to the process-wide service)
         """
         super().__init__(llm_model=llm_model, max_history_messages=max_history_messages)
         self.tenant_id = tenant_id
-        self.store = Neo4jPreferenceStore(config)
+        self.store = Neo4jPreferenceStore(config, resources=resources)
+        # Concept taxonomy: seeded relations are shared, learned ones per tenant
+        if config.taxonomy_enabled:
+            self.taxonomy = Neo4jTaxonomyStore(config, resources=resources)
         self._connected = False
         self.enable_context_awareness = enable_context_awareness
+        self.mailbox.name = tenant_id
 
         # Initialize ContextAwareAgent for Phase 3
         if enable_context_awareness:
-            self.context_agent = ContextAwareAgent()
+            self.context_agent = ContextAwareAgent(
+                embedding_service=embedding_service, resources=resources
+            )
             logger.info("Context-awareness enabled (Phase 3)")
         else:
             self.context_agent = None
             logger.info("Context-awareness disabled")
 
     async def connect(self) -> None:
-        """Connect to Neo4j database."""
+        """Connect to Neo4j database.
+
+        Concurrent first requests connect once: the connection is made in
+        the mailbox, connected agents return immediately.
+        """
+        if not self._connected:
+            await self.mailbox.call(self._connect)
+
+    async def _connect(self) -> None:
         if not self._connected:
             await self.store.connect()
             self._connected = True
             logger.info(f"Connected to Neo4j for tenant: {self.tenant_id}")
 
+            if self.taxonomy is not None:
+                try:
+                    await self.taxonomy.connect()
+                except Exception as e:
+                    # Conflict checks fall back to the LLM
+                    logger.warning(f"Preference taxonomy unavailable: {e}")
+                    self.taxonomy = None
+
             # Load existing preferences from Neo4j
             await self._load_preferences()
 
     async def disconnect(self) -> None:
-        """Disconnect from Neo4j database and close context agent."""
+        """Disconnect from Neo4j database and close context agent.
+
+        Waits for queued turns and pending inline learning tasks first, so
+        their writes still reach Neo4j.
+        """
+        await self.mailbox.join()
+        if self._learning_tasks:
+            await asyncio.gather(*self._learning_tasks, return_exceptions=True)
+
         if self._connected:
             await self.store.disconnect()
+            if self.taxonomy is not None:
+                await self.taxonomy.disconnect()
             self._connected = False
             logger.info("Disconnected from Neo4j")
 
@@ -88,9 +133,9 @@ class PersistentAgent(InMemoryAgent):
 
         preferences = await self.store.get_preferences(self.tenant_id)
 
-        # Convert Neo4j format to in-memory format
+        # Convert Neo4j format to in-memory format (oldest first, as learned)
         self.preferences = {}
-        for pref in preferences:
+        for pref in reversed(preferences):
             key = pref["key"]
             self.preferences[key] = {
                 "value": pref.get("value", ""),
@@ -99,17 +144,26 @@ class PersistentAgent(InMemoryAgent):
                 "is_exception": pref.get("is_exception", False),
                 "id": pref["id"],  # Store Neo4j ID for updates
             }
+        self._reset_conflict_state()
 
         logger.info(f"Loaded {len(self.preferences)} preferences from Neo4j")
 
-    def _update_preferences(self, extracted: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _update_preferences(
+        self, extracted: List[Dict[str, Any]], turn: Optional[TurnContext] = None
+    ) -> List[Dict[str, Any]]:
         """Update preferences and persist to Neo4j.
 
-        Overrides parent method to add Neo4j persistence.
+        Overrides parent method to add Neo4j persistence: applied
+        preferences are added to the turn's pending saves (see
+        _persist_pending_saves).
         """
         if not self._connected:
             logger.warning("Not connected to Neo4j, falling back to in-memory only")
-            return super()._update_preferences(extracted)
+            return super()._update_preferences(extracted, turn)
+
+        if turn is None:
+            # Callers outside a turn can't persist: the update stays in memory
+            turn = TurnContext("")
 
         conflicts = []
 
@@ -158,6 +212,7 @@ class PersistentAgent(InMemoryAgent):
                     continue  # Keep existing preference
 
             # Update in-memory cache immediately (sync)
+            action = "Updated" if key in self.preferences else "Added"
             pref_data = {
                 "key": key,
                 "value": new_value,
@@ -165,25 +220,23 @@ class PersistentAgent(InMemoryAgent):
                 "confidence": new_confidence,
                 "is_exception": False,
             }
-            self.preferences[key] = pref_data
+            self._set_preference(key, pref_data)
 
             # Mark for persistence (will be persisted on next save)
             # Phase 3: Include original message and user_id for context recording
-            if not hasattr(self, '_pending_saves'):
-                self._pending_saves = []
-
             save_data = pref_data.copy()
-            save_data["original_message"] = getattr(self, '_last_user_message', "")
-            save_data["user_id"] = getattr(self, '_current_user_id', "unknown")
+            save_data["original_message"] = turn.user_message
+            save_data["user_id"] = turn.user_id
+            save_data["context"] = turn.context
 
-            self._pending_saves.append(save_data)
+            turn.pending_saves.append(save_data)
 
             sentiment_emoji = "👍" if new_sentiment == "positive" else "👎" if new_sentiment == "negative" else "😐"
-            action = "Updated" if key in self.preferences else "Added"
             logger.info(f"{action} preference: {key} = {new_value} ({sentiment_emoji} {new_sentiment}, confidence: {new_confidence:.0%})")
 
         return conflicts
 
+    @serialized
     async def accept_preference(self, preference_id: str) -> Dict[str, Any]:
         """Accept a preference, increasing its confidence by +0.1.
 
@@ -206,7 +259,8 @@ class PersistentAgent(InMemoryAgent):
             delta=0.1,
         )
 
-        # Update in-memory cache
+        # Update in-memory cache (confidence doesn't affect conflict detection,
+        # so the key isn't marked for re-checking)
         key = updated_pref["key"]
         if key in self.preferences:
             self.preferences[key]["confidence"] = updated_pref["confidence"]
@@ -215,6 +269,7 @@ class PersistentAgent(InMemoryAgent):
 
         return updated_pref
 
+    @serialized
     async def reject_preference(self, preference_id: str) -> Dict[str, Any]:
         """Reject a preference, decreasing its confidence by -0.15.
 
@@ -237,14 +292,15 @@ class PersistentAgent(InMemoryAgent):
             delta=-0.15,
         )
 
-        # Update in-memory cache
+        # Update in-memory cache (confidence doesn't affect conflict detection,
+        # so the key isn't marked for re-checking)
         key = updated_pref["key"]
         if key in self.preferences:
             self.preferences[key]["confidence"] = updated_pref["confidence"]
 
         # If confidence drops to 0, remove from memory
         if updated_pref["confidence"] <= 0.0:
-            await self.delete_preference(preference_id)
+            await self._delete_preference(preference_id)
 
             # Clean up orphaned situations (situations without any linked preferences)
             try:
@@ -258,6 +314,7 @@ class PersistentAgent(InMemoryAgent):
 
         return updated_pref
 
+    @serialized
     async def delete_preference(self, preference_id: str) -> bool:
         """Delete a single preference.
 
@@ -267,6 +324,10 @@ class PersistentAgent(InMemoryAgent):
         Returns:
             True if deleted, False if not found
         """
+        return await self._delete_preference(preference_id)
+
+    async def _delete_preference(self, preference_id: str) -> bool:
+        """Delete a single preference (in the mailbox, see delete_preference)."""
         if not self._connected:
             raise RuntimeError("Not connected to Neo4j. Call connect() first.")
 
@@ -280,12 +341,13 @@ class PersistentAgent(InMemoryAgent):
             # Find and remove by ID
             for key, pref in list(self.preferences.items()):
                 if pref.get("id") == preference_id:
-                    del self.preferences[key]
+                    self._remove_preference(key)
                     logger.info(f"Deleted preference {preference_id}: {key}")
                     break
 
         return deleted
 
+    @serialized
     async def delete_all_preferences(self) -> int:
         """Delete all preferences for this tenant.
 
@@ -299,6 +361,7 @@ class PersistentAgent(InMemoryAgent):
 
         # Clear in-memory cache
         self.preferences.clear()
+        self._reset_conflict_state()
 
         logger.info(f"Deleted all {count} preferences for tenant {self.tenant_id}")
 
@@ -321,6 +384,7 @@ class PersistentAgent(InMemoryAgent):
         user_id: str,
         top_k: int = 10,
         min_score: float = 0.6,
+        context: Optional[ContextFactors] = None,
     ) -> Dict[str, Dict[str, Any]]:
         """Get preferences relevant to current context (Phase 3).
 
@@ -329,6 +393,7 @@ class PersistentAgent(InMemoryAgent):
             user_id: User ID for context tracking
             top_k: Maximum number of situations to retrieve
             min_score: Minimum similarity score (0.0 to 1.0)
+            context: Context of the message if already extracted
 
         Returns:
             Dict of context-relevant preferences (same format as self.preferences)
@@ -345,6 +410,7 @@ class PersistentAgent(InMemoryAgent):
                 user_id=user_id,
                 top_k=top_k,
                 min_score=min_score,
+                context=context,
             )
 
             if not similar_situations:
@@ -373,18 +439,58 @@ class PersistentAgent(InMemoryAgent):
             logger.warning(f"Context-aware retrieval failed, using all preferences: {e}")
             return self.preferences
 
-    async def _persist_pending_saves(self) -> None:
-        """Persist any pending preference saves to Neo4j.
+    async def _analyze_turn(self, turn: TurnContext) -> None:
+        """Analyze the turn's message once for preferences and context (Phase 3).
+
+        A single combined LLM call replaces separate preference extraction,
+        context extraction for retrieval, and context extraction when a
+        preference is recorded. The results are stored on the turn: the
+        preferences are consumed by preference learning, the merged context
+        by retrieval and _persist_pending_saves. If the analysis fails, each
+        step falls back to its own extraction.
+
+        Args:
+            turn: State of this turn
+        """
+        if not self.enable_context_awareness or not self.context_agent:
+            return
+
+        try:
+            analysis = await self.context_agent.analyze_message(
+                message=turn.user_message,
+                tenant_id=self.tenant_id,
+                user_id=turn.user_id,
+            )
+            turn.context = await self.context_agent.extract_and_merge_context(
+                message=turn.user_message,
+                tenant_id=self.tenant_id,
+                user_id=turn.user_id,
+                llm_result=analysis.context,
+            )
+            turn.preferences = analysis.preferences
+        except Exception as e:
+            logger.warning(f"Combined message analysis failed, extracting separately: {e}")
+
+    async def _persist_pending_saves(self, turn: TurnContext) -> None:
+        """Persist a turn's pending preference saves to Neo4j.
 
         Phase 3: Also records situational context for each preference.
+
+        Args:
+            turn: Turn whose applied preferences are persisted
         """
         if not self._connected:
+            if turn.pending_saves:
+                logger.warning(
+                    f"Not connected to Neo4j: {len(turn.pending_saves)} learned preferences "
+                    f"of tenant {self.tenant_id} are not persisted"
+                )
             return
 
-        if not hasattr(self, '_pending_saves') or not self._pending_saves:
-            return
+        # Take ownership so each entry is persisted once
+        pending_saves = turn.take_pending_saves()
 
-        for pref_data in self._pending_saves:
+        for pref_data in pending_saves:
             try:
                 # Check if already exists in Neo4j
                 key = pref_data["key"]
@@ -417,6 +523,7 @@ class PersistentAgent(InMemoryAgent):
                                 preference_id=created_pref["id"],
                                 tenant_id=self.tenant_id,
                                 user_id=pref_data.get("user_id", "unknown"),
+                                context=pref_data.get("context"),
                             )
                             logger.info(
                                 f"Recorded context for preference {key}: "
@@ -429,114 +536,62 @@ class PersistentAgent(InMemoryAgent):
             except Exception as e:
                 logger.error(f"Failed to persist preference {pref_data['key']}: {e}")
 
-        # Clear pending saves
-        self._pending_saves = []
-
-    async def chat(self, user_message: str, user_id: str = "unknown") -> str:
-        """Process user message and return response.
+    async def _chat_turn(self, turn: TurnContext) -> str:
+        """Run a chat turn (in the mailbox, see chat).
 
-        Overrides parent to add Neo4j persistence and context-awareness.
+        Overrides parent to add Neo4j persistence and context-awareness
+        (see _get_prompt_preferences).
 
         Args:
-            user_message: The user's message
-            user_id: User identifier for context tracking (Phase 3)
+            turn: State of this turn
 
         Returns:
             str: Bot response
         """
-        # Phase 3: Store message and user_id for context recording
-        self._last_user_message = user_message
-        self._current_user_id = user_id
+        response = await super()._chat_turn(turn)
 
-        # Phase 3: Get context-relevant preferences before generating response
-        if self.enable_context_awareness and self.context_agent:
-            original_prefs = self.preferences.copy()
-            try:
-                # Temporarily set preferences to context-relevant ones
-                self.preferences = await self._get_context_relevant_preferences(
-                    message=user_message,
-                    user_id=user_id,
-                )
+        # Persist any new preferences to Neo4j (and context to Qdrant);
+        # with background learning the queued job does this
+        await self._persist_pending_saves(turn)
 
-                response = await super().chat(user_message)
+        return response
 
-                # Merge any NEW preferences learned during chat back into original
-                for key, pref in self.preferences.items():
-                    if key not in original_prefs:
-                        original_prefs[key] = pref
+    async def _get_prompt_preferences(self, turn: TurnContext) -> Dict[str, Dict[str, Any]]:
+        """Analyze the message and select context-relevant preferences (Phase 3).
 
-                # Restore original preferences (now including new ones)
-                self.preferences = original_prefs
-            except Exception as e:
-                logger.warning(f"Context-aware filtering failed, using all preferences: {e}")
-                self.preferences = original_prefs
-                response = await super().chat(user_message)
-        else:
-            response = await super().chat(user_message)
+        Overrides parent to include only preferences relevant to the current
+        situation in the response prompt. Preference learning still updates
+        the full self.preferences.
 
-        # Persist any new preferences to Neo4j (and context to Qdrant)
-        await self._persist_pending_saves()
+        Args:
+            turn: State of this turn (receives the analysis results)
 
-        return response
+        Returns:
+            Context-relevant preferences (all preferences as fallback)
+        """
+        # Phase 3: Extract preferences and context in one LLM call
+        await self._analyze_turn(turn)
 
-    async def chat_stream(self, user_message: str, user_id: str = "unknown") -> AsyncGenerator[str, None]:
-        """Process user message and stream response token by token.
+        if not self.enable_context_awareness or not self.context_agent:
+            return self.preferences
 
-        Overrides parent to add Neo4j persistence and context-awareness.
+        return await self._get_context_relevant_preferences(
+            message=turn.user_message,
+            user_id=turn.user_id,
+            context=turn.context,
+        )
 
-        Args:
-            user_message: The user's message
-            user_id: User identifier for context tracking (Phase 3)
+    async def _on_preferences_updated(self, turn: TurnContext) -> None:
+        """Persist new preferences to Neo4j (and context to Qdrant).
 
-        Yields:
-            str: SSE events (tokens, preferences_updated, conflicts, done)
+        Overrides parent hook so the frontend sees persisted data when it
+        refreshes on the preferences_updated event.
         """
-        # Phase 3: Store message and user_id for context recording
-        self._last_user_message = user_message
-        self._current_user_id = user_id
-
-        # Phase 3: Get context-relevant preferences before generating response
-        if self.enable_context_awareness and self.context_agent:
-            original_prefs = self.preferences.copy()
-            try:
-                # Temporarily set preferences to context-relevant ones
-                self.preferences = await self._get_context_relevant_preferences(
-                    message=user_message,
-                    user_id=user_id,
-                )
-            except Exception as e:
-                logger.warning(f"Context-aware filtering failed, using all preferences: {e}")
-                # Keep original preferences on error
+        await self._persist_pending_saves(turn)
 
-        try:
-            async for event in super().chat_stream(user_message):
-                # Check event type
-                try:
-                    event_data = json.loads(event)
-                    event_type = event_data.get("type")
-
-                    if event_type == "preferences_updated":
-                        # Persist to Neo4j immediately when preferences are updated
-                        await self._persist_pending_saves()
-                        # Now yield the event so frontend can refresh
-                        yield event
-                        continue
-                    elif event_type == "done":
-                        # Just yield done - persistence already happened at preferences_updated
-                        yield event
-                        continue
-                except json.JSONDecodeError:
-                    pass
-
-                # Yield all other events (tokens, acknowledged, etc.)
-                yield event
-        finally:
-            # Phase 3: Restore original preferences after stream
-            if self.enable_context_awareness and self.context_agent:
-                # Merge any NEW preferences learned during chat back into original
-                for key, pref in self.preferences.items():
-                    if key not in original_prefs:
-                        original_prefs[key] = pref
+    def _relatedness_scope(self) -> str:
+        """Scope relatedness verdicts by tenant (agents of a tenant share preferences).
 
-                # Restore original preferences (now including new ones)
-                self.preferences = original_prefs
+        Overrides parent method, which scopes by agent instance.
+        """
+        return self.tenant_id
@@ -0,0 +1,196 @@
+"""Token-budgeted preference section for the chat system prompt.
+
+_build_prompt used to list every known preference, so each turn re-sent
+the whole profile; with hundreds of preferences that is thousands of
+tokens and noticeably slower responses on small local models.
+PreferenceSectionBuilder ranks preferences by relevance to the current
+message, confidence and recency, and fills the section up to a token
+budget.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from litellm import token_counter
+
+from fidus.config import config
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (about 4 characters per token).
+
+    Args:
+        text: Text to count
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+class PreferenceSectionBuilder:
+    """Select and render the "User's known preferences" prompt section.
+
+    Example:
+        builder = PreferenceSectionBuilder(token_budget=500)
+        section, stats = builder.build(agent.preferences, "What should I drink?")
+    """
+
+    # Ranking weights (each signal is normalized to 0.0-1.0)
+    RELEVANCE_WEIGHT = 0.5
+    CONFIDENCE_WEIGHT = 0.3
+    RECENCY_WEIGHT = 0.2
+
+    HEADER = "User's known preferences:\n"
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        token_counter_mode: Optional[str] = None,
+        model: Optional[str] = None,
+    ):
+        """Initialize the builder.
+
+        Args:
+            token_budget: Maximum tokens for the preference lines, 0 for no limit
+                (defaults to config.prompt_preference_token_budget)
+            token_counter_mode: "approx" (fast estimate) or "model" (the model's
+                tokenizer via LiteLLM) (defaults to config.prompt_token_counter)
+            model: LLM model name for "model" token counting
+        """
+        self.token_budget = (
+            config.prompt_preference_token_budget if token_budget is None else token_budget
+        )
+        self.token_counter_mode = token_counter_mode or config.prompt_token_counter
+        self.model = model
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the configured counter.
+
+        Falls back to the approximation if the model tokenizer is unavailable.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            int: Number of tokens
+        """
+        if self.token_counter_mode == "model" and self.model:
+            try:
+                return token_counter(model=self.model, text=text)
+            except Exception as e:
+                logger.debug(f"Tokenizer unavailable for {self.model}, estimating: {e}")
+        return estimate_tokens(text)
+
+    @staticmethod
+    def format_line(key: str, pref: Dict[str, Any]) -> str:
+        """Render one preference as a prompt line.
+
+        Args:
+            key: Preference key (domain.key)
+            pref: Preference data
+
+        Returns:
+            str: Line including the trailing newline
+        """
+        sentiment = pref.get('sentiment', 'neutral')
+        sentiment_prefix = "likes" if sentiment == "positive" else "dislikes" if sentiment == "negative" else "neutral about"
+        return f"- {key}: {sentiment_prefix} {pref['value']}\n"
+
+    def rank(
+        self, preferences: Dict[str, Dict[str, Any]], message: str = ""
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Rank preferences by relevance to the message, confidence and recency.
+
+        Relevance is the share of the key's words found in the message.
+        Recency is the position in the preferences dict (agents keep it
+        ordered oldest to most recently learned).
+
+        Args:
+            preferences: Preferences by key
+            message: Current user message
+
+        Returns:
+            (key, preference) pairs, best first
+        """
+        message_words = set(_WORD.findall(message.lower()))
+        count = len(preferences)
+
+        def score(index: int, key: str, pref: Dict[str, Any]) -> float:
+            # Keys are English and normalized ("food.instant_coffee"); the
+            # values are mostly generic ("loves it"), so match on the key item
+            item_words = set(key.rsplit(".", 1)[-1].lower().split("_"))
+            relevance = len(item_words & message_words) / len(item_words) if item_words else 0.0
+            recency = (index + 1) / count
+            return (
+                self.RELEVANCE_WEIGHT * relevance
+                + self.CONFIDENCE_WEIGHT * float(pref.get("confidence", 0.0))
+                + self.RECENCY_WEIGHT * recency
+            )
+
+        scored = [
+            (score(index, key, pref), index, key, pref)
+            for index, (key, pref) in enumerate(preferences.items())
+        ]
+        scored.sort(key=lambda item: (-item[0], -item[1]))
+        return [(key, pref) for _, _, key, pref in scored]
+
+    def build(
+        self,
+        preferences: Dict[str, Dict[str, Any]],
+        message: str = "",
+        sort_keys: bool = False,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build the preference section within the token budget.
+
+        Args:
+            preferences: Preferences by key
+            message: Current user message (for relevance ranking)
+            sort_keys: Render the selected preferences in key order instead of
+                rank order, so the section is stable across turns (prompt caching)
+
+        Returns:
+            Tuple of (section text, "" if there are no preferences; stats with
+            included/total counts and used/full/saved token counts)
+        """
+        if not preferences:
+            return "", {"included": 0, "total": 0, "tokens": 0, "full_tokens": 0, "saved_tokens": 0}
+
+        lines = []
+        used_tokens = 0
+        full_tokens = 0
+        for key, pref in self.rank(preferences, message):
+            line = self.format_line(key, pref)
+            tokens = self.count_tokens(line)
+            full_tokens += tokens
+            if self.token_budget and used_tokens + tokens > self.token_budget:
+                continue
+            lines.append((key, line))
+            used_tokens += tokens
+
+        if sort_keys:
+            lines.sort()
+
+        stats = {
+            "included": len(lines),
+            "total": len(preferences),
+            "tokens": used_tokens,
+            "full_tokens": full_tokens,
+            "saved_tokens": full_tokens - used_tokens,
+        }
+        logger.info(
+            f"Preference prompt section: {stats['included']}/{stats['total']} preferences, "
+            f"{used_tokens} tokens (saved {stats['saved_tokens']})",
+            extra=stats,
+        )
+
+        if not lines:
+            return "", stats
+        return self.HEADER + "".join(line for _, line in lines) + "\n", stats
@@ -0,0 +1,115 @@
+"""Prompt (prefix) cache metrics for chat completions.
+
+Ollama reuses its KV cache and hosted providers (OpenAI, Anthropic,
+DeepSeek) bill cached prompt prefixes only if consecutive requests start
+with identical tokens. The cache-friendly prompt layout (see
+InMemoryAgent._build_prompt) keeps the system prompt stable across turns;
+PromptCacheMetrics measures whether that works:
+
+- prefix stability: share of turns whose system prompt equals the agent's
+  previous one (computed locally, works with every provider)
+- cached prompt tokens, where the provider reports them in the usage
+  (LiteLLM maps them to usage.prompt_tokens_details.cached_tokens)
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheMetrics:
+    """Process-wide prompt cache counters."""
+
+    def __init__(self):
+        """Initialize with zeroed counters."""
+        self.turns = 0
+        self.stable_prefix_turns = 0
+        self.reported_requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    @staticmethod
+    def cached_tokens_from_usage(usage: Any) -> Optional[int]:
+        """Get the cached prompt tokens from a LiteLLM usage object.
+
+        Args:
+            usage: Usage object or dict from a completion response (may be None)
+
+        Returns:
+            Number of cached prompt tokens, or None if the provider doesn't report it
+        """
+        if usage is None:
+            return None
+
+        if isinstance(usage, dict):
+            details = usage.get("prompt_tokens_details")
+            cached = details.get("cached_tokens") if isinstance(details, dict) else None
+            if cached is None:
+                cached = usage.get("cache_read_input_tokens")
+        else:
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) if details is not None else None
+            if cached is None:
+                cached = getattr(usage, "cache_read_input_tokens", None)
+
+        # Mocks and partial objects may return anything here
+        return cached if isinstance(cached, int) and not isinstance(cached, bool) else None
+
+    def record_prefix(self, stable: bool) -> None:
+        """Count a turn and whether its system prompt matched the previous turn.
+
+        Args:
+            stable: True if the system prompt was unchanged
+        """
+        self.turns += 1
+        if stable:
+            self.stable_prefix_turns += 1
+
+    def record_usage(self, usage: Any) -> None:
+        """Record prompt and cached tokens from a completion's usage.
+
+        Args:
+            usage: Usage object or dict (ignored if it has no cache information)
+        """
+        cached = self.cached_tokens_from_usage(usage)
+        if cached is None:
+            return
+
+        prompt_tokens = (
+            usage.get("prompt_tokens") if isinstance(usage, dict)
+            else getattr(usage, "prompt_tokens", None)
+        )
+        self.reported_requests += 1
+        self.cached_tokens += cached
+        if isinstance(prompt_tokens, int):
+            self.prompt_tokens += prompt_tokens
+
+        logger.debug(
+            f"Prompt cache: {cached}/{prompt_tokens} prompt tokens cached",
+            extra={"cached_tokens": cached, "prompt_tokens": prompt_tokens},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get prompt cache metrics.
+
+        Returns:
+            Dictionary with prefix stability and provider-reported cache hit ratio
+        """
+        return {
+            "turns": self.turns,
+            "stable_prefix_turns": self.stable_prefix_turns,
+            "stable_prefix_ratio": (
+                self.stable_prefix_turns / self.turns if self.turns else 0.0
+            ),
+            "reported_requests": self.reported_requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_token_ratio": (
+                self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+            ),
+        }
+
+
+# Shared by all agents in this process (exposed via /health/prompt-cache)
+prompt_cache_metrics = PromptCacheMetrics()
@@ -0,0 +1,178 @@
+"""Memo for LLM relatedness verdicts between preference keys.
+
+Conflict detection asks the LLM whether pairs of same-domain preference
+keys are directly related ("food.coffee" / "food.espresso"). A verdict only
+depends on the model and the two keys, so it is memoized per pair and
+the LLM only sees pairs it has not judged before. Verdicts come from one
+tenant's preferences, so like the IS_A edges the taxonomy learns from them
+they are kept per tenant by default; FIDUS_RELATEDNESS_SHARE_PAIRS shares
+them across tenants instead.
+
+Verdicts live in process and, if a SessionCache is passed in, in Redis.
+"""
+
+import logging
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from fidus.config import config
+from fidus.infrastructure.memory_cache import LRUCache
+from fidus.infrastructure.redis.session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+# Pair of preference keys in sorted order
+KeyPair = Tuple[str, str]
+
+# Scope of verdicts shared by all tenants
+SHARED_SCOPE = "shared"
+
+
+def key_pair(key_a: str, key_b: str) -> KeyPair:
+    """Build the symmetric (sorted) pair of two preference keys.
+
+    Args:
+        key_a: Preference key
+        key_b: Preference key
+
+    Returns:
+        KeyPair: Both keys in sorted order
+    """
+    first, second = sorted((key_a, key_b))
+    return (first, second)
+
+
+class RelatednessMemo:
+    """Pairwise relatedness verdicts per model (and tenant, if not shared).
+
+    Example:
+        memo = RelatednessMemo()
+        verdicts = await memo.lookup(tenant_id, model, pairs)
+        unknown = [pair for pair in pairs if pair not in verdicts]
+        if unknown:
+            new_verdicts = ...  # ask the LLM about the unknown pairs
+            await memo.record(tenant_id, model, new_verdicts)
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        share_pairs: Optional[bool] = None,
+        session_cache: Optional[SessionCache] = None,
+    ):
+        """Initialize the memo.
+
+        Args:
+            max_size: In-process capacity in pairs (defaults to config.relatedness_memo_size)
+            share_pairs: Share verdicts across tenants
+                (defaults to config.relatedness_share_pairs)
+            session_cache: Connected SessionCache for the Redis tier (optional)
+        """
+        self.share_pairs = config.relatedness_share_pairs if share_pairs is None else share_pairs
+        self.session_cache = session_cache
+        # (scope, model, key_a, key_b) -> related
+        self._pairs: LRUCache[bool] = LRUCache(
+            max_size=config.relatedness_memo_size if max_size is None else max_size
+        )
+
+        self.hits = 0
+        self.misses = 0
+
+    def scope(self, tenant_id: str) -> str:
+        """Get the verdict scope of a tenant.
+
+        Args:
+            tenant_id: Tenant (or agent) identifier
+
+        Returns:
+            str: SHARED_SCOPE if verdicts are shared, otherwise the tenant ID
+        """
+        return SHARED_SCOPE if self.share_pairs else tenant_id
+
+    async def lookup(
+        self, tenant_id: str, model: str, pairs: Sequence[KeyPair]
+    ) -> Dict[KeyPair, bool]:
+        """Get known verdicts, promoting Redis hits into memory.
+
+        Args:
+            tenant_id: Tenant (or agent) identifier
+            model: LLM model name
+            pairs: Sorted key pairs to look up
+
+        Returns:
+            Mapping of pairs with a known verdict to related (unknown ones omitted)
+        """
+        scope = self.scope(tenant_id)
+        known: Dict[KeyPair, bool] = {}
+        missing = []
+        for pair in pairs:
+            verdict = self._pairs.get((scope, model, *pair))
+            if verdict is None:
+                missing.append(pair)
+            else:
+                known[pair] = verdict
+
+        if missing and self.session_cache is not None:
+            fields = {f"{first}|{second}": (first, second) for first, second in missing}
+            try:
+                stored = await self.session_cache.get_related_pairs(scope, model, list(fields))
+            except Exception as e:
+                # Redis is an optimization; the LLM can always be asked again
+                logger.warning(f"Relatedness memo Redis lookup failed: {e}")
+                stored = {}
+            for field, verdict in stored.items():
+                pair = fields[field]
+                known[pair] = verdict
+                self._pairs.set((scope, model, *pair), verdict)
+
+        self.hits += len(known)
+        self.misses += len(pairs) - len(known)
+        return known
+
+    async def record(
+        self, tenant_id: str, model: str, verdicts: Mapping[KeyPair, bool]
+    ) -> None:
+        """Store verdicts in both tiers.
+
+        Args:
+            tenant_id: Tenant (or agent) identifier
+            model: LLM model name
+            verdicts: Mapping of sorted key pairs to related
+        """
+        if not verdicts:
+            return
+
+        scope = self.scope(tenant_id)
+        for pair, verdict in verdicts.items():
+            self._pairs.set((scope, model, *pair), verdict)
+
+        if self.session_cache is not None:
+            try:
+                await self.session_cache.store_related_pairs(
+                    scope,
+                    model,
+                    {f"{first}|{second}": verdict for (first, second), verdict in verdicts.items()},
+                )
+            except Exception as e:
+                logger.warning(f"Relatedness memo Redis write failed: {e}")
+
+    def clear(self) -> None:
+        """Remove all in-process entries (Redis entries are kept)."""
+        self._pairs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memo metrics.
+
+        Returns:
+            Dictionary with pair hits, misses and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "pairs": len(self._pairs),
+        }
+
+
+# Shared by all agents in this process (verdicts are scoped per tenant if not shared)
+default_relatedness_memo = RelatednessMemo()
@@ -1,18 +1,114 @@
+import asyncio
 import json
 import os
 import logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Dict, List, Any, AsyncGenerator
+from types import MappingProxyType
+from typing import Callable, Dict, List, Any, AsyncGenerator, Mapping, Optional, Tuple
 from litellm import acompletion
 
+from fidus.config import config
+from fidus.infrastructure.neo4j_taxonomy import IsA, Neo4jTaxonomyStore, normalize_concept_key
+from fidus.memory.agent_actor import Mailbox, TurnContext, serialized
+from fidus.memory.conflict_detector import ConflictDetector, default_conflict_detector
+from fidus.memory.extraction_cache import ExtractionCache, default_extraction_cache
+from fidus.memory.learning_queue import EmitEvent, LearningQueue, default_learning_queue
+from fidus.memory.prompt_budget import PreferenceSectionBuilder
+from fidus.memory.prompt_cache import prompt_cache_metrics
+from fidus.memory.relatedness_memo import (
+    KeyPair,
+    RelatednessMemo,
+    default_relatedness_memo,
+    key_pair,
+)
+
 logger = logging.getLogger(__name__)
 
+# Sentinel put on the chat_stream event queue when a producer finishes
+_STREAM_END = object()
+
+
+# Preference extraction rules, shared with the combined extractor
+# (fidus/memory/context/extractor.py) so both produce the same shape
+PREFERENCE_EXTRACTION_RULES = """Rules:
+- Extract both positive preferences ("I like X") and negative ones ("I don't like X", "I hate X")
+- Do NOT extract if the text is just a greeting, question, or test message
+- domain: category like "food", "lifestyle", "work", "hobbies"
+- key: the specific item/topic (e.g., "coffee", "dark_mode", "mornings")
+- sentiment: "positive", "negative", or "neutral" - MUST match the tone of the value field
+- value: descriptive text that clearly expresses the sentiment
+- confidence: 0.0-1.0 based on how explicit the preference is
+
+CRITICAL - Key Language Normalization:
+- ALWAYS use English for the "key" field, regardless of the input language
+- Translate non-English preference items to their English equivalents
+- This ensures consistency across languages for conflict detection
+- Examples:
+  • "Ich mag Kaffee" → key: "coffee" (NOT "kaffee")
+  • "J'aime le café" → key: "coffee" (NOT "café")
+  • "Me gusta el café" → key: "coffee" (NOT "café")
+  • "Ich hasse Montage" → key: "mondays" (NOT "montage")
+  • "J'adore le chocolat" → key: "chocolate" (NOT "chocolat")
+- Use lowercase, snake_case for multi-word keys (e.g., "instant_coffee", "dark_mode")
+
+IMPORTANT: The sentiment field MUST match the value field:
+- If value expresses liking/loving/preferring → sentiment MUST be "positive"
+- If value expresses disliking/hating/avoiding → sentiment MUST be "negative"
+- If value is neutral/ambiguous → sentiment MUST be "neutral"
+
+CRITICAL: Do NOT extract obligations or necessities as preferences:
+- Phrases with "must", "have to", "need to", "should", "muss", "sollte", "brauche" indicate OBLIGATION, not preference
+- "I have to do X quite a bit" = obligation/effort, NOT enjoyment or preference
+- "I need to X" = necessity, NOT preference
+- Only extract if there's CLEAR positive/negative sentiment beyond the obligation
+- If unsure whether it's preference vs. obligation, do NOT extract it
+
+Confidence Calibration:
+- Explicit emotional statements ("I love", "I hate"): 0.8-0.9
+- Clear preferences ("I prefer", "I like", "I dislike"): 0.7-0.8
+- Moderate statements ("X is good", "X is bad"): 0.6-0.7
+- Implied preferences ("X works well", "X is useful"): 0.5-0.6
+- Ambiguous or implicit statements: 0.4-0.5
+- If confidence would be < 0.6 for non-explicit statements, consider NOT extracting
+
+Examples:
+- "I love cappuccino" → {"domain": "food", "key": "cappuccino", "sentiment": "positive", "value": "loves it", "confidence": 0.9}
+- "I hate instant coffee" → {"domain": "food", "key": "instant_coffee", "sentiment": "negative", "value": "hates it", "confidence": 0.9}
+- "I prefer dark mode" → {"domain": "lifestyle", "key": "dark_mode", "sentiment": "positive", "value": "prefers it", "confidence": 0.8}
+- "I don't like mornings" → {"domain": "lifestyle", "key": "mornings", "sentiment": "negative", "value": "dislikes them", "confidence": 0.8}
+- "I have to do quite a bit of fine tuning" → DO NOT EXTRACT (obligation/effort, not preference)
+- "I must configure X" → DO NOT EXTRACT (necessity, not preference)
+- "I enjoy fine tuning" → {"domain": "work", "key": "fine_tuning", "sentiment": "positive", "value": "enjoys it", "confidence": 0.8}"""
+
+
+# Static part of the cache-friendly system prompt (see InMemoryAgent._build_prompt);
+# nothing per-turn may be added here, or prompt caching stops working
+STATIC_INSTRUCTIONS = """You are Fidus Memory, a friendly conversational AI that learns about the user's preferences.
+
+IMPORTANT:
+- Respond naturally in conversation. Do NOT output system information, internal state, or debugging info to the user.
+- When the user asks about the current time or date, use the Current Date and Time given at the end of the conversation to answer accurately.
+- ALWAYS respond in the SAME LANGUAGE as the user's message. If the user writes in German, respond in German. If in English, respond in English.
+
+Respond naturally and conversationally. Ask follow-up questions to learn more preferences.
+
+"""
+
 
 class InMemoryAgent:
     """Simple chat agent with in-memory preference learning."""
 
-    def __init__(self, llm_model: str | None = None, max_history_messages: int = 20):
+    def __init__(
+        self,
+        llm_model: str | None = None,
+        max_history_messages: int = 20,
+        extraction_cache: Optional[ExtractionCache] = None,
+        learning_queue: Optional[LearningQueue] = None,
+        relatedness_memo: Optional[RelatednessMemo] = None,
+        conflict_detector: Optional[ConflictDetector] = None,
+        taxonomy: Optional[Neo4jTaxonomyStore] = None,
+    ):
         self.llm_model = llm_model or os.getenv("FIDUS_LLM_MODEL", "gpt-4o-mini")
         logger.info(f"Initializing InMemoryAgent with model: {self.llm_model}")
         logger.info(f"FIDUS_LLM_MODEL env var: {os.getenv('FIDUS_LLM_MODEL')}")
@@ -20,42 +116,89 @@ class InMemoryAgent:
         self.preferences: Dict[str, Dict[str, Any]] = {}  # {domain.key: {value, sentiment, confidence, is_exception}}
         self.conversation_history: List[Dict[str, str]] = []
         self.max_history_messages = max_history_messages  # Sliding window size
+        self.extraction_cache = extraction_cache or default_extraction_cache
+        self.relatedness_memo = relatedness_memo or default_relatedness_memo
+        self.conflict_detector = conflict_detector or default_conflict_detector
+        # Shared concept taxonomy answering relatedness before the LLM (None: LLM only)
+        self.taxonomy = taxonomy
+        # Incremental conflict detection: keys changed since the last scan and
+        # related pairs found by earlier scans (verdicts only depend on the keys)
+        self._dirty_keys: set[str] = set()
+        self._related_pairs: set[KeyPair] = set()
+        self._learning_tasks: set[asyncio.Task] = set()
+        # Background learning (None: learn inline during the turn)
+        if learning_queue is None and config.background_learning_enabled:
+            learning_queue = default_learning_queue
+        self.learning_queue = learning_queue
+        self.preference_section = PreferenceSectionBuilder(model=self.llm_model)
+        self._last_system_prompt: str | None = None
+        # Runs chat turns and other state changes one at a time (see agent_actor)
+        self.mailbox = Mailbox()
 
     async def chat(self, user_message: str, user_id: str = "unknown") -> str:
         """Process user message and return response.
 
+        Turns of the same agent run one at a time through its mailbox.
+
         Args:
             user_message: The user's message
             user_id: User identifier for context tracking (Phase 4)
         """
-        logger.info(f"Chat called with message: {user_message[:50]}... (user: {user_id})")
+        turn = TurnContext(user_message, user_id)
+        return await self.mailbox.call(lambda: self._chat_turn(turn))
+
+    async def _chat_turn(self, turn: TurnContext) -> str:
+        """Run a chat turn (in the mailbox, see chat).
+
+        Args:
+            turn: State of this turn
+
+        Returns:
+            str: Bot response
+        """
+        user_message = turn.user_message
+        logger.info(f"Chat called with message: {user_message[:50]}... (user: {turn.user_id})")
         logger.info(f"Using model: {self.llm_model}")
 
         # 1. Add to history
         self.conversation_history.append({"role": "user", "content": user_message})
 
-        # 2. Extract preferences from message
-        extracted = await self._extract_preferences(user_message)
-        conflicts = self._update_preferences(extracted)
-        # Note: conflicts are ignored in non-streaming mode
+        # 2. Select preferences for the prompt
+        prompt_preferences = await self._get_prompt_preferences(turn)
+
+        # 3. Extract preferences from message (queued if background learning is on)
+        if not self._submit_learning(turn):
+            extracted = turn.take_preferences()
+            if extracted is None:
+                extracted = await self._extract_preferences(user_message)
+            known = dict(self.preferences)
+            conflicts = self._update_preferences(extracted, turn)
+            # Note: conflicts are ignored in non-streaming mode
+
+            if prompt_preferences is not self.preferences:
+                # A selected subset is a copy: add what this turn just learned
+                prompt_preferences = {
+                    **prompt_preferences,
+                    **{
+                        key: pref for key, pref in self.preferences.items()
+                        if known.get(key) is not pref
+                    },
+                }
 
-        # 3. Build system prompt with learned preferences
-        system_prompt = self._build_prompt()
+        # 4. Build system prompt with learned preferences
+        system_prompt = self._build_prompt(prompt_preferences, user_message)
 
-        # 4. Apply sliding window to conversation history
+        # 5. Apply sliding window to conversation history
         recent_history = self._get_recent_history()
         logger.info(f"Using {len(recent_history)} messages from history (window size: {self.max_history_messages})")
 
-        # 5. Generate response
+        # 6. Generate response
         logger.info(f"Calling LiteLLM with model: {self.llm_model}")
 
         # Build kwargs for acompletion
         completion_kwargs = {
             "model": self.llm_model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                *recent_history
-            ]
+            "messages": self._build_messages(system_prompt, recent_history)
         }
 
         # Add api_base for models using custom endpoints
@@ -71,6 +214,7 @@ class InMemoryAgent:
                 logger.info(f"Using OpenAI API base: {openai_base}")
 
         response = await acompletion(**completion_kwargs)
+        prompt_cache_metrics.record_usage(getattr(response, "usage", None))
 
         bot_response = response.choices[0].message.content
         self.conversation_history.append({"role": "assistant", "content": bot_response})
@@ -79,10 +223,37 @@ class InMemoryAgent:
     async def chat_stream(self, user_message: str, user_id: str = "unknown") -> AsyncGenerator[str, None]:
         """Process user message and stream response token by token.
 
+        Runs as a concurrent pipeline: once the prompt inputs are ready, the
+        response completion starts immediately, while preference extraction
+        and conflict checks run alongside it. Their events are interleaved
+        with the token events as they complete.
+
+        With background learning, extraction and conflict checks are queued
+        instead; learning events that are ready when the response ends
+        (including ones from earlier turns) are sent before "done", later
+        ones are delivered with the next stream or via polling.
+
+        Turns of the same agent run one at a time through its mailbox.
+
         Args:
             user_message: The user's message
             user_id: User identifier for context tracking (Phase 4)
         """
+        turn = TurnContext(user_message, user_id)
+        async for event in self.mailbox.stream(lambda: self._chat_stream_turn(turn)):
+            yield event
+
+    async def _chat_stream_turn(self, turn: TurnContext) -> AsyncGenerator[str, None]:
+        """Run a streaming chat turn (in the mailbox, see chat_stream).
+
+        Args:
+            turn: State of this turn
+
+        Yields:
+            str: SSE events (tokens, preferences_updated, conflicts, done)
+        """
+        user_message = turn.user_message
+        user_id = turn.user_id
         logger.info(f"Chat stream called with message: {user_message[:50]}... (user: {user_id})")
         logger.info(f"Using model: {self.llm_model}")
 
@@ -92,171 +263,304 @@ class InMemoryAgent:
         # 2. Yield acknowledgment event
         yield json.dumps({"type": "acknowledged"}) + "\n"
 
-        # 3. Extract preferences from message (in background, don't block streaming)
-        extracted = await self._extract_preferences(user_message)
-        conflicts = self._update_preferences(extracted)
+        # 3. Build system prompt from the preferences known so far (the current
+        # message itself is part of the history, so the response doesn't need
+        # to wait for its extraction)
+        prompt_preferences = await self._get_prompt_preferences(turn)
+        system_prompt = self._build_prompt(prompt_preferences, user_message)
+
+        # 4. Apply sliding window to conversation history
+        recent_history = list(self._get_recent_history())
+        logger.info(f"Using {len(recent_history)} messages from history (window size: {self.max_history_messages})")
+
+        # 5. Generate the response and learn from the message concurrently
+        events: asyncio.Queue = asyncio.Queue()
+        response_task = asyncio.create_task(
+            self._stream_response(system_prompt, recent_history, events)
+        )
+        running = 1
+
+        learning_task: Optional[asyncio.Task] = None
+        queued = self._submit_learning(turn)
+        if not queued:
+            learning_task = asyncio.create_task(
+                self._learn_from_message(
+                    turn,
+                    lambda event: events.put_nowait(json.dumps(event) + "\n"),
+                    done=lambda: events.put_nowait(_STREAM_END),
+                )
+            )
+            # Keep a reference so learning completes even if the client disconnects
+            self._learning_tasks.add(learning_task)
+            learning_task.add_done_callback(self._learning_tasks.discard)
+            running += 1
+
+        try:
+            while running:
+                event = await events.get()
+                if event is _STREAM_END:
+                    running -= 1
+                elif isinstance(event, BaseException):
+                    raise event
+                else:
+                    yield event
+        finally:
+            response_task.cancel()
+            if learning_task is not None and not learning_task.done():
+                # Client went away: finish learning before this mailbox
+                # operation ends, so the next turn can't run alongside it
+                await asyncio.shield(learning_task)
+
+        # 6. Deliver background learning results that are ready
+        if self.learning_queue is not None:
+            for event in self.learning_queue.pop_events(user_id):
+                yield json.dumps(event) + "\n"
+
+        # 7. Yield completion event
+        yield json.dumps({"type": "done"}) + "\n"
+
+    async def _get_prompt_preferences(self, turn: TurnContext) -> Dict[str, Dict[str, Any]]:
+        """Get the preferences to include in the response prompt.
+
+        Subclasses override this to select preferences for the current
+        message (e.g. by situational context).
+
+        Args:
+            turn: State of this turn (message and user)
+
+        Returns:
+            Preferences in the same format as self.preferences
+        """
+        return self.preferences
+
+    async def _stream_response(
+        self,
+        system_prompt: str,
+        recent_history: List[Dict[str, str]],
+        events: asyncio.Queue,
+    ) -> None:
+        """Stream the response completion into the event queue.
+
+        Puts token events, then _STREAM_END. Errors are put on the queue and
+        re-raised by chat_stream.
+
+        Args:
+            system_prompt: System prompt with learned preferences
+            recent_history: Conversation history window
+            events: Event queue consumed by chat_stream
+        """
+        try:
+            logger.info(f"Calling LiteLLM with streaming model: {self.llm_model}")
+
+            # Build kwargs for acompletion with streaming
+            completion_kwargs = {
+                "model": self.llm_model,
+                "messages": self._build_messages(system_prompt, recent_history),
+                "stream": True
+            }
+
+            # Add api_base for models using custom endpoints
+            if self.llm_model.startswith("ollama/"):
+                ollama_base = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
+                completion_kwargs["api_base"] = ollama_base
+                logger.info(f"Using Ollama API base: {ollama_base}")
+            else:
+                # For non-ollama models, use OPENAI_API_BASE if set (e.g., LiteLLM proxy)
+                openai_base = os.getenv("OPENAI_API_BASE")
+                if openai_base:
+                    completion_kwargs["api_base"] = openai_base
+                    logger.info(f"Using OpenAI API base: {openai_base}")
+                # Final chunk carries usage, including cached prompt tokens
+                completion_kwargs["stream_options"] = {"include_usage": True}
 
-        # Yield preferences update event immediately after extraction
-        extracted_count = len(extracted) if extracted else 0
-        if extracted_count > 0:
-            yield json.dumps({
+            response = await acompletion(**completion_kwargs)
+
+            # Stream tokens and build full response
+            full_response = ""
+            usage = None
+            async for chunk in response:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                if hasattr(chunk.choices[0], 'delta') and hasattr(chunk.choices[0].delta, 'content'):
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        full_response += token
+                        # Queue token event
+                        events.put_nowait(json.dumps({
+                            "type": "token",
+                            "content": token
+                        }) + "\n")
+
+            prompt_cache_metrics.record_usage(usage)
+
+            # Add to conversation history
+            self.conversation_history.append({"role": "assistant", "content": full_response})
+        except Exception as e:
+            events.put_nowait(e)
+        finally:
+            events.put_nowait(_STREAM_END)
+
+    async def _learn_from_message(
+        self,
+        turn: TurnContext,
+        emit: EmitEvent,
+        done: Optional[Callable[[], None]] = None,
+        in_mailbox: bool = True,
+    ) -> None:
+        """Extract preferences and check for conflicts, emitting SSE event payloads.
+
+        Failures are logged and do not interrupt the response stream.
+
+        Args:
+            turn: State of the turn the message was sent in
+            emit: Callback receiving event payloads
+            done: Callback invoked when learning has finished
+            in_mailbox: False for background jobs, which apply and scan the
+                extracted preferences through the mailbox, in order with other turns
+        """
+        try:
+            extracted = turn.take_preferences()
+            if extracted is None:
+                extracted = await self._extract_preferences(turn.user_message)
+
+            if in_mailbox:
+                await self._apply_learning(turn, extracted, emit)
+            else:
+                await self.mailbox.call(lambda: self._apply_learning(turn, extracted, emit))
+        except Exception as e:
+            logger.error(f"Preference learning failed: {str(e)}")
+        finally:
+            if done is not None:
+                done()
+
+    async def _apply_learning(
+        self, turn: TurnContext, extracted: List[Dict[str, Any]], emit: EmitEvent
+    ) -> None:
+        """Apply extracted preferences and scan them for conflicts.
+
+        Reads and changes agent state (preferences, dirty keys, related pairs)
+        across awaits, so it runs in the mailbox as one step (see
+        _learn_from_message); a concurrent delete or reject cannot clear that
+        state halfway through the scan.
+
+        Args:
+            turn: State of the turn the preferences were learned in
+            extracted: Extracted preferences
+            emit: Callback receiving event payloads
+        """
+        conflicts = self._update_preferences(extracted, turn)
+        if extracted:
+            await self._on_preferences_updated(turn)
+
+            # Emit preferences update event once they are applied
+            emit({
                 "type": "preferences_updated",
-                "count": extracted_count
-            }) + "\n"
+                "count": len(extracted)
+            })
+
+        # Only preferences changed since the last scan (and pending direct
+        # conflicts) need checking; nothing changed means no conflict work
+        changed_keys = self._take_dirty_keys() | {conflict["key"] for conflict in conflicts}
+        related_pairs = self._related_pairs
+        semantic_conflicts = []
+        if changed_keys:
+            # One batched relatedness check covers the scan and the enrichment
+            related_pairs = await self._find_related_pairs(changed_keys, conflicts)
 
-        # Check for semantic inconsistencies in newly added preferences
-        semantic_conflicts = await self._find_semantic_inconsistencies()
+            # Check for semantic inconsistencies in newly added preferences
+            semantic_conflicts = self._find_semantic_inconsistencies(related_pairs, changed_keys)
 
         # Combine direct conflicts with semantic conflicts
         all_conflicts = conflicts + semantic_conflicts
 
-        # Yield conflict event if there are sentiment conflicts
+        # Emit conflict event if there are sentiment conflicts
         if all_conflicts:
-            # For each conflict, find semantically related preferences
-            enriched_conflicts = []
-            for conflict in all_conflicts:
-                # Find related preferences that might also be inconsistent
-                related_keys = await self._find_related_preferences(
-                    conflict["key"],
-                    conflict["new_sentiment"]
-                )
-
-                # Check which related preferences have opposite sentiment
-                affected_prefs = []
-                for related_key in related_keys:
-                    # Skip if this is the same key as the conflict itself (direct conflict, not semantic)
-                    if related_key == conflict["key"]:
-                        continue
-
-                    if related_key in self.preferences:
-                        related_pref = self.preferences[related_key]
-                        # Only include if sentiment is opposite to new preference
-                        if ((conflict["new_sentiment"] == "negative" and related_pref["sentiment"] == "positive") or
-                            (conflict["new_sentiment"] == "positive" and related_pref["sentiment"] == "negative")):
-                            affected_prefs.append({
-                                "key": related_key,
-                                "value": related_pref["value"],
-                                "sentiment": related_pref["sentiment"],
-                                "confidence": related_pref["confidence"]
-                            })
-
-                # Add related preferences to conflict
-                enriched_conflict = {**conflict, "related_preferences": affected_prefs}
-                enriched_conflicts.append(enriched_conflict)
-
-            yield json.dumps({
+            emit({
                 "type": "preference_conflict",
-                "conflicts": enriched_conflicts
-            }) + "\n"
+                "conflicts": [
+                    self._enrich_conflict(conflict, related_pairs)
+                    for conflict in all_conflicts
+                ]
+            })
 
-        # 4. Build system prompt with learned preferences
-        system_prompt = self._build_prompt()
+    def _submit_learning(self, turn: TurnContext) -> bool:
+        """Queue learning for a message if background learning is enabled.
 
-        # 5. Apply sliding window to conversation history
-        recent_history = self._get_recent_history()
-        logger.info(f"Using {len(recent_history)} messages from history (window size: {self.max_history_messages})")
+        The job owns the turn from here on; it may run after later turns.
 
-        # 6. Generate streaming response
-        logger.info(f"Calling LiteLLM with streaming model: {self.llm_model}")
+        Args:
+            turn: State of the turn (jobs per user run in order)
 
-        # Build kwargs for acompletion with streaming
-        completion_kwargs = {
-            "model": self.llm_model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                *recent_history
-            ],
-            "stream": True
-        }
+        Returns:
+            bool: True if queued; False means the caller learns inline
+        """
+        if self.learning_queue is None:
+            return False
 
-        # Add api_base for models using custom endpoints
-        if self.llm_model.startswith("ollama/"):
-            ollama_base = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
-            completion_kwargs["api_base"] = ollama_base
-            logger.info(f"Using Ollama API base: {ollama_base}")
-        else:
-            # For non-ollama models, use OPENAI_API_BASE if set (e.g., LiteLLM proxy)
-            openai_base = os.getenv("OPENAI_API_BASE")
-            if openai_base:
-                completion_kwargs["api_base"] = openai_base
-                logger.info(f"Using OpenAI API base: {openai_base}")
+        async def job(emit: EmitEvent) -> None:
+            await self._learn_from_message(turn, emit, in_mailbox=False)
 
-        response = await acompletion(**completion_kwargs)
+        return self.learning_queue.submit(turn.user_id, job)
 
-        # Stream tokens and build full response
-        full_response = ""
-        async for chunk in response:
-            if hasattr(chunk.choices[0], 'delta') and hasattr(chunk.choices[0].delta, 'content'):
-                token = chunk.choices[0].delta.content
-                if token:
-                    full_response += token
-                    # Yield token event
-                    yield json.dumps({
-                        "type": "token",
-                        "content": token
-                    }) + "\n"
-
-        # 7. Add to conversation history
-        self.conversation_history.append({"role": "assistant", "content": full_response})
-
-        # 8. Yield completion event
-        yield json.dumps({"type": "done"}) + "\n"
+    async def _on_preferences_updated(self, turn: TurnContext) -> None:
+        """Hook called after extracted preferences were applied.
+
+        Runs before the preferences_updated event is sent, so subclasses can
+        persist here and clients refreshing on the event see the new data.
+
+        Args:
+            turn: State of the turn the preferences were learned in
+        """
+
+    def _enrich_conflict(
+        self, conflict: Dict[str, Any], related_pairs: set[KeyPair]
+    ) -> Dict[str, Any]:
+        """Add semantically related preferences with opposite sentiment to a conflict.
+
+        Args:
+            conflict: Conflict from _update_preferences or _find_semantic_inconsistencies
+            related_pairs: Related key pairs from _find_related_pairs
+
+        Returns:
+            Conflict with a "related_preferences" list
+        """
+        # Check which related preferences have opposite sentiment
+        affected_prefs = []
+        for related_key in self.preferences:
+            # Skip if this is the same key as the conflict itself (direct conflict, not semantic)
+            if related_key == conflict["key"]:
+                continue
+
+            if key_pair(conflict["key"], related_key) in related_pairs:
+                related_pref = self.preferences[related_key]
+                # Only include if sentiment is opposite to new preference
+                if ((conflict["new_sentiment"] == "negative" and related_pref["sentiment"] == "positive") or
+                    (conflict["new_sentiment"] == "positive" and related_pref["sentiment"] == "negative")):
+                    affected_prefs.append({
+                        "key": related_key,
+                        "value": related_pref["value"],
+                        "sentiment": related_pref["sentiment"],
+                        "confidence": related_pref["confidence"]
+                    })
+
+        return {**conflict, "related_preferences": affected_prefs}
 
     async def _extract_preferences(self, text: str) -> List[Dict[str, Any]]:
-        """Use LLM to extract preferences from text with sentiment."""
+        """Use LLM to extract preferences from text with sentiment.
+
+        Results are cached per normalized text and model (see ExtractionCache).
+        """
+        cached = await self.extraction_cache.get("preferences", self.llm_model, text)
+        if cached is not None:
+            logger.info("Preference extraction cache hit")
+            return cached["preferences"]
+
         prompt = f"""Extract user preferences from this text. Only extract clear, meaningful preferences.
 
         Text: "{text}"
 
-        Rules:
-        - Extract both positive preferences ("I like X") and negative ones ("I don't like X", "I hate X")
-        - Do NOT extract if the text is just a greeting, question, or test message
-        - domain: category like "food", "lifestyle", "work", "hobbies"
-        - key: the specific item/topic (e.g., "coffee", "dark_mode", "mornings")
-        - sentiment: "positive", "negative", or "neutral" - MUST match the tone of the value field
-        - value: descriptive text that clearly expresses the sentiment
-        - confidence: 0.0-1.0 based on how explicit the preference is
-
-        CRITICAL - Key Language Normalization:
-        - ALWAYS use English for the "key" field, regardless of the input language
-        - Translate non-English preference items to their English equivalents
-        - This ensures consistency across languages for conflict detection
-        - Examples:
-          • "Ich mag Kaffee" → key: "coffee" (NOT "kaffee")
-          • "J'aime le café" → key: "coffee" (NOT "café")
-          • "Me gusta el café" → key: "coffee" (NOT "café")
-          • "Ich hasse Montage" → key: "mondays" (NOT "montage")
-          • "J'adore le chocolat" → key: "chocolate" (NOT "chocolat")
-        - Use lowercase, snake_case for multi-word keys (e.g., "instant_coffee", "dark_mode")
-
-        IMPORTANT: The sentiment field MUST match the value field:
-        - If value expresses liking/loving/preferring → sentiment MUST be "positive"
-        - If value expresses disliking/hating/avoiding → sentiment MUST be "negative"
-        - If value is neutral/ambiguous → sentiment MUST be "neutral"
-
-        CRITICAL: Do NOT extract obligations or necessities as preferences:
-        - Phrases with "must", "have to", "need to", "should", "muss", "sollte", "brauche" indicate OBLIGATION, not preference
-        - "I have to do X quite a bit" = obligation/effort, NOT enjoyment or preference
-        - "I need to X" = necessity, NOT preference
-        - Only extract if there's CLEAR positive/negative sentiment beyond the obligation
-        - If unsure whether it's preference vs. obligation, do NOT extract it
-
-        Confidence Calibration:
-        - Explicit emotional statements ("I love", "I hate"): 0.8-0.9
-        - Clear preferences ("I prefer", "I like", "I dislike"): 0.7-0.8
-        - Moderate statements ("X is good", "X is bad"): 0.6-0.7
-        - Implied preferences ("X works well", "X is useful"): 0.5-0.6
-        - Ambiguous or implicit statements: 0.4-0.5
-        - If confidence would be < 0.6 for non-explicit statements, consider NOT extracting
-
-        Examples:
-        - "I love cappuccino" → {{"domain": "food", "key": "cappuccino", "sentiment": "positive", "value": "loves it", "confidence": 0.9}}
-        - "I hate instant coffee" → {{"domain": "food", "key": "instant_coffee", "sentiment": "negative", "value": "hates it", "confidence": 0.9}}
-        - "I prefer dark mode" → {{"domain": "lifestyle", "key": "dark_mode", "sentiment": "positive", "value": "prefers it", "confidence": 0.8}}
-        - "I don't like mornings" → {{"domain": "lifestyle", "key": "mornings", "sentiment": "negative", "value": "dislikes them", "confidence": 0.8}}
-        - "I have to do quite a bit of fine tuning" → DO NOT EXTRACT (obligation/effort, not preference)
-        - "I must configure X" → DO NOT EXTRACT (necessity, not preference)
-        - "I enjoy fine tuning" → {{"domain": "work", "key": "fine_tuning", "sentiment": "positive", "value": "enjoys it", "confidence": 0.8}}
+        {PREFERENCE_EXTRACTION_RULES}
 
         Return ONLY valid JSON in this exact format:
         {{"preferences": [{{"domain": "food", "key": "cappuccino", "sentiment": "positive", "value": "loves it", "confidence": 0.9}}]}}
@@ -281,10 +585,15 @@ class InMemoryAgent:
 
         try:
             result = json.loads(response.choices[0].message.content)
-            return result.get("preferences", [])
         except json.JSONDecodeError:
             return []
 
+        preferences = result.get("preferences", [])
+        await self.extraction_cache.set(
+            "preferences", self.llm_model, text, {"preferences": preferences}
+        )
+        return preferences
+
     def _is_valid_preference(self, pref: Dict[str, Any]) -> bool:
         """Validate that a preference has meaningful content.
 
@@ -325,45 +634,177 @@ class InMemoryAgent:
 
         return True
 
-    async def _find_related_preferences(self, new_key: str, new_sentiment: str) -> List[str]:
-        """Find semantically related preferences that might conflict.
+    async def _find_related_pairs(
+        self, changed_keys: set[str], conflicts: List[Dict[str, Any]]
+    ) -> set[KeyPair]:
+        """Find semantically related preference pairs that might conflict.
 
-        Uses LLM to identify preferences that are subcategories or closely related
-        to the new preference. Only checks preferences within the same domain category.
+        Checks the changed keys against the other preferences; pairs of
+        unchanged keys keep the results of earlier scans. Only pairs within
+        the same domain whose sentiments differ (or would differ after a
+        pending direct conflict) can matter. Of those, the conflict detector
+        keeps pairs with similar key embeddings, the relatedness memo answers
+        pairs judged before, and the rest go to the LLM in one batched call.
+
+        Keys of pairs left without a verdict (LLM failure) stay dirty, so the
+        next scan retries them.
+
+        Args:
+            changed_keys: Keys added or changed since the last scan
+            conflicts: Direct conflicts from _update_preferences
+
+        Returns:
+            set[KeyPair]: All known related pairs of current preferences
         """
-        if not self.preferences:
-            return []
+        new_sentiments = {conflict["key"]: conflict["new_sentiment"] for conflict in conflicts}
+
+        def may_conflict(key1: str, key2: str) -> bool:
+            sentiment1 = self.preferences[key1]["sentiment"]
+            sentiment2 = self.preferences[key2]["sentiment"]
+            return (
+                sentiment1 != sentiment2
+                or self._opposite_sentiments(new_sentiments.get(key1), sentiment2)
+                or self._opposite_sentiments(new_sentiments.get(key2), sentiment1)
+            )
+
+        keys_by_domain: Dict[Optional[str], List[str]] = {}
+        for key in self.preferences:
+            keys_by_domain.setdefault(key.split('.')[0] if '.' in key else None, []).append(key)
+
+        pairs = sorted({
+            key_pair(key1, key2)
+            for key1 in changed_keys
+            if key1 in self.preferences
+            for key2 in keys_by_domain[key1.split('.')[0] if '.' in key1 else None]
+            if key2 != key1
+            and key_pair(key1, key2) not in self._related_pairs
+            and may_conflict(key1, key2)
+        })
+        if not pairs:
+            return self._related_pairs
+
+        taxonomy_related = await self._lookup_taxonomy(pairs)
+        remaining = [pair for pair in pairs if pair not in taxonomy_related]
+        candidates = await self.conflict_detector.candidates(remaining) if remaining else []
+
+        verdicts: Dict[KeyPair, bool] = {}
+        unknown: List[KeyPair] = []
+        if candidates:
+            scope = self._relatedness_scope()
+            verdicts = await self.relatedness_memo.lookup(scope, self.llm_model, candidates)
+            unknown = [pair for pair in candidates if pair not in verdicts]
+        if unknown:
+            new_verdicts, relations = await self._adjudicate_related_pairs(unknown)
+            await self.relatedness_memo.record(scope, self.llm_model, new_verdicts)
+            await self._record_taxonomy(relations)
+            verdicts.update(new_verdicts)
+            self._dirty_keys.update(
+                key
+                for pair in unknown
+                if pair not in new_verdicts
+                for key in pair
+                if key in changed_keys and key in self.preferences
+            )
+
+        logger.info(
+            f"Relatedness check for {len(changed_keys)} changed keys: {len(pairs)} pairs, "
+            f"{len(taxonomy_related)} from taxonomy, {len(candidates)} candidates, "
+            f"{len(unknown)} sent to LLM"
+        )
+        self._related_pairs |= taxonomy_related
+        self._related_pairs |= {pair for pair, related in verdicts.items() if related}
+        return self._related_pairs
+
+    async def _lookup_taxonomy(self, pairs: List[KeyPair]) -> set[KeyPair]:
+        """Find pairs the concept taxonomy already relates, in one traversal.
 
-        # Extract domain and key part
-        new_domain = new_key.split('.')[0] if '.' in new_key else None
-        new_key_only = new_key.split('.')[-1] if '.' in new_key else new_key
+        Args:
+            pairs: Sorted key pairs to check
 
-        # Filter existing keys to only same domain (e.g., both "food.*")
-        existing_keys = [
-            key for key in self.preferences.keys()
-            if (key.split('.')[0] if '.' in key else None) == new_domain
-        ]
+        Returns:
+            set[KeyPair]: Pairs whose keys are ancestor and descendant in the
+            taxonomy (empty without a taxonomy or if the lookup failed)
+        """
+        if self.taxonomy is None:
+            return set()
 
-        # If no keys in same domain, no conflicts possible
-        if not existing_keys:
-            return []
+        keys = list(dict.fromkeys(key for pair in pairs for key in pair))
+        try:
+            related = await self.taxonomy.related_keys(
+                keys,
+                keys,
+                max_depth=config.taxonomy_max_depth,
+                tenant_id=self._relatedness_scope(),
+            )
+        except Exception as e:
+            # The taxonomy is an optimization; the LLM can still judge the pairs
+            logger.warning(f"Taxonomy lookup failed: {e}")
+            return set()
+
+        return {
+            (key1, key2)
+            for key1, key2 in pairs
+            if normalize_concept_key(key2) in related.get(normalize_concept_key(key1), ())
+        }
 
-        prompt = f"""Analyze if any existing preferences are semantically related to the new preference.
+    async def _record_taxonomy(self, relations: List[IsA]) -> None:
+        """Add IS_A relations learned from LLM verdicts to the taxonomy.
 
-New preference: "{new_key_only}" (domain: {new_domain}) with sentiment "{new_sentiment}"
+        They are scoped like relatedness verdicts (see _relatedness_scope),
+        so they never change what other tenants see.
 
-Existing preferences in same domain: {json.dumps(existing_keys)}
+        Args:
+            relations: (child key, parent key) pairs
+        """
+        if self.taxonomy is None or not relations:
+            return
+
+        try:
+            await self.taxonomy.add_relations(
+                relations, source="llm", tenant_id=self._relatedness_scope()
+            )
+        except Exception as e:
+            logger.warning(f"Taxonomy update failed: {e}")
+
+    @staticmethod
+    def _opposite_sentiments(sentiment1: Optional[str], sentiment2: Optional[str]) -> bool:
+        """Check for a positive/negative sentiment pair."""
+        return {sentiment1, sentiment2} == {"positive", "negative"}
+
+    async def _adjudicate_related_pairs(
+        self, pairs: List[KeyPair]
+    ) -> Tuple[Dict[KeyPair, bool], List[IsA]]:
+        """Ask the LLM which preference pairs are semantically related, in one call.
+
+        The LLM also names the more general key of each related pair, which
+        becomes an IS_A relation for the taxonomy (synonyms in both directions).
+
+        Args:
+            pairs: Candidate key pairs
+
+        Returns:
+            Tuple of (verdict per pair; (child, parent) relations). Both are
+            empty if the LLM call failed (nothing is memoized then)
+        """
+        pair_lines = "\n".join(
+            f'{number}. "{key1}" - "{key2}"' for number, (key1, key2) in enumerate(pairs, start=1)
+        )
+        prompt = f"""Analyze which pairs of preferences are semantically related.
+
+Pairs:
+{pair_lines}
 
 Rules:
-- Find preferences that are subcategories or specific types of the new preference
-- Example: "food.coffee" (negative) conflicts with "food.cappuccino" (positive), "food.espresso" (positive)
-- Example: "food.meat" (negative) conflicts with "food.beef" (positive), "food.chicken" (positive)
+- A pair is related if one preference is a subcategory or specific type of the other
+- Example: "food.coffee" is related to "food.cappuccino" and "food.espresso"
+- Example: "food.meat" is related to "food.beef" and "food.chicken"
 - Only include DIRECT relationships (parent-child, synonym, or subcategory)
-- DO NOT include loosely related items (e.g., "food.cappuccino" is NOT related to "lifestyle.mornings")
-- Only return keys from the SAME domain ({new_domain})
+- DO NOT include loosely related items (e.g., "food.cappuccino" is NOT related to "food.breakfast")
 
-Return ONLY a JSON object with a "related_keys" array of preference keys that are semantically related.
-If no related preferences found, return: {{"related_keys": []}}
+Return ONLY a JSON object with a "related" array with one entry per related pair:
+{{"pair": <number>, "general": "<the more general key of the pair, or null for synonyms>"}}
+Example: {{"related": [{{"pair": 1, "general": "food.coffee"}}]}}
+If no pair is related, return: {{"related": []}}
 
 Response:"""
 
@@ -382,99 +823,125 @@ Response:"""
 
             response = await acompletion(**completion_kwargs)
             result = json.loads(response.choices[0].message.content)
-            related = result.get("related_keys", [])
 
-            logger.info(f"LLM analyzed '{new_key}' ({new_sentiment}) - found {len(related)} related: {related}")
+            related_numbers = set()
+            relations: List[IsA] = []
+            for entry in result.get("related", []):
+                # Plain numbers (no direction) are accepted but don't teach the taxonomy
+                number = entry.get("pair") if isinstance(entry, dict) else entry
+                if not isinstance(number, int) or not 1 <= number <= len(pairs):
+                    continue
+                related_numbers.add(number)
+                if not isinstance(entry, dict):
+                    continue
+
+                key1, key2 = pairs[number - 1]
+                general = entry.get("general")
+                if general is None:
+                    relations.extend([(key1, key2), (key2, key1)])
+                elif general in (key1, key2):
+                    relations.append((key2, key1) if general == key1 else (key1, key2))
 
-            return related
+            verdicts = {
+                pair: number in related_numbers
+                for number, pair in enumerate(pairs, start=1)
+            }
+            logger.info(
+                f"LLM analyzed {len(pairs)} preference pairs - found {len(related_numbers)} related: "
+                f"{[pair for pair, related in verdicts.items() if related]}"
+            )
+            return verdicts, relations
         except Exception as e:
             logger.error(f"Error finding related preferences: {str(e)}")
-            return []
+            return {}, []
+
+    def _relatedness_scope(self) -> str:
+        """Scope of this agent's relatedness verdicts (memo and learned taxonomy).
+
+        Preferences of an in-memory agent are private to the agent instance.
+
+        Returns:
+            str: Memo scope (a tenant ID for persistent agents)
+        """
+        return f"agent-{id(self)}"
 
-    async def _find_semantic_inconsistencies(self) -> List[Dict[str, Any]]:
+    def _find_semantic_inconsistencies(
+        self, related_pairs: set[KeyPair], changed_keys: Optional[set[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Find semantic inconsistencies in current preferences.
 
-        Checks all preferences pairwise to find parent-child conflicts
-        (e.g., negative coffee but positive espresso).
+        Looks for related pairs with opposite sentiment (parent-child
+        conflicts, e.g. negative coffee but positive espresso). Of each pair,
+        the earlier learned preference is reported as the "general" one.
 
-        Returns list of conflicts in same format as _update_preferences.
+        Args:
+            related_pairs: Related key pairs from _find_related_pairs
+            changed_keys: Only report pairs involving these keys (None: all pairs)
+
+        Returns:
+            List of conflicts in same format as _update_preferences
         """
         conflicts = []
 
         if len(self.preferences) < 2:
             return conflicts
 
-        # Check each preference against all others
-        checked_pairs = set()
-        for key1, pref1 in self.preferences.items():
-            # Skip if this preference is marked as an exception
-            if pref1.get("is_exception", False):
+        order = {key: index for index, key in enumerate(self.preferences)}
+        general_keys = set()
+        for pair in related_pairs:
+            if changed_keys is not None and not changed_keys.intersection(pair):
+                continue
+            if pair[0] not in order or pair[1] not in order:
                 continue
 
-            for key2, pref2 in self.preferences.items():
-                if key1 == key2:
-                    continue
-
-                # Skip if the related preference is marked as an exception
-                if pref2.get("is_exception", False):
-                    continue
-
-                # Skip if not in same domain (e.g., food.* vs lifestyle.*)
-                domain1 = key1.split('.')[0] if '.' in key1 else None
-                domain2 = key2.split('.')[0] if '.' in key2 else None
-                if domain1 != domain2:
-                    continue
-
-                # Skip if already checked (avoid duplicates)
-                pair = tuple(sorted([key1, key2]))
-                if pair in checked_pairs:
-                    continue
-                checked_pairs.add(pair)
-
-                # Only check if sentiments are opposite
-                if pref1["sentiment"] == pref2["sentiment"]:
-                    continue
-
-                # Check if semantically related
-                related_to_key1 = await self._find_related_preferences(key1, pref1["sentiment"])
-
-                if key2 in related_to_key1:
-                    # Found semantic conflict!
-                    # But only create conflict if key1 and key2 are DIFFERENT
-                    # (same key with different sentiment should be handled by direct conflict detection)
-                    key1_only = key1.split('.')[-1] if '.' in key1 else key1
-                    key2_only = key2.split('.')[-1] if '.' in key2 else key2
+            key1, key2 = sorted(pair, key=order.__getitem__)
+            pref1 = self.preferences[key1]
+            pref2 = self.preferences[key2]
 
-                    logger.info(f"Checking semantic conflict: key1='{key1}' (only='{key1_only}') vs key2='{key2}' (only='{key2_only}')")
+            # Skip if either preference is marked as an exception
+            if pref1.get("is_exception", False) or pref2.get("is_exception", False):
+                continue
 
-                    if key1_only == key2_only:
-                        # Same preference key - this is a direct conflict, not semantic
-                        # Skip it here, it will be handled by _update_preferences
-                        logger.info(f"Skipping same-key semantic conflict: {key1} vs {key2}")
-                        continue
+            # Only conflicting if sentiments are opposite
+            if pref1["sentiment"] == pref2["sentiment"]:
+                continue
 
-                    # Create conflict with key1 as the "general" preference
-                    # and key2 as the "specific" preference
-                    logger.info(f"Semantic inconsistency detected: {key1} ({pref1['sentiment']}) vs {key2} ({pref2['sentiment']})")
+            # Same key with different sentiment is handled by direct conflict detection
+            key1_only = key1.split('.')[-1] if '.' in key1 else key1
+            key2_only = key2.split('.')[-1] if '.' in key2 else key2
+            if key1_only == key2_only:
+                logger.info(f"Skipping same-key semantic conflict: {key1} vs {key2}")
+                continue
 
-                    conflicts.append({
-                        "key": key1,
-                        "old_value": pref1["value"],
-                        "old_sentiment": pref1["sentiment"],
-                        "old_confidence": pref1["confidence"],
-                        "new_value": pref1["value"],
-                        "new_sentiment": pref1["sentiment"],
-                        "new_confidence": pref1["confidence"],
-                        "related_keys": []  # Will be populated in chat_stream
-                    })
-                    break  # Only report each general preference once
+            logger.info(f"Semantic inconsistency detected: {key1} ({pref1['sentiment']}) vs {key2} ({pref2['sentiment']})")
+            general_keys.add(key1)
+
+        # Only report each general preference once
+        for key1 in sorted(general_keys, key=order.__getitem__):
+            pref1 = self.preferences[key1]
+            conflicts.append({
+                "key": key1,
+                "old_value": pref1["value"],
+                "old_sentiment": pref1["sentiment"],
+                "old_confidence": pref1["confidence"],
+                "new_value": pref1["value"],
+                "new_sentiment": pref1["sentiment"],
+                "new_confidence": pref1["confidence"],
+                "related_keys": []  # Will be populated in chat_stream
+            })
 
         return conflicts
 
-    def _update_preferences(self, extracted: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _update_preferences(
+        self, extracted: List[Dict[str, Any]], turn: Optional[TurnContext] = None
+    ) -> List[Dict[str, Any]]:
         """Update in-memory preference dict with validation and conflict detection.
 
         Returns list of conflicts that need user confirmation.
+
+        Args:
+            extracted: Extracted preferences
+            turn: State of the turn they were learned in (used by subclasses)
         """
         conflicts = []
 
@@ -523,18 +990,67 @@ Response:"""
                     continue  # Keep existing preference
 
             # Add or update preference
-            self.preferences[key] = {
+            action = "Updated" if key in self.preferences else "Added"
+            self._set_preference(key, {
                 "value": new_value,
                 "sentiment": new_sentiment,
                 "confidence": new_confidence,
                 "is_exception": False  # Default: not an exception
-            }
+            })
             sentiment_emoji = "👍" if new_sentiment == "positive" else "👎" if new_sentiment == "negative" else "😐"
-            action = "Updated" if key in self.preferences else "Added"
             logger.info(f"{action} preference: {key} = {new_value} ({sentiment_emoji} {new_sentiment}, confidence: {new_confidence:.0%})")
 
         return conflicts
 
+    def _set_preference(self, key: str, pref: Dict[str, Any]) -> None:
+        """Add or replace a preference as the most recently learned one.
+
+        self.preferences is kept ordered from oldest to most recently
+        learned; the prompt builder uses this order as recency signal.
+        """
+        self.preferences.pop(key, None)
+        self.preferences[key] = pref
+        self._dirty_keys.add(key)
+
+    @serialized
+    async def set_preference(self, key: str, pref: Dict[str, Any]) -> None:
+        """Add or replace a preference (e.g. a manual edit), in order with chat turns.
+
+        Args:
+            key: Preference key (domain.key)
+            pref: Preference data (value, sentiment, confidence, is_exception)
+        """
+        self._set_preference(key, pref)
+
+    def preferences_snapshot(self) -> Mapping[str, Mapping[str, Any]]:
+        """Get a read-only copy of the preferences.
+
+        Readers use this instead of self.preferences, so they don't wait for
+        the mailbox and never see a preference change halfway.
+
+        Returns:
+            Immutable mapping of preference keys to immutable preference data
+        """
+        return MappingProxyType({
+            key: MappingProxyType(dict(pref)) for key, pref in self.preferences.items()
+        })
+
+    def _remove_preference(self, key: str) -> None:
+        """Remove a preference and the conflict detection results involving it."""
+        self.preferences.pop(key, None)
+        self._dirty_keys.discard(key)
+        self._related_pairs = {pair for pair in self._related_pairs if key not in pair}
+
+    def _reset_conflict_state(self) -> None:
+        """Re-check all preferences at the next conflict scan (after reloading or clearing)."""
+        self._dirty_keys = set(self.preferences)
+        self._related_pairs = set()
+
+    def _take_dirty_keys(self) -> set[str]:
+        """Get and reset the keys added or changed since the last conflict scan."""
+        dirty_keys, self._dirty_keys = self._dirty_keys, set()
+        return dirty_keys
+
     def _get_recent_history(self) -> List[Dict[str, str]]:
         """Get recent conversation history using sliding window.
 
@@ -547,21 +1063,42 @@ Response:"""
         # Return only the most recent messages
         return self.conversation_history[-self.max_history_messages:]
 
-    def _build_prompt(self) -> str:
+    def _build_prompt(
+        self,
+        preferences: Dict[str, Dict[str, Any]] | None = None,
+        message: str = "",
+    ) -> str:
         """Build system prompt with learned preferences.
 
         This implements Structured Memory: preferences are stored separately
         and compactly included in the system prompt, while conversation
         history uses a sliding window.
+
+        Preferences are ranked by relevance to the message, confidence and
+        recency, and included up to the configured token budget.
+
+        In the cache-friendly layout (FIDUS_PROMPT_CACHE_FRIENDLY) the prompt
+        starts with static instructions, lists preferences in key order and
+        leaves out the current time, which _build_messages appends after the
+        history. Preferences over the token budget are ranked without the
+        message, so the selected subset doesn't change from turn to turn.
+        Consecutive turns then share the prompt prefix, so Ollama's KV cache
+        and provider prompt caching can reuse it. The prefix still changes
+        when preferences are learned, or when a subclass passes a different
+        per-message selection (e.g. context-relevant preferences).
+
+        Args:
+            preferences: Preferences to include (defaults to self.preferences)
+            message: Current user message (for relevance ranking)
         """
-        # Get current datetime in Europe/Berlin timezone
-        timezone = os.getenv("TZ", "Europe/Berlin")
-        try:
-            tz = ZoneInfo(timezone)
-            current_datetime = datetime.now(tz).strftime("%A, %Y-%m-%d %H:%M:%S %Z")
-        except Exception:
-            # Fallback to UTC if timezone not found
-            current_datetime = datetime.now().strftime("%A, %Y-%m-%d %H:%M:%S UTC")
+        if preferences is None:
+            preferences = self.preferences
+
+        if config.prompt_cache_friendly:
+            preference_section, _ = self.preference_section.build(preferences, sort_keys=True)
+            return (STATIC_INSTRUCTIONS + preference_section).rstrip()
+
+        current_datetime = self._current_datetime("%A, %Y-%m-%d %H:%M:%S %Z")
 
         base = f"""You are Fidus Memory, a friendly conversational AI that learns about the user's preferences.
 
@@ -574,14 +1111,53 @@ IMPORTANT:
 
 """
 
-        if self.preferences:
-            base += "User's known preferences:\n"
-            for key, pref in self.preferences.items():
-                sentiment = pref.get('sentiment', 'neutral')
-                sentiment_prefix = "likes" if sentiment == "positive" else "dislikes" if sentiment == "negative" else "neutral about"
-                base += f"- {key}: {sentiment_prefix} {pref['value']}\n"
-            base += "\n"
+        preference_section, _ = self.preference_section.build(preferences, message)
+        base += preference_section
 
         base += "Respond naturally and conversationally. Ask follow-up questions to learn more preferences."
 
         return base
+
+    def _build_messages(
+        self, system_prompt: str, recent_history: List[Dict[str, str]]
+    ) -> List[Dict[str, str]]:
+        """Build the chat completion messages and record prefix stability.
+
+        In the cache-friendly layout the current time (minute resolution) is
+        sent as a trailing system message, after the history, so it doesn't
+        invalidate the cached prefix.
+
+        Args:
+            system_prompt: System prompt from _build_prompt
+            recent_history: Conversation history window
+
+        Returns:
+            Messages for acompletion
+        """
+        prompt_cache_metrics.record_prefix(system_prompt == self._last_system_prompt)
+        self._last_system_prompt = system_prompt
+
+        messages = [{"role": "system", "content": system_prompt}, *recent_history]
+        if config.prompt_cache_friendly:
+            current_datetime = self._current_datetime("%A, %Y-%m-%d %H:%M %Z")
+            messages.append({"role": "system", "content": f"Current Date and Time: {current_datetime}"})
+        return messages
+
+    @staticmethod
+    def _current_datetime(fmt: str) -> str:
+        """Format the current datetime in the configured timezone.
+
+        Args:
+            fmt: strftime format ending in %Z
+
+        Returns:
+            str: Formatted datetime
+        """
+        # Get current datetime in Europe/Berlin timezone
+        timezone = os.getenv("TZ", "Europe/Berlin")
+        try:
+            tz = ZoneInfo(timezone)
+            return datetime.now(tz).strftime(fmt)
+        except Exception:
+            # Fallback to UTC if timezone not found
+            return datetime.now().strftime(fmt.replace("%Z", "UTC"))
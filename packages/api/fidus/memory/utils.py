@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional
 
 from fidus.config import config
 from fidus.infrastructure.neo4j_client import Neo4jPreferenceStore
+from fidus.infrastructure.resources import get_resources
 from fidus.memory.context.agent import ContextAwareAgent
 from fidus.memory.context.models import Situation
 
@@ -23,7 +24,7 @@ async def get_neo4j_store() -> Neo4jPreferenceStore:
     """Get or create Neo4j store instance."""
     global _neo4j_store
     if _neo4j_store is None:
-        _neo4j_store = Neo4jPreferenceStore(config)
+        _neo4j_store = Neo4jPreferenceStore(config, resources=get_resources())
         await _neo4j_store.connect()
         logger.info("Initialized Neo4j store")
     return _neo4j_store
@@ -33,7 +34,7 @@ async def get_context_agent() -> ContextAwareAgent:
     """Get or create ContextAwareAgent instance."""
     global _context_agent
     if _context_agent is None:
-        _context_agent = ContextAwareAgent()
+        _context_agent = ContextAwareAgent(resources=get_resources())
         logger.info("Initialized ContextAwareAgent")
     return _context_agent
 
@@ -0,0 +1,135 @@
+"""Tests for startup warmup and readiness-gated health checks.
+
+Tests:
+- Components run concurrently and record timings
+- Failures and timeouts are recorded without blocking readiness
+- /health returns 503 while warming up
+- /health/warmup reports per-component results
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from fidus.api.warmup import WarmupState, run_warmup, warmup_state
+from fidus.main import app
+
+
+@pytest.fixture(autouse=True)
+def reset_warmup_state():
+    """Restore the global warmup state after each test."""
+    yield
+    warmup_state.__init__()
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_records_component_results():
+    """Should record status and timing for each component and become ready."""
+
+    async def ok():
+        await asyncio.sleep(0)
+
+    async def failing():
+        raise ConnectionError("connection refused")
+
+    state = await run_warmup({"embedding": ok, "redis": failing})
+
+    assert state.state == WarmupState.READY
+    assert state.duration_seconds is not None
+    assert state.components["embedding"]["status"] == "ok"
+    assert state.components["embedding"]["error"] is None
+    assert state.components["redis"]["status"] == "error"
+    assert "connection refused" in state.components["redis"]["error"]
+    assert state.components["redis"]["seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_times_out_slow_component():
+    """Should give up on a component after the warmup timeout."""
+
+    async def hanging():
+        await asyncio.sleep(10)
+
+    with patch("fidus.api.warmup.config") as mock_config:
+        mock_config.warmup_timeout_seconds = 0.01
+        state = await run_warmup({"llm": hanging})
+
+    assert state.state == WarmupState.READY
+    assert state.components["llm"]["status"] == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_runs_components_concurrently():
+    """Should warm components in parallel, not one after another."""
+    running = 0
+    max_running = 0
+
+    async def tracked():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await run_warmup({"embedding": tracked, "llm": tracked, "qdrant": tracked})
+
+    assert max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_run_warmup_uses_configured_components():
+    """Should only run the components listed in config.warmup_components."""
+    called = []
+
+    async def warm_embedding():
+        called.append("embedding")
+
+    async def warm_llm():
+        called.append("llm")
+
+    components = {"embedding": warm_embedding, "llm": warm_llm}
+    with patch("fidus.api.warmup.WARMUP_COMPONENTS", components), \
+         patch("fidus.api.warmup.config") as mock_config:
+        mock_config.warmup_components = ["llm"]
+        mock_config.warmup_timeout_seconds = 1
+        await run_warmup()
+
+    assert called == ["llm"]
+
+
+@pytest.mark.asyncio
+async def test_health_returns_503_while_warming_up():
+    """Should report warming_up with 503 until warmup has finished."""
+    warmup_state.start()
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/health")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+        warmup_state.finish()
+
+        response = await client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_warmup_status_endpoint():
+    """Should expose per-component warmup results without auth."""
+
+    async def ok():
+        return None
+
+    await run_warmup({"qdrant": ok})
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/health/warmup")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["state"] == "ready"
+    assert data["components"]["qdrant"]["status"] == "ok"
+    assert "X-User-ID" not in response.headers
@@ -0,0 +1,66 @@
+"""Tests for the in-process LRU cache."""
+
+import time
+
+import pytest
+
+from fidus.infrastructure.memory_cache import LRUCache
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+
+    def test_get_and_set(self) -> None:
+        """Should return cached values and count hits/misses."""
+        cache: LRUCache[str] = LRUCache(max_size=2)
+
+        assert cache.get("a") is None
+        cache.set("a", "value-a")
+        assert cache.get("a") == "value-a"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Should evict the least recently used entry when full."""
+        cache: LRUCache[int] = LRUCache(max_size=2)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Should treat expired entries as misses."""
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+        cache: LRUCache[int] = LRUCache(max_size=10, ttl_seconds=60)
+        cache.set("a", 1)
+
+        now[0] += 30
+        assert cache.get("a") == 1
+
+        now[0] += 31
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self) -> None:
+        """Should not store anything when max_size is 0."""
+        cache: LRUCache[int] = LRUCache(max_size=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_negative_size_rejected(self) -> None:
+        """Should reject negative capacity."""
+        with pytest.raises(ValueError):
+            LRUCache(max_size=-1)
@@ -0,0 +1,221 @@
+"""Tests for the Neo4j concept taxonomy.
+
+These tests verify the taxonomy store implementation including:
+- Concept key normalization
+- Constraint creation on connect
+- Adding and seeding IS_A relations (learned ones scoped per tenant)
+- Related key lookups in one query
+- Seed vocabulary loading
+"""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fidus.infrastructure.neo4j_taxonomy import (
+    DEFAULT_VOCABULARY,
+    SHARED_SCOPE,
+    Neo4jTaxonomyStore,
+    load_vocabulary,
+    normalize_concept_key,
+)
+from fidus.config import PrototypeConfig
+
+
+@pytest.fixture
+def mock_config():
+    """Create a mock configuration."""
+    config = MagicMock(spec=PrototypeConfig)
+    config.neo4j_uri = "bolt://localhost:7687"
+    config.neo4j_user = "neo4j"
+    config.neo4j_password = "password"
+    return config
+
+
+@pytest.fixture
+def store(mock_config):
+    """Create a Neo4jTaxonomyStore instance."""
+    return Neo4jTaxonomyStore(mock_config)
+
+
+@pytest.fixture
+def mock_driver():
+    """Create a mock Neo4j driver."""
+    driver = MagicMock()
+    session = AsyncMock()
+
+    context_mgr = MagicMock()
+    context_mgr.__aenter__ = AsyncMock(return_value=session)
+    context_mgr.__aexit__ = AsyncMock(return_value=None)
+    driver.session.return_value = context_mgr
+    driver.verify_connectivity = AsyncMock()
+    driver.close = AsyncMock()
+
+    return driver, session
+
+
+def _patch_driver(driver):
+    return patch(
+        "fidus.infrastructure.neo4j_taxonomy.AsyncGraphDatabase.driver",
+        return_value=driver,
+    )
+
+
+def test_normalize_concept_key():
+    """Should lowercase keys and join words with underscores."""
+    assert normalize_concept_key(" Food.Instant Coffee ") == "food.instant_coffee"
+    assert normalize_concept_key("music.hip-hop") == "music.hip_hop"
+
+
+class TestConnection:
+    """Tests for connection management."""
+
+    @pytest.mark.asyncio
+    async def test_connect_creates_key_constraint(self, store, mock_driver):
+        """Should create the unique constraint on the concept key."""
+        driver, session = mock_driver
+
+        with _patch_driver(driver):
+            await store.connect()
+
+        driver.verify_connectivity.assert_called_once()
+        query = session.run.call_args[0][0]
+        assert "Concept" in query and "c.key IS UNIQUE" in query
+
+    @pytest.mark.asyncio
+    async def test_operations_without_connection(self, store):
+        """Should raise if the driver is not initialized."""
+        with pytest.raises(RuntimeError):
+            await store.related_keys(["food.coffee"], ["food.espresso"])
+
+
+class TestRelations:
+    """Tests for adding relations."""
+
+    @pytest.mark.asyncio
+    async def test_add_relations_normalizes_keys(self, store, mock_driver):
+        """Should merge normalized relations in one query and skip self-relations."""
+        driver, session = mock_driver
+
+        with _patch_driver(driver):
+            await store.connect()
+            session.run.reset_mock()
+            count = await store.add_relations(
+                [("food.Flat White", "food.coffee"), ("food.coffee", "Food.Coffee")],
+                tenant_id="tenant-1",
+            )
+
+        assert count == 1
+        session.run.assert_called_once()
+        kwargs = session.run.call_args[1]
+        assert kwargs["rows"] == [{"child": "food.flat_white", "parent": "food.coffee"}]
+        assert kwargs["source"] == "llm"
+        assert kwargs["scope"] == "tenant-1"
+
+    @pytest.mark.asyncio
+    async def test_learned_relations_require_a_tenant(self, store, mock_driver):
+        """Should not let LLM-learned relations into the shared scope."""
+        driver, session = mock_driver
+
+        with _patch_driver(driver):
+            await store.connect()
+            session.run.reset_mock()
+            with pytest.raises(ValueError):
+                await store.add_relations([("food.espresso", "food.coffee")])
+
+        session.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_seed_submits_vocabulary(self, store, mock_driver):
+        """Should add one IS_A relation per child with source "seed"."""
+        driver, session = mock_driver
+
+        with _patch_driver(driver):
+            await store.connect()
+            count = await store.seed({"food.coffee": ["food.espresso", "food.latte"]})
+
+        assert count == 2
+        kwargs = session.run.call_args[1]
+        assert kwargs["source"] == "seed"
+        assert kwargs["scope"] == SHARED_SCOPE
+        assert {row["child"] for row in kwargs["rows"]} == {"food.espresso", "food.latte"}
+
+
+class TestRelatedKeys:
+    """Tests for related key lookups."""
+
+    @pytest.mark.asyncio
+    async def test_related_keys(self, store, mock_driver):
+        """Should look up all keys in one query."""
+        driver, session = mock_driver
+        mock_result = AsyncMock()
+        mock_result.__aiter__.return_value = [
+            {"key": "food.coffee", "related": ["food.espresso"]},
+        ]
+
+        with _patch_driver(driver):
+            await store.connect()
+            session.run.reset_mock()
+            session.run.return_value = mock_result
+            related = await store.related_keys(
+                ["food.coffee", "food.tea"],
+                ["food.espresso", "food.tea"],
+                max_depth=2,
+                tenant_id="tenant-1",
+            )
+
+        assert related == {"food.coffee": ["food.espresso"]}
+        session.run.assert_called_once()
+        query = session.run.call_args[0][0]
+        assert "IS_A*1..2" in query
+        assert session.run.call_args[1]["keys"] == ["food.coffee", "food.tea"]
+        assert session.run.call_args[1]["scopes"] == [SHARED_SCOPE, "tenant-1"]
+
+    @pytest.mark.asyncio
+    async def test_related_keys_without_tenant_uses_seed_only(self, store, mock_driver):
+        """Should follow only shared edges without a tenant."""
+        driver, session = mock_driver
+        mock_result = AsyncMock()
+        mock_result.__aiter__.return_value = []
+
+        with _patch_driver(driver):
+            await store.connect()
+            session.run.return_value = mock_result
+            await store.related_keys(["food.coffee"], ["food.espresso"])
+
+        assert session.run.call_args[1]["scopes"] == [SHARED_SCOPE]
+
+    @pytest.mark.asyncio
+    async def test_related_keys_empty_input(self, store, mock_driver):
+        """Should not query without keys."""
+        driver, session = mock_driver
+
+        with _patch_driver(driver):
+            await store.connect()
+            session.run.reset_mock()
+            assert await store.related_keys([], ["food.tea"]) == {}
+
+        session.run.assert_not_called()
+
+
+class TestVocabulary:
+    """Tests for seed vocabulary loading."""
+
+    def test_default_vocabulary(self):
+        """Should use the built-in vocabulary without a path."""
+        assert load_vocabulary() is DEFAULT_VOCABULARY
+
+    def test_load_from_file(self, tmp_path):
+        """Should load a parent -> children mapping from JSON."""
+        path = tmp_path / "vocabulary.json"
+        path.write_text(json.dumps({"food.bread": ["food.sourdough"]}))
+
+        assert load_vocabulary(str(path)) == {"food.bread": ["food.sourdough"]}
+
+    def test_invalid_file(self, tmp_path):
+        """Should reject files that are not a parent -> children mapping."""
+        path = tmp_path / "vocabulary.json"
+        path.write_text(json.dumps(["food.bread"]))
+
+        with pytest.raises(ValueError):
+            load_vocabulary(str(path))
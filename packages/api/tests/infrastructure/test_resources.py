@@ -0,0 +1,211 @@
+"""Tests for the process-wide connection pool container.
+
+These tests verify:
+- Lazy creation of one shared client per backend
+- One-time setup steps
+- The process-wide container opened on startup and closed on shutdown
+- Stores and services borrowing shared clients without closing them
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fidus.config import PrototypeConfig
+from fidus.infrastructure.neo4j_client import Neo4jPreferenceStore
+from fidus.infrastructure.postgres.conversation_store import ConversationStore
+from fidus.infrastructure.redis.session_cache import SessionCache
+from fidus.infrastructure.resources import (
+    Resources,
+    close_resources,
+    get_resources,
+    open_resources,
+)
+from fidus.memory.context.retrieval import ContextRetrievalService
+from fidus.memory.context.storage import ContextStorageService
+
+
+@pytest.fixture
+def mock_config():
+    """Create a mock configuration."""
+    config = MagicMock(spec=PrototypeConfig)
+    config.neo4j_uri = "bolt://localhost:7687"
+    config.neo4j_user = "neo4j"
+    config.neo4j_password = "password"
+    config.neo4j_max_pool_size = 25
+    config.qdrant_host = "localhost"
+    config.qdrant_port = 6333
+    config.qdrant_grpc_port = 6334
+    config.qdrant_pool_size = 5
+    config.redis_url = "redis://localhost:6379/0"
+    config.redis_max_connections = 10
+    config.postgres_host = "localhost"
+    config.postgres_port = 5432
+    config.postgres_user = "fidus"
+    config.postgres_password = "password"
+    config.postgres_db = "fidus"
+    config.postgres_pool_min_size = 1
+    config.postgres_pool_max_size = 4
+    return config
+
+
+@pytest.fixture
+def mock_driver():
+    """Create a mock Neo4j driver."""
+    driver = MagicMock()
+    session = AsyncMock()
+    context_mgr = MagicMock()
+    context_mgr.__aenter__ = AsyncMock(return_value=session)
+    context_mgr.__aexit__ = AsyncMock(return_value=None)
+    driver.session.return_value = context_mgr
+    driver.verify_connectivity = AsyncMock()
+    driver.close = AsyncMock()
+    return driver
+
+
+@pytest.fixture
+def resources(mock_config, mock_driver):
+    """Create a Resources container with mocked clients."""
+    resources = Resources(mock_config)
+    resources._neo4j_driver = mock_driver
+    resources._qdrant_client = MagicMock()
+    resources._redis_client = MagicMock(ping=AsyncMock(), aclose=AsyncMock())
+    return resources
+
+
+class TestResources:
+    """Tests for the container itself."""
+
+    def test_neo4j_driver_created_once_with_pool_size(self, mock_config, mock_driver):
+        """Should create a single driver sized from the config."""
+        resources = Resources(mock_config)
+
+        with patch(
+            "fidus.infrastructure.resources.AsyncGraphDatabase.driver",
+            return_value=mock_driver,
+        ) as create_driver:
+            assert resources.neo4j_driver is mock_driver
+            assert resources.neo4j_driver is mock_driver
+
+        create_driver.assert_called_once()
+        assert create_driver.call_args[1]["max_connection_pool_size"] == 25
+
+    @pytest.mark.asyncio
+    async def test_postgres_pool_created_once(self, mock_config):
+        """Should create the PostgreSQL pool on first use only."""
+        resources = Resources(mock_config)
+        pool = MagicMock(close=AsyncMock())
+
+        with patch(
+            "fidus.infrastructure.resources.asyncpg.create_pool",
+            new_callable=AsyncMock,
+            return_value=pool,
+        ) as create_pool:
+            assert await resources.postgres_pool() is pool
+            assert await resources.postgres_pool() is pool
+
+        create_pool.assert_awaited_once()
+        assert create_pool.await_args[1]["max_size"] == 4
+
+    @pytest.mark.asyncio
+    async def test_once_runs_setup_once_and_retries_failures(self, resources):
+        """Should run a setup step once, but again after a failure."""
+        setup = AsyncMock(side_effect=[Exception("Neo4j down"), None])
+
+        with pytest.raises(Exception, match="Neo4j down"):
+            await resources.once("step", setup)
+        await resources.once("step", setup)
+        await resources.once("step", setup)
+
+        assert setup.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_close_closes_all_pools(self, resources, mock_driver):
+        """Should close every open client."""
+        qdrant_client = resources._qdrant_client
+        redis_client = resources._redis_client
+
+        await resources.close()
+
+        mock_driver.close.assert_awaited_once()
+        qdrant_client.close.assert_called_once()
+        redis_client.aclose.assert_awaited_once()
+        assert resources.stats()["neo4j"] is False
+
+
+class TestProcessResources:
+    """Tests for the process-wide container lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_open_get_close(self, mock_config):
+        """Should create the container on startup and drop it on shutdown."""
+        with patch("fidus.infrastructure.resources._resources", None):
+            with pytest.raises(RuntimeError):
+                get_resources()
+
+            resources = open_resources(mock_config)
+            assert open_resources(mock_config) is resources
+            assert get_resources() is resources
+
+            resources._redis_client = MagicMock(aclose=AsyncMock())
+            redis_client = resources._redis_client
+            await close_resources()
+
+            redis_client.aclose.assert_awaited_once()
+            with pytest.raises(RuntimeError):
+                get_resources()
+
+
+class TestInjection:
+    """Tests for components borrowing shared clients."""
+
+    @pytest.mark.asyncio
+    async def test_stores_share_driver_and_setup(self, mock_config, resources, mock_driver):
+        """Should verify and create constraints once and never close the shared driver."""
+        first = Neo4jPreferenceStore(mock_config, resources=resources)
+        second = Neo4jPreferenceStore(mock_config, resources=resources)
+
+        await first.connect()
+        await second.connect()
+        await first.disconnect()
+
+        assert second._driver is mock_driver
+        mock_driver.verify_connectivity.assert_awaited_once()
+        mock_driver.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_context_services_use_shared_clients(self, resources, mock_driver):
+        """Should use shared clients and leave them open on close."""
+        storage = ContextStorageService(embedding_service=MagicMock(), resources=resources)
+        retrieval = ContextRetrievalService(resources=resources)
+
+        await storage.close()
+        retrieval.close()
+
+        assert storage.neo4j_driver is mock_driver
+        assert retrieval.qdrant_client is resources.qdrant_client
+        mock_driver.close.assert_not_awaited()
+        resources.qdrant_client.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_session_cache_uses_shared_pool(self, mock_config, resources):
+        """Should borrow the shared Redis client and leave it open."""
+        cache = SessionCache(mock_config, resources=resources)
+
+        await cache.connect()
+        await cache.disconnect()
+
+        resources.redis_client.ping.assert_awaited_once()
+        resources.redis_client.aclose.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_conversation_store_uses_shared_pool(self, resources):
+        """Should borrow the shared PostgreSQL pool and leave it open."""
+        pool = MagicMock(close=AsyncMock())
+        resources._postgres_pool = pool
+        store = ConversationStore(resources=resources)
+
+        await store.initialize()
+        await store.close()
+
+        assert store.pool is pool
+        pool.close.assert_not_awaited()
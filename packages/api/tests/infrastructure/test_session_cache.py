@@ -412,6 +412,48 @@ class TestSessionCacheClearAll:
         )
 
 
+class TestSessionCacheEmbedding:
+    """Test content-addressed embedding caching."""
+
+    async def test_cache_and_retrieve_embedding(self, cache: SessionCache) -> None:
+        """Test caching and retrieving an embedding vector."""
+        content_hash = "test-embedding-hash"
+        vector = [0.1, -0.2, 0.3]
+
+        await cache.cache_embedding(content_hash, vector)
+
+        assert await cache.get_cached_embedding(content_hash) == vector
+
+    async def test_embedding_cache_miss(self, cache: SessionCache) -> None:
+        """Test embedding cache miss returns None."""
+        assert await cache.get_cached_embedding("unknown-embedding-hash") is None
+
+    async def test_embedding_without_connect(self) -> None:
+        """Test that embedding retrieval fails without connect()."""
+        config = PrototypeConfig()
+        cache = SessionCache(config)
+
+        with pytest.raises(RuntimeError, match="not initialized"):
+            await cache.get_cached_embedding("hash")
+
+
+class TestSessionCacheExtraction:
+    """Test content-addressed extraction result caching."""
+
+    async def test_cache_and_retrieve_extraction(self, cache: SessionCache) -> None:
+        """Test caching and retrieving an extraction result."""
+        content_hash = "test-extraction-hash"
+        result = {"context": {"factors": {"mood": "tired"}}, "confidence": 0.8}
+
+        await cache.cache_extraction(content_hash, result, ttl_seconds=60)
+
+        assert await cache.get_cached_extraction(content_hash) == result
+
+    async def test_extraction_cache_miss(self, cache: SessionCache) -> None:
+        """Test extraction cache miss returns None."""
+        assert await cache.get_cached_extraction("unknown-extraction-hash") is None
+
+
 class TestSessionCacheErrors:
     """Test error handling."""
 
@@ -1,13 +1,15 @@
 """Tests for context-aware agent."""
 
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from fidus.memory.context.agent import ContextAwareAgent
+from fidus.memory.context.extractor import CombinedExtractor
 from fidus.memory.context.models import (
     ContextExtractionResult,
     ContextFactors,
+    MessageAnalysis,
     Situation,
 )
 
@@ -133,6 +135,113 @@ class TestContextAwareAgent:
         # Should return merged context
         assert result == merged_context
 
+    @pytest.mark.asyncio
+    async def test_extract_and_merge_context_reuses_llm_result(
+        self,
+        agent: ContextAwareAgent,
+        mock_extractor: Mock,
+        mock_system_provider: Mock,
+        mock_merger: Mock,
+    ) -> None:
+        """Should skip the LLM call when the context was already extracted."""
+        mock_extractor.extract = AsyncMock()
+        llm_result = ContextExtractionResult(
+            context=ContextFactors(factors={"mood": "calm"}),
+            confidence=0.8,
+        )
+        system_context = ContextFactors(factors={"time_of_day": "evening"})
+        mock_system_provider.get_context.return_value = system_context
+        mock_merger.merge.return_value = ContextFactors(
+            factors={"mood": "calm", "time_of_day": "evening"}
+        )
+
+        await agent.extract_and_merge_context(
+            message="Relaxing now",
+            tenant_id="tenant-1",
+            user_id="user-1",
+            llm_result=llm_result,
+        )
+
+        mock_extractor.extract.assert_not_called()
+        mock_merger.merge.assert_called_once_with(
+            llm_context=llm_result.context,
+            system_context=system_context,
+            tenant_id="tenant-1",
+            user_id="user-1",
+        )
+
+    @pytest.mark.asyncio
+    async def test_analyze_message_combined(self, mock_storage: Mock) -> None:
+        """Should use the combined extractor's single analysis call."""
+        extractor = Mock(spec=CombinedExtractor)
+        analysis = MessageAnalysis(
+            preferences=[{"domain": "food", "key": "tea", "value": "likes it"}],
+            context=ContextExtractionResult(context=ContextFactors(), confidence=0.5),
+        )
+        extractor.analyze = AsyncMock(return_value=analysis)
+        agent = ContextAwareAgent(
+            extractor=extractor,
+            system_provider=Mock(),
+            merger=Mock(),
+            embedding_service=Mock(),
+            storage=mock_storage,
+            retrieval=Mock(),
+        )
+
+        result = await agent.analyze_message("I like tea", "tenant-1", "user-1")
+
+        assert result == analysis
+        extractor.analyze.assert_called_once_with(
+            message="I like tea", tenant_id="tenant-1", user_id="user-1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_analyze_message_context_only_extractor(
+        self, agent: ContextAwareAgent, mock_extractor: Mock
+    ) -> None:
+        """Should fall back to context-only extraction without preferences."""
+        llm_result = ContextExtractionResult(context=ContextFactors(), confidence=0.2)
+        mock_extractor.extract = AsyncMock(return_value=llm_result)
+
+        result = await agent.analyze_message("Hello", "tenant-1", "user-1")
+
+        assert result.preferences is None
+        assert result.context == llm_result
+
+    @pytest.mark.asyncio
+    async def test_record_preference_with_given_context(
+        self,
+        agent: ContextAwareAgent,
+        mock_extractor: Mock,
+        mock_embedding_service: Mock,
+        mock_storage: Mock,
+    ) -> None:
+        """Should not extract context again when the merged context is given."""
+        mock_extractor.extract = AsyncMock()
+        context = ContextFactors(factors={"time_of_day": "morning"})
+        mock_embedding_service.generate_embedding = AsyncMock(return_value=[0.1] * 8)
+        situation = Situation(
+            id="sit-1", tenant_id="tenant-1", user_id="user-1", context=context
+        )
+        mock_storage.store_situation = AsyncMock(return_value=situation)
+        mock_storage.link_preference_to_situation = AsyncMock()
+
+        result = await agent.record_preference_with_context(
+            message="I want a cappuccino",
+            preference_id="pref-1",
+            tenant_id="tenant-1",
+            user_id="user-1",
+            context=context,
+        )
+
+        assert result == situation
+        mock_extractor.extract.assert_not_called()
+        mock_embedding_service.generate_embedding.assert_called_once_with(
+            context=context,
+            tenant_id="tenant-1",
+            user_id="user-1",
+        )
+
     @pytest.mark.asyncio
     async def test_record_preference_with_context(
         self,
@@ -432,8 +541,23 @@ class TestContextAwareAgent:
         self,
         agent: ContextAwareAgent,
         mock_storage: Mock,
+        mock_retrieval: Mock,
     ) -> None:
-        """Should close storage connections."""
+        """Should close storage and retrieval connections."""
         await agent.close()
 
         mock_storage.close.assert_called_once()
+        mock_retrieval.close.assert_called_once()
+
+    def test_agents_share_embedding_service(self) -> None:
+        """Should use one process-wide embedding service for all agents and their storage."""
+        resources = Mock()
+        with patch(
+            "fidus.memory.context.embedding_service._default_service", None
+        ), patch("fidus.memory.context.embedding_service.EmbeddingService") as service_class:
+            first = ContextAwareAgent(extractor=Mock(), resources=resources)
+            second = ContextAwareAgent(extractor=Mock(), resources=resources)
+
+        service_class.assert_called_once()
+        assert first.embedding_service is second.embedding_service
+        assert first.storage.embedding_service is first.embedding_service
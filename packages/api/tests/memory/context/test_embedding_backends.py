@@ -0,0 +1,113 @@
+"""Tests for local embedding backends."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from fidus.config import config
+from fidus.memory.context.embedding_backends import (
+    LocalEmbeddingBackend,
+    get_embedding_backend,
+)
+from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.memory.context.models import ContextFactors
+
+
+class TestLocalEmbeddingBackend:
+    """Tests for LocalEmbeddingBackend."""
+
+    def test_hashing_is_deterministic_and_normalized(self) -> None:
+        """Should return the same unit vector for the same text."""
+        backend = LocalEmbeddingBackend(dimension=64)
+
+        first, second = backend.embed_sync(
+            ["mood: happy, time_of_day: morning", "mood: happy, time_of_day: morning"]
+        )
+
+        assert first == second
+        assert len(first) == 64
+        assert np.linalg.norm(first) == pytest.approx(1.0, abs=1e-5)
+
+    def test_shared_factors_are_more_similar(self) -> None:
+        """Should place contexts sharing factors closer together."""
+        backend = LocalEmbeddingBackend(dimension=256)
+
+        base, close, far = np.array(
+            backend.embed_sync(
+                [
+                    "mood: happy, time_of_day: morning",
+                    "mood: happy, time_of_day: evening",
+                    "location: office, weather: rainy",
+                ]
+            )
+        )
+
+        assert float(base @ close) > float(base @ far)
+
+    def test_registers_dimension_in_config(self) -> None:
+        """Should register its dimension for Qdrant setup and validation."""
+        LocalEmbeddingBackend(model="local/test-model", dimension=32)
+
+        assert config.embedding_dimensions["local/test-model"] == 32
+
+    def test_projection_loaded_from_disk(self, tmp_path: Path) -> None:
+        """Should project hashed features with a matrix loaded from .npy."""
+        path = tmp_path / "projection.npy"
+        np.save(path, np.random.default_rng(0).normal(size=(64, 16)).astype(np.float32))
+
+        backend = LocalEmbeddingBackend(
+            model="local/test-projection", dimension=64, projection_path=str(path)
+        )
+        vector = backend.embed_sync(["mood: happy"])[0]
+
+        assert backend.dimension == 16
+        assert len(vector) == 16
+        assert config.embedding_dimensions["local/test-projection"] == 16
+        assert backend.cache_namespace.startswith("local/test-projection:")
+
+    def test_projection_shape_mismatch(self, tmp_path: Path) -> None:
+        """Should reject a projection whose input size doesn't match."""
+        path = tmp_path / "projection.npy"
+        np.save(path, np.zeros((10, 4), dtype=np.float32))
+
+        with pytest.raises(ValueError, match="dimension mismatch"):
+            LocalEmbeddingBackend(dimension=64, projection_path=str(path))
+
+    def test_unknown_local_model(self) -> None:
+        """Should reject unknown local model names."""
+        with pytest.raises(ValueError, match="Unknown local embedding model"):
+            get_embedding_backend("local/does-not-exist")
+
+    def test_litellm_models_have_no_backend(self) -> None:
+        """Should leave non-local models to LiteLLM."""
+        assert get_embedding_backend("ollama/nomic-embed-text") is None
+
+
+class TestEmbeddingServiceLocalBackend:
+    """Tests for EmbeddingService with a local backend."""
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding")
+    async def test_local_model_skips_network(self, mock_aembedding) -> None:
+        """Should embed local models in-process without calling LiteLLM."""
+        service = EmbeddingService(model="local/hashing")
+
+        vector = await service.generate_embedding(
+            ContextFactors(factors={"mood": "happy"}), "tenant-1", "user-1"
+        )
+
+        mock_aembedding.assert_not_called()
+        assert len(vector) == config.local_embedding_dimension
+        assert service.expected_dimension == config.local_embedding_dimension
+
+    def test_local_model_sync(self) -> None:
+        """Should support the sync path with the same vectors."""
+        backend = LocalEmbeddingBackend(model="local/test-sync", dimension=32)
+        service = EmbeddingService(backend=backend)
+        context = ContextFactors(factors={"mood": "happy"})
+
+        vector = service.generate_embedding_sync(context, "tenant-1", "user-1")
+
+        assert vector == backend.embed_sync(["mood: happy"])[0]
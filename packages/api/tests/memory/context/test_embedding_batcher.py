@@ -0,0 +1,124 @@
+"""Tests for embedding request coalescing."""
+
+import asyncio
+
+import pytest
+
+from fidus.memory.context.embedding_batcher import EmbeddingBatcher
+
+
+class TestEmbeddingBatcher:
+    """Tests for EmbeddingBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self) -> None:
+        """Should send concurrent requests as a single batch."""
+        calls: list[list[str]] = []
+
+        async def embed_batch(texts: list[str]) -> list[list[float]]:
+            calls.append(texts)
+            return [[float(len(text))] for text in texts]
+
+        batcher = EmbeddingBatcher(embed_batch=embed_batch, window_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit("a"),
+            batcher.submit("bb"),
+            batcher.submit("ccc"),
+        )
+
+        assert calls == [["a", "bb", "ccc"]]
+        assert results == [[1.0], [2.0], [3.0]]
+        assert batcher.batches_total == 1
+        assert batcher.average_batch_size == 3.0
+
+    @pytest.mark.asyncio
+    async def test_duplicate_texts_embedded_once(self) -> None:
+        """Should embed identical texts once and fan the vector out."""
+        calls: list[list[str]] = []
+
+        async def embed_batch(texts: list[str]) -> list[list[float]]:
+            calls.append(texts)
+            return [[1.0, 2.0] for _ in texts]
+
+        batcher = EmbeddingBatcher(embed_batch=embed_batch, window_ms=20)
+
+        first, second = await asyncio.gather(
+            batcher.submit("mood: happy"),
+            batcher.submit("mood: happy"),
+        )
+
+        assert calls == [["mood: happy"]]
+        assert first == second == [1.0, 2.0]
+        # Each caller gets its own list
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_immediately(self) -> None:
+        """Should flush as soon as max_batch_size requests are pending."""
+        calls: list[list[str]] = []
+
+        async def embed_batch(texts: list[str]) -> list[list[float]]:
+            calls.append(texts)
+            return [[0.0] for _ in texts]
+
+        # Window far longer than the test timeout: only the size trigger can flush
+        batcher = EmbeddingBatcher(embed_batch=embed_batch, window_ms=60_000, max_batch_size=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a"), batcher.submit("b")),
+            timeout=1.0,
+        )
+
+        assert calls == [["a", "b"]]
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_all_callers(self) -> None:
+        """Should raise the provider error in every waiting caller."""
+
+        async def embed_batch(texts: list[str]) -> list[list[float]]:
+            raise RuntimeError("provider down")
+
+        batcher = EmbeddingBatcher(embed_batch=embed_batch, window_ms=5)
+
+        results = await asyncio.gather(
+            batcher.submit("a"),
+            batcher.submit("b"),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_releases_callers(self) -> None:
+        """Should cancel the callers' requests when their batch is cancelled."""
+        started = asyncio.Event()
+
+        async def embed_batch(texts: list[str]) -> list[list[float]]:
+            started.set()
+            await asyncio.Event().wait()
+            return []
+
+        batcher = EmbeddingBatcher(embed_batch=embed_batch, window_ms=1000, max_batch_size=2)
+
+        requests = [asyncio.create_task(batcher.submit(text)) for text in ("a", "b")]
+        await started.wait()
+
+        # The running batch is referenced by the batcher, not just the loop
+        [batch_task] = batcher._batch_tasks
+        batch_task.cancel()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*requests, return_exceptions=True), timeout=1
+        )
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert batcher._batch_tasks == set()
+
+    def test_invalid_batch_size(self) -> None:
+        """Should reject a non-positive batch size."""
+
+        async def embed_batch(texts: list[str]) -> list[list[float]]:
+            return []
+
+        with pytest.raises(ValueError):
+            EmbeddingBatcher(embed_batch=embed_batch, max_batch_size=0)
@@ -0,0 +1,80 @@
+"""Tests for the content-addressed embedding cache."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from fidus.memory.context.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache."""
+
+    @pytest.fixture
+    def session_cache(self) -> Mock:
+        """Create mock Redis session cache."""
+        mock = Mock()
+        mock.get_cached_embedding = AsyncMock(return_value=None)
+        mock.cache_embedding = AsyncMock()
+        return mock
+
+    def test_key_depends_on_model_and_text(self) -> None:
+        """Should produce different keys for different models or texts."""
+        key = EmbeddingCache.make_key("ollama/bge-m3", "mood: happy")
+
+        assert key == EmbeddingCache.make_key("ollama/bge-m3", "mood: happy")
+        assert key != EmbeddingCache.make_key("ollama/nomic-embed-text", "mood: happy")
+        assert key != EmbeddingCache.make_key("ollama/bge-m3", "mood: tired")
+
+    @pytest.mark.asyncio
+    async def test_memory_tier(self) -> None:
+        """Should serve repeated lookups from the in-process tier."""
+        cache = EmbeddingCache(max_size=10)
+
+        assert await cache.get("model", "mood: happy") is None
+        await cache.set("model", "mood: happy", [0.1, 0.2])
+
+        assert await cache.get("model", "mood: happy") == [0.1, 0.2]
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["memory_size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_hit_promotes_to_memory(self, session_cache: Mock) -> None:
+        """Should fall back to Redis and promote hits into the LRU."""
+        session_cache.get_cached_embedding.return_value = [0.5, 0.5]
+        cache = EmbeddingCache(max_size=10, session_cache=session_cache)
+
+        assert await cache.get("model", "mood: happy") == [0.5, 0.5]
+        assert await cache.get("model", "mood: happy") == [0.5, 0.5]
+
+        session_cache.get_cached_embedding.assert_awaited_once_with(
+            EmbeddingCache.make_key("model", "mood: happy")
+        )
+        assert cache.redis_hits == 1
+        assert cache.memory_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_set_writes_both_tiers(self, session_cache: Mock) -> None:
+        """Should write embeddings to Redis as well."""
+        cache = EmbeddingCache(max_size=10, session_cache=session_cache)
+
+        await cache.set("model", "mood: happy", [0.1])
+
+        session_cache.cache_embedding.assert_awaited_once_with(
+            EmbeddingCache.make_key("model", "mood: happy"), [0.1]
+        )
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_are_not_fatal(self, session_cache: Mock) -> None:
+        """Should treat Redis failures as cache misses."""
+        session_cache.get_cached_embedding.side_effect = ConnectionError("redis down")
+        session_cache.cache_embedding.side_effect = ConnectionError("redis down")
+        cache = EmbeddingCache(max_size=10, session_cache=session_cache)
+
+        assert await cache.get("model", "mood: happy") is None
+        await cache.set("model", "mood: happy", [0.1])
+
+        assert await cache.get("model", "mood: happy") == [0.1]
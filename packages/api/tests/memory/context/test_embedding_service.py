@@ -1,12 +1,26 @@
 """Tests for embedding service."""
 
+import asyncio
 import math
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
+import numpy as np
 import pytest
+from tenacity import wait_none
 
+from fidus.memory.context.embedding_cache import EmbeddingCache
 from fidus.memory.context.embedding_service import EmbeddingService
 from fidus.memory.context.models import ContextFactors
+from fidus.memory.context.resilience import ResiliencePolicy
+
+
+@pytest.fixture(autouse=True)
+def fresh_default_cache():
+    """Give each test an empty process-wide embedding cache."""
+    with patch(
+        "fidus.memory.context.embedding_service.default_embedding_cache", EmbeddingCache()
+    ) as cache:
+        yield cache
 
 
 class TestEmbeddingService:
@@ -279,3 +293,224 @@ class TestEmbeddingService:
 
         # Test range: 0.0 <= similarity <= 1.0
         assert 0.0 <= sim_ab <= 1.0
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_generate_embeddings_batch(
+        self, mock_embedding: AsyncMock, service: EmbeddingService
+    ) -> None:
+        """Should embed several contexts with one provider call."""
+        mock_embedding.return_value = Mock(
+            data=[
+                {"index": 1, "embedding": [0.2] * 768},
+                {"index": 0, "embedding": [0.1] * 768},
+            ]
+        )
+
+        contexts = [
+            ContextFactors(factors={"mood": "happy"}),
+            ContextFactors(factors={}),
+            ContextFactors(factors={"mood": "tired"}),
+            ContextFactors(factors={"mood": "happy"}),
+        ]
+
+        vectors = await service.generate_embeddings_batch(
+            contexts=contexts,
+            tenant_id="tenant-1",
+            user_id="user-1",
+        )
+
+        mock_embedding.assert_called_once()
+        assert mock_embedding.call_args.kwargs["input"] == ["mood: happy", "mood: tired"]
+
+        # Response items are reordered by index; empty context gets a zero vector
+        assert vectors[0] == [0.1] * 768
+        assert vectors[1] == [0.0] * 768
+        assert vectors[2] == [0.2] * 768
+        assert vectors[3] == [0.1] * 768
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_generate_text_embeddings_uses_cache(
+        self, mock_embedding: AsyncMock, service: EmbeddingService
+    ) -> None:
+        """Should embed plain texts once and serve repeats from the cache."""
+        mock_embedding.return_value = Mock(data=[{"index": 0, "embedding": [0.3] * 768}])
+
+        first = await service.generate_text_embeddings(["food: coffee"])
+        second = await service.generate_text_embeddings(["food: coffee", ""])
+
+        mock_embedding.assert_called_once()
+        assert mock_embedding.call_args.kwargs["input"] == ["food: coffee"]
+        assert second == [first[0], [0.0] * 768]
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_concurrent_generate_embedding_is_coalesced(
+        self, mock_embedding: AsyncMock
+    ) -> None:
+        """Should coalesce concurrent single requests into one provider call."""
+        service = EmbeddingService(model="ollama/nomic-embed-text", batch_window_ms=20)
+
+        async def fake_embedding(**kwargs):
+            return Mock(
+                data=[
+                    {"index": i, "embedding": [float(i)] * 768}
+                    for i, _ in enumerate(kwargs["input"])
+                ]
+            )
+
+        mock_embedding.side_effect = fake_embedding
+
+        first, second = await asyncio.gather(
+            service.generate_embedding(
+                ContextFactors(factors={"mood": "happy"}), "tenant-1", "user-1"
+            ),
+            service.generate_embedding(
+                ContextFactors(factors={"mood": "tired"}), "tenant-2", "user-2"
+            ),
+        )
+
+        mock_embedding.assert_called_once()
+        assert first == [0.0] * 768
+        assert second == [1.0] * 768
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_repeated_context_served_from_cache(
+        self, mock_embedding: AsyncMock, service: EmbeddingService
+    ) -> None:
+        """Should skip the embedding model for a previously embedded context."""
+        mock_embedding.return_value = Mock(data=[{"embedding": [0.3] * 768}])
+        context = ContextFactors(factors={"season": "fall", "time_of_day": "morning"})
+
+        first = await service.generate_embedding(context, "tenant-1", "user-1")
+        second = await service.generate_embedding(context, "tenant-1", "user-2")
+
+        mock_embedding.assert_called_once()
+        assert first == second == [0.3] * 768
+        assert service.cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_services_share_the_default_cache(
+        self, mock_embedding: AsyncMock, fresh_default_cache: EmbeddingCache
+    ) -> None:
+        """Should serve a context embedded by one service to another from the shared cache."""
+        mock_embedding.return_value = Mock(data=[{"embedding": [0.3] * 768}])
+        context = ContextFactors(factors={"season": "fall"})
+
+        await EmbeddingService(model="ollama/nomic-embed-text").generate_embedding(
+            context, "tenant-1", "user-1"
+        )
+        await EmbeddingService(model="ollama/nomic-embed-text").generate_embedding(
+            context, "tenant-2", "user-2"
+        )
+
+        mock_embedding.assert_called_once()
+        assert fresh_default_cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_embedding_calls_bounded_by_semaphore(
+        self, mock_embedding: AsyncMock
+    ) -> None:
+        """Should cap in-flight provider calls at embedding_max_concurrency."""
+        service = EmbeddingService(model="ollama/nomic-embed-text", batch_window_ms=0)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_embedding(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return Mock(data=[{"embedding": [0.1] * 768}])
+
+        mock_embedding.side_effect = slow_embedding
+
+        with patch("fidus.memory.context.embedding_service.config") as mock_config:
+            mock_config.embedding_max_concurrency = 2
+            mock_config.embedding_timeout_seconds = 5
+            await asyncio.gather(
+                *[
+                    service.generate_embedding(
+                        ContextFactors(factors={"mood": f"mood-{i}"}), "tenant-1", "user-1"
+                    )
+                    for i in range(6)
+                ]
+            )
+
+        assert mock_embedding.await_count == 6
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_embedding_call_timeout_is_retried(
+        self, mock_embedding: AsyncMock
+    ) -> None:
+        """Should time out hung provider calls and retry them without blocking."""
+        service = EmbeddingService(
+            model="ollama/nomic-embed-text",
+            batch_window_ms=0,
+            resilience=ResiliencePolicy("test-embedding", hedging_enabled=False),
+        )
+
+        async def hung_embedding(**kwargs):
+            await asyncio.sleep(10)
+
+        mock_embedding.side_effect = hung_embedding
+
+        with patch("fidus.memory.context.embedding_service.config") as mock_config, patch.object(
+            EmbeddingService._embed_texts.retry, "wait", wait_none()
+        ):
+            mock_config.embedding_max_concurrency = 8
+            mock_config.embedding_timeout_seconds = 0.01
+            with pytest.raises(asyncio.TimeoutError):
+                await service.generate_embedding(
+                    ContextFactors(factors={"mood": "happy"}), "tenant-1", "user-1"
+                )
+
+        assert mock_embedding.await_count == 3
+
+    def test_similarity_matrix_matches_scalar(self, service: EmbeddingService) -> None:
+        """Should compute all query/candidate similarities at once."""
+        queries = [[1.0, 0.0, 0.0], [1.0, 1.0, 0.0]]
+        candidates = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+
+        matrix = service.similarity_matrix(queries, candidates)
+
+        assert matrix.shape == (2, 4)
+        for i, query in enumerate(queries):
+            for j, candidate in enumerate(candidates):
+                assert matrix[i, j] == pytest.approx(
+                    service.calculate_similarity(query, candidate), abs=1e-6
+                )
+
+    def test_similarity_matrix_prenormalized(self, service: EmbeddingService) -> None:
+        """Should reduce to a dot product for pre-normalized storage."""
+        candidates = service.normalize_embeddings([[3.0, 4.0], [0.0, 2.0]])
+
+        matrix = service.similarity_matrix(
+            service.normalize_embeddings([0.0, 1.0]), candidates, normalized=True
+        )
+
+        assert candidates.dtype == np.float32
+        assert matrix[0].tolist() == pytest.approx([0.8, 1.0])
+
+    def test_similarity_matrix_dimension_mismatch(self, service: EmbeddingService) -> None:
+        """Should reject queries and candidates of different dimensions."""
+        with pytest.raises(ValueError, match="dimension mismatch"):
+            service.similarity_matrix([[1.0, 0.0]], [[1.0, 0.0, 0.0]])
+
+    def test_top_k(self, service: EmbeddingService) -> None:
+        """Should return the k most similar candidates, best first."""
+        candidates = [[0.0, 1.0], [1.0, 0.1], [1.0, 0.0], [0.7, 0.7]]
+
+        results = service.top_k([1.0, 0.0], candidates, k=2)
+
+        assert [index for index, _ in results] == [2, 1]
+        assert results[0][1] == pytest.approx(1.0)
+        assert service.top_k([1.0, 0.0], candidates, k=10)[-1][0] == 0
+        assert service.top_k([1.0, 0.0], [], k=3) == []
@@ -0,0 +1,77 @@
+"""Tests for the compact float32 embedding representation."""
+
+import json
+
+import numpy as np
+import pytest
+
+from fidus.memory.context.embedding_vector import COMPACT_EMBEDDINGS, EmbeddingVector
+from fidus.memory.context.models import ContextFactors, Situation
+
+
+class TestEmbeddingVector:
+    """Tests for EmbeddingVector."""
+
+    def test_stores_read_only_float32(self) -> None:
+        """Should keep a single read-only float32 array."""
+        vector = EmbeddingVector([0.1, 0.2, 0.3])
+
+        assert vector.array.dtype == np.float32
+        assert vector.array.nbytes == 12
+        with pytest.raises(ValueError):
+            vector.array[0] = 1.0
+
+    def test_behaves_like_sequence(self) -> None:
+        """Should support len, indexing, iteration and list comparison."""
+        vector = EmbeddingVector([0.5, -0.25, 1.0])
+
+        assert len(vector) == 3
+        assert vector[1] == -0.25
+        assert vector[:2] == [0.5, -0.25]
+        assert list(vector) == [0.5, -0.25, 1.0]
+        assert vector == [0.5, -0.25, 1.0]
+        assert vector != [0.5, -0.25]
+        assert isinstance(vector.tolist()[0], float)
+
+    def test_base64_round_trip(self) -> None:
+        """Should round-trip through the compact string form."""
+        vector = EmbeddingVector(np.linspace(-1, 1, 1024))
+
+        assert EmbeddingVector.from_base64(vector.to_base64()) == vector
+
+    def test_rejects_non_vector_input(self) -> None:
+        """Should reject multi-dimensional input."""
+        with pytest.raises(ValueError, match="one-dimensional"):
+            EmbeddingVector([[0.1, 0.2]])
+
+
+class TestSituationEmbeddingSerialization:
+    """Tests for Situation embedding (de)serialization."""
+
+    @pytest.fixture
+    def situation(self) -> Situation:
+        """Create situation with embedding."""
+        return Situation(
+            id="123e4567-e89b-12d3-a456-426614174000",
+            tenant_id="tenant-1",
+            user_id="user-1",
+            context=ContextFactors(factors={"mood": "happy"}),
+            embedding=[0.25, 0.5, 0.75],
+        )
+
+    def test_embedding_is_compact(self, situation: Situation) -> None:
+        """Should convert list input to EmbeddingVector."""
+        assert isinstance(situation.embedding, EmbeddingVector)
+
+    def test_json_dump_uses_float_list(self, situation: Situation) -> None:
+        """Should keep the public JSON format a list of floats."""
+        data = json.loads(situation.model_dump_json())
+
+        assert data["embedding"] == [0.25, 0.5, 0.75]
+
+    def test_compact_dump_round_trip(self, situation: Situation) -> None:
+        """Should serialize to base64 for Redis and validate it back."""
+        data = situation.model_dump(mode="json", context={COMPACT_EMBEDDINGS: True})
+
+        assert isinstance(data["embedding"], str)
+        assert Situation.model_validate(data).embedding == situation.embedding
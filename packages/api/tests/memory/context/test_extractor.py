@@ -1,12 +1,27 @@
 """Tests for dynamic context extraction."""
 
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
-from fidus.memory.context.extractor import DynamicContextExtractor
-from fidus.memory.context.models import ContextFactors, ContextExtractionResult
+from fidus.memory.context.extractor import (
+    CombinedExtractor,
+    DynamicContextExtractor,
+    _JSONObjectScanner,
+)
+from fidus.memory.context.fast_path import ContextSignalClassifier
+from fidus.memory.context.models import ContextFactors, ContextExtractionResult, MessageAnalysis
+from fidus.memory.context.resilience import CircuitOpenError, ResiliencePolicy
+from fidus.memory.extraction_cache import ExtractionCache, default_extraction_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_extraction_cache():
+    """Keep cached extraction results from leaking between tests."""
+    default_extraction_cache.clear()
+    yield
+    default_extraction_cache.clear()
 
 
 class TestDynamicContextExtractor:
@@ -218,3 +233,389 @@ class TestDynamicContextExtractor:
         assert result.context.factors["mood"] == "relaxed"
         assert result.context.factors["activity"] == "socializing"
         assert result.confidence == 0.95
+
+
+class TestContextFastPath:
+    """Tests for skipping the LLM on messages without situational signal."""
+
+    @pytest.fixture
+    def classifier(self) -> ContextSignalClassifier:
+        """Create a classifier with fresh counters."""
+        return ContextSignalClassifier()
+
+    @pytest.mark.asyncio
+    async def test_extract_skips_llm_without_signal(
+        self, classifier: ContextSignalClassifier
+    ) -> None:
+        """Should return empty context without calling the LLM."""
+        extractor = DynamicContextExtractor(model="gpt-4o-mini", classifier=classifier)
+
+        with patch.object(extractor, "_acomplete", new_callable=AsyncMock) as mock_complete:
+            result = await extractor.extract("Hello, how are you?", "tenant-1", "user-1")
+
+        mock_complete.assert_not_called()
+        assert result.context.factors == {}
+        assert classifier.stats()["fast_path_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_extract_calls_llm_with_signal(
+        self, classifier: ContextSignalClassifier
+    ) -> None:
+        """Should call the LLM when the message carries situational signal."""
+        extractor = DynamicContextExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-fast-path", hedging_enabled=False),
+            classifier=classifier,
+        )
+        content = json.dumps({"context_factors": {"location": "gym"}, "confidence": 0.9})
+
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            result = await extractor.extract("Tired after the gym", "tenant-1", "user-1")
+
+        mock_complete.assert_called_once()
+        assert result.context.factors == {"location": "gym"}
+        assert classifier.stats() == {
+            "messages_total": 1,
+            "fast_path_total": 0,
+            "fast_path_ratio": 0.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_combined_extractor_keeps_preference_messages(
+        self, classifier: ContextSignalClassifier
+    ) -> None:
+        """Should not skip messages that may express a preference."""
+        extractor = CombinedExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-fast-path-combined", hedging_enabled=False),
+            classifier=classifier,
+        )
+        content = json.dumps({"preferences": [], "context_factors": {}, "confidence": 0.1})
+
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            await extractor.analyze("I like green tea", "tenant-1", "user-1")
+            greeting = await extractor.analyze("Hi there!", "tenant-1", "user-1")
+
+        mock_complete.assert_called_once()
+        # Preference extraction is left to the caller
+        assert greeting.preferences is None
+        assert greeting.context.context.factors == {}
+
+    @pytest.mark.asyncio
+    async def test_fast_path_disabled(self) -> None:
+        """Should always call the LLM when the fast path is disabled."""
+        with patch("fidus.memory.context.extractor.config") as mock_config:
+            mock_config.llm_model = "gpt-4o-mini"
+            mock_config.context_fast_path_enabled = False
+            extractor = DynamicContextExtractor(
+                resilience=ResiliencePolicy("test-no-fast-path", hedging_enabled=False)
+            )
+
+        assert extractor.classifier is None
+        content = json.dumps({"context_factors": {}, "confidence": 0.1})
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            await extractor.extract("Hello", "tenant-1", "user-1")
+
+        mock_complete.assert_called_once()
+
+
+class TestCombinedExtractor:
+    """Tests for CombinedExtractor (preferences + context in one call)."""
+
+    @pytest.fixture
+    def extractor(self) -> CombinedExtractor:
+        """Create combined extractor with its own resilience policy."""
+        return CombinedExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-combined", hedging_enabled=False),
+        )
+
+    @pytest.mark.asyncio
+    async def test_analyze_returns_preferences_and_context(
+        self, extractor: CombinedExtractor
+    ) -> None:
+        """Should validate one response into both preferences and context."""
+        content = json.dumps(
+            {
+                "preferences": [
+                    {
+                        "domain": "food",
+                        "key": "cappuccino",
+                        "sentiment": "positive",
+                        "value": "loves it",
+                        "confidence": 0.9,
+                    }
+                ],
+                "context_factors": {"time_of_day": "morning"},
+                "confidence": 0.8,
+                "explanation": "Morning coffee",
+            }
+        )
+
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            result = await extractor.analyze(
+                message="I love cappuccino in the morning",
+                tenant_id="tenant-1",
+                user_id="user-1",
+            )
+
+        mock_complete.assert_called_once()
+        assert isinstance(result, MessageAnalysis)
+        assert result.preferences == [
+            {
+                "domain": "food",
+                "key": "cappuccino",
+                "sentiment": "positive",
+                "value": "loves it",
+                "confidence": 0.9,
+            }
+        ]
+        assert result.context.context.factors == {"time_of_day": "morning"}
+        assert result.context.confidence == 0.8
+
+    @pytest.mark.asyncio
+    async def test_analyze_skips_malformed_preferences(
+        self, extractor: CombinedExtractor
+    ) -> None:
+        """Should drop entries that don't match the preference shape."""
+        content = (
+            "Let me think about this first.\n"
+            + json.dumps(
+                {
+                    "preferences": [
+                        "coffee",
+                        {"domain": "food", "key": "tea"},
+                        {"domain": "food", "key": "tea", "value": "likes it", "confidence": "high"},
+                        {"domain": "food", "key": "tea", "value": "likes it", "confidence": "0.7"},
+                    ],
+                    "context_factors": {},
+                    "confidence": 0.1,
+                }
+            )
+        )
+
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ):
+            result = await extractor.analyze("I like tea", "tenant-1", "user-1")
+
+        assert result.preferences == [
+            {"domain": "food", "key": "tea", "value": "likes it", "confidence": 0.7}
+        ]
+        assert result.context.context.factors == {}
+
+    @pytest.mark.asyncio
+    async def test_extract_returns_context_part(self, extractor: CombinedExtractor) -> None:
+        """Should keep extract() compatible with DynamicContextExtractor."""
+        content = json.dumps(
+            {"preferences": [], "context_factors": {"location": "work"}, "confidence": 0.7}
+        )
+
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ):
+            result = await extractor.extract("At work again", "tenant-1", "user-1")
+
+        assert isinstance(result, ContextExtractionResult)
+        assert result.context.factors == {"location": "work"}
+
+    def test_system_prompt_includes_preference_rules(self) -> None:
+        """Should ask for the same preference shape as the standalone extraction."""
+        assert "Key Language Normalization" in CombinedExtractor.SYSTEM_PROMPT
+        assert '"context_factors"' in CombinedExtractor.SYSTEM_PROMPT
+        assert '"preferences"' in CombinedExtractor.SYSTEM_PROMPT
+
+
+def _stream(*texts: str) -> MagicMock:
+    """Build an async LLM stream yielding the given text chunks."""
+    chunks = [Mock(choices=[Mock(delta=Mock(content=text))]) for text in texts]
+    stream = MagicMock()
+    stream.__aiter__.return_value = chunks
+    stream.aclose = AsyncMock()
+    return stream
+
+
+class TestStreamingExtraction:
+    """Tests for async streaming with early termination."""
+
+    def test_scanner_skips_preamble_and_stops_at_object_end(self) -> None:
+        """Should return the object as soon as its closing brace arrives."""
+        scanner = _JSONObjectScanner("context_factors")
+
+        assert scanner.feed("<think>the user says {hi}") is None
+        assert scanner.feed('</think>{"context_') is None
+        assert scanner.feed('factors": {"mood": "a } in a string"}, ') is None
+        assert scanner.feed('"confidence": 0.9}') == (
+            '{"context_factors": {"mood": "a } in a string"}, "confidence": 0.9}'
+        )
+
+    def test_scanner_handles_escaped_quotes(self) -> None:
+        """Should not end strings at escaped quotes."""
+        scanner = _JSONObjectScanner("context_factors")
+
+        result = scanner.feed('{"context_factors": {"note": "say \\"}\\""}}trailing')
+
+        assert result == '{"context_factors": {"note": "say \\"}\\""}}'
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.extractor.acompletion", new_callable=AsyncMock)
+    async def test_acomplete_closes_stream_after_object(self, mock_acompletion: AsyncMock) -> None:
+        """Should stop reading and close the stream once the object is complete."""
+        stream = _stream(
+            "Let me think about the context first. ",
+            '{"context_factors": {"location": "gym"},',
+            ' "confidence": 0.8}',
+            " And some more reasoning that should never be read.",
+        )
+        mock_acompletion.return_value = stream
+        extractor = DynamicContextExtractor(model="gpt-4o-mini")
+
+        content = await extractor._acomplete([{"role": "user", "content": "At the gym"}])
+
+        assert json.loads(content) == {"context_factors": {"location": "gym"}, "confidence": 0.8}
+        assert mock_acompletion.call_args[1]["stream"] is True
+        stream.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.extractor.acompletion", new_callable=AsyncMock)
+    async def test_acomplete_returns_full_content_without_object(
+        self, mock_acompletion: AsyncMock
+    ) -> None:
+        """Should fall back to the full content if the expected object never starts."""
+        stream = _stream('{"confidence": 0.2, ', '"context_factors": {}}')
+        mock_acompletion.return_value = stream
+        extractor = DynamicContextExtractor(model="gpt-4o-mini")
+
+        content = await extractor._acomplete([{"role": "user", "content": "At work"}])
+
+        assert content == '{"confidence": 0.2, "context_factors": {}}'
+        stream.aclose.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.extractor.acompletion", new_callable=AsyncMock)
+    async def test_extract_uses_async_completion(self, mock_acompletion: AsyncMock) -> None:
+        """Should extract context via the async streaming API."""
+        mock_acompletion.return_value = _stream(
+            '{"context_factors": {"weather": "rainy"}, "confidence": 0.7}'
+        )
+        extractor = DynamicContextExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-streaming", hedging_enabled=False),
+        )
+
+        result = await extractor.extract("It's raining", "tenant-1", "user-1")
+
+        assert result.context.factors == {"weather": "rainy"}
+        mock_acompletion.assert_awaited_once()
+
+
+class TestExtractionCaching:
+    """Tests for reusing extraction results across identical messages."""
+
+    @pytest.fixture
+    def cache(self) -> ExtractionCache:
+        """Create an isolated extraction cache."""
+        return ExtractionCache(max_size=10, ttl_seconds=60)
+
+    @pytest.mark.asyncio
+    async def test_extract_reuses_result_for_normalized_message(
+        self, cache: ExtractionCache
+    ) -> None:
+        """Should call the LLM once for messages that only differ in spelling."""
+        extractor = DynamicContextExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-cache", hedging_enabled=False),
+            cache=cache,
+        )
+        content = json.dumps({"context_factors": {"mood": "tired"}, "confidence": 0.8})
+
+        with patch(
+            "fidus.memory.context.extractor.current_datetime_bucket",
+            return_value="Monday, 2025-01-13 09:00 CET",
+        ), patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            first = await extractor.extract("I'm tired", "tenant-1", "user-1")
+            second = await extractor.extract("  i'm   TIRED! ", "tenant-1", "user-1")
+
+        mock_complete.assert_awaited_once()
+        assert second.context.factors == first.context.factors == {"mood": "tired"}
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_extract_misses_in_new_time_bucket(self, cache: ExtractionCache) -> None:
+        """Should re-extract once the prompt's time bucket changes."""
+        extractor = DynamicContextExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-cache-bucket", hedging_enabled=False),
+            cache=cache,
+        )
+        content = json.dumps({"context_factors": {"mood": "tired"}, "confidence": 0.8})
+
+        with patch(
+            "fidus.memory.context.extractor.current_datetime_bucket",
+            side_effect=["Monday, 2025-01-13 09:00 CET", "Monday, 2025-01-13 10:00 CET"],
+        ), patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            await extractor.extract("I'm tired", "tenant-1", "user-1")
+            await extractor.extract("I'm tired", "tenant-1", "user-1")
+
+        assert mock_complete.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_degraded_result_is_not_cached(self, cache: ExtractionCache) -> None:
+        """Should not cache the empty result returned while the circuit is open."""
+        resilience = ResiliencePolicy("test-cache-degraded", hedging_enabled=False)
+        resilience.call = AsyncMock(side_effect=CircuitOpenError("open"))
+        extractor = DynamicContextExtractor(
+            model="gpt-4o-mini", resilience=resilience, cache=cache
+        )
+
+        result = await extractor.extract("I'm tired", "tenant-1", "user-1")
+
+        assert result.context.factors == {}
+        assert cache.stats()["memory_size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_analyze_reuses_combined_result(self, cache: ExtractionCache) -> None:
+        """Should cache preferences and context together for the combined call."""
+        extractor = CombinedExtractor(
+            model="gpt-4o-mini",
+            resilience=ResiliencePolicy("test-cache-combined", hedging_enabled=False),
+            cache=cache,
+        )
+        content = json.dumps(
+            {
+                "preferences": [
+                    {
+                        "domain": "food",
+                        "key": "cappuccino",
+                        "sentiment": "positive",
+                        "value": "loves it",
+                        "confidence": 0.9,
+                    }
+                ],
+                "context_factors": {"time_of_day": "morning"},
+                "confidence": 0.8,
+            }
+        )
+
+        with patch.object(
+            extractor, "_acomplete", new_callable=AsyncMock, return_value=content
+        ) as mock_complete:
+            first = await extractor.analyze("I love cappuccino in the morning", "t", "u")
+            second = await extractor.analyze("I love cappuccino in the morning", "t", "u")
+
+        mock_complete.assert_awaited_once()
+        assert isinstance(second, MessageAnalysis)
+        assert second.preferences == first.preferences
+        assert second.context.context.factors == {"time_of_day": "morning"}
@@ -0,0 +1,146 @@
+"""Tests for compositional factor-vector embeddings."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.memory.context.factor_vectors import (
+    FactorVectorTable,
+    compose_vector,
+    connect_factor_tables,
+    factor_pairs,
+    get_factor_table,
+)
+from fidus.memory.context.models import ContextFactors
+
+
+@pytest.fixture(autouse=True)
+def fresh_factor_tables():
+    """Give each test empty process-wide factor tables."""
+    with patch.dict("fidus.memory.context.factor_vectors._tables", clear=True), patch(
+        "fidus.memory.context.factor_vectors._session_cache", None
+    ):
+        yield
+
+
+class TestComposeVector:
+    """Tests for factor pair formatting and composition."""
+
+    def test_factor_pairs_sorted(self) -> None:
+        """Should format factors as sorted "key: value" strings."""
+        assert factor_pairs({"mood": "happy", "location": "gym"}) == [
+            "location: gym",
+            "mood: happy",
+        ]
+
+    def test_weighted_sum_is_normalized(self) -> None:
+        """Should weight factor vectors by key and normalize the result."""
+        vectors = {"mood: happy": [1.0, 0.0], "season: fall": [0.0, 1.0]}
+
+        vector = compose_vector(
+            {"mood": "happy", "season": "fall"}, vectors, weights={"season": 0.5}
+        )
+
+        assert vector == pytest.approx([1 / np.sqrt(1.25), 0.5 / np.sqrt(1.25)])
+
+
+class TestFactorVectorTable:
+    """Tests for FactorVectorTable."""
+
+    @pytest.mark.asyncio
+    async def test_redis_backing_store(self) -> None:
+        """Should load unknown pairs from Redis and persist new ones."""
+        session_cache = Mock()
+        session_cache.get_factor_vectors = AsyncMock(return_value={"mood: happy": [0.1]})
+        session_cache.store_factor_vectors = AsyncMock()
+        table = FactorVectorTable("model", session_cache=session_cache)
+
+        found = await table.get(["mood: happy", "season: fall"])
+        await table.set({"season: fall": [0.2]})
+
+        assert found == {"mood: happy": [0.1]}
+        session_cache.get_factor_vectors.assert_awaited_once_with(
+            "model", ["mood: happy", "season: fall"]
+        )
+        session_cache.store_factor_vectors.assert_awaited_once_with(
+            "model", {"season: fall": [0.2]}
+        )
+        assert len(table) == 2
+
+    def test_shared_table_per_model_connected_to_redis(self) -> None:
+        """Should share one table per model and back existing and later tables with Redis."""
+        session_cache = Mock()
+        existing = get_factor_table("model-a")
+
+        connect_factor_tables(session_cache)
+
+        assert get_factor_table("model-a") is existing
+        assert existing.session_cache is session_cache
+        assert get_factor_table("model-b").session_cache is session_cache
+
+    def test_services_share_factor_table(self) -> None:
+        """Should give services of the same model the same factor table."""
+        first = EmbeddingService(model="local/hashing", mode="compositional")
+        second = EmbeddingService(model="local/hashing", mode="compositional")
+
+        assert first.factor_table is second.factor_table
+
+
+class TestCompositionalEmbeddingService:
+    """Tests for EmbeddingService in compositional mode."""
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_model_called_only_for_new_factors(self, mock_embedding: AsyncMock) -> None:
+        """Should embed each factor pair once and reuse it on later turns."""
+        service = EmbeddingService(
+            model="ollama/nomic-embed-text", batch_window_ms=0, mode="compositional"
+        )
+
+        async def fake_embedding(**kwargs):
+            return Mock(
+                data=[
+                    {"index": i, "embedding": [float(i + 1)] + [0.0] * 767}
+                    for i, _ in enumerate(kwargs["input"])
+                ]
+            )
+
+        mock_embedding.side_effect = fake_embedding
+
+        await service.generate_embedding(
+            ContextFactors(factors={"mood": "happy", "season": "fall"}), "tenant-1", "user-1"
+        )
+        vector = await service.generate_embedding(
+            ContextFactors(factors={"mood": "happy", "season": "winter"}), "tenant-1", "user-2"
+        )
+
+        assert mock_embedding.await_count == 2
+        assert mock_embedding.await_args_list[0].kwargs["input"] == [
+            "mood: happy",
+            "season: fall",
+        ]
+        assert mock_embedding.await_args_list[1].kwargs["input"] == ["season: winter"]
+        assert len(vector) == 768
+        assert np.linalg.norm(vector) == pytest.approx(1.0)
+
+    def test_sync_matches_async(self) -> None:
+        """Should produce the same vector on the sync path."""
+        service = EmbeddingService(model="local/hashing", mode="compositional")
+        context = ContextFactors(factors={"mood": "happy", "season": "fall"})
+
+        vector = service.generate_embedding_sync(context, "tenant-1", "user-1")
+
+        pairs = factor_pairs(context.factors)
+        expected = compose_vector(
+            context.factors,
+            dict(zip(pairs, service.backend.embed_sync(pairs))),
+            service.factor_weights,
+        )
+        assert vector == pytest.approx(expected)
+
+    def test_unknown_mode_rejected(self) -> None:
+        """Should reject unknown embedding modes."""
+        with pytest.raises(ValueError, match="Unknown embedding mode"):
+            EmbeddingService(model="local/hashing", mode="sparse")
@@ -0,0 +1,89 @@
+"""Tests for the rule-based context extraction fast path."""
+
+import pytest
+
+from fidus.memory.context.fast_path import ContextSignalClassifier
+
+
+class TestContextSignalClassifier:
+    """Tests for ContextSignalClassifier."""
+
+    @pytest.fixture
+    def classifier(self) -> ContextSignalClassifier:
+        """Create a classifier with fresh counters."""
+        return ContextSignalClassifier()
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "Hi!",
+            "Hello, how are you?",
+            "What can you do?",
+            "Hallo, wie geht's?",
+            "Bonjour, ça va ?",
+            "¿Qué tal?",
+            "Thanks, that helps",
+        ],
+    )
+    def test_no_signal(self, classifier: ContextSignalClassifier, message: str) -> None:
+        """Should find no situational signal in greetings and plain questions."""
+        assert classifier.signals(message) == set()
+        assert classifier.has_situational_signal(message) is False
+
+    @pytest.mark.parametrize(
+        "message,category",
+        [
+            ("Just finished my workout at the gym", "location"),
+            ("Ich bin im Büro", "location"),
+            ("Je suis à l'école", "location"),
+            ("Estoy en la oficina", "location"),
+            ("Cooking for everyone", "activity"),
+            ("It's raining again", "weather"),
+            ("Es ist kalt heute", "weather"),
+            ("Il fait froid", "weather"),
+            ("I'm so tired", "mood"),
+            ("Ich bin müde", "mood"),
+            ("Estoy cansado", "mood"),
+            ("I need coffee, it's 9am", "time"),
+            ("Treffen um 18 Uhr", "time"),
+            ("On se voit cet après-midi", "time"),
+            ("Having friends over", "company"),
+        ],
+    )
+    def test_detects_signal(
+        self, classifier: ContextSignalClassifier, message: str, category: str
+    ) -> None:
+        """Should detect situational signals across languages."""
+        assert category in classifier.signals(message)
+        assert classifier.has_situational_signal(message) is True
+
+    @pytest.mark.parametrize(
+        "message,expected",
+        [
+            ("I like tea", True),
+            ("Ich mag Kaffee", True),
+            ("J'aime le café", True),
+            ("Me gusta el café", True),
+            ("Hello there", False),
+        ],
+    )
+    def test_preference_signal(
+        self, classifier: ContextSignalClassifier, message: str, expected: bool
+    ) -> None:
+        """Should detect preference vocabulary."""
+        assert classifier.has_preference_signal(message) is expected
+
+    def test_stats(self, classifier: ContextSignalClassifier) -> None:
+        """Should report how often the fast path was taken."""
+        assert classifier.stats()["fast_path_ratio"] == 0.0
+
+        classifier.record(True)
+        classifier.record(True)
+        classifier.record(False)
+        classifier.record(True)
+
+        assert classifier.stats() == {
+            "messages_total": 4,
+            "fast_path_total": 3,
+            "fast_path_ratio": 0.75,
+        }
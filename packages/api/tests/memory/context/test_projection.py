@@ -0,0 +1,130 @@
+"""Tests for embedding dimension reduction."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from fidus.config import PrototypeConfig
+from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.memory.context.models import ContextFactors
+from fidus.memory.context.projection import (
+    PCAProjection,
+    TruncationProjection,
+    get_embedding_projection,
+)
+
+
+class TestTruncationProjection:
+    """Tests for TruncationProjection."""
+
+    def test_truncates_and_normalizes(self) -> None:
+        """Should keep leading dimensions and re-normalize."""
+        projection = TruncationProjection(input_dimension=4, output_dimension=2)
+
+        vectors = projection.apply([[3.0, 4.0, 1.0, 1.0], [0.0, 0.0, 0.0, 0.0]])
+
+        assert vectors[0] == pytest.approx([0.6, 0.8])
+        assert vectors[1] == [0.0, 0.0]
+
+    def test_invalid_dimension(self) -> None:
+        """Should reject a reduced size larger than the input."""
+        with pytest.raises(ValueError):
+            TruncationProjection(input_dimension=4, output_dimension=8)
+
+
+class TestPCAProjection:
+    """Tests for PCAProjection."""
+
+    def test_fit_save_load(self, tmp_path: Path) -> None:
+        """Should fit offline, round-trip through .npz and project."""
+        rng = np.random.default_rng(0)
+        samples = rng.normal(size=(50, 16)).tolist()
+
+        projection = PCAProjection.fit(samples, output_dimension=4)
+        path = tmp_path / "pca.npz"
+        projection.save(str(path))
+        loaded = PCAProjection.load(str(path))
+
+        vectors = loaded.apply(samples[:3])
+        assert len(vectors[0]) == 4
+        assert np.linalg.norm(vectors[0]) == pytest.approx(1.0, abs=1e-5)
+        np.testing.assert_allclose(vectors, projection.apply(samples[:3]), atol=1e-5)
+
+    def test_zero_vector_stays_zero(self) -> None:
+        """Should not turn empty-context zero vectors into -mean projections."""
+        projection = PCAProjection(
+            mean=np.ones(3, dtype=np.float32), components=np.eye(3, 2, dtype=np.float32)
+        )
+
+        assert projection.apply([[0.0, 0.0, 0.0]]) == [[0.0, 0.0]]
+
+    def test_dimension_mismatch(self) -> None:
+        """Should reject vectors of the wrong input dimension."""
+        projection = TruncationProjection(input_dimension=4, output_dimension=2)
+
+        with pytest.raises(ValueError, match="dimension mismatch"):
+            projection.apply([[1.0, 0.0]])
+
+
+class TestConfiguredProjection:
+    """Tests for config-driven projection and vector size."""
+
+    def test_disabled_by_default(self) -> None:
+        """Should keep full dimensionality without configuration."""
+        config = PrototypeConfig()
+        config.embedding_reduced_dimension = None
+        config.embedding_projection_path = None
+
+        with patch("fidus.memory.context.projection.config", config):
+            assert get_embedding_projection(768) is None
+
+    def test_vector_size_uses_reduced_dimension(self) -> None:
+        """Should size the Qdrant collection with the reduced dimension."""
+        config = PrototypeConfig()
+        config.embedding_model = "ollama/nomic-embed-text"
+        config.embedding_reduced_dimension = 256
+        config.embedding_projection_path = None
+
+        assert config.get_vector_size() == 256
+
+    @patch("fidus.memory.context.setup_qdrant.QdrantClient")
+    def test_create_collection_uses_vector_size(self, mock_client_cls: Mock) -> None:
+        """Should create the Qdrant collection with config.get_vector_size()."""
+        from fidus.memory.context.setup_qdrant import QdrantSetup
+
+        client = mock_client_cls.return_value
+        client.get_collections.return_value = Mock(collections=[])
+
+        with patch("fidus.memory.context.setup_qdrant.config") as mock_config:
+            mock_config.get_vector_size.return_value = 256
+            QdrantSetup().create_collection()
+
+        vectors_config = client.create_collection.call_args.kwargs["vectors_config"]
+        assert vectors_config.size == 256
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.embedding_service.aembedding", new_callable=AsyncMock)
+    async def test_service_returns_reduced_vectors(self, mock_embedding: AsyncMock) -> None:
+        """Should project embeddings while caching full model vectors."""
+        mock_embedding.return_value = Mock(data=[{"embedding": [0.1] * 768}])
+        service = EmbeddingService(
+            model="ollama/nomic-embed-text",
+            batch_window_ms=0,
+            projection=TruncationProjection(768, 256),
+        )
+
+        vector = await service.generate_embedding(
+            ContextFactors(factors={"mood": "happy"}), "tenant-1", "user-1"
+        )
+        cached = await service.generate_embedding(
+            ContextFactors(factors={"mood": "happy"}), "tenant-1", "user-1"
+        )
+        empty = await service.generate_embedding(ContextFactors(factors={}), "tenant-1", "user-1")
+
+        assert service.vector_size == 256
+        assert len(vector) == 256
+        assert cached == pytest.approx(vector)
+        assert empty == [0.0] * 256
+        assert len(await service.cache.get(service.model, "mood: happy")) == 768
@@ -0,0 +1,197 @@
+"""Tests for request hedging and circuit breaking."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from fidus.memory.context.embedding_service import EmbeddingService
+from fidus.memory.context.extractor import DynamicContextExtractor
+from fidus.memory.context.factor_vectors import FactorVectorTable
+from fidus.memory.context.models import ContextFactors
+from fidus.memory.context.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    ResiliencePolicy,
+    hedged,
+)
+
+
+class TestLatencyTracker:
+    """Tests for LatencyTracker."""
+
+    def test_percentile(self) -> None:
+        """Should return nearest-rank percentiles."""
+        tracker = LatencyTracker()
+        for value in range(1, 101):
+            tracker.record(value / 100)
+
+        assert tracker.percentile(50) == 0.5
+        assert tracker.percentile(95) == 0.95
+        assert LatencyTracker().percentile(95) is None
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        """Should reject calls after failure_threshold failures."""
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_seconds=60)
+
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.rejected_calls == 1
+
+    def test_slow_calls_count_as_failures(self) -> None:
+        """Should treat persistently slow calls as failures."""
+        breaker = CircuitBreaker("test", failure_threshold=2, slow_call_seconds=1.0)
+
+        breaker.record_success(5.0)
+        breaker.record_success(5.0)
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_half_open_probe(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Should let one probe through after recovery and close on success."""
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+        breaker.record_failure()
+
+        now[0] += 31
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow_request()  # probe in flight
+
+        breaker.record_success(0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestHedging:
+    """Tests for hedged()."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_wins_when_first_is_slow(self) -> None:
+        """Should return the duplicate's result when the first call stalls."""
+        delays = [1.0, 0.01]
+        started = []
+
+        async def call() -> int:
+            attempt = len(started)
+            started.append(attempt)
+            await asyncio.sleep(delays[attempt])
+            return attempt
+
+        result = await asyncio.wait_for(hedged(call, hedge_delay=0.02), timeout=0.5)
+
+        assert result == 1
+        assert len(started) == 2
+
+    @pytest.mark.asyncio
+    async def test_no_duplicate_for_fast_call(self) -> None:
+        """Should not hedge calls finishing before the deadline."""
+        call = AsyncMock(return_value="ok")
+
+        assert await hedged(call, hedge_delay=0.5) == "ok"
+        call.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_policy_rejects_when_open(self) -> None:
+        """Should raise CircuitOpenError without calling the backend."""
+        policy = ResiliencePolicy(
+            "test", hedging_enabled=False, breaker=CircuitBreaker("test", failure_threshold=1)
+        )
+        failing = AsyncMock(side_effect=ConnectionError("down"))
+        with pytest.raises(ConnectionError):
+            await policy.call(failing)
+
+        call = AsyncMock()
+        with pytest.raises(CircuitOpenError):
+            await policy.call(call)
+        call.assert_not_awaited()
+        assert policy.stats()["circuit_state"] == CircuitBreaker.OPEN
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_half_open_slot(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Should let the next call probe when the probe is cancelled."""
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=30)
+        policy = ResiliencePolicy("test", hedging_enabled=False, breaker=breaker)
+        breaker.record_failure()
+        now[0] += 31
+
+        probe = asyncio.create_task(policy.call(lambda: asyncio.sleep(60)))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert await policy.call(AsyncMock(return_value="ok")) == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_hedging_starts_after_min_samples(self) -> None:
+        """Should derive the hedge deadline from observed latency."""
+        policy = ResiliencePolicy("test", hedging_enabled=True, min_samples=3)
+        assert policy.hedge_delay() is None
+
+        for value in (0.1, 0.2, 0.3):
+            policy.latency.record(value)
+
+        assert policy.hedge_delay() == pytest.approx(0.3)
+
+
+class TestDegradedPaths:
+    """Tests for degraded paths when the circuit is open."""
+
+    @pytest.fixture
+    def open_policy(self) -> ResiliencePolicy:
+        """Create a policy whose circuit is open."""
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=60)
+        breaker.record_failure()
+        return ResiliencePolicy("test", hedging_enabled=False, breaker=breaker)
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.extractor.completion")
+    async def test_extractor_returns_empty_context(
+        self, mock_completion: Mock, open_policy: ResiliencePolicy
+    ) -> None:
+        """Should skip the LLM and return empty low-confidence context."""
+        extractor = DynamicContextExtractor(resilience=open_policy)
+
+        result = await extractor.extract("I need coffee", "tenant-1", "user-1")
+
+        mock_completion.assert_not_called()
+        assert result.context.factors == {}
+        assert result.confidence == 0.0
+
+    @pytest.mark.asyncio
+    async def test_compositional_uses_known_factors(
+        self, open_policy: ResiliencePolicy
+    ) -> None:
+        """Should compose from known factor vectors when new ones can't be embedded."""
+        service = EmbeddingService(
+            model="ollama/nomic-embed-text",
+            batch_window_ms=0,
+            mode="compositional",
+            factor_table=FactorVectorTable("ollama/nomic-embed-text"),
+            resilience=open_policy,
+        )
+        service.factor_table.set_local({"mood: happy": [1.0] + [0.0] * 767})
+
+        vector = await service.generate_embedding(
+            ContextFactors(factors={"mood": "happy", "location": "gym"}), "tenant-1", "user-1"
+        )
+
+        assert vector == [1.0] + [0.0] * 767
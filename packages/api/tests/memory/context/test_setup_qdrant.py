@@ -0,0 +1,38 @@
+"""Tests for Qdrant setup and embedding migration."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from fidus.memory.context.setup_qdrant import QdrantSetup
+
+
+class TestQdrantSetupReembed:
+    """Tests for QdrantSetup.reembed_points()."""
+
+    @pytest.mark.asyncio
+    @patch("fidus.memory.context.setup_qdrant.QdrantClient")
+    async def test_reembeds_only_points_from_other_modes(self, mock_client_cls: Mock) -> None:
+        """Should re-embed stale points from their factors payload and tag them."""
+        stale = Mock(id="s1", payload={"factors": {"mood": "happy"}, "tenant_id": "t1"})
+        current = Mock(
+            id="s2", payload={"factors": {"mood": "sad"}, "embedding_mode": "compositional"}
+        )
+        client = mock_client_cls.return_value
+        client.scroll.side_effect = [([stale], "next"), ([current], None)]
+
+        embedding_service = Mock(mode="compositional")
+        embedding_service.generate_embeddings_batch = AsyncMock(return_value=[[0.5, 0.5]])
+
+        migrated = await QdrantSetup().reembed_points(embedding_service, batch_size=1)
+
+        assert migrated == 1
+        contexts = embedding_service.generate_embeddings_batch.await_args.kwargs["contexts"]
+        assert contexts[0].factors == {"mood": "happy"}
+
+        client.upsert.assert_called_once()
+        point = client.upsert.call_args.kwargs["points"][0]
+        assert point.id == "s1"
+        assert point.vector == [0.5, 0.5]
+        assert point.payload["embedding_mode"] == "compositional"
+        assert point.payload["tenant_id"] == "t1"
@@ -299,8 +299,10 @@ class TestContextStorageService:
         self,
         storage: ContextStorageService,
         mock_neo4j_driver: Mock,
+        mock_qdrant_client: Mock,
     ) -> None:
-        """Should close Neo4j driver connection."""
+        """Should close Neo4j driver and Qdrant client connections."""
         await storage.close()
 
         mock_neo4j_driver.close.assert_called_once()
+        mock_qdrant_client.close.assert_called_once()
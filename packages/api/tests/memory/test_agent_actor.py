@@ -0,0 +1,162 @@
+"""Tests for the per-agent mailbox and turn state."""
+
+import asyncio
+
+import pytest
+
+from fidus.memory.agent_actor import Mailbox, TurnContext, serialized
+
+
+@pytest.mark.asyncio
+async def test_operations_run_one_at_a_time_in_order():
+    """Should not start an operation before the previous one finished."""
+    mailbox = Mailbox()
+    log = []
+
+    async def operation(name):
+        log.append(f"start {name}")
+        await asyncio.sleep(0)
+        log.append(f"end {name}")
+        return name
+
+    results = await asyncio.gather(
+        mailbox.call(lambda: operation("a")),
+        mailbox.call(lambda: operation("b")),
+    )
+
+    assert results == ["a", "b"]
+    assert log == ["start a", "end a", "start b", "end b"]
+    assert mailbox.stats()["processed"] == 2
+    assert not mailbox.busy
+
+
+@pytest.mark.asyncio
+async def test_failure_is_raised_to_caller_only():
+    """Should re-raise an operation's error and keep processing."""
+    mailbox = Mailbox()
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def succeed():
+        return "ok"
+
+    with pytest.raises(ValueError, match="boom"):
+        await mailbox.call(fail)
+
+    assert await mailbox.call(succeed) == "ok"
+    assert mailbox.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_operation_completes_when_caller_is_cancelled():
+    """Should finish a started operation even if its caller goes away."""
+    mailbox = Mailbox()
+    release = asyncio.Event()
+    done = []
+
+    async def operation():
+        await release.wait()
+        done.append(True)
+
+    caller = asyncio.create_task(mailbox.call(operation))
+    await asyncio.sleep(0)
+    caller.cancel()
+    release.set()
+    await mailbox.join()
+
+    assert done == [True]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_items_and_holds_the_mailbox():
+    """Should stream items and run later operations after the stream."""
+    mailbox = Mailbox()
+    log = []
+
+    async def generate():
+        for item in ("a", "b"):
+            log.append(item)
+            yield item
+
+    async def after():
+        log.append("after")
+
+    items = []
+    async for item in mailbox.stream(generate):
+        if not items:
+            mailbox.post(after)
+        items.append(item)
+    await mailbox.join()
+
+    assert items == ["a", "b"]
+    assert log == ["a", "b", "after"]
+
+
+@pytest.mark.asyncio
+async def test_stream_closed_early_closes_generator():
+    """Should close the generator when the consumer stops."""
+    mailbox = Mailbox()
+    closed = []
+
+    async def generate():
+        try:
+            for item in range(10):
+                yield item
+                await asyncio.sleep(0)
+        finally:
+            closed.append(True)
+
+    stream = mailbox.stream(generate)
+    assert await stream.__anext__() == 0
+    await stream.aclose()
+    await mailbox.join()
+
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_stream_error_is_raised_to_consumer():
+    """Should re-raise a generator error in the consumer."""
+    mailbox = Mailbox()
+
+    async def generate():
+        yield "a"
+        raise RuntimeError("LLM down")
+
+    with pytest.raises(RuntimeError, match="LLM down"):
+        async for _ in mailbox.stream(generate):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_serialized_methods_use_the_mailbox():
+    """Should run decorated methods through the instance's mailbox."""
+
+    class Counter:
+        def __init__(self):
+            self.mailbox = Mailbox()
+            self.value = 0
+
+        @serialized
+        async def increment(self):
+            value = self.value
+            await asyncio.sleep(0)
+            self.value = value + 1
+
+    counter = Counter()
+    await asyncio.gather(*(counter.increment() for _ in range(5)))
+
+    assert counter.value == 5
+
+
+def test_turn_state_is_taken_once():
+    """Should hand out the analysis preferences and pending saves once."""
+    turn = TurnContext("I love cappuccino", "user-1")
+    turn.preferences = [{"key": "cappuccino"}]
+    turn.pending_saves = [{"key": "food.cappuccino"}]
+
+    assert turn.take_preferences() == [{"key": "cappuccino"}]
+    assert turn.take_preferences() is None
+    assert turn.take_pending_saves() == [{"key": "food.cappuccino"}]
+    assert turn.take_pending_saves() == []
@@ -0,0 +1,269 @@
+"""Tests for the per-user agent registry."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from fidus.memory.agent_actor import Mailbox
+from fidus.memory.agent_registry import AGENT_BASE_BYTES, AgentRegistry, estimate_agent_bytes
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _agent():
+    agent = MagicMock()
+    agent.disconnect = AsyncMock()
+    agent.mailbox = Mailbox()
+    agent._learning_tasks = set()
+    agent.learning_queue = None
+    agent.conversation_history = [{"role": "user", "content": "Hello"}]
+    agent.preferences = {"food.coffee": {"value": "loves it"}}
+    return agent
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _registry(clock, **kwargs):
+    kwargs.setdefault("max_size", 2)
+    kwargs.setdefault("idle_ttl_seconds", 60)
+    return AgentRegistry(lambda user_id: _agent(), clock=clock, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_get_reuses_agent(clock):
+    """Should create one agent per user and return it again."""
+    registry = _registry(clock)
+
+    agent = registry.get("user-1")
+
+    assert registry.get("user-1") is agent
+    assert registry.stats()["created"] == 1
+    assert registry.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(clock):
+    """Should disconnect the least recently used agent when full."""
+    registry = _registry(clock)
+    first = registry.get("user-1")
+    second = registry.get("user-2")
+    registry.get("user-1")
+
+    registry.get("user-3")
+    await registry.wait_closed()
+
+    assert "user-2" not in registry
+    assert "user-1" in registry
+    second.disconnect.assert_awaited_once()
+    first.disconnect.assert_not_awaited()
+    assert registry.stats()["evicted_lru"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_evicts_idle_agents(clock):
+    """Should disconnect agents unused for longer than the TTL."""
+    registry = _registry(clock)
+    idle = registry.get("user-1")
+    clock.now = 50
+    active = registry.get("user-2")
+
+    clock.now = 100
+    evicted = await registry.sweep()
+
+    assert evicted == 1
+    assert len(registry) == 1
+    idle.disconnect.assert_awaited_once()
+    active.disconnect.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_idle_agent_replaced_on_access(clock):
+    """Should replace an expired agent on access even before a sweep."""
+    registry = _registry(clock)
+    old = registry.get("user-1")
+
+    clock.now = 120
+    new = registry.get("user-1")
+    await registry.wait_closed()
+
+    assert new is not old
+    old.disconnect.assert_awaited_once()
+    assert registry.stats()["evicted_idle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_busy_agents_are_not_evicted(clock):
+    """Should keep agents with a turn or learning in flight."""
+    registry = _registry(clock, max_size=1)
+    release = asyncio.Event()
+    turn = registry.get("user-1")
+    turn.mailbox.post(release.wait)
+    learning = registry.get("user-2")
+    learning_task = asyncio.create_task(release.wait())
+    learning._learning_tasks.add(learning_task)
+    learning_task.add_done_callback(learning._learning_tasks.discard)
+
+    registry.get("user-3")
+    assert len(registry) == 3
+    clock.now = 120
+    assert registry.get("user-1") is turn
+    assert await registry.sweep() == 1
+    assert "user-2" in registry
+
+    release.set()
+    await turn.mailbox.join()
+    await learning_task
+    clock.now = 240
+    assert await registry.sweep() == 2
+    turn.disconnect.assert_awaited_once()
+    learning.disconnect.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_leased_agents_are_not_evicted(clock):
+    """Should keep an agent while a request holds a lease on it."""
+    registry = _registry(clock, max_size=1)
+
+    with registry.lease("user-1") as leased:
+        registry.get("user-2")
+        clock.now = 120
+        assert await registry.sweep() == 1
+        assert "user-1" in registry
+        assert registry.stats()["leased"] == 1
+
+    assert registry.stats()["leased"] == 0
+    assert await registry.sweep() == 1
+    leased.disconnect.assert_awaited_once()
+
+
+def test_lease_release_is_idempotent(clock):
+    """Should count each lease once, however often it is released."""
+    registry = _registry(clock)
+    first = registry.lease("user-1")
+    second = registry.lease("user-1")
+
+    first.release()
+    first.release()
+    assert registry.stats()["leased"] == 1
+    second.release()
+    assert registry.stats()["leased"] == 0
+
+
+@pytest.mark.asyncio
+async def test_agents_with_queued_learning_are_not_evicted(clock):
+    """Should keep an agent while learning jobs of its user are queued."""
+    from fidus.memory.learning_queue import LearningQueue
+
+    queue = LearningQueue(max_size=10, workers=1)
+    registry = _registry(clock, max_size=1)
+    agent = registry.get("user-1")
+    agent.learning_queue = queue
+    release = asyncio.Event()
+
+    async def job(emit):
+        await release.wait()
+
+    queue.start()
+    try:
+        assert queue.submit("user-1", job)
+        registry.get("user-2")
+        assert "user-1" in registry
+
+        release.set()
+        await queue.join()
+        clock.now = 120
+        assert await registry.sweep() == 2
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_running_turns(clock):
+    """Should disconnect an agent only after its running turn finished."""
+    registry = _registry(clock)
+    agent = registry.get("user-1")
+    release = asyncio.Event()
+    log = []
+
+    async def turn():
+        await release.wait()
+        log.append("turn")
+
+    agent.disconnect.side_effect = lambda: log.append("disconnect")
+    agent.mailbox.post(turn)
+
+    closing = asyncio.create_task(registry.close())
+    await asyncio.sleep(0)
+    release.set()
+    await closing
+
+    assert log == ["turn", "disconnect"]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_failure_is_counted(clock):
+    """Should keep evicting if an agent fails to disconnect."""
+    registry = _registry(clock, max_size=1)
+    registry.get("user-1").disconnect.side_effect = Exception("Neo4j down")
+
+    registry.get("user-2")
+    await registry.wait_closed()
+
+    assert registry.stats()["close_failures"] == 1
+    assert "user-2" in registry
+
+
+@pytest.mark.asyncio
+async def test_close_disconnects_all_agents(clock):
+    """Should stop the sweeper and disconnect every agent."""
+    registry = _registry(clock, sweep_interval_seconds=3600)
+    registry.start()
+    agents = [registry.get("user-1"), registry.get("user-2")]
+
+    await registry.close()
+
+    assert len(registry) == 0
+    for agent in agents:
+        agent.disconnect.assert_awaited_once()
+    assert registry._sweeper is None
+
+
+@pytest.mark.asyncio
+async def test_sweeper_runs_periodically(clock):
+    """Should sweep idle agents in the background."""
+    registry = _registry(clock, sweep_interval_seconds=0.01)
+    agent = registry.get("user-1")
+    clock.now = 100
+
+    registry.start()
+    for _ in range(50):
+        if "user-1" not in registry:
+            break
+        await asyncio.sleep(0.01)
+    await registry.close()
+
+    agent.disconnect.assert_awaited_once()
+
+
+def test_memory_accounting(clock):
+    """Should report estimated memory of all agents."""
+    registry = _registry(clock)
+    registry.get("user-1")
+
+    stats = registry.stats()
+
+    assert stats["agents"] == 1
+    assert stats["estimated_bytes"] == estimate_agent_bytes(_agent())
+    assert stats["estimated_bytes"] > AGENT_BASE_BYTES
@@ -0,0 +1,94 @@
+"""Tests for the embedding prefilter of semantic conflict detection."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from fidus.memory.conflict_detector import ConflictDetector
+
+VECTORS = {
+    "food: coffee": [1.0, 0.0, 0.0],
+    "food: espresso": [0.9, 0.1, 0.0],
+    "food: instant coffee": [0.8, 0.2, 0.0],
+    "food: broccoli": [0.0, 0.0, 1.0],
+}
+
+
+def _embedding_service() -> Mock:
+    """Embedding service returning fixed vectors per key text."""
+    service = Mock()
+    service.model = "test-model"
+    service.generate_text_embeddings = AsyncMock(
+        side_effect=lambda texts: [VECTORS[text] for text in texts]
+    )
+    return service
+
+
+class TestConflictDetector:
+    """Tests for ConflictDetector."""
+
+    def test_key_text(self) -> None:
+        """Should embed a readable form of the key."""
+        assert ConflictDetector.key_text("food.instant_coffee") == "food: instant coffee"
+        assert ConflictDetector.key_text("coffee") == "coffee"
+
+    @pytest.mark.asyncio
+    async def test_candidates_filters_by_similarity(self) -> None:
+        """Should keep similar pairs, most similar first."""
+        detector = ConflictDetector(_embedding_service(), similarity_threshold=0.5)
+
+        candidates = await detector.candidates([
+            ("food.broccoli", "food.coffee"),
+            ("food.coffee", "food.instant_coffee"),
+            ("food.coffee", "food.espresso"),
+        ])
+
+        assert candidates == [
+            ("food.coffee", "food.espresso"),
+            ("food.coffee", "food.instant_coffee"),
+        ]
+        assert detector.stats()["pairs_checked"] == 3
+        assert detector.stats()["pairs_selected"] == 2
+
+    @pytest.mark.asyncio
+    async def test_key_vectors_are_cached(self) -> None:
+        """Should embed each key once, in one call per check."""
+        service = _embedding_service()
+        detector = ConflictDetector(service, similarity_threshold=0.5)
+
+        await detector.candidates([("food.coffee", "food.espresso")])
+        await detector.candidates([("food.coffee", "food.espresso"), ("food.broccoli", "food.coffee")])
+
+        assert service.generate_text_embeddings.await_count == 2
+        assert service.generate_text_embeddings.await_args.args[0] == ["food: broccoli"]
+
+    @pytest.mark.asyncio
+    async def test_max_candidates(self) -> None:
+        """Should cap the number of candidate pairs."""
+        detector = ConflictDetector(_embedding_service(), similarity_threshold=0.0, max_candidates=1)
+
+        candidates = await detector.candidates([
+            ("food.coffee", "food.instant_coffee"),
+            ("food.coffee", "food.espresso"),
+        ])
+
+        assert candidates == [("food.coffee", "food.espresso")]
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_keeps_all_pairs(self) -> None:
+        """Should fall back to LLM-only checking if embedding fails."""
+        service = _embedding_service()
+        service.generate_text_embeddings = AsyncMock(side_effect=ConnectionError("down"))
+        detector = ConflictDetector(service, similarity_threshold=0.5)
+
+        candidates = await detector.candidates([("food.broccoli", "food.coffee")])
+
+        assert candidates == [("food.broccoli", "food.coffee")]
+
+    def test_defaults_to_shared_embedding_service(self) -> None:
+        """Should embed keys with the process-wide embedding service."""
+        shared = _embedding_service()
+        with patch(
+            "fidus.memory.context.embedding_service.get_embedding_service", return_value=shared
+        ):
+            assert ConflictDetector().embedding_service is shared
@@ -0,0 +1,114 @@
+"""Tests for the extraction result cache."""
+
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from fidus.memory.extraction_cache import ExtractionCache, current_datetime_bucket
+
+
+class TestExtractionCache:
+    """Tests for ExtractionCache."""
+
+    @pytest.fixture
+    def cache(self) -> ExtractionCache:
+        """Create an in-process-only cache."""
+        return ExtractionCache(max_size=10, ttl_seconds=60)
+
+    def test_normalize(self) -> None:
+        """Should ignore case, whitespace and trailing punctuation."""
+        assert ExtractionCache.normalize("  Good   MORNING!! ") == "good morning"
+        assert ExtractionCache.normalize("Good morning?") == "good morning?"
+
+    def test_make_key_separates_kind_model_and_bucket(self) -> None:
+        """Should only share keys for the same kind, model and bucket."""
+        key = ExtractionCache.make_key("context", "m", "Good morning", "Mon 09:00")
+
+        assert key == ExtractionCache.make_key("context", "m", "good morning!", "Mon 09:00")
+        assert key != ExtractionCache.make_key("analysis", "m", "Good morning", "Mon 09:00")
+        assert key != ExtractionCache.make_key("context", "other", "Good morning", "Mon 09:00")
+        assert key != ExtractionCache.make_key("context", "m", "Good morning", "Mon 10:00")
+
+    @pytest.mark.asyncio
+    async def test_get_and_set(self, cache: ExtractionCache) -> None:
+        """Should return stored results and count hits and misses."""
+        assert await cache.get("context", "m", "hi") is None
+
+        await cache.set("context", "m", "hi", {"confidence": 0.5})
+
+        assert await cache.get("context", "m", "Hi!") == {"confidence": 0.5}
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_results_are_copied(self, cache: ExtractionCache) -> None:
+        """Should not let callers mutate cached entries."""
+        result = {"preferences": [{"key": "coffee"}]}
+        await cache.set("preferences", "m", "I like coffee", result)
+        result["preferences"].clear()
+
+        cached = await cache.get("preferences", "m", "I like coffee")
+        cached["preferences"][0]["key"] = "tea"
+
+        assert await cache.get("preferences", "m", "I like coffee") == {
+            "preferences": [{"key": "coffee"}]
+        }
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Should drop entries older than the TTL."""
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        cache = ExtractionCache(max_size=10, ttl_seconds=60)
+
+        await cache.set("context", "m", "hi", {"confidence": 0.5})
+        now[0] += 61
+
+        assert await cache.get("context", "m", "hi") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_is_promoted(self) -> None:
+        """Should fall back to Redis and keep the result in process."""
+        session_cache = Mock()
+        session_cache.get_cached_extraction = AsyncMock(return_value={"confidence": 0.7})
+        cache = ExtractionCache(max_size=10, ttl_seconds=60, session_cache=session_cache)
+
+        assert await cache.get("context", "m", "hi") == {"confidence": 0.7}
+        assert await cache.get("context", "m", "hi") == {"confidence": 0.7}
+
+        session_cache.get_cached_extraction.assert_awaited_once()
+        assert cache.stats()["redis_hits"] == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_set_writes_through_to_redis(self) -> None:
+        """Should store results in Redis with the configured TTL."""
+        session_cache = Mock()
+        session_cache.cache_extraction = AsyncMock()
+        cache = ExtractionCache(max_size=10, ttl_seconds=60, session_cache=session_cache)
+
+        await cache.set("context", "m", "hi", {"confidence": 0.7})
+
+        session_cache.cache_extraction.assert_awaited_once_with(
+            ExtractionCache.make_key("context", "m", "hi"), {"confidence": 0.7}, 60
+        )
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_are_ignored(self) -> None:
+        """Should treat Redis failures as misses instead of raising."""
+        session_cache = Mock()
+        session_cache.get_cached_extraction = AsyncMock(side_effect=ConnectionError("down"))
+        session_cache.cache_extraction = AsyncMock(side_effect=ConnectionError("down"))
+        cache = ExtractionCache(max_size=10, ttl_seconds=60, session_cache=session_cache)
+
+        assert await cache.get("context", "m", "hi") is None
+        await cache.set("context", "m", "hi", {"confidence": 0.7})
+
+        assert await cache.get("context", "m", "hi") == {"confidence": 0.7}
+
+
+def test_current_datetime_bucket_has_hour_resolution() -> None:
+    """Should round the prompt datetime down to the hour."""
+    assert ":00 " in current_datetime_bucket()
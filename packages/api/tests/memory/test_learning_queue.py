@@ -0,0 +1,183 @@
+"""Tests for the background learning queue."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from fidus.config import config
+from fidus.memory.learning_queue import LearningQueue
+
+
+@pytest.fixture
+async def queue():
+    """Create and start a small learning queue."""
+    queue = LearningQueue(max_size=10, workers=2)
+    queue.start()
+    yield queue
+    await queue.stop(drain_timeout=1)
+
+
+class TestLearningQueue:
+    """Tests for LearningQueue."""
+
+    def test_submit_without_workers_is_rejected(self) -> None:
+        """Should ask the caller to learn inline when not started."""
+
+        async def job(emit):
+            pass
+
+        assert LearningQueue(max_size=10, workers=1).submit("user-1", job) is False
+
+    @pytest.mark.asyncio
+    async def test_job_events_are_buffered_per_user(self, queue: LearningQueue) -> None:
+        """Should run jobs and keep their events until popped."""
+
+        async def job(emit):
+            emit({"type": "preferences_updated", "count": 1})
+
+        assert queue.submit("user-1", job) is True
+        await queue.join()
+
+        assert queue.pop_events("user-2") == []
+        assert queue.pop_events("user-1") == [{"type": "preferences_updated", "count": 1}]
+        assert queue.pop_events("user-1") == []
+        assert queue.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_jobs_for_same_user_run_in_order(self, queue: LearningQueue) -> None:
+        """Should never run two jobs of one user concurrently."""
+        order = []
+
+        def make_job(name: str, delay: float):
+            async def job(emit):
+                order.append(f"{name}-start")
+                await asyncio.sleep(delay)
+                order.append(f"{name}-end")
+
+            return job
+
+        queue.submit("user-1", make_job("first", 0.02))
+        queue.submit("user-1", make_job("second", 0))
+        await queue.join()
+
+        assert order == ["first-start", "first-end", "second-start", "second-end"]
+
+    @pytest.mark.asyncio
+    async def test_jobs_for_different_users_overlap(self, queue: LearningQueue) -> None:
+        """Should process different users concurrently."""
+        other_ran = asyncio.Event()
+
+        async def waiting_job(emit):
+            await asyncio.wait_for(other_ran.wait(), timeout=1)
+
+        async def other_job(emit):
+            other_ran.set()
+
+        queue.submit("user-1", waiting_job)
+        queue.submit("user-2", other_job)
+        await queue.join()
+
+        assert queue.stats()["completed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self) -> None:
+        """Should reject jobs beyond capacity instead of blocking."""
+        queue = LearningQueue(max_size=1, workers=1)
+        queue.start()
+        release = asyncio.Event()
+
+        async def blocking_job(emit):
+            await release.wait()
+
+        try:
+            assert queue.submit("user-1", blocking_job)
+            await asyncio.sleep(0)  # worker picks up the first job
+            assert queue.submit("user-1", blocking_job)
+            assert queue.submit("user-1", blocking_job) is False
+            assert queue.stats()["rejected"] == 1
+        finally:
+            release.set()
+            await queue.stop(drain_timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_failed_job_does_not_stop_worker(self, queue: LearningQueue) -> None:
+        """Should count failures and keep processing."""
+
+        async def failing_job(emit):
+            raise RuntimeError("neo4j down")
+
+        async def job(emit):
+            emit({"type": "preferences_updated", "count": 1})
+
+        queue.submit("user-1", failing_job)
+        queue.submit("user-1", job)
+        await queue.join()
+
+        assert queue.stats()["failed"] == 1
+        assert queue.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_queued_jobs(self) -> None:
+        """Should finish queued jobs before stopping."""
+        queue = LearningQueue(max_size=10, workers=1)
+        queue.start()
+        done = []
+
+        async def job(emit):
+            await asyncio.sleep(0.01)
+            done.append(True)
+
+        queue.submit("user-1", job)
+        queue.submit("user-1", job)
+        await queue.stop(drain_timeout=1)
+
+        assert done == [True, True]
+        assert queue.running is False
+
+    @pytest.mark.asyncio
+    async def test_pending_for_counts_queued_and_running_jobs(self) -> None:
+        """Should count a user's jobs until they finish."""
+        queue = LearningQueue(max_size=10, workers=1)
+        queue.start()
+        release = asyncio.Event()
+
+        async def blocking_job(emit):
+            await release.wait()
+
+        try:
+            queue.submit("user-1", blocking_job)
+            queue.submit("user-1", blocking_job)
+            await asyncio.sleep(0)  # worker picks up the first job
+            assert queue.pending_for("user-1") == 2
+            assert queue.pending_for("user-2") == 0
+
+            release.set()
+            await queue.join()
+            assert queue.pending_for("user-1") == 0
+        finally:
+            release.set()
+            await queue.stop(drain_timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_user_locks_dropped_when_jobs_finish(self, queue: LearningQueue) -> None:
+        """Should not keep a lock for users without queued or running jobs."""
+        async def job(emit):
+            await asyncio.sleep(0)
+
+        queue.submit("user-1", job)
+        queue.submit("user-2", job)
+        await queue.join()
+
+        assert queue._user_locks == {}
+
+    def test_event_buffers_bounded_by_user_count(self) -> None:
+        """Should drop the least recently used buffers of users who never poll."""
+        with patch.object(config, "learning_events_max_users", 2):
+            queue = LearningQueue(max_size=10, workers=1)
+
+        for user_id in ("user-1", "user-2", "user-3"):
+            queue.publish(user_id, {"type": "preferences_updated", "count": 1})
+
+        assert queue.pop_events("user-1") == []
+        assert queue.pop_events("user-3") == [{"type": "preferences_updated", "count": 1}]
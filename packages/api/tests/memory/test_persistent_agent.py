@@ -8,10 +8,14 @@ These tests verify the persistent agent implementation including:
 - Multi-tenancy enforcement
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from fidus.memory.agent_actor import TurnContext
 from fidus.memory.persistent_agent import PersistentAgent
 from fidus.infrastructure.neo4j_client import Neo4jPreferenceStore
+from fidus.infrastructure.neo4j_taxonomy import Neo4jTaxonomyStore
 
 
 @pytest.fixture
@@ -29,10 +33,20 @@ def mock_neo4j_store():
 
 
 @pytest.fixture
-def agent(mock_neo4j_store):
-    """Create a PersistentAgent with mocked store."""
+def mock_taxonomy():
+    """Create a mock Neo4jTaxonomyStore."""
+    taxonomy = AsyncMock(spec=Neo4jTaxonomyStore)
+    taxonomy.related_keys = AsyncMock(return_value={})
+    taxonomy.add_relations = AsyncMock(return_value=0)
+    return taxonomy
+
+
+@pytest.fixture
+def agent(mock_neo4j_store, mock_taxonomy):
+    """Create a PersistentAgent with mocked stores."""
     agent = PersistentAgent(tenant_id="test-tenant")
     agent.store = mock_neo4j_store
+    agent.taxonomy = mock_taxonomy
     return agent
 
 
@@ -63,6 +77,9 @@ class TestConnection:
         assert "food.coffee" in agent.preferences
         assert agent.preferences["food.coffee"]["confidence"] == 0.8
 
+        # Loaded preferences are checked at the next conflict scan
+        assert agent._take_dirty_keys() == {"food.coffee"}
+
     @pytest.mark.asyncio
     async def test_disconnect(self, agent, mock_neo4j_store):
         """Should properly disconnect from Neo4j."""
@@ -73,6 +90,77 @@ class TestConnection:
         assert agent._connected is False
         mock_neo4j_store.disconnect.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_disconnect_waits_for_learning_tasks(self, agent, mock_neo4j_store):
+        """Should let pending learning finish before closing the store."""
+        agent._connected = True
+        finished = []
+
+        async def learn():
+            await asyncio.sleep(0)
+            finished.append(mock_neo4j_store.disconnect.called)
+
+        task = asyncio.create_task(learn())
+        agent._learning_tasks.add(task)
+
+        await agent.disconnect()
+
+        assert finished == [False]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_connects_connect_once(self, agent, mock_neo4j_store):
+        """Should connect and load preferences once for concurrent first requests."""
+        await asyncio.gather(agent.connect(), agent.connect())
+
+        mock_neo4j_store.connect.assert_called_once()
+        mock_neo4j_store.get_preferences.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_waits_for_queued_turns(self, agent, mock_neo4j_store):
+        """Should let queued mailbox operations finish before closing the store."""
+        agent._connected = True
+        finished = []
+
+        async def operation():
+            await asyncio.sleep(0)
+            finished.append(mock_neo4j_store.disconnect.called)
+
+        agent.mailbox.post(operation)
+
+        await agent.disconnect()
+
+        assert finished == [False]
+
+    @pytest.mark.asyncio
+    async def test_connect_and_disconnect_taxonomy(self, agent, mock_taxonomy):
+        """Should connect and disconnect the shared taxonomy with the store."""
+        await agent.connect()
+        mock_taxonomy.connect.assert_called_once()
+
+        await agent.disconnect()
+        mock_taxonomy.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_taxonomy_is_scoped_to_tenant(self, agent, mock_taxonomy):
+        """Should read and write learned relations for the agent's tenant."""
+        await agent._lookup_taxonomy([("food.coffee", "food.espresso")])
+        await agent._record_taxonomy([("food.espresso", "food.coffee")])
+
+        assert mock_taxonomy.related_keys.await_args.kwargs["tenant_id"] == "test-tenant"
+        mock_taxonomy.add_relations.assert_awaited_once_with(
+            [("food.espresso", "food.coffee")], source="llm", tenant_id="test-tenant"
+        )
+
+    @pytest.mark.asyncio
+    async def test_connect_without_taxonomy(self, agent, mock_taxonomy):
+        """Should keep working without the taxonomy if it can't connect."""
+        mock_taxonomy.connect.side_effect = Exception("Neo4j down")
+
+        await agent.connect()
+
+        assert agent._connected is True
+        assert agent.taxonomy is None
+
     @pytest.mark.asyncio
     async def test_operations_without_connection(self, agent):
         """Should raise error when operations attempted without connection."""
@@ -257,6 +345,23 @@ class TestDeletePreference:
         # Verify removed from memory
         assert "food.coffee" not in agent.preferences
 
+    @pytest.mark.asyncio
+    async def test_delete_preference_drops_conflict_results(self, agent, mock_neo4j_store):
+        """Should forget related pairs of the deleted preference."""
+        agent._connected = True
+        agent.preferences = {
+            "food.coffee": {"value": "likes it", "sentiment": "positive",
+                            "confidence": 0.8, "id": "pref-1"},
+            "food.espresso": {"value": "hates it", "sentiment": "negative",
+                              "confidence": 0.8, "id": "pref-2"},
+        }
+        agent._related_pairs = {("food.coffee", "food.espresso")}
+        mock_neo4j_store.delete_preference.return_value = True
+
+        await agent.delete_preference("pref-2")
+
+        assert agent._related_pairs == set()
+
     @pytest.mark.asyncio
     async def test_delete_preference_not_found(self, agent, mock_neo4j_store):
         """Should return False if preference not found."""
@@ -311,7 +416,8 @@ class TestPreferencePersistence:
                 "confidence": 0.8,
             }
         }
-        agent._pending_saves = [
+        turn = TurnContext("I love pizza")
+        turn.pending_saves = [
             {
                 "key": "food.pizza",
                 "value": "loves it",
@@ -328,7 +434,7 @@ class TestPreferencePersistence:
             "confidence": 0.8,
         }
 
-        await agent._persist_pending_saves()
+        await agent._persist_pending_saves(turn)
 
         # Verify Neo4j create was called
         mock_neo4j_store.create_preference.assert_called_once()
@@ -338,12 +444,341 @@ class TestPreferencePersistence:
         assert call_kwargs["sentiment"] == "positive"
 
         # Verify pending saves cleared
-        assert len(agent._pending_saves) == 0
+        assert len(turn.pending_saves) == 0
 
         # Verify Neo4j ID added to memory
         assert agent.preferences["food.pizza"]["id"] == "new-pref-1"
 
 
+class TestCombinedAnalysis:
+    """Tests for single-pass preference and context extraction."""
+
+    @pytest.mark.asyncio
+    async def test_chat_analyzes_message_once(self, agent):
+        """Should reuse one combined analysis for preferences, retrieval and recording."""
+        from fidus.memory.context.models import (
+            ContextExtractionResult,
+            ContextFactors,
+            MessageAnalysis,
+        )
+
+        preferences = [
+            {
+                "domain": "food",
+                "key": "cappuccino",
+                "sentiment": "positive",
+                "value": "loves it",
+                "confidence": 0.9,
+            }
+        ]
+        merged_context = ContextFactors(factors={"time_of_day": "morning"})
+        context_agent = MagicMock()
+        context_agent.analyze_message = AsyncMock(
+            return_value=MessageAnalysis(
+                preferences=preferences,
+                context=ContextExtractionResult(context=ContextFactors(), confidence=0.5),
+            )
+        )
+        context_agent.extract_and_merge_context = AsyncMock(return_value=merged_context)
+        context_agent.get_relevant_preferences = AsyncMock(return_value=[])
+        agent.context_agent = context_agent
+
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="Noted!"))]
+        with patch("fidus.memory.simple_agent.acompletion", new_callable=AsyncMock) as mock_llm:
+            mock_llm.return_value = response
+            await agent.chat("I love cappuccino in the morning", user_id="user-1")
+
+        # Only the reply itself goes to the chat LLM
+        mock_llm.assert_called_once()
+        context_agent.analyze_message.assert_called_once()
+        assert context_agent.get_relevant_preferences.call_args[1]["context"] == merged_context
+        assert agent.preferences["food.cappuccino"]["sentiment"] == "positive"
+
+    @pytest.mark.asyncio
+    async def test_chat_prompt_includes_preferences_learned_in_turn(self, agent):
+        """Should add this turn's preferences to the context-selected subset."""
+        from fidus.memory.context.models import (
+            ContextExtractionResult,
+            ContextFactors,
+            MessageAnalysis,
+        )
+
+        agent.preferences = {
+            "food.tea": {
+                "id": "pref-1", "value": "likes it", "sentiment": "positive",
+                "confidence": 0.8, "is_exception": False,
+            },
+            "music.jazz": {
+                "value": "likes it", "sentiment": "positive",
+                "confidence": 0.8, "is_exception": False,
+            },
+        }
+        context_agent = MagicMock()
+        context_agent.analyze_message = AsyncMock(return_value=MessageAnalysis(
+            preferences=[{
+                "domain": "food",
+                "key": "cappuccino",
+                "sentiment": "positive",
+                "value": "loves it",
+                "confidence": 0.9,
+            }],
+            context=ContextExtractionResult(context=ContextFactors(), confidence=0.5),
+        ))
+        context_agent.extract_and_merge_context = AsyncMock(return_value=ContextFactors())
+        context_agent.get_relevant_preferences = AsyncMock(return_value=[{"id": "situation-1"}])
+        agent.context_agent = context_agent
+        agent.learning_queue = None
+
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="Noted!"))]
+        with patch.object(agent, "_build_prompt", wraps=agent._build_prompt) as build_prompt, \
+                patch("fidus.memory.simple_agent.acompletion", new_callable=AsyncMock,
+                      return_value=response):
+            await agent.chat("I love cappuccino", user_id="user-1")
+
+        prompt_preferences = build_prompt.call_args[0][0]
+        assert set(prompt_preferences) == {"food.tea", "food.cappuccino"}
+
+    @pytest.mark.asyncio
+    async def test_fast_path_message_still_learns_preferences(self, agent):
+        """Should extract preferences separately for messages the fast path skips."""
+        from fidus.memory.context.extractor import CombinedExtractor
+        from fidus.memory.context.fast_path import ContextSignalClassifier
+        from fidus.memory.context.models import ContextFactors
+
+        extractor = CombinedExtractor(model="gpt-4o-mini", classifier=ContextSignalClassifier())
+        context_agent = MagicMock()
+        context_agent.analyze_message = AsyncMock(side_effect=extractor.analyze)
+        context_agent.extract_and_merge_context = AsyncMock(return_value=ContextFactors())
+        context_agent.get_relevant_preferences = AsyncMock(return_value=[])
+        agent.context_agent = context_agent
+        agent.learning_queue = None
+
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="Noted!"))]
+        with patch.object(extractor, "_acomplete", new_callable=AsyncMock) as mock_analysis, \
+                patch.object(agent, "_extract_preferences", new_callable=AsyncMock, return_value=[{
+                    "domain": "food",
+                    "key": "vegetarian_diet",
+                    "sentiment": "positive",
+                    "value": "is vegetarian",
+                    "confidence": 0.9,
+                }]) as mock_extract, \
+                patch("fidus.memory.simple_agent.acompletion", new_callable=AsyncMock,
+                      return_value=response):
+            await agent.chat("I am vegetarian", user_id="user-1")
+
+        # No lexicon word: the combined analysis is skipped, extraction still runs
+        context_agent.analyze_message.assert_awaited_once()
+        mock_analysis.assert_not_called()
+        mock_extract.assert_awaited_once_with("I am vegetarian")
+        assert "food.vegetarian_diet" in agent.preferences
+
+    @pytest.mark.asyncio
+    async def test_persist_passes_turn_context(self, agent, mock_neo4j_store):
+        """Should record situations with the context from the turn's analysis."""
+        from fidus.memory.context.models import ContextFactors
+
+        agent._connected = True
+        turn = TurnContext("I love cappuccino")
+        turn.context = ContextFactors(factors={"time_of_day": "morning"})
+        agent.context_agent = MagicMock()
+        agent.context_agent.record_preference_with_context = AsyncMock()
+        mock_neo4j_store.create_preference.return_value = {"id": "pref-1"}
+
+        agent._update_preferences([
+            {
+                "domain": "food",
+                "key": "cappuccino",
+                "sentiment": "positive",
+                "value": "loves it",
+                "confidence": 0.9,
+            }
+        ], turn)
+        await agent._persist_pending_saves(turn)
+
+        call_kwargs = agent.context_agent.record_preference_with_context.call_args[1]
+        assert call_kwargs["message"] == "I love cappuccino"
+        assert call_kwargs["context"] == turn.context
+        assert call_kwargs["preference_id"] == "pref-1"
+
+    @pytest.mark.asyncio
+    async def test_extract_preferences_falls_back_without_analysis(self, agent):
+        """Should call the standalone extraction when no analysis is available."""
+        with patch(
+            "fidus.memory.simple_agent.InMemoryAgent._extract_preferences",
+            new_callable=AsyncMock,
+            return_value=[],
+        ) as mock_extract:
+            await agent._extract_preferences("Hello")
+
+        mock_extract.assert_called_once_with("Hello")
+
+
+    @pytest.mark.asyncio
+    async def test_chat_stream_persists_before_preferences_event(
+        self, agent, mock_neo4j_store
+    ):
+        """Should persist analyzed preferences before announcing them."""
+        import json
+
+        from fidus.memory.context.models import (
+            ContextExtractionResult,
+            ContextFactors,
+            MessageAnalysis,
+        )
+
+        agent._connected = True
+        context_agent = MagicMock()
+        context_agent.analyze_message = AsyncMock(
+            return_value=MessageAnalysis(
+                preferences=[
+                    {
+                        "domain": "food",
+                        "key": "cappuccino",
+                        "sentiment": "positive",
+                        "value": "loves it",
+                        "confidence": 0.9,
+                    }
+                ],
+                context=ContextExtractionResult(context=ContextFactors(), confidence=0.5),
+            )
+        )
+        context_agent.extract_and_merge_context = AsyncMock(return_value=ContextFactors())
+        context_agent.get_relevant_preferences = AsyncMock(return_value=[])
+        context_agent.record_preference_with_context = AsyncMock(
+            return_value=MagicMock(context=ContextFactors(), id="situation-1")
+        )
+        agent.context_agent = context_agent
+        mock_neo4j_store.create_preference.return_value = {"id": "pref-1"}
+
+        stream = MagicMock()
+        stream.__aiter__.return_value = [
+            MagicMock(choices=[MagicMock(delta=MagicMock(content="Noted!"))])
+        ]
+        events = []
+        with patch("fidus.memory.simple_agent.acompletion", new_callable=AsyncMock) as mock_llm:
+            mock_llm.return_value = stream
+            async for event in agent.chat_stream("I love cappuccino", user_id="user-1"):
+                event_type = json.loads(event)["type"]
+                if event_type == "preferences_updated":
+                    mock_neo4j_store.create_preference.assert_called_once()
+                events.append(event_type)
+
+        assert "preferences_updated" in events
+        assert events[-1] == "done"
+        # Only the reply itself goes to the chat LLM
+        mock_llm.assert_called_once()
+        assert agent.preferences["food.cappuccino"]["id"] == "pref-1"
+
+
+    @pytest.mark.asyncio
+    async def test_background_learning_uses_its_turn(self, agent, mock_neo4j_store):
+        """Should record the queued turn's message and context, not the latest one."""
+        from fidus.memory.context.models import ContextFactors
+        from fidus.memory.learning_queue import LearningQueue
+
+        queue = LearningQueue(max_size=10, workers=1)
+        queue.start()
+        agent.learning_queue = queue
+        agent._connected = True
+        agent.context_agent = MagicMock()
+        agent.context_agent.record_preference_with_context = AsyncMock(
+            return_value=MagicMock(context=ContextFactors(), id="situation-1")
+        )
+        mock_neo4j_store.create_preference.return_value = {"id": "pref-1"}
+
+        first_context = ContextFactors(factors={"location": "cafe"})
+        turn = TurnContext("I love cappuccino", "user-1")
+        turn.context = first_context
+        turn.preferences = [
+            {
+                "domain": "food",
+                "key": "cappuccino",
+                "sentiment": "positive",
+                "value": "loves it",
+                "confidence": 0.9,
+            }
+        ]
+        assert agent._submit_learning(turn)
+
+        # Next turn is analyzed before the worker runs
+        next_turn = TurnContext("Hello", "user-1")
+        next_turn.context = ContextFactors(factors={"location": "office"})
+
+        await queue.join()
+        await queue.stop(drain_timeout=1)
+
+        call_kwargs = agent.context_agent.record_preference_with_context.call_args[1]
+        assert call_kwargs["message"] == "I love cappuccino"
+        assert call_kwargs["context"] == first_context
+        assert next_turn.pending_saves == []
+        assert queue.pop_events("user-1") == [{"type": "preferences_updated", "count": 1}]
+
+    @pytest.mark.asyncio
+    async def test_background_conflict_scan_is_not_interleaved_with_delete(
+        self, agent, mock_neo4j_store
+    ):
+        """Should not re-add related pairs of preferences deleted while a job scans."""
+        import asyncio
+        from fidus.memory.context.models import ContextFactors
+        from fidus.memory.learning_queue import LearningQueue
+        from fidus.memory.relatedness_memo import RelatednessMemo
+
+        queue = LearningQueue(max_size=10, workers=1)
+        queue.start()
+        agent.learning_queue = queue
+        agent._connected = True
+        agent.relatedness_memo = RelatednessMemo(max_size=100)
+        agent.conflict_detector = MagicMock()
+        agent.conflict_detector.candidates = AsyncMock(side_effect=lambda pairs: list(pairs))
+        agent.context_agent = MagicMock()
+        agent.context_agent.record_preference_with_context = AsyncMock(
+            return_value=MagicMock(context=ContextFactors(), id="situation-1")
+        )
+        mock_neo4j_store.create_preference.return_value = {"id": "pref-2"}
+        agent._set_preference("food.coffee", {
+            "id": "pref-1", "value": "dislikes it", "sentiment": "negative", "confidence": 0.9,
+        })
+
+        scanning = asyncio.Event()
+        release = asyncio.Event()
+
+        async def adjudicate(**kwargs):
+            scanning.set()
+            await release.wait()
+            response = MagicMock()
+            response.choices = [MagicMock(message=MagicMock(content='{"related": [1]}'))]
+            return response
+
+        turn = TurnContext("I love espresso", "user-1")
+        turn.context = ContextFactors()
+        turn.preferences = [
+            {
+                "domain": "food",
+                "key": "espresso",
+                "sentiment": "positive",
+                "value": "loves it",
+                "confidence": 0.9,
+            }
+        ]
+        try:
+            with patch('fidus.memory.simple_agent.acompletion', side_effect=adjudicate):
+                assert agent._submit_learning(turn)
+                await scanning.wait()
+                delete_all = asyncio.create_task(agent.delete_all_preferences())
+                await asyncio.sleep(0.01)
+                release.set()
+                await delete_all
+                await queue.join()
+        finally:
+            await queue.stop(drain_timeout=1)
+
+        assert agent.preferences == {}
+        assert agent._related_pairs == set()
+
+
 class TestMultiTenancy:
     """Tests for multi-tenancy enforcement."""
 
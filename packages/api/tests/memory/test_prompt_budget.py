@@ -0,0 +1,93 @@
+"""Tests for the token-budgeted preference prompt section."""
+
+from unittest.mock import patch
+
+from fidus.memory.prompt_budget import PreferenceSectionBuilder, estimate_tokens
+
+
+def _pref(value: str, confidence: float = 0.7, sentiment: str = "positive") -> dict:
+    return {"value": value, "sentiment": sentiment, "confidence": confidence, "is_exception": False}
+
+
+class TestEstimateTokens:
+    """Tests for the token approximation."""
+
+    def test_estimate(self) -> None:
+        """Should estimate about four characters per token."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abc") == 1
+        assert estimate_tokens("a" * 40) == 10
+
+
+class TestPreferenceSectionBuilder:
+    """Tests for PreferenceSectionBuilder."""
+
+    def test_empty_preferences(self) -> None:
+        """Should render nothing without preferences."""
+        section, stats = PreferenceSectionBuilder(token_budget=100).build({})
+
+        assert section == ""
+        assert stats["total"] == 0
+
+    def test_unlimited_budget_includes_everything(self) -> None:
+        """Should include all preferences when the budget is 0."""
+        preferences = {f"food.item_{i}": _pref(f"likes item {i}") for i in range(50)}
+
+        section, stats = PreferenceSectionBuilder(token_budget=0).build(preferences)
+
+        assert section.startswith("User's known preferences:\n")
+        assert stats["included"] == 50
+        assert stats["saved_tokens"] == 0
+
+    def test_budget_limits_section_and_reports_savings(self) -> None:
+        """Should stay within the budget and report saved tokens."""
+        preferences = {f"food.item_{i}": _pref(f"likes item {i}") for i in range(50)}
+        builder = PreferenceSectionBuilder(token_budget=40)
+
+        section, stats = builder.build(preferences)
+
+        assert 0 < stats["included"] < 50
+        assert stats["tokens"] <= 40
+        assert stats["saved_tokens"] == stats["full_tokens"] - stats["tokens"]
+        assert section.count("\n- ") == stats["included"]
+
+    def test_relevant_preferences_ranked_first(self) -> None:
+        """Should prefer preferences mentioned in the current message."""
+        preferences = {
+            "food.coffee": _pref("loves it", confidence=0.6),
+            "hobbies.hiking": _pref("enjoys it", confidence=0.9),
+        }
+
+        ranked = PreferenceSectionBuilder().rank(preferences, "Should I get a coffee?")
+
+        assert ranked[0][0] == "food.coffee"
+
+    def test_confidence_and_recency_break_ties(self) -> None:
+        """Should rank confident and recently learned preferences higher."""
+        preferences = {
+            "food.tea": _pref("likes it", confidence=0.6),
+            "food.soup": _pref("likes it", confidence=0.9),
+            "food.bread": _pref("likes it", confidence=0.6),
+        }
+
+        ranked = [key for key, _ in PreferenceSectionBuilder().rank(preferences, "Hello")]
+
+        assert ranked == ["food.soup", "food.bread", "food.tea"]
+
+    def test_model_token_counter_falls_back_to_estimate(self) -> None:
+        """Should estimate when the model tokenizer fails."""
+        builder = PreferenceSectionBuilder(token_counter_mode="model", model="unknown/model")
+
+        with patch(
+            "fidus.memory.prompt_budget.token_counter", side_effect=ValueError("no tokenizer")
+        ):
+            assert builder.count_tokens("a" * 40) == 10
+
+    def test_model_token_counter(self) -> None:
+        """Should use the model tokenizer when configured."""
+        builder = PreferenceSectionBuilder(token_counter_mode="model", model="gpt-4o-mini")
+
+        with patch("fidus.memory.prompt_budget.token_counter", return_value=7) as mock_counter:
+            assert builder.count_tokens("hello there") == 7
+
+        mock_counter.assert_called_once_with(model="gpt-4o-mini", text="hello there")
@@ -0,0 +1,46 @@
+"""Tests for prompt cache metrics."""
+
+from types import SimpleNamespace
+
+from fidus.memory.prompt_cache import PromptCacheMetrics
+
+
+class TestPromptCacheMetrics:
+    """Tests for PromptCacheMetrics."""
+
+    def test_cached_tokens_from_openai_style_usage(self) -> None:
+        """Should read prompt_tokens_details.cached_tokens."""
+        usage = SimpleNamespace(
+            prompt_tokens=1000, prompt_tokens_details=SimpleNamespace(cached_tokens=768)
+        )
+
+        assert PromptCacheMetrics.cached_tokens_from_usage(usage) == 768
+
+    def test_cached_tokens_from_anthropic_style_dict(self) -> None:
+        """Should fall back to cache_read_input_tokens."""
+        usage = {"prompt_tokens": 500, "cache_read_input_tokens": 400}
+
+        assert PromptCacheMetrics.cached_tokens_from_usage(usage) == 400
+
+    def test_unreported_usage_is_ignored(self) -> None:
+        """Should not count requests without cache information."""
+        metrics = PromptCacheMetrics()
+
+        metrics.record_usage(None)
+        metrics.record_usage(SimpleNamespace(prompt_tokens=100, prompt_tokens_details=None))
+
+        assert metrics.stats()["reported_requests"] == 0
+
+    def test_record_usage_and_prefix(self) -> None:
+        """Should aggregate cached token ratio and prefix stability."""
+        metrics = PromptCacheMetrics()
+
+        metrics.record_prefix(False)
+        metrics.record_prefix(True)
+        metrics.record_usage({"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 0}})
+        metrics.record_usage({"prompt_tokens": 1000, "prompt_tokens_details": {"cached_tokens": 900}})
+
+        stats = metrics.stats()
+        assert stats["stable_prefix_ratio"] == 0.5
+        assert stats["reported_requests"] == 2
+        assert stats["cached_token_ratio"] == 0.45
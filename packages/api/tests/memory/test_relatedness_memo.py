@@ -0,0 +1,103 @@
+"""Tests for the relatedness verdict memo."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from fidus.memory.relatedness_memo import SHARED_SCOPE, RelatednessMemo, key_pair
+
+MODEL = "ollama/llama3.2"
+COFFEE_ESPRESSO = ("food.coffee", "food.espresso")
+COFFEE_TEA = ("food.coffee", "food.tea")
+
+
+def test_key_pair_is_symmetric() -> None:
+    """Should order the keys of a pair."""
+    assert key_pair("food.espresso", "food.coffee") == COFFEE_ESPRESSO
+    assert key_pair("food.coffee", "food.espresso") == COFFEE_ESPRESSO
+
+
+class TestRelatednessMemo:
+    """Tests for RelatednessMemo."""
+
+    @pytest.fixture
+    def memo(self) -> RelatednessMemo:
+        """Create an in-process-only memo sharing verdicts across tenants."""
+        return RelatednessMemo(max_size=100, share_pairs=True)
+
+    @pytest.mark.asyncio
+    async def test_lookup_and_record(self, memo: RelatednessMemo) -> None:
+        """Should return recorded verdicts and omit unknown pairs."""
+        assert await memo.lookup("t1", MODEL, [COFFEE_ESPRESSO]) == {}
+
+        await memo.record("t1", MODEL, {COFFEE_ESPRESSO: True, COFFEE_TEA: False})
+
+        assert await memo.lookup("t1", MODEL, [COFFEE_ESPRESSO, COFFEE_TEA]) == {
+            COFFEE_ESPRESSO: True,
+            COFFEE_TEA: False,
+        }
+        assert memo.stats()["hits"] == 2
+        assert memo.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_verdicts_are_per_model(self, memo: RelatednessMemo) -> None:
+        """Should not reuse verdicts of another model."""
+        await memo.record("t1", MODEL, {COFFEE_ESPRESSO: True})
+
+        assert await memo.lookup("t1", "gpt-4o-mini", [COFFEE_ESPRESSO]) == {}
+
+    @pytest.mark.asyncio
+    async def test_shared_across_tenants(self, memo: RelatednessMemo) -> None:
+        """Should answer another tenant's lookup when sharing is on."""
+        await memo.record("t1", MODEL, {COFFEE_ESPRESSO: True})
+
+        assert await memo.lookup("t2", MODEL, [COFFEE_ESPRESSO]) == {COFFEE_ESPRESSO: True}
+        assert memo.scope("t2") == SHARED_SCOPE
+
+    @pytest.mark.asyncio
+    async def test_kept_per_tenant_by_default(self) -> None:
+        """Should scope verdicts per tenant by default, like learned taxonomy edges."""
+        memo = RelatednessMemo(max_size=100)
+        await memo.record("t1", MODEL, {COFFEE_ESPRESSO: True})
+
+        assert memo.share_pairs is False
+        assert memo.scope("t2") == "t2"
+        assert await memo.lookup("t2", MODEL, [COFFEE_ESPRESSO]) == {}
+
+    @pytest.mark.asyncio
+    async def test_not_shared_when_disabled(self) -> None:
+        """Should keep verdicts per tenant if sharing is off."""
+        memo = RelatednessMemo(max_size=100, share_pairs=False)
+        await memo.record("t1", MODEL, {COFFEE_ESPRESSO: True})
+
+        assert await memo.lookup("t2", MODEL, [COFFEE_ESPRESSO]) == {}
+        assert await memo.lookup("t1", MODEL, [COFFEE_ESPRESSO]) == {COFFEE_ESPRESSO: True}
+
+    @pytest.mark.asyncio
+    async def test_redis_tier(self) -> None:
+        """Should read verdicts from Redis when not in process."""
+        session_cache = Mock()
+        session_cache.get_related_pairs = AsyncMock(
+            return_value={"food.coffee|food.espresso": True}
+        )
+        memo = RelatednessMemo(max_size=100, share_pairs=True, session_cache=session_cache)
+
+        assert await memo.lookup("t1", MODEL, [COFFEE_ESPRESSO]) == {COFFEE_ESPRESSO: True}
+        assert await memo.lookup("t1", MODEL, [COFFEE_ESPRESSO]) == {COFFEE_ESPRESSO: True}
+
+        session_cache.get_related_pairs.assert_awaited_once_with(
+            SHARED_SCOPE, MODEL, ["food.coffee|food.espresso"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_falls_back(self) -> None:
+        """Should treat Redis errors as misses."""
+        session_cache = Mock()
+        session_cache.get_related_pairs = AsyncMock(side_effect=ConnectionError("down"))
+        session_cache.store_related_pairs = AsyncMock(side_effect=ConnectionError("down"))
+        memo = RelatednessMemo(max_size=100, session_cache=session_cache)
+
+        await memo.record("t1", MODEL, {COFFEE_TEA: False})
+
+        assert await memo.lookup("t1", MODEL, [COFFEE_ESPRESSO]) == {}
+        assert await memo.lookup("t1", MODEL, [COFFEE_TEA]) == {COFFEE_TEA: False}
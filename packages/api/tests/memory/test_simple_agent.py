@@ -1,5 +1,7 @@
+import json
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from fidus.memory.agent_actor import TurnContext
 from fidus.memory.simple_agent import InMemoryAgent
 
 
@@ -56,3 +58,635 @@ async def test_preference_storage():
             assert len(agent.preferences) > 0
             assert "food.cappuccino" in agent.preferences
             assert agent.preferences["food.cappuccino"]["confidence"] == 0.8
+
+
+@pytest.mark.asyncio
+async def test_preference_extraction_is_cached():
+    """Should reuse extracted preferences for a repeated message."""
+    from fidus.memory.extraction_cache import ExtractionCache
+
+    agent = InMemoryAgent(extraction_cache=ExtractionCache(max_size=10, ttl_seconds=60))
+
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(
+        content='{"preferences": [{"domain": "food", "key": "cappuccino", "value": "loves it", '
+                '"sentiment": "positive", "confidence": 0.9}]}'
+    ))]
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=mock_response) as mock_acompletion:
+        first = await agent._extract_preferences("I love cappuccino")
+        second = await agent._extract_preferences("i love cappuccino!")
+
+    assert mock_acompletion.await_count == 1
+    assert second == first
+    assert second[0]["key"] == "cappuccino"
+
+
+def _token_stream(*tokens):
+    """Build an async LLM stream yielding the given tokens."""
+    stream = MagicMock()
+    stream.__aiter__.return_value = [
+        MagicMock(choices=[MagicMock(delta=MagicMock(content=token))]) for token in tokens
+    ]
+    return stream
+
+
+async def _collect_events(agent, message):
+    """Run chat_stream and decode its events."""
+    return [json.loads(event) async for event in agent.chat_stream(message)]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_starts_response_before_extraction_finishes():
+    """Should stream tokens while preference extraction is still running."""
+    import asyncio
+
+    agent = InMemoryAgent()
+    extraction_started = asyncio.Event()
+
+    async def slow_extraction(text):
+        extraction_started.set()
+        await asyncio.sleep(0.05)
+        return [{"domain": "food", "key": "cappuccino", "value": "loves it",
+                 "sentiment": "positive", "confidence": 0.9}]
+
+    with patch.object(agent, '_extract_preferences', side_effect=slow_extraction):
+        with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                   return_value=_token_stream("Hello", " there")):
+            events = await _collect_events(agent, "I love cappuccino")
+
+    assert extraction_started.is_set()
+    assert [event["type"] for event in events] == [
+        "acknowledged", "token", "token", "preferences_updated", "done"
+    ]
+    assert agent.conversation_history[-1] == {"role": "assistant", "content": "Hello there"}
+    assert "food.cappuccino" in agent.preferences
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_prompt_uses_preferences_known_before_message():
+    """Should not wait for the current message's extraction to build the prompt."""
+    agent = InMemoryAgent()
+    agent.preferences["food.tea"] = {
+        "value": "likes it", "sentiment": "positive", "confidence": 0.8, "is_exception": False
+    }
+
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock, return_value=[]):
+        with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                   return_value=_token_stream("Sure")) as mock_acompletion:
+            await _collect_events(agent, "Any drink ideas?")
+
+    system_prompt = mock_acompletion.call_args[1]["messages"][0]["content"]
+    assert "food.tea" in system_prompt
+    user_messages = [m for m in mock_acompletion.call_args[1]["messages"] if m["role"] == "user"]
+    assert user_messages[-1]["content"] == "Any drink ideas?"
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_survives_learning_failure():
+    """Should finish the response even if preference extraction fails."""
+    agent = InMemoryAgent()
+
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock,
+                      side_effect=RuntimeError("extraction down")):
+        with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                   return_value=_token_stream("Hi")):
+            events = await _collect_events(agent, "Hello")
+
+    assert [event["type"] for event in events] == ["acknowledged", "token", "done"]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_raises_response_failure():
+    """Should propagate errors from the response completion."""
+    agent = InMemoryAgent()
+
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock, return_value=[]):
+        with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                   side_effect=RuntimeError("llm down")):
+            with pytest.raises(RuntimeError, match="llm down"):
+                await _collect_events(agent, "Hello")
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_enriched_conflicts():
+    """Should interleave a conflict event with related preferences."""
+    agent = InMemoryAgent()
+    agent.preferences = {
+        "food.coffee": {"value": "loves it", "sentiment": "positive", "confidence": 0.8,
+                        "is_exception": False},
+        "food.espresso": {"value": "loves it", "sentiment": "positive", "confidence": 0.8,
+                          "is_exception": False},
+    }
+    extracted = [{"domain": "food", "key": "coffee", "value": "hates it",
+                  "sentiment": "negative", "confidence": 0.9}]
+
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock,
+                      return_value=extracted), \
+            patch.object(agent, '_find_related_pairs', new_callable=AsyncMock,
+                         return_value={("food.coffee", "food.espresso")}) as mock_related:
+        with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                   return_value=_token_stream("Ok")):
+            events = await _collect_events(agent, "I hate coffee")
+
+    conflict_event = next(event for event in events if event["type"] == "preference_conflict")
+    assert conflict_event["conflicts"][0]["key"] == "food.coffee"
+    assert conflict_event["conflicts"][0]["related_preferences"][0]["key"] == "food.espresso"
+    assert events[-1]["type"] == "done"
+    # One relatedness check serves the scan and the enrichment
+    mock_related.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_background_learning_moves_extraction_off_the_stream():
+    """Should stream the response without waiting for queued learning."""
+    import asyncio
+    from fidus.memory.learning_queue import LearningQueue
+
+    queue = LearningQueue(max_size=10, workers=1)
+    queue.start()
+    agent = InMemoryAgent(learning_queue=queue)
+    release = asyncio.Event()
+
+    async def blocked_extraction(text):
+        await release.wait()
+        return [{"domain": "food", "key": "cappuccino", "value": "loves it",
+                 "sentiment": "positive", "confidence": 0.9}]
+
+    try:
+        with patch.object(agent, '_extract_preferences', side_effect=blocked_extraction):
+            with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                       return_value=_token_stream("Hi")):
+                events = await _collect_events(agent, "I love cappuccino")
+
+            assert [event["type"] for event in events] == ["acknowledged", "token", "done"]
+
+            release.set()
+            await queue.join()
+    finally:
+        await queue.stop(drain_timeout=1)
+
+    assert "food.cappuccino" in agent.preferences
+    assert queue.pop_events("unknown") == [{"type": "preferences_updated", "count": 1}]
+
+
+@pytest.mark.asyncio
+async def test_background_learning_events_delivered_on_next_stream():
+    """Should send learning events that completed since the last stream."""
+    from fidus.memory.learning_queue import LearningQueue
+
+    queue = LearningQueue(max_size=10, workers=1)
+    queue.start()
+    agent = InMemoryAgent(learning_queue=queue)
+    queue.publish("user-1", {"type": "preferences_updated", "count": 2})
+
+    try:
+        with patch.object(agent, '_extract_preferences', new_callable=AsyncMock, return_value=[]):
+            with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                       return_value=_token_stream("Hi")):
+                events = [json.loads(event)
+                          async for event in agent.chat_stream("Hello", user_id="user-1")]
+    finally:
+        await queue.stop(drain_timeout=1)
+
+    assert [event["type"] for event in events] == [
+        "acknowledged", "token", "preferences_updated", "done"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_turns_of_one_agent_do_not_interleave():
+    """Should run concurrent chats of the same agent one after the other."""
+    import asyncio
+
+    agent = InMemoryAgent()
+    agent.learning_queue = None
+    first_reply_released = asyncio.Event()
+
+    async def reply(**kwargs):
+        last_message = [message["content"] for message in kwargs["messages"]
+                        if message["role"] == "user"][-1]
+        if "first" in last_message:
+            await first_reply_released.wait()
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content=f"Re: {last_message}"))]
+        return response
+
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock, return_value=[]), \
+            patch('fidus.memory.simple_agent.acompletion', side_effect=reply):
+        first = asyncio.create_task(agent.chat("first", user_id="user-1"))
+        second = asyncio.create_task(agent.chat("second", user_id="user-1"))
+        await asyncio.sleep(0.01)
+        first_reply_released.set()
+        await asyncio.gather(first, second)
+
+    assert [message["content"] for message in agent.conversation_history] == [
+        "first", "Re: first", "second", "Re: second"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_disconnected_stream_finishes_learning_before_next_turn():
+    """Should keep inline learning in the mailbox when the client goes away."""
+    import asyncio
+
+    agent = InMemoryAgent()
+    agent.learning_queue = None
+    release = asyncio.Event()
+    more_tokens = asyncio.Event()
+    log = []
+
+    async def tokens():
+        yield MagicMock(choices=[MagicMock(delta=MagicMock(content="Hi"))])
+        await more_tokens.wait()
+        yield MagicMock(choices=[MagicMock(delta=MagicMock(content=" there"))])
+
+    async def blocked_extraction(text):
+        await release.wait()
+        log.append(f"learned {text}")
+        return []
+
+    async def reply(**kwargs):
+        if kwargs.get("stream"):
+            return tokens()
+        log.append("reply")
+        response = MagicMock()
+        response.choices = [MagicMock(message=MagicMock(content="Hi"))]
+        return response
+
+    with patch.object(agent, '_extract_preferences', side_effect=blocked_extraction), \
+            patch('fidus.memory.simple_agent.acompletion', side_effect=reply):
+        stream = agent.chat_stream("first", user_id="user-1")
+        assert json.loads(await stream.__anext__())["type"] == "acknowledged"
+        assert json.loads(await stream.__anext__())["type"] == "token"
+        await stream.aclose()
+        more_tokens.set()
+
+        second = asyncio.create_task(agent.chat("second", user_id="user-1"))
+        await asyncio.sleep(0.01)
+        assert log == []
+        assert {"role": "user", "content": "second"} not in agent.conversation_history
+
+        release.set()
+        await second
+
+    assert log == ["learned first", "learned second", "reply"]
+
+
+def test_preferences_snapshot_is_read_only_copy():
+    """Should give readers an immutable copy that later changes don't affect."""
+    agent = InMemoryAgent()
+    agent._set_preference("food.coffee", {"value": "loves it", "sentiment": "positive",
+                                          "confidence": 0.9, "is_exception": False})
+
+    snapshot = agent.preferences_snapshot()
+    agent.preferences["food.coffee"]["confidence"] = 0.5
+    agent._set_preference("food.tea", {"value": "likes it", "sentiment": "positive",
+                                       "confidence": 0.8, "is_exception": False})
+
+    assert list(snapshot) == ["food.coffee"]
+    assert snapshot["food.coffee"]["confidence"] == 0.9
+    with pytest.raises(TypeError):
+        snapshot["food.coffee"]["confidence"] = 0.1
+
+
+def test_build_prompt_limits_preferences_to_budget():
+    """Should include only the most relevant preferences within the token budget."""
+    from fidus.memory.prompt_budget import PreferenceSectionBuilder
+
+    agent = InMemoryAgent()
+    agent.preference_section = PreferenceSectionBuilder(token_budget=20)
+    for i in range(30):
+        agent.preferences[f"hobbies.hobby_{i}"] = {
+            "value": "enjoys it", "sentiment": "positive", "confidence": 0.9, "is_exception": False
+        }
+    agent.preferences["food.cappuccino"] = {
+        "value": "loves it", "sentiment": "positive", "confidence": 0.5, "is_exception": False
+    }
+
+    prompt = agent._build_prompt(message="Is a cappuccino a good idea?")
+
+    assert "food.cappuccino" in prompt
+    assert prompt.count("hobbies.hobby_") < 30
+
+
+def test_updated_preference_becomes_most_recent():
+    """Should move updated preferences to the end (most recently learned)."""
+    agent = InMemoryAgent()
+    agent._update_preferences([
+        {"domain": "food", "key": "tea", "value": "likes it", "sentiment": "positive", "confidence": 0.6},
+        {"domain": "food", "key": "soup", "value": "likes it", "sentiment": "positive", "confidence": 0.6},
+    ])
+    agent._update_preferences([
+        {"domain": "food", "key": "tea", "value": "loves it", "sentiment": "positive", "confidence": 0.9},
+    ])
+
+    assert list(agent.preferences) == ["food.soup", "food.tea"]
+
+
+def _pref(value, confidence=0.8):
+    return {"value": value, "sentiment": "positive", "confidence": confidence, "is_exception": False}
+
+
+def test_cache_friendly_prompt_is_stable_across_turns():
+    """Should keep the system prompt identical and send the time last."""
+    from fidus.config import config
+
+    agent = InMemoryAgent()
+    agent.preferences = {"food.tea": _pref("likes it", 0.6), "food.coffee": _pref("loves it")}
+
+    with patch.object(config, "prompt_cache_friendly", True):
+        first = agent._build_prompt(message="Coffee?")
+        second = agent._build_prompt(message="What about tea?")
+        messages = agent._build_messages(second, [{"role": "user", "content": "What about tea?"}])
+
+    assert first == second
+    assert "Current Date and Time:" not in first
+    assert first.index("food.coffee") < first.index("food.tea")
+    assert messages[0] == {"role": "system", "content": second}
+    assert messages[-1]["role"] == "system"
+    assert messages[-1]["content"].startswith("Current Date and Time: ")
+
+
+def test_cache_friendly_prompt_selects_the_same_preferences_over_budget():
+    """Should not let the message change which preferences fit the budget."""
+    from fidus.config import config
+    from fidus.memory.prompt_budget import PreferenceSectionBuilder
+
+    agent = InMemoryAgent()
+    agent.preference_section = PreferenceSectionBuilder(token_budget=10)
+    agent.preferences = {"food.tea": _pref("likes it", 0.6), "food.coffee": _pref("loves it")}
+
+    with patch.object(config, "prompt_cache_friendly", True):
+        first = agent._build_prompt(message="Coffee?")
+        second = agent._build_prompt(message="What about tea?")
+
+    assert first == second
+    assert "food.coffee" in first
+    assert "food.tea" not in first
+
+
+def test_cache_friendly_prompt_is_opt_in():
+    """Should keep the original message layout unless enabled."""
+    from fidus.config import PrototypeConfig
+
+    with patch.dict("os.environ", {}, clear=False) as environ:
+        environ.pop("FIDUS_PROMPT_CACHE_FRIENDLY", None)
+        assert PrototypeConfig().prompt_cache_friendly is False
+
+
+def test_legacy_prompt_layout_keeps_time_in_system_prompt():
+    """Should keep the original layout when the cache-friendly mode is off."""
+    from fidus.config import config
+
+    agent = InMemoryAgent()
+
+    with patch.object(config, "prompt_cache_friendly", False):
+        prompt = agent._build_prompt()
+        messages = agent._build_messages(prompt, [{"role": "user", "content": "Hi"}])
+
+    assert "Current Date and Time:" in prompt
+    assert messages[-1] == {"role": "user", "content": "Hi"}
+
+
+def test_build_messages_records_prefix_stability():
+    """Should count turns that reuse the previous system prompt."""
+    from fidus.memory.prompt_cache import PromptCacheMetrics
+
+    agent = InMemoryAgent()
+    metrics = PromptCacheMetrics()
+
+    with patch("fidus.memory.simple_agent.prompt_cache_metrics", metrics):
+        agent._build_messages("prompt A", [])
+        agent._build_messages("prompt A", [])
+        agent._build_messages("prompt B", [])
+
+    assert metrics.stats()["turns"] == 3
+    assert metrics.stats()["stable_prefix_turns"] == 1
+
+
+def _conflict_agent(**kwargs):
+    """Agent with a coffee conflict and an embedding prefilter that keeps every pair."""
+    from fidus.memory.relatedness_memo import RelatednessMemo
+
+    detector = MagicMock()
+    detector.candidates = AsyncMock(side_effect=lambda pairs: list(pairs))
+    agent = InMemoryAgent(
+        relatedness_memo=RelatednessMemo(max_size=100), conflict_detector=detector, **kwargs
+    )
+    for key, sentiment in [
+        ("food.coffee", "negative"),
+        ("food.espresso", "positive"),
+        ("food.tea", "negative"),
+        ("food.pizza", "positive"),
+        ("music.jazz", "positive"),
+    ]:
+        agent._set_preference(key, {"value": "...", "sentiment": sentiment, "confidence": 0.9})
+    return agent, detector
+
+
+def _related_response(*numbers):
+    """Build an LLM response confirming the given pair numbers."""
+    response = MagicMock()
+    response.choices = [MagicMock(message=MagicMock(
+        content=json.dumps({"related": list(numbers)})
+    ))]
+    return response
+
+
+async def _scan(agent, conflicts=()):
+    """Run one incremental relatedness scan over the dirty keys."""
+    return await agent._find_related_pairs(agent._take_dirty_keys(), list(conflicts))
+
+
+@pytest.mark.asyncio
+async def test_related_pairs_checked_in_one_batched_call():
+    """Should only check same-domain pairs with differing sentiment, in one LLM call."""
+    agent, detector = _conflict_agent()
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response(1)) as mock_acompletion:
+        related_pairs = await _scan(agent)
+
+    assert detector.candidates.await_args.args[0] == [
+        ("food.coffee", "food.espresso"),
+        ("food.coffee", "food.pizza"),
+        ("food.espresso", "food.tea"),
+        ("food.pizza", "food.tea"),
+    ]
+    assert mock_acompletion.await_count == 1
+    assert related_pairs == {("food.coffee", "food.espresso")}
+
+    conflicts = agent._find_semantic_inconsistencies(related_pairs)
+    assert [conflict["key"] for conflict in conflicts] == ["food.coffee"]
+
+
+@pytest.mark.asyncio
+async def test_repeated_conflict_check_reuses_relatedness_verdicts():
+    """Should not call the LLM again for pairs judged before."""
+    agent, _ = _conflict_agent()
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response(1)) as mock_acompletion:
+        first = await _scan(agent)
+        agent._reset_conflict_state()
+        second = await _scan(agent)
+
+    assert mock_acompletion.await_count == 1
+    assert second == first
+
+
+@pytest.mark.asyncio
+async def test_related_pairs_include_pending_direct_conflicts():
+    """Should check pairs that only conflict with a pending sentiment change."""
+    agent, detector = _conflict_agent()
+    agent._take_dirty_keys()
+    conflict = {"key": "food.pizza", "new_sentiment": "negative"}
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response()):
+        await agent._find_related_pairs({"food.pizza"}, [conflict])
+
+    # Pizza (positive -> negative) vs espresso (positive) matters for enrichment
+    assert ("food.espresso", "food.pizza") in detector.candidates.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_failed_relatedness_check_is_retried():
+    """Should treat pairs as unrelated on LLM errors and keep their keys dirty."""
+    agent, _ = _conflict_agent()
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               side_effect=Exception("LLM down")):
+        assert await _scan(agent) == set()
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response(1)) as mock_acompletion:
+        assert await _scan(agent) == {("food.coffee", "food.espresso")}
+
+    assert mock_acompletion.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_turn_without_changes_does_no_conflict_work():
+    """Should skip the conflict scan if no preference changed."""
+    agent, detector = _conflict_agent()
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response(1)):
+        await _scan(agent)
+    detector.candidates.reset_mock()
+
+    events = []
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock, return_value=[]):
+        await agent._learn_from_message(TurnContext("Hello"), events.append)
+
+    detector.candidates.assert_not_awaited()
+    assert events == []
+
+
+@pytest.mark.asyncio
+async def test_new_preference_only_checked_against_the_rest():
+    """Should check only the new key's pairs and keep earlier results."""
+    agent, detector = _conflict_agent()
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response(1)):
+        await _scan(agent)
+
+    extracted = [{"domain": "food", "key": "latte", "value": "loves it",
+                  "sentiment": "positive", "confidence": 0.9}]
+    events = []
+    with patch.object(agent, '_extract_preferences', new_callable=AsyncMock,
+                      return_value=extracted), \
+            patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+                  return_value=_related_response(1)):
+        await agent._learn_from_message(TurnContext("I love latte"), events.append)
+
+    assert detector.candidates.await_args.args[0] == [
+        ("food.coffee", "food.latte"),
+        ("food.latte", "food.tea"),
+    ]
+    assert agent._related_pairs == {
+        ("food.coffee", "food.espresso"),
+        ("food.coffee", "food.latte"),
+    }
+    conflict_event = next(event for event in events if event["type"] == "preference_conflict")
+    assert [conflict["key"] for conflict in conflict_event["conflicts"]] == ["food.coffee"]
+    related = conflict_event["conflicts"][0]["related_preferences"]
+    assert {pref["key"] for pref in related} == {"food.espresso", "food.latte"}
+
+
+def test_removed_preference_drops_related_pairs():
+    """Should forget conflict results of a removed preference."""
+    agent, _ = _conflict_agent()
+    agent._related_pairs = {("food.coffee", "food.espresso"), ("food.pizza", "food.tea")}
+
+    agent._remove_preference("food.espresso")
+
+    assert agent._related_pairs == {("food.pizza", "food.tea")}
+    assert "food.espresso" not in agent._take_dirty_keys()
+
+
+def _taxonomy(related=None):
+    """Mock taxonomy store returning the given related keys."""
+    taxonomy = MagicMock()
+    taxonomy.related_keys = AsyncMock(return_value=related or {})
+    taxonomy.add_relations = AsyncMock(return_value=0)
+    return taxonomy
+
+
+@pytest.mark.asyncio
+async def test_taxonomy_relations_skip_the_llm():
+    """Should take pairs related in the taxonomy without prefilter or LLM."""
+    taxonomy = _taxonomy({"food.coffee": ["food.espresso"], "food.espresso": ["food.coffee"]})
+    agent, detector = _conflict_agent(taxonomy=taxonomy)
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response()) as mock_acompletion:
+        related_pairs = await _scan(agent)
+
+    taxonomy.related_keys.assert_awaited_once()
+    assert ("food.coffee", "food.espresso") not in detector.candidates.await_args.args[0]
+    assert mock_acompletion.await_count == 1
+    assert related_pairs == {("food.coffee", "food.espresso")}
+    taxonomy.add_relations.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_directed_llm_verdicts_extend_the_taxonomy():
+    """Should record the general key of related pairs as IS_A relations."""
+    taxonomy = _taxonomy()
+    agent, _ = _conflict_agent(taxonomy=taxonomy)
+    response = MagicMock()
+    response.choices = [MagicMock(message=MagicMock(content=json.dumps(
+        {"related": [{"pair": 1, "general": "food.coffee"}, {"pair": 4, "general": None}]}
+    )))]
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=response):
+        related_pairs = await _scan(agent)
+
+    assert related_pairs == {("food.coffee", "food.espresso"), ("food.pizza", "food.tea")}
+    taxonomy.add_relations.assert_awaited_once_with(
+        [
+            ("food.espresso", "food.coffee"),
+            ("food.pizza", "food.tea"),
+            ("food.tea", "food.pizza"),
+        ],
+        source="llm",
+        tenant_id=agent._relatedness_scope(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_taxonomy_failure_falls_back_to_llm():
+    """Should judge all pairs with the LLM if the taxonomy lookup fails."""
+    taxonomy = _taxonomy()
+    taxonomy.related_keys.side_effect = Exception("Neo4j down")
+    agent, _ = _conflict_agent(taxonomy=taxonomy)
+
+    with patch('fidus.memory.simple_agent.acompletion', new_callable=AsyncMock,
+               return_value=_related_response(1)):
+        assert await _scan(agent) == {("food.coffee", "food.espresso")}